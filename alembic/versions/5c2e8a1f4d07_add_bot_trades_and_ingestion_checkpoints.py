@@ -0,0 +1,74 @@
+"""Add bot_trades and trade_ingestion_checkpoints tables
+
+Revision ID: 5c2e8a1f4d07
+Revises: 89b99142fa73
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e8a1f4d07'
+down_revision: Union[str, Sequence[str], None] = '89b99142fa73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('bot_trades',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('bot_name', sa.String(length=100), nullable=False),
+    sa.Column('ft_trade_id', sa.Integer(), nullable=False),
+    sa.Column('exchange', sa.String(length=50), nullable=True),
+    sa.Column('pair', sa.String(length=50), nullable=False),
+    sa.Column('is_open', sa.Boolean(), nullable=False),
+    sa.Column('is_short', sa.Boolean(), nullable=False),
+    sa.Column('open_date', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('close_date', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('open_rate', sa.Float(), nullable=True),
+    sa.Column('close_rate', sa.Float(), nullable=True),
+    sa.Column('amount', sa.Float(), nullable=True),
+    sa.Column('stake_amount', sa.Float(), nullable=True),
+    sa.Column('profit_ratio', sa.Float(), nullable=True),
+    sa.Column('profit_abs', sa.Float(), nullable=True),
+    sa.Column('exit_reason', sa.String(length=100), nullable=True),
+    sa.Column('enter_tag', sa.String(length=100), nullable=True),
+    sa.Column('strategy', sa.String(length=100), nullable=True),
+    sa.Column('timeframe', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('bot_name', 'ft_trade_id', name='uq_bot_trades_bot_trade')
+    )
+    op.create_index(op.f('ix_bot_trades_id'), 'bot_trades', ['id'], unique=False)
+    op.create_index(op.f('ix_bot_trades_bot_name'), 'bot_trades', ['bot_name'], unique=False)
+    op.create_index(op.f('ix_bot_trades_pair'), 'bot_trades', ['pair'], unique=False)
+    op.create_index(op.f('ix_bot_trades_is_open'), 'bot_trades', ['is_open'], unique=False)
+    op.create_index(op.f('ix_bot_trades_open_date'), 'bot_trades', ['open_date'], unique=False)
+    op.create_index(op.f('ix_bot_trades_close_date'), 'bot_trades', ['close_date'], unique=False)
+    op.create_table('trade_ingestion_checkpoints',
+    sa.Column('bot_name', sa.String(length=100), nullable=False),
+    sa.Column('last_trade_id', sa.Integer(), nullable=False),
+    sa.Column('last_order_id', sa.Integer(), nullable=False),
+    sa.Column('open_trade_ids', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('bot_name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('trade_ingestion_checkpoints')
+    op.drop_index(op.f('ix_bot_trades_close_date'), table_name='bot_trades')
+    op.drop_index(op.f('ix_bot_trades_open_date'), table_name='bot_trades')
+    op.drop_index(op.f('ix_bot_trades_is_open'), table_name='bot_trades')
+    op.drop_index(op.f('ix_bot_trades_pair'), table_name='bot_trades')
+    op.drop_index(op.f('ix_bot_trades_bot_name'), table_name='bot_trades')
+    op.drop_index(op.f('ix_bot_trades_id'), table_name='bot_trades')
+    op.drop_table('bot_trades')
@@ -0,0 +1,73 @@
+"""Add composite keyset indexes to audit_logs
+
+Revision ID: 9e4b7d2c6a15
+Revises: 5c2e8a1f4d07
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9e4b7d2c6a15"
+down_revision: Union[str, Sequence[str], None] = "5c2e8a1f4d07"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Composite indexes replace the single-column ones they start with
+    op.drop_index(op.f("ix_audit_logs_user_id"), table_name="audit_logs")
+    op.drop_index(op.f("ix_audit_logs_username"), table_name="audit_logs")
+    op.drop_index(op.f("ix_audit_logs_path"), table_name="audit_logs")
+    op.drop_index(op.f("ix_audit_logs_status_code"), table_name="audit_logs")
+    op.create_index(
+        "ix_audit_logs_created_at_id", "audit_logs", ["created_at", "id"], unique=False
+    )
+    op.create_index(
+        "ix_audit_logs_user_id_created_at",
+        "audit_logs",
+        ["user_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_audit_logs_username_created_at",
+        "audit_logs",
+        ["username", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_audit_logs_path_created_at",
+        "audit_logs",
+        ["path", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_audit_logs_status_code_created_at",
+        "audit_logs",
+        ["status_code", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_audit_logs_status_code_created_at", table_name="audit_logs")
+    op.drop_index("ix_audit_logs_path_created_at", table_name="audit_logs")
+    op.drop_index("ix_audit_logs_username_created_at", table_name="audit_logs")
+    op.drop_index("ix_audit_logs_user_id_created_at", table_name="audit_logs")
+    op.drop_index("ix_audit_logs_created_at_id", table_name="audit_logs")
+    op.create_index(
+        op.f("ix_audit_logs_status_code"), "audit_logs", ["status_code"], unique=False
+    )
+    op.create_index(op.f("ix_audit_logs_path"), "audit_logs", ["path"], unique=False)
+    op.create_index(
+        op.f("ix_audit_logs_username"), "audit_logs", ["username"], unique=False
+    )
+    op.create_index(
+        op.f("ix_audit_logs_user_id"), "audit_logs", ["user_id"], unique=False
+    )
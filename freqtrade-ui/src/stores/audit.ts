@@ -15,18 +15,30 @@ const AuditLogSchema = z.object({
 
 export type AuditLog = z.infer<typeof AuditLogSchema>;
 
+const AuditLogPageSchema = z.object({
+  items: z.array(AuditLogSchema),
+  next_cursor: z.string().nullable(),
+});
+
 export const useAuditStore = defineStore('audit', () => {
   const logs: Ref<AuditLog[]> = ref([]);
   const loading: Ref<boolean> = ref(false);
   const error: Ref<string | null> = ref(null);
+  // Keyset cursor of the next page, null when the last page is loaded
+  const nextCursor: Ref<string | null> = ref(null);
 
-  async function fetchAuditLogs() {
+  async function fetchAuditLogs(loadMore = false) {
+    if (loadMore && !nextCursor.value) {
+      return;
+    }
     loading.value = true;
     error.value = null;
     try {
-      const response = await apiClient.get('/audit/logs');
-      const validatedLogs = z.array(AuditLogSchema).parse(response.data);
-      logs.value = validatedLogs;
+      const params = loadMore ? { cursor: nextCursor.value } : {};
+      const response = await apiClient.get('/audit/search', { params });
+      const page = AuditLogPageSchema.parse(response.data);
+      logs.value = loadMore ? [...logs.value, ...page.items] : page.items;
+      nextCursor.value = page.next_cursor;
     } catch (e: any) {
       if (e instanceof z.ZodError) {
         error.value = "Received invalid data from the server.";
@@ -44,6 +56,7 @@ export const useAuditStore = defineStore('audit', () => {
     logs,
     loading,
     error,
+    nextCursor,
     fetchAuditLogs,
   };
 });
@@ -0,0 +1,268 @@
+"""
+Conditional GET and response caching for read-heavy list endpoints.
+
+Dashboards poll the bot, strategy and FreqAI model lists. Each list belongs
+to a resource ("bots", "strategies", "freqai_models") with a version number
+kept in Redis (an INCR counter per resource), so every server process
+derives the same ETag. The ETag of a response is derived from the resource
+version, the user and the URL, so a poll whose If-None-Match still matches
+gets a 304 before any database query, whichever process serves it. Other
+polls are served from an in-process LRU of encoded bodies keyed by ETag.
+
+A resource version is bumped when:
+- a database commit changed one of its models (bulk UPDATE/DELETE included);
+- an endpoint calls `response_cache.invalidate()` (e.g. strategy files);
+- a bot status event (BOT_STARTED, BOT_STOPPED, ...) arrives on
+  `bot_events` or `mcp_events`. Trade and other bot events leave the bot
+  list as it is and are ignored.
+
+While Redis is unreachable, versions fall back to per-process counters
+under a random epoch, so ETags of other processes never match. ETags also
+change every RESPONSE_CACHE_TTL seconds, which bounds staleness after
+changes made outside this server.
+"""
+
+import asyncio
+import hashlib
+import logging
+import secrets
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from itertools import chain
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from management_server.core.config import settings
+from management_server.models.models import Bot, FreqAIModel
+from management_server.services.cache_service import CacheService, cache_service
+from management_server.tools.redis_streams_event_bus import (
+    RedisStreamsEventBus,
+    core_streams_event_bus,
+)
+
+logger = logging.getLogger(__name__)
+
+# Models whose changes invalidate cached responses of a resource
+RESOURCE_MODELS = {Bot: "bots", FreqAIModel: "freqai_models"}
+
+# Streams with the events that change the bot list (status, pid, port)
+BOT_EVENT_STREAMS = ("bot_events", "mcp_events")
+# Per-process consumer groups are named with this prefix
+CONSUMER_GROUP_PREFIX = "response_cache_"
+BOT_STATUS_EVENTS = {
+    "BOT_STARTING",
+    "BOT_STARTED",
+    "BOT_START_FAILED",
+    "BOT_STOPPING",
+    "BOT_STOPPED",
+    "BOT_RESTARTING",
+}
+
+
+def version_key(resource: str) -> str:
+    """CacheService key of the shared version counter of a resource."""
+    return f"response_version:{resource}"
+
+
+class ResponseCache:
+    """Resource versions, ETags and the cache of encoded responses."""
+
+    def __init__(
+        self,
+        event_bus: Optional[RedisStreamsEventBus] = None,
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None,
+        cache: Optional[CacheService] = None,
+    ):
+        self.event_bus = event_bus or core_streams_event_bus
+        self.cache = cache or cache_service
+        self.max_entries = max_entries or settings.RESPONSE_CACHE_MAX_ENTRIES
+        self.ttl = ttl or settings.RESPONSE_CACHE_TTL
+        # Fallback versions while Redis is unreachable; the epoch keeps ETags
+        # of a restarted or another process from matching them
+        self.epoch = secrets.token_hex(4)
+        self.versions: Dict[str, int] = defaultdict(int)
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._adapters: Dict[Any, TypeAdapter] = {}
+        self._consumer_group = f"{CONSUMER_GROUP_PREFIX}{uuid.uuid4().hex[:12]}"
+        self.stats: Dict[str, int] = {
+            "not_modified": 0,
+            "hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+        }
+
+    async def version(self, resource: str) -> str:
+        """Shared version of a resource, or this process's own without Redis."""
+        # INCRBY 0 reads the counter, creating it at 0 on first use
+        shared = await self.cache.increment(version_key(resource), 0)
+        if shared is None:
+            return f"{self.epoch}.{self.versions[resource]}"
+        return str(shared)
+
+    def etag(self, resource: str, version: str, user_id: Any, request: Request) -> str:
+        query = sorted(request.query_params.multi_items())
+        bucket = int(time.time() // self.ttl)
+        raw = f"{resource}|{version}|{bucket}|{user_id}|{request.url.path}|{query}"
+        return f'W/"{hashlib.sha1(raw.encode()).hexdigest()[:24]}"'
+
+    @staticmethod
+    def _matches(request: Request, etag: str) -> bool:
+        header = request.headers.get("if-none-match")
+        if not header:
+            return False
+        # Weak comparison, as proxies may strip or add the W/ prefix
+        candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+        return "*" in candidates or etag.removeprefix("W/") in candidates
+
+    def _encode(self, data: Any, response_model: Any) -> bytes:
+        adapter = self._adapters.get(response_model)
+        if adapter is None:
+            adapter = self._adapters[response_model] = TypeAdapter(response_model)
+        return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+
+    async def respond(
+        self,
+        request: Request,
+        resource: str,
+        user_id: Any,
+        loader: Callable[[], Awaitable[Any]],
+        response_model: Any,
+    ) -> Response:
+        """
+        Response of a cacheable GET endpoint.
+
+        Args:
+            request: Current request, for its URL and If-None-Match header
+            resource: Resource the response is built from
+            user_id: User the response is for, None for public endpoints
+            loader: Coroutine function loading the response data
+            response_model: Type the data is validated and encoded as
+
+        Returns:
+            304 if the client's copy is current, else the encoded response
+        """
+        etag = self.etag(resource, await self.version(resource), user_id, request)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if settings.RESPONSE_CACHE_ENABLED and self._matches(request, etag):
+            self.stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+
+        body = self._entries.get(etag) if settings.RESPONSE_CACHE_ENABLED else None
+        if body is not None:
+            self.stats["hits"] += 1
+            self._entries.move_to_end(etag)
+        else:
+            self.stats["misses"] += 1
+            body = self._encode(await loader(), response_model)
+            self._entries[etag] = body
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def bump(self, *resources: str):
+        """Bump the fallback versions of resources in this process."""
+        for resource in resources:
+            self.versions[resource] += 1
+        self.stats["invalidations"] += 1
+
+    async def bump_shared(self, *resources: str):
+        """Bump the Redis versions of resources, seen by every process."""
+        for resource in resources:
+            await self.cache.increment(version_key(resource))
+
+    async def invalidate(self, *resources: str):
+        """Invalidate resources here and in every other server process."""
+        self.bump(*resources)
+        await self.bump_shared(*resources)
+
+    async def handle_event(self, event_message: Any):
+        """Bump the bots version on bot status events."""
+        if event_message.type.upper() in BOT_STATUS_EVENTS:
+            await self.invalidate("bots")
+
+    async def subscribe(self):
+        """
+        Listen for bot status events, in a consumer group of this process.
+        Every process bumps the shared version for an event, which only
+        needs to change, not to count events.
+        """
+        for stream in BOT_EVENT_STREAMS:
+            await self.event_bus.prune_idle_consumer_groups(
+                stream,
+                CONSUMER_GROUP_PREFIX,
+                keep=self._consumer_group,
+                ttl=settings.EVENT_CONSUMER_GROUP_TTL,
+            )
+            await self.event_bus.subscribe(
+                stream_name=stream,
+                callback=self.handle_event,
+                consumer_group=self._consumer_group,
+                start_id="$",
+            )
+
+    async def unsubscribe(self):
+        for stream in BOT_EVENT_STREAMS:
+            # The listener goes first, or it would recreate the group
+            await self.event_bus.unsubscribe(stream)
+            await self.event_bus.destroy_consumer_group(stream, self._consumer_group)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "cached_responses": len(self._entries),
+            "versions": dict(self.versions),
+        }
+
+
+# Global instance
+response_cache = ResponseCache()
+
+
+# --- Invalidation on database commits ---
+
+
+def _changed_resources(session: Session) -> Set[str]:
+    return session.info.setdefault("changed_resources", set())
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_changes(session: Session, flush_context):
+    for obj in chain(session.new, session.dirty, session.deleted):
+        resource = RESOURCE_MODELS.get(type(obj))
+        if resource:
+            _changed_resources(session).add(resource)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_changes(orm_execute_state):
+    state = orm_execute_state
+    if state.is_update or state.is_delete or state.is_insert:
+        mapper = state.bind_mapper
+        resource = RESOURCE_MODELS.get(mapper.class_) if mapper else None
+        if resource:
+            _changed_resources(state.session).add(resource)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_changes(session: Session):
+    resources: Tuple[str, ...] = tuple(session.info.pop("changed_resources", ()))
+    if not resources:
+        return
+    response_cache.bump(*resources)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    # Commit hooks are synchronous, the shared versions are bumped in the loop
+    loop.create_task(response_cache.bump_shared(*resources))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_changes(session: Session):
+    session.info.pop("changed_resources", None)
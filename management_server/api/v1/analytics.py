@@ -2,13 +2,14 @@
 Analytics endpoints - 6 endpoints.
 """
 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from fastapi import APIRouter, Depends, Query, HTTPException
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...database import get_db
 from ...services.analytics_service import AnalyticsService
+from ...services.trade_analytics import WINDOWS
 from ...auth.dependencies import get_current_active_user
 from ...models.models import User
 
@@ -48,6 +49,28 @@ async def get_performance_analytics(
     }
 
 
+@router.get("/performance/batch", response_model=Dict[str, Any])
+async def get_batch_performance_analytics(
+    bot_ids: List[int] = Query([]),
+    timeframes: List[str] = Query(["24h"]),
+    service: AnalyticsService = Depends(get_analytics_service),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get performance analytics of many bots over many timeframes in one pass.
+    Without bot_ids, analytics of the user's whole portfolio are returned.
+    """
+    unknown = sorted(set(timeframes) - set(WINDOWS))
+    if unknown:
+        raise HTTPException(
+            status_code=422, detail=f"Unknown timeframes: {', '.join(unknown)}"
+        )
+    data = await service.get_batch_analytics(
+        bot_ids or [None], timeframes, current_user.id  # type: ignore[arg-type]
+    )
+    return {"data": data, "timeframes": timeframes, "timestamp": datetime.utcnow()}
+
+
 @router.get("/profit", response_model=Dict[str, Any])
 async def get_profit_analytics(
     bot_id: Optional[int] = None,
@@ -90,3 +113,13 @@ async def get_portfolio_analytics(
     """Get portfolio analytics."""
     data = await service.get_portfolio_analytics(current_user.id)  # type: ignore[arg-type]
     return {"data": data}
+
+
+@router.get("/fleet", response_model=Dict[str, Any])
+async def get_fleet_analytics(
+    service: AnalyticsService = Depends(get_analytics_service),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """Get bot counts by status, profit and drawdown of the user's bots."""
+    data = await service.get_fleet_analytics(current_user.id)  # type: ignore[arg-type]
+    return {"data": data}
@@ -1,11 +1,11 @@
-from fastapi import APIRouter, Depends, Query
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 
 from management_server.database import get_db
 from management_server.services.audit_service import AuditService
-from management_server.auth.dependencies import get_current_active_user
+from management_server.auth.dependencies import get_token_principal
 from management_server.models.models import User
 import datetime
 
@@ -21,6 +21,11 @@ class AuditLogResponse(BaseModel):
     class Config:
         orm_mode = True
 
+
+class AuditLogPage(BaseModel):
+    items: List[AuditLogResponse]
+    next_cursor: Optional[str] = None
+
 router = APIRouter()
 
 def get_audit_service(db: AsyncSession = Depends(get_db)) -> AuditService:
@@ -28,13 +33,71 @@ def get_audit_service(db: AsyncSession = Depends(get_db)) -> AuditService:
 
 @router.get("/logs", response_model=List[AuditLogResponse])
 async def get_audit_logs_endpoint(
+    response: Response,
     skip: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     limit: int = Query(100, ge=1, le=500),
     service: AuditService = Depends(get_audit_service),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_token_principal)
 ):
     """
-    Get the latest audit logs with pagination.
+    Get the latest audit logs, newest first. The cursor of the next page is
+    returned in the X-Next-Cursor header; pass it back as `cursor`. `skip`
+    is still accepted but gets slow on deep pages.
     """
-    logs = await service.get_logs(limit=limit, offset=skip)
+    if skip and cursor:
+        raise HTTPException(status_code=400, detail="Use either skip or cursor")
+    if skip:
+        return await service.get_logs(limit=limit, offset=skip)
+    try:
+        logs, next_cursor = await service.search_logs(cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return logs
+
+
+@router.get("/search", response_model=AuditLogPage)
+async def search_audit_logs_endpoint(
+    user_id: Optional[int] = None,
+    username: Optional[str] = None,
+    path: Optional[str] = None,
+    path_prefix: Optional[str] = None,
+    status_code: Optional[int] = None,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    service: AuditService = Depends(get_audit_service),
+    current_user: User = Depends(get_token_principal),
+):
+    """
+    Search audit logs by user, path and status within a time range, newest first.
+    Pass the returned `next_cursor` back to get the next page.
+    """
+    try:
+        logs, next_cursor = await service.search_logs(
+            user_id=user_id,
+            username=username,
+            path=path,
+            path_prefix=path_prefix,
+            status_code=status_code,
+            since=since,
+            until=until,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": logs, "next_cursor": next_cursor}
+
+
+@router.get("/writer/stats")
+async def get_audit_writer_stats(current_user: User = Depends(get_token_principal)):
+    """
+    Get queue depth, written/dropped records and batch timings of the audit writer.
+    """
+    from management_server.services.audit_writer import audit_log_writer
+
+    return audit_log_writer.get_stats()
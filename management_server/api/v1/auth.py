@@ -33,7 +33,11 @@ async def login(
 
     access_token_expires = timedelta(hours=settings.JWT_EXPIRATION_HOURS)
     access_token = service.create_access_token(
-        data={"sub": user.username, "type": "access"}
+        data={
+            "sub": user.username,
+            "type": "access",
+            "uid": user.id,
+        }
     )
 
     return TokenResponse(
@@ -60,7 +64,11 @@ async def login_json(
 
     access_token_expires = timedelta(hours=settings.JWT_EXPIRATION_HOURS)
     access_token = service.create_access_token(
-        data={"sub": user.username, "type": "access"}
+        data={
+            "sub": user.username,
+            "type": "access",
+            "uid": user.id,
+        }
     )
 
     return TokenResponse(
@@ -4,10 +4,11 @@ Bot management endpoints. Total: 15 endpoints.
 
 from typing import List, Any, Dict, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...auth.dependencies import get_current_active_user
+from ...auth.dependencies import get_current_active_user, get_token_principal
+from ..response_cache import response_cache
 from ...core.feature_flags import feature_flags
 from ...database import get_db
 from ...db.repositories.bot_repository import BotRepository
@@ -45,13 +46,23 @@ def get_bot_service(
 
 @router.get("/", response_model=List[BotResponse])
 async def get_bots(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     service: BotService = Depends(get_bot_service),
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_token_principal),
 ) -> Any:
-    """Get a list of all bots with pagination."""
-    return await service.get_all_bots(current_user, skip, limit)  # type: ignore
+    """
+    Get a list of all bots with pagination.
+    Supports If-None-Match: an unchanged list is answered with 304.
+    """
+    return await response_cache.respond(
+        request,
+        "bots",
+        current_user.id,
+        lambda: service.get_all_bots(current_user, skip, limit),  # type: ignore
+        List[BotResponse],
+    )
 
 
 @router.post("/", response_model=BotResponse, status_code=201)
@@ -67,7 +78,7 @@ async def create_bot(
 @router.get("/status", response_model=Dict[str, Any])
 async def get_all_bots_status(
     service: BotService = Depends(get_bot_service),
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_token_principal),
 ) -> Any:
     """Get the status of all bots from the Trading Gateway."""
     return await service.get_all_bots_status(current_user)
@@ -196,7 +207,7 @@ async def restart_bot(
 async def get_bot_status(
     bot_id: int,
     service: BotService = Depends(get_bot_service),
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_token_principal),
 ) -> Any:
     """Get the status of a specific bot from the Trading Gateway."""
     return await service.get_bot_status(bot_id, current_user)
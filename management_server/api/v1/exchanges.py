@@ -1,8 +1,49 @@
+import asyncio
+import time
+from typing import Dict
+
 import ccxt.async_support as ccxt
 from fastapi import APIRouter, HTTPException
 
+from management_server.core.config import settings
+
 router = APIRouter()
 
+# One ccxt instance per exchange, reused across requests; markets are
+# reloaded after EXCHANGE_MARKETS_TTL and concurrent loads are coalesced
+_exchanges: Dict[str, ccxt.Exchange] = {}
+_markets_loaded_at: Dict[str, float] = {}
+_markets_locks: Dict[str, asyncio.Lock] = {}
+
+
+async def get_exchange_with_markets(exchange_id: str) -> ccxt.Exchange:
+    """Shared ccxt instance of an exchange with markets loaded at most once per TTL."""
+    if exchange_id not in _exchanges:
+        exchange_class = getattr(ccxt, exchange_id)
+        config = {}
+        if settings.EXCHANGE_PROXY_URL:
+            # Route through the gateway caching proxy shared with the bot fleet
+            config["proxyUrl"] = f"{settings.EXCHANGE_PROXY_URL.rstrip('/')}/{exchange_id}/"
+        _exchanges[exchange_id] = exchange_class(config)
+    exchange = _exchanges[exchange_id]
+
+    lock = _markets_locks.setdefault(exchange_id, asyncio.Lock())
+    async with lock:
+        loaded_at = _markets_loaded_at.get(exchange_id)
+        if loaded_at is None or time.monotonic() - loaded_at >= settings.EXCHANGE_MARKETS_TTL:
+            await exchange.load_markets(reload=loaded_at is not None)
+            _markets_loaded_at[exchange_id] = time.monotonic()
+    return exchange
+
+
+async def close_exchange_clients():
+    """Close the shared ccxt instances on application shutdown."""
+    for exchange in _exchanges.values():
+        await exchange.close()
+    _exchanges.clear()
+    _markets_loaded_at.clear()
+
+
 @router.get("/")
 async def get_exchanges():
     """
@@ -15,18 +56,12 @@ async def get_exchange_pairs(exchange_id: str):
     """
     Returns a list of available trading pairs for a given exchange.
     """
+    if exchange_id not in ccxt.exchanges:
+        raise HTTPException(status_code=404, detail=f"Exchange '{exchange_id}' not found.")
     try:
-        exchange_class = getattr(ccxt, exchange_id)
-        exchange = exchange_class()
-        await exchange.load_markets()
+        exchange = await get_exchange_with_markets(exchange_id)
         # Filter for USDT pairs for simplicity, supporting both formats
         pairs = [symbol for symbol in exchange.symbols if symbol.endswith(('/USDT', ':USDT'))]
-        await exchange.close()
         return sorted(pairs)
-    except AttributeError:
-        raise HTTPException(status_code=404, detail=f"Exchange '{exchange_id}' not found.")
     except Exception as e:
-        # It's good practice to close the exchange connection in case of any error
-        if 'exchange' in locals() and hasattr(exchange, 'close'):
-            await exchange.close()
         raise HTTPException(status_code=500, detail=str(e))
@@ -4,10 +4,12 @@ from typing import List
 from uuid import uuid4
 from pydantic import BaseModel
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...auth.dependencies import get_current_active_user as get_current_user
+from ...auth.dependencies import get_token_principal
+from ..response_cache import response_cache
 from ...database import get_db
 from ...models import models
 from management_server.models.models import Bot, FreqAIModel, FreqAIModelCreate, FreqAIModelResponse, FreqAIModelStatus
@@ -67,15 +69,22 @@ async def upload_model(
 
 @router.get("/", response_model=List[FreqAIModelResponse])
 async def get_all_models(
+    request: Request,
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: models.User = Depends(get_token_principal),
 ):
     """
     Get a list of all uploaded FreqAI models.
+    Supports If-None-Match: an unchanged list is answered with 304.
     """
-    result = await db.execute(select(FreqAIModel))
-    models = result.scalars().all()
-    return models
+
+    async def load_models():
+        result = await db.execute(select(FreqAIModel))
+        return result.scalars().all()
+
+    return await response_cache.respond(
+        request, "freqai_models", current_user.id, load_models, List[FreqAIModelResponse]
+    )
 
 
 @router.delete("/{model_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -79,18 +79,24 @@ async def get_system_metrics(
     Get detailed system metrics.
 
     Returns comprehensive system metrics including:
-    - CPU, memory, disk usage
+    - CPU, memory, disk usage of the latest background sample, with
+      min/avg/max over each SYSTEM_METRICS_WINDOWS window
     - Network statistics
     - Detailed component information
 
     Requires superuser privileges.
     """
+    from management_server.services.system_metrics_sampler import (
+        system_metrics_sampler,
+    )
+
     full_status = await service.get_system_status()
     return {
         "timestamp": full_status.get("timestamp"),
         "system_metrics": full_status.get("system_metrics"),
         "component_health": full_status.get("component_health"),
         "overall_status": full_status.get("overall_status"),
+        "sampler": system_metrics_sampler.get_stats(),
     }
 
 
@@ -115,3 +121,20 @@ async def get_bot_statistics(
         "timestamp": full_status.get("timestamp"),
         "bot_statistics": full_status.get("bot_statistics"),
     }
+
+
+@router.get("/cache", response_model=Dict[str, Any])
+async def get_cache_statistics(
+    current_user: User = Depends(get_current_active_user),
+) -> Dict[str, Any]:
+    """
+    Get hit/miss counters of the two-tier cache (local LRU and Redis),
+    single-flight loads and stale values served, and of the conditional GET
+    response cache.
+
+    Requires authenticated user.
+    """
+    from management_server.api.response_cache import response_cache
+    from management_server.services.cache_service import cache_service
+
+    return {**cache_service.get_stats(), "responses": response_cache.get_stats()}
@@ -1,13 +1,14 @@
 from pathlib import Path
 from typing import List, Dict, Any
 from pydantic import BaseModel
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from management_server.database import get_db
 from management_server.auth.dependencies import get_current_active_user
+from management_server.api.response_cache import response_cache
 from management_server.models.models import (
     User, Bot, StrategyBacktestResult,
     StrategyBacktestResultCreate, StrategyBacktestResultResponse, BacktestStatus
@@ -35,9 +36,15 @@ class StrategyAnalysisResult(BaseModel):
 # CRUD operations for strategy files
 
 @router.get("/", response_model=List[str])
-async def get_available_strategies():
-    """Returns a list of available strategy file names."""
-    return [f.stem for f in STRATEGIES_DIR.glob("*.py") if f.name != "__init__.py"]
+async def get_available_strategies(request: Request):
+    """
+    Returns a list of available strategy file names.
+    Supports If-None-Match: an unchanged list is answered with 304.
+    """
+    async def list_strategies():
+        return [f.stem for f in STRATEGIES_DIR.glob("*.py") if f.name != "__init__.py"]
+
+    return await response_cache.respond(request, "strategies", None, list_strategies, List[str])
 
 @router.get("/{strategy_name}", response_model=StrategyCode)
 async def get_strategy_code(strategy_name: str):
@@ -54,6 +61,7 @@ async def create_strategy(strategy_name: str, strategy_code: StrategyCode):
     if strategy_file.exists():
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Strategy with this name already exists")
     strategy_file.write_text(strategy_code.code)
+    await response_cache.invalidate("strategies")
     return {"message": "Strategy created successfully"}
 
 @router.put("/{strategy_name}", status_code=status.HTTP_200_OK)
@@ -63,6 +71,7 @@ async def update_strategy(strategy_name: str, strategy_code: StrategyCode):
     if not strategy_file.exists():
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Strategy file not found")
     strategy_file.write_text(strategy_code.code)
+    await response_cache.invalidate("strategies")
     return {"message": "Strategy updated successfully"}
 
 @router.delete("/{strategy_name}", status_code=status.HTTP_204_NO_CONTENT)
@@ -72,6 +81,7 @@ async def delete_strategy(strategy_name: str):
     if not strategy_file.exists():
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Strategy file not found")
     strategy_file.unlink()
+    await response_cache.invalidate("strategies")
     return
 
 # --- Analysis endpoint ---
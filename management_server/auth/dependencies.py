@@ -2,11 +2,13 @@
 FastAPI dependencies for authentication.
 """
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 import logging
+import time
 
+from .principal_cache import principal_cache
 from .service import AuthService
 from ..models.models import User
 
@@ -16,13 +18,18 @@ security = HTTPBearer()
 
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     auth_service: AuthService = Depends(),
 ) -> User:
     """
     Get current authenticated user.
 
+    The user is served from the principal cache when possible, so most
+    requests need no database query to authenticate.
+
     Args:
+        request: Current request, the user is recorded on it for the audit log
         credentials: HTTP Bearer token
 
     Returns:
@@ -48,7 +55,12 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = await auth_service.get_user_by_username(username)
+    user = principal_cache.get(username)
+    if user is None:
+        resolved_at = time.time()
+        user = await auth_service.get_user_by_username(username)
+        if user is not None:
+            principal_cache.put(user, resolved_at)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -56,9 +68,39 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    request.state.audit_user_id = user.id
+    request.state.audit_username = user.username
     return user
 
 
+async def get_token_principal(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    auth_service: AuthService = Depends(),
+) -> User:
+    """
+    Get the active user of a token from its signed claims, for read-only
+    endpoints.
+
+    The returned user only carries the ID, username, status and superuser
+    flag. Tokens without these claims, issued before their user was updated,
+    or whose user is not cached are resolved like in get_current_user.
+
+    Raises:
+        HTTPException: If authentication fails or the user is inactive
+    """
+    payload = auth_service.verify_token(credentials.credentials)
+    user = principal_cache.principal_from_claims(payload) if payload else None
+    if user is None:
+        return await get_current_active_user(
+            await get_current_user(request, credentials, auth_service)
+        )
+
+    request.state.audit_user_id = user.id
+    request.state.audit_username = user.username
+    return await get_current_active_user(user)
+
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -0,0 +1,186 @@
+"""
+In-process cache of authenticated principals.
+
+Resolving the user of a bearer token used to query the database on every
+request. The principal of a token subject is now kept for
+AUTH_PRINCIPAL_CACHE_TTL seconds. Updating, deactivating a user or changing
+its password invalidates the entry, locally and in every other management
+server process through a PRINCIPAL_INVALIDATED event on the `user_events`
+stream.
+
+Tokens also carry the user ID as a signed claim. Read-only endpoints
+authorize from the claim and the cached principal of the subject, which alone
+provides the active and superuser flags;
+a subject that is not cached, e.g. after a restart, is loaded from the
+database first. Claims of a token issued before its subject was last
+invalidated are not trusted.
+"""
+
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from ..core.config import settings
+from ..models.models import User
+from ..tools.redis_streams_event_bus import (
+    RedisStreamsEventBus,
+    mcp_streams_event_bus,
+)
+
+logger = logging.getLogger(__name__)
+
+USER_EVENTS_STREAM = "user_events"
+# Per-process consumer groups are named with this prefix
+CONSUMER_GROUP_PREFIX = "principal_cache_"
+
+# Columns of a cached principal; the password hash is never cached
+PRINCIPAL_FIELDS = (
+    "id",
+    "username",
+    "email",
+    "full_name",
+    "is_active",
+    "is_superuser",
+    "last_login",
+    "created_at",
+    "updated_at",
+)
+
+
+class PrincipalCache:
+    """TTL cache of users by token subject, with event-driven invalidation."""
+
+    def __init__(
+        self,
+        event_bus: Optional[RedisStreamsEventBus] = None,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+    ):
+        self.event_bus = event_bus or mcp_streams_event_bus
+        self.ttl = ttl if ttl is not None else settings.AUTH_PRINCIPAL_CACHE_TTL
+        self.max_entries = max_entries or settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # Wall clock time of the last invalidation of each subject
+        self._invalidated_at: Dict[str, float] = {}
+        # Consumer group of this process, so every process sees every event
+        self._consumer_group = f"{CONSUMER_GROUP_PREFIX}{uuid.uuid4().hex[:12]}"
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "claims": 0,
+            "invalidations": 0,
+        }
+
+    def get(self, username: str) -> Optional[User]:
+        """Cached principal of a subject, as a detached User, if still fresh."""
+        entry = self._entries.get(username)
+        if entry is None or time.monotonic() - entry[0] >= self.ttl:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return User(**entry[1])
+
+    def put(self, user: User, resolved_at: float):
+        """
+        Cache a principal loaded from the database.
+
+        `resolved_at` is the wall clock time the load started; a principal
+        invalidated since then may be stale and is not cached.
+        """
+        if self.ttl <= 0 or self._invalidated_at.get(user.username, 0) >= resolved_at:
+            return
+        self._entries.pop(user.username, None)
+        self._entries[user.username] = (
+            time.monotonic(),
+            {name: getattr(user, name) for name in PRINCIPAL_FIELDS},
+        )
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, username: str):
+        """Drop a cached principal without distrusting the subject's tokens."""
+        self._entries.pop(username, None)
+
+    def invalidate(self, username: str):
+        """Drop the principal of a subject in this process."""
+        self._entries.pop(username, None)
+        self._invalidated_at[username] = time.time()
+        self.stats["invalidations"] += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._invalidated_at.clear()
+
+    async def publish_invalidation(self, username: str, reason: str):
+        """Invalidate a subject here and in every other server process."""
+        self.invalidate(username)
+        await self.event_bus.publish(
+            USER_EVENTS_STREAM,
+            {"username": username, "reason": reason},
+            "PRINCIPAL_INVALIDATED",
+        )
+
+    async def handle_event(self, event_message: Any):
+        """Apply PRINCIPAL_INVALIDATED events published by any process."""
+        if event_message.type == "PRINCIPAL_INVALIDATED":
+            self.invalidate(event_message.data["username"])
+
+    async def subscribe(self):
+        """Listen for invalidations from the other server processes."""
+        await self.event_bus.prune_idle_consumer_groups(
+            USER_EVENTS_STREAM,
+            CONSUMER_GROUP_PREFIX,
+            keep=self._consumer_group,
+            ttl=settings.EVENT_CONSUMER_GROUP_TTL,
+        )
+        await self.event_bus.subscribe(
+            stream_name=USER_EVENTS_STREAM,
+            callback=self.handle_event,
+            consumer_group=self._consumer_group,
+            start_id="$",
+        )
+
+    async def unsubscribe(self):
+        # The listener goes first, or it would recreate the group
+        await self.event_bus.unsubscribe(USER_EVENTS_STREAM)
+        await self.event_bus.destroy_consumer_group(
+            USER_EVENTS_STREAM, self._consumer_group
+        )
+
+    def principal_from_claims(self, payload: Dict[str, Any]) -> Optional[User]:
+        """
+        Principal of a token from its signed claims and the cached user of
+        its subject, without any lookup. None if the token lacks the claims,
+        predates the last invalidation of its subject, or the subject is not
+        cached: invalidations are only known in memory, so the status and
+        superuser flag always come from a principal loaded from the database.
+        """
+        username = payload.get("sub")
+        user_id = payload.get("uid")
+        issued_at = payload.get("iat")
+        if username is None or user_id is None or issued_at is None:
+            return None
+        if self._invalidated_at.get(username, 0) >= issued_at:
+            return None
+        entry = self._entries.get(username)
+        if entry is None or time.monotonic() - entry[0] >= self.ttl:
+            return None
+        fields = entry[1]
+        if fields["id"] != user_id:
+            return None
+        self.stats["claims"] += 1
+        return User(
+            id=user_id,
+            username=username,
+            is_active=fields["is_active"],
+            is_superuser=fields["is_superuser"],
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "cached_principals": len(self._entries), "ttl": self.ttl}
+
+
+# Global instance
+principal_cache = PrincipalCache()
@@ -13,6 +13,7 @@ from sqlalchemy import select
 from ..core.config import settings
 from ..database.connection import get_db
 from ..models.models import User, UserCreate
+from .principal_cache import principal_cache
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +45,7 @@ class AuthService:
             user.last_login = datetime.now(timezone.utc)
             await self.db.commit()
             await self.db.refresh(user)
+            principal_cache.discard(user.username)
             return user
         except Exception as e:
             logger.error(f"Authentication error for user {username}: {e}")
@@ -74,6 +76,8 @@ class AuthService:
         self.db.add(user)
         await self.db.commit()
         await self.db.refresh(user)
+        # A principal of a deleted user with the same name may still be cached
+        await principal_cache.publish_invalidation(user.username, "created")
 
         logger.info(f"Created new user: {user.username}")
         return user
@@ -83,8 +87,10 @@ class AuthService:
         Create JWT access token.
         """
         to_encode = data.copy()
-        expire = datetime.now(timezone.utc) + timedelta(hours=self.expiration_hours)
-        to_encode.update({"exp": expire})
+        now = datetime.now(timezone.utc)
+        expire = now + timedelta(hours=self.expiration_hours)
+        # Sub-second issue time, compared with invalidations of the subject
+        to_encode.update({"exp": expire, "iat": now.timestamp()})
         return jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
 
     def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
@@ -114,5 +120,29 @@ class AuthService:
 
         user.set_password(new_password)
         await self.db.commit()
+        await principal_cache.publish_invalidation(user.username, "password_changed")
         logger.info(f"Password changed for user {user.username}")
         return True
+
+    async def update_user(self, user_id: int, **changes: Any) -> Optional[User]:
+        """
+        Update profile or status fields of a user, e.g. is_active=False to
+        deactivate it. Returns None if the user does not exist.
+
+        No endpoint changes users yet; user admin endpoints should go through
+        this method so cached principals are invalidated on every replica.
+        """
+        result = await self.db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        if not user:
+            return None
+
+        for field, value in changes.items():
+            if field not in ("email", "full_name", "is_active", "is_superuser"):
+                raise ValueError(f"Field cannot be updated: {field}")
+            setattr(user, field, value)
+        await self.db.commit()
+        await self.db.refresh(user)
+        await principal_cache.publish_invalidation(user.username, "updated")
+        logger.info(f"Updated user {user.username}: {sorted(changes)}")
+        return user
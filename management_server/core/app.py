@@ -18,7 +18,9 @@ from slowapi.middleware import SlowAPIMiddleware
 from slowapi.util import get_remote_address
 from prometheus_fastapi_instrumentator import Instrumentator
 
+from management_server.api.response_cache import response_cache
 from management_server.api.v1.router import api_router
+from management_server.auth.principal_cache import principal_cache
 from management_server.core.config import settings
 from management_server.core.logging import setup_logging, get_logger
 from management_server.database import close_database, init_database, SessionLocal
@@ -29,9 +31,17 @@ from management_server.middleware.rate_limiting import create_limiter
 from management_server.services.trading_gateway_client import (
     close_trading_gateway_client,
 )
+from management_server.api.v1.exchanges import close_exchange_clients
+from management_server.services.audit_writer import audit_log_writer
+from management_server.services.cache_service import cache_service
+from management_server.services.fleet_stats import fleet_stats
+from management_server.services.system_metrics_sampler import system_metrics_sampler
 from management_server.services.freqai_server_client import (
     close_freqai_server_client,
 )
+from management_server.services.freqtrade_client import (
+    close_freqtrade_client_session,
+)
 from management_server.tools.redis_streams_event_bus import (
     RedisStreamsEventBus,
     mcp_streams_event_bus,
@@ -67,6 +77,7 @@ def lifespan_factory(session_factory):
         logger.info("✅ Redis Streams connected")
 
         # Subscribe to the events stream from the trading gateway
+        bot_event_handler = None
         if mcp_streams_event_bus.redis:
             from management_server.services.bot_event_handler import BotEventHandler
 
@@ -74,14 +85,51 @@ def lifespan_factory(session_factory):
             await mcp_streams_event_bus.subscribe(
                 stream_name="mcp_events", callback=bot_event_handler.handle_event
             )
+            await principal_cache.subscribe()
+            await response_cache.subscribe()
+            await fleet_stats.subscribe()
         else:
             logger.error("Could not subscribe to mcp_events: Redis connection failed.")
 
+        audit_log_writer.start(session_factory)
+        logger.info("✅ Audit log writer started")
+
+        system_metrics_sampler.start()
+        logger.info("✅ System metrics sampler started")
+
+        fleet_stats.start(session_factory)
+        logger.info("✅ Fleet statistics reconciliation started")
+
+        trade_ingestion = None
+        if settings.TRADE_INGESTION_ENABLED:
+            from management_server.services.trade_ingestion_service import (
+                TradeIngestionService,
+            )
+
+            trade_ingestion = TradeIngestionService(session_factory)
+            trade_ingestion.start()
+            logger.info("✅ Trade ingestion started")
+
         yield
 
+        if trade_ingestion:
+            await trade_ingestion.stop()
+
         logger.info("🛑 Shutting down Management Server")
+        if bot_event_handler:
+            # No new events may queue states once the last ones are written
+            await mcp_streams_event_bus.unsubscribe("mcp_events")
+            await bot_event_handler.stop()
+            logger.info("✅ Pending bot state updates written")
+        await system_metrics_sampler.stop()
+        await fleet_stats.stop()
+        await audit_log_writer.stop()
+        logger.info("✅ Audit log records flushed")
         await close_database()
         logger.info("✅ Database connections closed")
+        await principal_cache.unsubscribe()
+        await response_cache.unsubscribe()
+        await fleet_stats.unsubscribe()
         await core_streams_event_bus.disconnect()
         await mcp_streams_event_bus.disconnect()
         logger.info("✅ Redis Streams disconnected")
@@ -89,6 +137,12 @@ def lifespan_factory(session_factory):
         logger.info("✅ Trading Gateway client shut down")
         await close_freqai_server_client()
         logger.info("✅ FreqAI Server client shut down")
+        await close_freqtrade_client_session()
+        logger.info("✅ Freqtrade client session closed")
+        await close_exchange_clients()
+        logger.info("✅ Exchange clients closed")
+        await cache_service.disconnect()
+        logger.info("✅ Cache disconnected")
 
     return lifespan
 
@@ -133,6 +187,7 @@ def create_application(
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor"],
     )
     if settings.ENVIRONMENT == "production":
         app.add_middleware(TrustedHostMiddleware, allowed_hosts=settings.ALLOWED_HOSTS)
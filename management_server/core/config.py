@@ -29,6 +29,9 @@ class Settings(BaseSettings):
     JWT_SECRET: str = "your-jwt-secret-change-in-production"
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_HOURS: int = 24
+    # Authenticated users are cached by token subject for this many seconds
+    AUTH_PRINCIPAL_CACHE_TTL: float = 30.0
+    AUTH_PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
     TRADING_GATEWAY_URL: str = "http://localhost:8001"
 
     # CORS
@@ -56,6 +59,9 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
     REDIS_PASSWORD: Optional[str] = None
+    # Consumer groups of processes that stopped reading for this many seconds,
+    # e.g. after a crash, are pruned when a process subscribes
+    EVENT_CONSUMER_GROUP_TTL: float = 3600.0
 
     # Additional settings from env
     ALGORITHM: str = "HS256"
@@ -69,6 +75,69 @@ class Settings(BaseSettings):
 
     # Trading Gateway URL
     TRADING_GATEWAY_URL: str = "http://localhost:8001"
+    # FreqAI models are streamed to the gateway in chunks of this size
+    FREQAI_MODEL_CHUNK_SIZE: int = 1024 * 1024
+    FREQAI_MODEL_UPLOAD_RETRIES: int = 3
+
+    # Exchange markets: route ccxt through the gateway caching proxy
+    # (e.g. "http://localhost:8001/api/v1/exchange_proxy") and reuse loaded
+    # markets for this many seconds
+    EXCHANGE_PROXY_URL: Optional[str] = None
+    EXCHANGE_MARKETS_TTL: int = 300
+
+    # Trade ingestion: tail the bots' tradesv3.sqlite files into bot_trades
+    TRADE_INGESTION_ENABLED: bool = True
+    TRADE_INGESTION_BOTS_DIR: str = "bots_data"
+    TRADE_INGESTION_INTERVAL: float = 10.0  # seconds between passes
+    TRADE_INGESTION_EVENT_BATCH: int = 500  # trades per TRADES_INGESTED event
+    TRADE_INGESTION_ENABLE_WAL: bool = True  # switch bot databases to WAL once
+
+    # Audit log writer: records are queued by the middleware and inserted in
+    # batches; "drop_newest" or "drop_oldest" when the queue is full
+    AUDIT_QUEUE_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 200
+    AUDIT_FLUSH_INTERVAL: float = 1.0  # seconds before a partial batch is written
+    AUDIT_OVERFLOW_POLICY: str = "drop_newest"
+    # A batch the database cannot take (connection lost, locked) is held and
+    # retried with a doubling delay between these bounds
+    AUDIT_RETRY_INTERVAL: float = 1.0
+    AUDIT_RETRY_MAX_INTERVAL: float = 60.0
+    AUDIT_RETENTION_DAYS: int = 0  # opt-in; 0 keeps audit logs forever
+    AUDIT_RETENTION_INTERVAL: float = 3600.0  # seconds between retention purges
+    AUDIT_RETENTION_BATCH_SIZE: int = 5000
+
+    # Cache: in-process LRU in front of Redis; local copies of Redis values
+    # are kept at most CACHE_LOCAL_TTL seconds
+    CACHE_LOCAL_MAX_ENTRIES: int = 10000
+    CACHE_LOCAL_TTL: float = 5.0
+    CACHE_TAG_TTL: int = 86400  # minimum lifetime of a tag's key set
+    CACHE_REDIS_RETRY_INTERVAL: float = 5.0  # seconds Redis is skipped after an error
+
+    # Conditional GET for polled list endpoints; ETags also expire every
+    # RESPONSE_CACHE_TTL seconds
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 2000
+    RESPONSE_CACHE_TTL: float = 60.0
+
+    # Bot state events are coalesced per bot and written in one UPDATE per
+    # window; 0 writes every event at once
+    BOT_EVENT_COALESCE_WINDOW: float = 0.25  # seconds
+    BOT_EVENT_COALESCE_MAX_BATCH: int = 500
+
+    # Host metrics are sampled in the background; monitoring endpoints read
+    # the latest sample and min/avg/max over each window (seconds)
+    SYSTEM_METRICS_INTERVAL: float = 5.0  # seconds between samples
+    SYSTEM_METRICS_BUFFER_SIZE: int = 720  # one hour at the default interval
+    SYSTEM_METRICS_WINDOWS: List[int] = [60, 300, 900]
+
+    # Fleet statistics are maintained from bot and trade events and rebuilt
+    # from the database every FLEET_STATS_RECONCILE_INTERVAL seconds
+    FLEET_STATS_RECONCILE_INTERVAL: float = 300.0
+
+    # Trade analytics are cached per bot (or portfolio) and window until the
+    # bot's trades are ingested again, or at most ANALYTICS_CACHE_TTL seconds
+    ANALYTICS_CACHE_TTL: int = 300
+    ANALYTICS_EQUITY_CURVE_POINTS: int = 200  # points per returned equity curve
 
     # External APIs
     TELEGRAM_BOT_TOKEN: Optional[str] = None
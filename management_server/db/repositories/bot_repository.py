@@ -65,3 +65,15 @@ class BotRepository:
         # Note: This doesn't check user_id, assuming it's an internal system update
         result = await self.db_session.execute(select(Bot).filter(Bot.id == bot_id))
         return result.scalars().first()
+
+    async def update_statuses(self, bot_ids: List[int], status: str, **values) -> int:
+        """Set the status (and other columns) of many bots in one UPDATE."""
+        if not bot_ids:
+            return 0
+        result = await self.db_session.execute(
+            sqlalchemy_update(Bot)
+            .where(Bot.id.in_(bot_ids))
+            .values(status=status, **values)
+        )
+        await self.db_session.commit()
+        return result.rowcount
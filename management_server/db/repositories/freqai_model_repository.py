@@ -1,7 +1,7 @@
 """
 Repository for FreqAI models.
 """
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -18,3 +18,10 @@ class FreqAIModelRepository:
             select(FreqAIModel).where(FreqAIModel.id == model_id, FreqAIModel.created_by == user_id)
         )
         return result.scalar_one_or_none()
+
+    async def get_many(self, model_ids: Iterable[int], user_id: int) -> List[FreqAIModel]:
+        """Get the user's FreqAI models with the given IDs in one query."""
+        result = await self.db.execute(
+            select(FreqAIModel).where(FreqAIModel.id.in_(list(model_ids)), FreqAIModel.created_by == user_id)
+        )
+        return list(result.scalars().all())
@@ -6,7 +6,6 @@ import uvicorn
 import logging
 from management_server.core.app import create_application
 from management_server.core.config import settings
-from management_server.api.middleware.audit_middleware import AuditMiddleware
 
 # Configure logging
 logging.basicConfig(
@@ -19,11 +18,9 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Audit middleware is added by create_application
 app = create_application("full_featured")
 
-# Add middleware
-app.add_middleware(AuditMiddleware)
-
 if __name__ == "__main__":
     logger.info("🚀 Starting Freqtrade Multi-Bot System API Server")
     logger.info("📊 Profile: full_featured")
@@ -4,9 +4,22 @@ from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoin
 from starlette.types import ASGIApp
 import jwt
 
-from management_server.database import SessionLocal
-from management_server.services.audit_service import AuditService
 from management_server.auth.jwt import ALGORITHM, SECRET_KEY
+from management_server.services.audit_writer import AuditRecord, audit_log_writer
+
+
+def token_username(request: Request) -> str | None:
+    """Subject of the request's bearer token, or "invalid_token"."""
+    auth_header = request.headers.get("Authorization")
+    if not auth_header or not auth_header.startswith("Bearer "):
+        return None
+    token = auth_header.split(" ")[1]
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.PyJWTError:
+        return "invalid_token"
+    return payload.get("sub")
+
 
 class AuditMiddleware(BaseHTTPMiddleware):
     def __init__(self, app: ASGIApp):
@@ -22,17 +35,13 @@ class AuditMiddleware(BaseHTTPMiddleware):
         if request.method == "OPTIONS" or request.url.path.startswith("/docs") or request.url.path.startswith("/openapi.json"):
             return response
 
-        user_id: int | None = None
-        username: str | None = None
-
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header.split(" ")[1]
-            try:
-                payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-                username = payload.get("sub")
-            except jwt.PyJWTError:
-                username = "invalid_token"
+        # The principal is recorded by get_current_user, so the token is only
+        # decoded here when the request was not authenticated, e.g. a rejected
+        # or expired token or an endpoint without authentication
+        user_id: int | None = getattr(request.state, "audit_user_id", None)
+        username: str | None = getattr(request.state, "audit_username", None)
+        if username is None:
+            username = token_username(request)
 
         action = f"{request.method} {request.url.path}"
 
@@ -41,9 +50,9 @@ class AuditMiddleware(BaseHTTPMiddleware):
             "user_agent": request.headers.get("user-agent", "unknown"),
         }
 
-        async with SessionLocal() as db:
-            audit_service = AuditService(db)
-            await audit_service.log(
+        # Written in batches by the background audit writer
+        audit_log_writer.enqueue(
+            AuditRecord(
                 action=action,
                 details=details,
                 username=username,
@@ -53,5 +62,6 @@ class AuditMiddleware(BaseHTTPMiddleware):
                 path=request.url.path,
                 ip_address=request.client.host if request.client else "unknown",
             )
+        )
 
         return response
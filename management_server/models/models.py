@@ -16,9 +16,11 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
+    UniqueConstraint,
 )
 
 from .base import Base, TimestampMixin
@@ -97,13 +99,24 @@ class AuditLog(Base, TimestampMixin):
     """Audit log SQLAlchemy model."""
 
     __tablename__ = "audit_logs"
+    # Every filter is paired with (created_at, id), the keyset of the newest
+    # first ordering, so filtered pages are index range scans
+    __table_args__ = (
+        Index("ix_audit_logs_created_at_id", "created_at", "id"),
+        Index("ix_audit_logs_user_id_created_at", "user_id", "created_at", "id"),
+        Index("ix_audit_logs_username_created_at", "username", "created_at", "id"),
+        Index("ix_audit_logs_path_created_at", "path", "created_at", "id"),
+        Index(
+            "ix_audit_logs_status_code_created_at", "status_code", "created_at", "id"
+        ),
+    )
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
-    username = Column(String(50), nullable=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    username = Column(String(50), nullable=True)
     ip_address = Column(String(45), nullable=True)
     http_method = Column(String(10), nullable=False, index=True)
-    path = Column(String(255), nullable=False, index=True)
-    status_code = Column(Integer, nullable=False, index=True)
+    path = Column(String(255), nullable=False)
+    status_code = Column(Integer, nullable=False)
     action = Column(String(100), nullable=False)
     details = Column(JSON, nullable=True)
 
@@ -140,6 +153,45 @@ class StrategyBacktestResult(Base, TimestampMixin):
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
 
 
+class BotTrade(Base, TimestampMixin):
+    """Trade ingested from a bot's freqtrade database."""
+
+    __tablename__ = "bot_trades"
+    __table_args__ = (
+        UniqueConstraint("bot_name", "ft_trade_id", name="uq_bot_trades_bot_trade"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    bot_name = Column(String(100), nullable=False, index=True)
+    ft_trade_id = Column(Integer, nullable=False)
+    exchange = Column(String(50), nullable=True)
+    pair = Column(String(50), nullable=False, index=True)
+    is_open = Column(Boolean, default=True, nullable=False, index=True)
+    is_short = Column(Boolean, default=False, nullable=False)
+    open_date = Column(DateTime(timezone=True), nullable=True, index=True)
+    close_date = Column(DateTime(timezone=True), nullable=True, index=True)
+    open_rate = Column(Float, nullable=True)
+    close_rate = Column(Float, nullable=True)
+    amount = Column(Float, nullable=True)
+    stake_amount = Column(Float, nullable=True)
+    profit_ratio = Column(Float, nullable=True)
+    profit_abs = Column(Float, nullable=True)
+    exit_reason = Column(String(100), nullable=True)
+    enter_tag = Column(String(100), nullable=True)
+    strategy = Column(String(100), nullable=True)
+    # freqtrade stores the timeframe in minutes
+    timeframe = Column(Integer, nullable=True)
+
+
+class TradeIngestionCheckpoint(Base, TimestampMixin):
+    """Position of the trade ingestion in a bot's freqtrade database."""
+
+    __tablename__ = "trade_ingestion_checkpoints"
+    bot_name = Column(String(100), primary_key=True)
+    last_trade_id = Column(Integer, default=0, nullable=False)
+    last_order_id = Column(Integer, default=0, nullable=False)
+    open_trade_ids = Column(JSON, nullable=False, default=list)
+
+
 # --- Pydantic Schemas ---
 
 
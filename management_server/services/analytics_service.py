@@ -2,13 +2,23 @@
 Service for handling analytics queries.
 """
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Sequence
 
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.models import Bot
 from ..tools.redis_streams_event_bus import core_streams_event_bus
+from .fleet_stats import fleet_stats
+from .trade_analytics import TradeGroup, trade_analytics
+
+RISK_METRICS = (
+    "max_drawdown",
+    "max_drawdown_abs",
+    "sharpe_ratio",
+    "sortino_ratio",
+    "calmar_ratio",
+)
 
 
 class AnalyticsService:
@@ -16,45 +26,91 @@ class AnalyticsService:
         self.db = db_session
         self.event_bus = core_streams_event_bus
 
+    async def _trade_groups(
+        self, user_id: int, bot_ids: Optional[Sequence[Optional[int]]]
+    ) -> Dict[Optional[int], TradeGroup]:
+        """
+        Groups of the requested bots of a user, by bot ID; the None ID is
+        the portfolio of all the user's bots. Bots of other users are absent.
+        """
+        query = select(Bot.id, Bot.name, Bot.stake_amount, Bot.max_open_trades)
+        rows = (await self.db.execute(query.where(Bot.created_by == user_id))).all()
+        capital = {row.id: row.stake_amount * row.max_open_trades for row in rows}
+        groups: Dict[Optional[int], TradeGroup] = {}
+        for bot_id in bot_ids or [None]:
+            if bot_id is None:
+                groups[None] = TradeGroup(
+                    f"user:{user_id}",
+                    [row.name for row in rows],
+                    sum(capital.values()),
+                )
+            else:
+                row = next((row for row in rows if row.id == bot_id), None)
+                if row is not None:
+                    groups[bot_id] = TradeGroup(
+                        f"bot:{bot_id}", [row.name], capital[bot_id]
+                    )
+        return groups
+
+    async def get_batch_analytics(
+        self,
+        bot_ids: Sequence[Optional[int]],
+        timeframes: Sequence[str],
+        user_id: int,
+    ) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Trade analytics of many bots over many timeframes, computed in one
+        pass. Keyed by bot ID ("portfolio" for None), then by timeframe.
+        """
+        groups = await self._trade_groups(user_id, bot_ids)
+        metrics = await trade_analytics.analyze(
+            self.db, list(groups.values()), timeframes
+        )
+        return {
+            "portfolio" if bot_id is None else str(bot_id): {
+                timeframe: metrics[(group.key, timeframe)] for timeframe in timeframes
+            }
+            for bot_id, group in groups.items()
+        }
+
     async def get_performance_analytics(
         self, bot_id: Optional[int], timeframe: str, user_id: Any
-    ) -> Dict[str, Any]:
+    ) -> Optional[Dict[str, Any]]:
         """Calculate and return performance analytics for bots."""
-        # For now, return mock data to test API
-        result = {
-            "total_trades": 150,
-            "profitable_trades": 90,
-            "avg_profit": 2.5,
-            "win_rate": 60.0,
-        }
-
-        return result
+        groups = await self._trade_groups(user_id, [bot_id])
+        if bot_id not in groups:
+            return None
+        metrics = await trade_analytics.analyze(self.db, [groups[bot_id]], [timeframe])
+        return metrics[(groups[bot_id].key, timeframe)]
 
     async def get_profit_analytics(
         self, bot_id: Optional[int], period: str, user_id: int
     ) -> Dict[str, Any]:
         """Calculate and return profit analytics."""
-        query = select(func.sum(Bot.total_profit)).where(Bot.created_by == user_id)
-
-        if bot_id:
-            query = query.where(Bot.id == bot_id)
-
-        # Period-based filtering would require a more complex query on a trades table.
-        # This is a simplified version based on the bot's lifetime profit.
-
-        total_profit = await self.db.scalar(query)
-        return {"total_profit": total_profit or 0.0}
+        groups = await self._trade_groups(user_id, [bot_id])
+        if bot_id not in groups:
+            return {"total_profit": 0.0, "period_profit": 0.0, "series": []}
+        group = groups[bot_id]
+        # One session runs one query at a time, so these are not gathered
+        lifetime = await trade_analytics.analyze(self.db, [group], ["all"])
+        series = await trade_analytics.profit_series(self.db, [group], period)
+        return {
+            "total_profit": lifetime[(group.key, "all")]["total_profit"],
+            **series[group.key],
+        }
 
     async def get_risk_analytics(
         self, bot_id: Optional[int], user_id: int
     ) -> Dict[str, Any]:
         """Calculate and return risk analytics (e.g., max drawdown)."""
-        query = select(func.max(Bot.max_drawdown)).where(Bot.created_by == user_id)
-        if bot_id:
-            query = query.where(Bot.id == bot_id)
-
-        max_drawdown = await self.db.scalar(query)
-        return {"max_drawdown": max_drawdown or 0.0}
+        groups = await self._trade_groups(user_id, [bot_id])
+        if bot_id not in groups:
+            return {"max_drawdown": 0.0}
+        group = groups[bot_id]
+        metrics = (await trade_analytics.analyze(self.db, [group], ["all"]))[
+            (group.key, "all")
+        ]
+        return {key: metrics[key] for key in RISK_METRICS}
 
     async def get_portfolio_analytics(self, user_id: int) -> Dict[str, Any]:
         """Get overall portfolio analytics."""
@@ -72,6 +128,11 @@ class AnalyticsService:
 
         return {"portfolio_value": portfolio_value}
 
+    async def get_fleet_analytics(self, user_id: int) -> Dict[str, Any]:
+        """Bot counts by status, profit and drawdown of a user's bots."""
+        await fleet_stats.ensure_loaded(self.db)
+        return fleet_stats.get_summary(user_id)
+
     async def get_market_analytics(self, symbol: str = "bitcoin") -> Dict[str, Any]:
         """Get general market analytics from CoinGecko."""
         try:
@@ -1,5 +1,8 @@
+import base64
 import logging
-from typing import Optional, Dict, Any
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
+from sqlalchemy import delete, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
@@ -7,6 +10,22 @@ from management_server.models.models import AuditLog
 
 logger = logging.getLogger(__name__)
 
+
+def encode_cursor(log: AuditLog) -> str:
+    """Opaque keyset cursor pointing after `log` in newest-first order."""
+    raw = f"{log.created_at.isoformat()}|{log.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Raises ValueError on a malformed cursor."""
+    try:
+        created_at, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(log_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
 class AuditService:
     """Service for logging audit trails."""
 
@@ -48,3 +67,76 @@ class AuditService:
             select(AuditLog).order_by(AuditLog.created_at.desc()).limit(limit).offset(offset)
         )
         return result.scalars().all()
+
+    async def search_logs(
+        self,
+        user_id: Optional[int] = None,
+        username: Optional[str] = None,
+        path: Optional[str] = None,
+        path_prefix: Optional[str] = None,
+        status_code: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+    ) -> Tuple[List[AuditLog], Optional[str]]:
+        """
+        Filtered audit logs, newest first, with keyset pagination.
+
+        Pages continue from `cursor` via (created_at, id) < cursor, so deep
+        pages cost the same as the first one, unlike OFFSET.
+
+        Returns:
+            Logs of the page and the cursor of the next page (None at the end)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        query = select(AuditLog)
+        if user_id is not None:
+            query = query.where(AuditLog.user_id == user_id)
+        if username is not None:
+            query = query.where(AuditLog.username == username)
+        if path is not None:
+            query = query.where(AuditLog.path == path)
+        if path_prefix is not None:
+            query = query.where(AuditLog.path.startswith(path_prefix, autoescape=True))
+        if status_code is not None:
+            query = query.where(AuditLog.status_code == status_code)
+        if since is not None:
+            query = query.where(AuditLog.created_at >= since)
+        if until is not None:
+            query = query.where(AuditLog.created_at < until)
+        if cursor:
+            query = query.where(
+                tuple_(AuditLog.created_at, AuditLog.id) < tuple_(*decode_cursor(cursor))
+            )
+
+        # One extra row tells whether there is a next page
+        result = await self.db_session.execute(
+            query.order_by(AuditLog.created_at.desc(), AuditLog.id.desc()).limit(limit + 1)
+        )
+        logs = list(result.scalars().all())
+        next_cursor = encode_cursor(logs[limit - 1]) if len(logs) > limit else None
+        return logs[:limit], next_cursor
+
+    async def purge_older_than(self, cutoff: datetime, batch_size: int = 5000) -> int:
+        """
+        Delete logs created before `cutoff`, oldest first, in bounded batches
+        so each transaction stays short. Returns the number of deleted logs.
+        """
+        deleted = 0
+        while True:
+            oldest = (
+                select(AuditLog.id)
+                .where(AuditLog.created_at < cutoff)
+                .order_by(AuditLog.created_at, AuditLog.id)
+                .limit(batch_size)
+            )
+            result = await self.db_session.execute(
+                delete(AuditLog).where(AuditLog.id.in_(oldest.scalar_subquery()))
+            )
+            await self.db_session.commit()
+            deleted += result.rowcount or 0
+            if (result.rowcount or 0) < batch_size:
+                return deleted
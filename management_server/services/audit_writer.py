@@ -0,0 +1,283 @@
+"""
+Background writer for audit log records.
+
+Requests no longer pay a database commit for their audit entry: the audit
+middleware enqueues a compact record into a bounded queue, and one writer
+task bulk-inserts them in batches of AUDIT_BATCH_SIZE or every
+AUDIT_FLUSH_INTERVAL seconds, whichever comes first. When the queue is full
+the AUDIT_OVERFLOW_POLICY decides whether the newest or the oldest record is
+dropped. Pending records are flushed on shutdown. Fields are cut to their
+column lengths, and a batch with a record the database rejects (integrity or
+data error) is retried in halves, so one bad record does not cost the whole
+batch. Any other error, such as a lost connection, leaves the batch whole:
+the writer holds it and retries it after AUDIT_RETRY_INTERVAL seconds,
+doubling up to AUDIT_RETRY_MAX_INTERVAL, while new records wait in the queue.
+
+When AUDIT_RETENTION_DAYS is set, the writer also deletes older logs in
+bounded batches every AUDIT_RETENTION_INTERVAL seconds; by default audit
+logs are kept forever.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from management_server.core.config import settings
+from management_server.database import SessionLocal
+from management_server.models.models import AuditLog
+from management_server.services.audit_service import AuditService
+
+logger = logging.getLogger(__name__)
+
+# Length of each string column of audit_logs
+FIELD_LENGTHS = {
+    column.name: column.type.length
+    for column in AuditLog.__table__.columns
+    if getattr(column.type, "length", None)
+}
+
+# Errors caused by the records themselves; only these split a batch
+RECORD_ERRORS = (IntegrityError, DataError)
+
+
+@dataclass
+class AuditRecord:
+    """One audit entry as captured by the middleware."""
+
+    action: str
+    status_code: int
+    http_method: str
+    path: str
+    ip_address: str
+    user_id: Optional[int] = None
+    username: Optional[str] = None
+    details: Optional[Dict[str, Any]] = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def __post_init__(self):
+        for name, length in FIELD_LENGTHS.items():
+            value = getattr(self, name, None)
+            if isinstance(value, str) and len(value) > length:
+                setattr(self, name, value[:length])
+
+
+class AuditLogWriter:
+    """Bounded queue of audit records drained in batches by one task."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        max_queue: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        overflow_policy: Optional[str] = None,
+    ):
+        self._session_factory = session_factory
+        self.max_queue = max_queue or settings.AUDIT_QUEUE_SIZE
+        self.batch_size = batch_size or settings.AUDIT_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.AUDIT_FLUSH_INTERVAL
+        self.overflow_policy = overflow_policy or settings.AUDIT_OVERFLOW_POLICY
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._retention_task: Optional[asyncio.Task] = None
+        self._writing: Optional[asyncio.Future] = None
+        self._batch: List[AuditRecord] = []
+        # Set by stop(); a held batch then gets one last attempt
+        self._stopping = asyncio.Event()
+        self.stats: Dict[str, Any] = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "failed": 0,
+            "retries": 0,
+            "batches": 0,
+            "last_batch_size": 0,
+            "last_flush_ms": 0.0,
+            "purged": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, session_factory: Optional[Callable[[], AsyncSession]] = None):
+        """Start the writer task in the running event loop."""
+        if session_factory is not None:
+            self._session_factory = session_factory
+        if self.running:
+            return
+        # The queue belongs to the loop of the writer task
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        if settings.AUDIT_RETENTION_DAYS > 0:
+            self._retention_task = asyncio.create_task(self._run_retention())
+
+    async def stop(self):
+        """Stop the writer after flushing every pending record."""
+        if not self.running:
+            return
+        self._stopping.set()
+        if self._retention_task is not None:
+            self._retention_task.cancel()
+            try:
+                await self._retention_task
+            except asyncio.CancelledError:
+                pass
+            self._retention_task = None
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        # A batch being written when the writer was cancelled is completed
+        if self._writing is not None and not self._writing.done():
+            await self._writing
+        await self._write(self._batch + self._drain())
+        self._batch = []
+
+    def enqueue(self, record: AuditRecord) -> bool:
+        """
+        Queue a record without waiting. Returns False if it was dropped.
+        """
+        if not self.running:
+            self.start()
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            if self.overflow_policy != "drop_oldest":
+                return False
+            self._queue.get_nowait()
+            self._queue.put_nowait(record)
+        self.stats["enqueued"] += 1
+        return True
+
+    def _drain(self, limit: Optional[int] = None) -> List[AuditRecord]:
+        records = []
+        while not self._queue.empty() and (limit is None or len(records) < limit):
+            records.append(self._queue.get_nowait())
+        return records
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Kept on the writer so a batch still being collected survives stop()
+            self._batch = batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                batch.extend(self._drain(self.batch_size - len(batch)))
+                timeout = deadline - loop.time()
+                if len(batch) >= self.batch_size or timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Shielded so stopping the writer never loses a batch mid-write
+            self._writing = asyncio.ensure_future(self._write(batch))
+            self._batch = []
+            await asyncio.shield(self._writing)
+
+    async def _write(self, records: List[AuditRecord]):
+        """Flush records, holding and retrying them while the database fails."""
+        delay = settings.AUDIT_RETRY_INTERVAL
+        while True:
+            try:
+                await self._flush(records)
+                return
+            except Exception as e:
+                if self._stopping.is_set():
+                    self.stats["failed"] += len(records)
+                    logger.error(
+                        f"Dropped {len(records)} audit log records on shutdown: {e}"
+                    )
+                    return
+                self.stats["retries"] += 1
+                logger.error(
+                    f"Audit log batch of {len(records)} records not written, "
+                    f"retrying in {delay}s: {e}"
+                )
+            try:
+                await asyncio.wait_for(self._stopping.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, settings.AUDIT_RETRY_MAX_INTERVAL)
+
+    async def _flush(self, records: List[AuditRecord]):
+        """Insert records in one executemany statement and one commit."""
+        if not records:
+            return
+        started = time.perf_counter()
+        self.stats["written"] += await self._insert(records)
+        self.stats["batches"] += 1
+        self.stats["last_batch_size"] = len(records)
+        self.stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    async def _insert(self, records: List[AuditRecord]) -> int:
+        """
+        Insert records, retrying a batch with a rejected record in halves
+        down to single records. Returns the number of records written;
+        errors other than RECORD_ERRORS are raised with the batch unsplit.
+        """
+        try:
+            async with self._session_factory() as db:
+                await db.execute(
+                    insert(AuditLog), [asdict(record) for record in records]
+                )
+                await db.commit()
+            return len(records)
+        except RECORD_ERRORS as e:
+            if len(records) == 1:
+                self.stats["failed"] += 1
+                logger.error(f"Failed to write audit log record {records[0]}: {e}")
+                return 0
+            logger.warning(f"Retrying {len(records)} audit log records in halves: {e}")
+        middle = len(records) // 2
+        return await self._insert(records[:middle]) + await self._insert(
+            records[middle:]
+        )
+
+    async def purge_expired(self) -> int:
+        """Delete audit logs older than AUDIT_RETENTION_DAYS."""
+        cutoff = datetime.now(timezone.utc) - timedelta(
+            days=settings.AUDIT_RETENTION_DAYS
+        )
+        async with self._session_factory() as db:
+            purged = await AuditService(db).purge_older_than(
+                cutoff, settings.AUDIT_RETENTION_BATCH_SIZE
+            )
+        self.stats["purged"] += purged
+        if purged:
+            logger.info(f"Purged {purged} audit logs older than {cutoff.isoformat()}")
+        return purged
+
+    async def _run_retention(self):
+        while True:
+            try:
+                await self.purge_expired()
+            except Exception as e:
+                logger.error(f"Audit log retention purge failed: {e}")
+            await asyncio.sleep(settings.AUDIT_RETENTION_INTERVAL)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_size": self.max_queue,
+            "overflow_policy": self.overflow_policy,
+            "retention_days": settings.AUDIT_RETENTION_DAYS,
+            "running": self.running,
+        }
+
+
+# Global instance
+audit_log_writer = AuditLogWriter(SessionLocal)
@@ -1,25 +1,191 @@
 """
 Handles asynchronous events related to bot status changes.
+
+State changes are not written one event at a time. BotStateCoalescer keeps
+the latest state of each bot for BOT_EVENT_COALESCE_WINDOW seconds and
+writes all of them in one UPDATE, so a fleet-wide restart costs a few
+transactions instead of one per event. Events are ordered by their stream
+entry ID: an event older than one already accepted for the same bot is
+dropped. Events are acknowledged before their state is written, so a batch
+the database rejects is queued again, behind any newer state of its bots.
 """
 
+import asyncio
 import logging
-from typing import Callable, Dict, Any, Coroutine
+from typing import Any, Callable, Dict, Optional, Tuple
 
+from sqlalchemy import case, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 
-from management_server.models.models import Bot, BotUpdate
+from management_server.core.config import settings
+from management_server.models.models import Bot
+from management_server.services.fleet_stats import fleet_stats
 
 logger = logging.getLogger(__name__)
 
+# Seconds before a batch the database rejected is written again
+RETRY_DELAY = 1.0
+
+
+def _stream_position(message_id: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Sortable form of a stream entry ID ("<milliseconds>-<sequence>")."""
+    if not message_id:
+        return None
+    milliseconds, _, sequence = message_id.partition("-")
+    try:
+        return int(milliseconds), int(sequence or 0)
+    except ValueError:
+        return None
+
+
+class BotStateCoalescer:
+    """
+    Collects bot state changes and writes the latest one of each bot in bulk.
+    """
+
+    def __init__(
+        self,
+        db_session_factory: Callable[[], AsyncSession],
+        window: Optional[float] = None,
+        max_batch: Optional[int] = None,
+    ):
+        self._get_db = db_session_factory
+        self.window = (
+            window if window is not None else settings.BOT_EVENT_COALESCE_WINDOW
+        )
+        self.max_batch = max_batch or settings.BOT_EVENT_COALESCE_MAX_BATCH
+        # Latest unwritten state of each bot, by bot name
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        # Stream position of the newest event accepted for each bot
+        self._positions: Dict[str, Tuple[int, int]] = {}
+        self._flush_lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.stats: Dict[str, int] = {
+            "events": 0,
+            "superseded": 0,
+            "out_of_order": 0,
+            "flushes": 0,
+            "rows": 0,
+            "requeued": 0,
+        }
+
+    async def submit(
+        self, bot_name: str, state: Dict[str, Any], message_id: Optional[str] = None
+    ):
+        """Queue the new state of a bot, replacing any unwritten older one."""
+        position = _stream_position(message_id)
+        if position is not None:
+            last = self._positions.get(bot_name)
+            if last is not None and position <= last:
+                self.stats["out_of_order"] += 1
+                logger.debug(f"Dropped stale event {message_id} of bot '{bot_name}'")
+                return
+            self._positions[bot_name] = position
+
+        self.stats["events"] += 1
+        if bot_name in self._pending:
+            self.stats["superseded"] += 1
+        self._pending[bot_name] = state
+
+        if self.window <= 0 or len(self._pending) >= self.max_batch:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self, delay: Optional[float] = None):
+        await asyncio.sleep(self.window if delay is None else delay)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self) -> int:
+        """Write all queued states; returns the number of bots updated."""
+        # The lock keeps batches in submission order
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            return await self._apply(batch)
+
+    async def _apply(self, batch: Dict[str, Dict[str, Any]]) -> int:
+        names = list(batch)
+        columns = {column for state in batch.values() for column in state}
+        # One CASE per column; bots whose state lacks a column keep its value
+        values = {
+            column: case(
+                {
+                    name: state[column]
+                    for name, state in batch.items()
+                    if column in state
+                },
+                value=Bot.name,
+                else_=getattr(Bot, column),
+            )
+            for column in columns
+        }
+
+        async with self._get_db() as db:
+            try:
+                result = await db.execute(
+                    update(Bot).where(Bot.name.in_(names)).values(**values)
+                )
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                logger.error(
+                    f"Error updating the state of {len(names)} bots: {e}",
+                    exc_info=True,
+                )
+                self._requeue(batch)
+                return 0
+
+        fleet_stats.apply_states(batch)
+        self.stats["flushes"] += 1
+        self.stats["rows"] += result.rowcount
+        if result.rowcount < len(names):
+            logger.error(
+                f"{len(names) - result.rowcount} of {len(names)} bots not found "
+                "in the database."
+            )
+        logger.info(f"Updated the state of {result.rowcount} bots")
+        return result.rowcount
+
+    def _requeue(self, batch: Dict[str, Dict[str, Any]]):
+        """Queue the states of a failed write again, unless newer ones are pending."""
+        for name, state in batch.items():
+            self._pending.setdefault(name, state)
+        self.stats["requeued"] += len(batch)
+        if self._timer is None and not self._stopping:
+            self._timer = asyncio.create_task(
+                self._flush_later(max(self.window, RETRY_DELAY))
+            )
+
+    async def stop(self):
+        """Cancel the pending timer and write what is queued."""
+        self._stopping = True
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        await self.flush()
+        if self._pending:
+            logger.error(f"State updates of {len(self._pending)} bots were not written")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "pending": len(self._pending), "window": self.window}
+
 
 class BotEventHandler:
     """
     Listens to events from the Trading Gateway and updates the database.
     """
 
-    def __init__(self, db_session_factory: Callable[[], AsyncSession]):
+    def __init__(
+        self,
+        db_session_factory: Callable[[], AsyncSession],
+        coalescer: Optional[BotStateCoalescer] = None,
+    ):
         self._get_db: Callable[[], AsyncSession] = db_session_factory
+        self.state_updates = coalescer or BotStateCoalescer(db_session_factory)
 
     async def handle_event(self, event_message: Any):
         """
@@ -27,48 +193,40 @@ class BotEventHandler:
         """
         event_type = event_message.type
         event_data = event_message.data
+        message_id = getattr(event_message, "message_id", None)
 
         logger.debug(f"Event received: Type={event_type}, Data={event_data}")
 
         handler_method = getattr(self, f"_handle_{event_type.lower()}", None)
 
         if handler_method:
-            await handler_method(event_data)
+            await handler_method(event_data, message_id)
         else:
             logger.warning(f"No handler for event type: {event_type}")
 
+    async def flush(self) -> int:
+        """Write the queued bot states now."""
+        return await self.state_updates.flush()
+
+    async def stop(self):
+        await self.state_updates.stop()
+
     async def _update_bot_state(
-        self, bot_name: str | None, update_data: Dict[str, Any]
+        self,
+        bot_name: str | None,
+        update_data: Dict[str, Any],
+        message_id: Optional[str] = None,
     ):
-        """Helper to update bot state in the database."""
+        """Helper to queue a bot state update for the next bulk write."""
         if not bot_name:
             logger.error("Bot name is None, cannot update state")
             return
 
-        db = self._get_db()
-        try:
-            result = await db.execute(select(Bot).where(Bot.name == bot_name))
-            bot = result.scalar_one_or_none()
+        await self.state_updates.submit(bot_name, update_data, message_id)
 
-            if bot:
-                for key, value in update_data.items():
-                    setattr(bot, key, value)
-
-                db.add(bot)
-                await db.commit()
-                logger.info(
-                    f"Successfully updated bot '{bot_name}' with data: {update_data}"
-                )
-            else:
-                logger.error(f"Bot '{bot_name}' not found in the database.")
-        except Exception as e:
-            logger.error(f"Error updating bot '{bot_name}': {e}", exc_info=True)
-        finally:
-            # If the session factory created a new session, we should close it.
-            # In our test case, the session is managed outside, so this is safe.
-            pass
-
-    async def _handle_bot_started(self, data: Dict[str, Any]):
+    async def _handle_bot_started(
+        self, data: Dict[str, Any], message_id: Optional[str] = None
+    ):
         bot_name = data.get("bot_name")
         if not bot_name:
             logger.error("Bot name missing in BOT_STARTED event")
@@ -78,20 +236,24 @@ class BotEventHandler:
             "pid": data.get("pid"),
             "port": data.get("port"),
         }
-        await self._update_bot_state(bot_name, update_data)
+        await self._update_bot_state(bot_name, update_data, message_id)
 
-    async def _handle_bot_stopped(self, data: Dict[str, Any]):
+    async def _handle_bot_stopped(
+        self, data: Dict[str, Any], message_id: Optional[str] = None
+    ):
         bot_name = data.get("bot_name")
         if not bot_name:
             logger.error("Bot name missing in BOT_STOPPED event")
             return
         update_data = {"status": "stopped", "pid": None, "port": None}
-        await self._update_bot_state(bot_name, update_data)
+        await self._update_bot_state(bot_name, update_data, message_id)
 
-    async def _handle_bot_start_failed(self, data: Dict[str, Any]):
+    async def _handle_bot_start_failed(
+        self, data: Dict[str, Any], message_id: Optional[str] = None
+    ):
         bot_name = data.get("bot_name")
         if not bot_name:
             logger.error("Bot name missing in BOT_START_FAILED event")
             return
         update_data = {"status": "error", "pid": None, "port": None}
-        await self._update_bot_state(bot_name, update_data)
+        await self._update_bot_state(bot_name, update_data, message_id)
@@ -3,16 +3,26 @@ Service for bot management.
 Orchestrates bot operations by interacting with the database and publishing commands to a Redis Stream.
 """
 
+import asyncio
 import base64
+import hashlib
 import logging
 import os
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
 
 from management_server.db.repositories.bot_repository import BotRepository
 from management_server.db.repositories.freqai_model_repository import (
     FreqAIModelRepository,
 )
-from management_server.models.models import Bot, BotCreate, BotUpdate, BotStatus, User
+from management_server.models.models import (
+    Bot,
+    BotCreate,
+    BotUpdate,
+    BotStatus,
+    FreqAIModel,
+    User,
+)
 from management_server.tools.redis_streams_event_bus import RedisStreamsEventBus
 from shared.config.redis_streams import redis_streams_config
 from management_server.services.trading_gateway_client import TradingGatewayClient
@@ -21,6 +31,23 @@ from management_server.services.freqtrade_client import FreqtradeClient
 
 logger = logging.getLogger(__name__)
 
+# SHA-256 of model files keyed by (path, mtime, size), so a model is hashed
+# once rather than on every start
+_model_hash_cache: Dict[Tuple[str, float, int], str] = {}
+
+
+def _hash_model_file(file_path: str) -> Tuple[str, int]:
+    """SHA-256 and size of a model file, read in blocks."""
+    stat = os.stat(file_path)
+    key = (file_path, stat.st_mtime, stat.st_size)
+    if key not in _model_hash_cache:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        _model_hash_cache[key] = digest.hexdigest()
+    return _model_hash_cache[key], stat.st_size
+
 
 class BotService:
     def __init__(
@@ -109,8 +136,16 @@ class BotService:
         """Delete a bot."""
         return await self.bot_repo.delete(bot_id, user.id)  # type: ignore
 
-    async def _prepare_start_command(self, bot: Bot, user: User) -> Dict[str, Any]:
-        """Helper to prepare the data for START_BOT and RESTART_BOT commands."""
+    async def _prepare_start_command(
+        self,
+        bot: Bot,
+        user: User,
+        model_payloads: Optional[Dict[int, Optional[Dict[str, Any]]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Helper to prepare the data for START_BOT and RESTART_BOT commands.
+        `model_payloads` holds FreqAI model payloads already prepared by ID.
+        """
         logger.info(
             f"User {user.username} is preparing to start/restart bot {bot.name} (ID: {bot.id})"
         )
@@ -126,14 +161,60 @@ class BotService:
             logger.info(
                 f"Bot {bot.name} has FreqAI model ID {bot.freqai_model_id} attached. Preparing model for deployment."
             )
-            model = await self.model_repo.get_by_id(bot.freqai_model_id, user.id)  # type: ignore
-            if model and os.path.exists(model.file_path):  # type: ignore
+            if model_payloads is not None and bot.freqai_model_id in model_payloads:
+                command_data["freqai_model"] = model_payloads[bot.freqai_model_id]
+            else:
+                model = await self.model_repo.get_by_id(bot.freqai_model_id, user.id)  # type: ignore
+                command_data["freqai_model"] = await self._prepare_model_payload(
+                    model, bot
+                )
+
+        return command_data
+
+    async def _prepare_model_payload(
+        self, model: Optional[FreqAIModel], bot: Bot
+    ) -> Optional[Dict[str, Any]]:
+        """
+        The `freqai_model` part of a start command: the model's hash once it
+        is on the gateway, else its content inline.
+        """
+        payload = None
+        if model and os.path.exists(model.file_path):  # type: ignore
+            filename = os.path.basename(model.file_path)  # type: ignore
+            try:
+                # Stream the model to the gateway store; the command then
+                # carries only its hash
+                content_hash, size = await asyncio.to_thread(
+                    _hash_model_file, model.file_path  # type: ignore
+                )
+                result = await self.tg_client.upload_freqai_model(
+                    model.file_path, content_hash, size  # type: ignore
+                )
+                if result.get("present"):
+                    payload = {
+                        "filename": filename,
+                        "sha256": content_hash,
+                        "size": size,
+                    }
+                    logger.info(
+                        f"FreqAI model '{model.name}' ({content_hash}) is on the gateway."
+                    )
+                else:
+                    logger.warning(
+                        f"Chunked upload of FreqAI model for bot {bot.name} failed: {result}. Sending it inline."
+                    )
+            except Exception as e:
+                logger.error(
+                    f"Failed to upload FreqAI model file for bot {bot.name}: {e}. Sending it inline."
+                )
+
+            if payload is None:
                 try:
                     with open(model.file_path, "rb") as f:  # type: ignore
                         model_content = f.read()
 
-                    command_data["freqai_model"] = {
-                        "filename": os.path.basename(model.file_path),  # type: ignore
+                    payload = {
+                        "filename": filename,
                         "content_b64": base64.b64encode(model_content).decode("utf-8"),
                     }
                     logger.info(
@@ -143,12 +224,12 @@ class BotService:
                     logger.error(
                         f"Failed to read or encode FreqAI model file for bot {bot.name}: {e}"
                     )
-            else:
-                logger.warning(
-                    f"FreqAI model with ID {bot.freqai_model_id} not found or file does not exist. Starting bot without a model."
-                )
+        else:
+            logger.warning(
+                f"FreqAI model with ID {bot.freqai_model_id} not found or file does not exist. Starting bot without a model."
+            )
 
-        return command_data
+        return payload
 
     async def start_bot(self, bot_id: int, user: User) -> Dict[str, Any]:
         """Publish a command to start a bot."""
@@ -251,24 +332,105 @@ class BotService:
         )
         return {"status": "restart_command_sent", "bot_name": bot.name}
 
-    # ... (rest of the bulk and status methods remain the same)
-    async def start_all_bots(self, user: User):
+    # --- Fleet operations ---
+    # One query loads the bots, one prepares the models they share, commands
+    # and events go out in pipelined batches and one UPDATE sets the statuses
+
+    async def _prepare_start_commands(
+        self, bots: List[Bot], user: User
+    ) -> List[Dict[str, Any]]:
+        """Start commands of many bots, preparing each FreqAI model once."""
+        model_ids = {bot.freqai_model_id for bot in bots if bot.freqai_model_id}
+        model_payloads: Dict[int, Optional[Dict[str, Any]]] = {}
+        if model_ids:
+            models = {
+                model.id: model
+                for model in await self.model_repo.get_many(model_ids, user.id)  # type: ignore
+            }
+            # The first bot using a model names it in the logs
+            bot_of_model: Dict[int, Bot] = {}
+            for bot in bots:
+                bot_of_model.setdefault(bot.freqai_model_id, bot)  # type: ignore
+            payloads = await asyncio.gather(
+                *(
+                    self._prepare_model_payload(
+                        models.get(model_id), bot_of_model[model_id]
+                    )
+                    for model_id in model_ids
+                )
+            )
+            model_payloads = dict(zip(model_ids, payloads))
+
+        return [
+            await self._prepare_start_command(bot, user, model_payloads) for bot in bots
+        ]
+
+    async def _publish_bot_events(
+        self, bots: List[Bot], user: User, action: str, event_type: str
+    ):
+        timestamp = datetime.now(timezone.utc).isoformat()
+        await self.event_bus.publish_batch(
+            "bot_events",
+            [
+                (
+                    {
+                        "bot_id": bot.id,
+                        "bot_name": bot.name,
+                        "user_id": user.id,
+                        "action": action,
+                        "timestamp": timestamp,
+                    },
+                    event_type,
+                )
+                for bot in bots
+            ],
+        )
+
+    async def start_all_bots(self, user: User) -> Dict[str, Any]:
         """Publish a start command for all of a user's bots."""
         bots = await self.get_all_bots(user, 0, 1000)  # Assuming max 1000 bots
-        for bot in bots:
-            await self.start_bot(bot.id, user)  # type: ignore
+        if not bots:
+            return {"bots": 0}
+        commands = await self._prepare_start_commands(bots, user)
+        await self.event_bus.publish_batch(
+            redis_streams_config.MGMT_TRADING_COMMANDS,
+            [(command, "START_BOT") for command in commands],
+        )
+        await self._publish_bot_events(bots, user, "starting", "BOT_STARTING")
+        await self.bot_repo.update_statuses(
+            [bot.id for bot in bots], BotStatus.STARTING  # type: ignore
+        )
+        return {"bots": len(bots)}
 
-    async def stop_all_bots(self, user: User):
+    async def stop_all_bots(self, user: User) -> Dict[str, Any]:
         """Publish a stop command for all of a user's bots."""
         bots = await self.get_all_bots(user, 0, 1000)
-        for bot in bots:
-            await self.stop_bot(bot.id, user)  # type: ignore
+        if not bots:
+            return {"bots": 0}
+        logger.info(f"User {user.username} is requesting to stop {len(bots)} bots")
+        await self.event_bus.publish_batch(
+            "mcp_commands", [({"bot_name": bot.name}, "STOP_BOT") for bot in bots]
+        )
+        await self._publish_bot_events(bots, user, "stopping", "BOT_STOPPING")
+        await self.bot_repo.update_statuses([bot.id for bot in bots], "stopping")  # type: ignore
+        return {"bots": len(bots)}
 
-    async def restart_all_bots(self, user: User):
+    async def restart_all_bots(self, user: User) -> Dict[str, Any]:
         """Publish a restart command for all of a user's bots."""
         bots = await self.get_all_bots(user, 0, 1000)
-        for bot in bots:
-            await self.restart_bot(bot.id, user)  # type: ignore
+        if not bots:
+            return {"bots": 0}
+        commands = await self._prepare_start_commands(bots, user)
+        await self.event_bus.publish_batch(
+            "mcp_commands", [(command, "RESTART_BOT") for command in commands]
+        )
+        await self._publish_bot_events(bots, user, "restarting", "BOT_RESTARTING")
+        await self.bot_repo.update_statuses(
+            [bot.id for bot in bots],  # type: ignore
+            BotStatus.STARTING,
+            restart_required=False,
+        )
+        return {"bots": len(bots)}
 
     async def emergency_stop_all(self):
         """Publish a single, high-priority command to stop all processes immediately."""
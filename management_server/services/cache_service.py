@@ -1,25 +1,128 @@
 """
-Redis-based caching service.
+Two-tier caching service: an in-process LRU in front of Redis.
+
+Reads are served from the local tier first, then from Redis, whose hits are
+copied into the local tier for up to CACHE_LOCAL_TTL seconds. Other
+processes may change Redis meanwhile, so that short TTL bounds how stale a
+local value can be. Values are serialized with orjson when it is installed.
+
+`get_or_set` loads a missing value once however many callers miss it at the
+same time, and with `stale_ttl` keeps serving the previous value while one
+background load refreshes it. A loaded None is cached like any other value.
+Values can be tagged (e.g. "bot:42") and invalidated by tag. The `cached`
+decorator applies `get_or_set` to service methods.
+
+Every invalidation bumps the version of its tags, here and in Redis. Values
+computed while one of their tags was invalidated are dropped instead of
+cached: writers read the tag versions before computing (`tag_versions`),
+pass them to `set_many`, and check them again after writing.
+
+After a Redis error, reads and writes skip Redis for
+CACHE_REDIS_RETRY_INTERVAL seconds. Deletes and tag invalidations are
+always attempted; those that fail are kept and replayed once Redis answers
+again, so a lost invalidation cannot leave stale values behind.
 """
 
+import asyncio
+import functools
+import inspect
 import json
 import logging
-from typing import Any, Optional, Union
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
 import redis.asyncio as redis
 
 from ..core.config import settings
 
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Marks a value stored with its freshness deadline
+ENVELOPE_KEY = "__fresh_until__"
+
+
+def _dumps(value: Any) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value).encode()
+
+
+def _loads(data: Union[bytes, str]) -> Any:
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _unwrap(payload: Any) -> Tuple[Any, Optional[float]]:
+    """(value, fresh_until) of a stored payload; raw values never go stale."""
+    if isinstance(payload, dict) and ENVELOPE_KEY in payload and "value" in payload:
+        return payload["value"], payload[ENVELOPE_KEY]
+    return payload, None
+
+
 class CacheService:
     """
-    Redis-based caching service with TTL support.
+    Redis-based caching service with TTL support, an in-process LRU tier,
+    bulk operations, single-flight loading and tag invalidation.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        local_max_entries: Optional[int] = None,
+        local_ttl: Optional[float] = None,
+    ):
         self.redis_url = settings.REDIS_URL
         self.redis: Optional[redis.Redis] = None
         self.prefix = "freqtrade:"
+        self.local_max_entries = local_max_entries or settings.CACHE_LOCAL_MAX_ENTRIES
+        self.local_ttl = (
+            local_ttl if local_ttl is not None else settings.CACHE_LOCAL_TTL
+        )
+        # key -> (serialized payload, monotonic expiry)
+        self._local: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        # tag -> local keys, and key -> its tags to prune them with the key
+        self._local_tags: Dict[str, Set[str]] = {}
+        self._local_key_tags: Dict[str, Set[str]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refreshing: Set[str] = set()
+        # Redis is skipped until this monotonic time after an error
+        self._redis_retry_at = 0.0
+        # Deletes and tag invalidations that failed, replayed on reconnect
+        self._unapplied_keys: Set[str] = set()
+        self._unapplied_tags: Set[str] = set()
+        # tag -> number of invalidations in this process
+        self._tag_generations: Dict[str, int] = {}
+        self.stats: Dict[str, int] = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "coalesced": 0,
+            "stale_served": 0,
+            "redis_errors": 0,
+            "replayed_invalidations": 0,
+            "stale_writes": 0,
+        }
 
     async def connect(self) -> None:
         """Connect to Redis."""
@@ -32,6 +135,88 @@ class CacheService:
             await self.redis.close()
             self.redis = None
 
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def _tag_version_key(self, tag: str) -> str:
+        return f"{self.prefix}tag_version:{tag}"
+
+    async def _client(self, backoff: bool = True) -> Optional[redis.Redis]:
+        """
+        Redis client, or None while Redis is backing off after an error;
+        deletes pass backoff=False and are attempted anyway.
+        """
+        if backoff and time.monotonic() < self._redis_retry_at:
+            return None
+        await self.connect()
+        if (self._unapplied_keys or self._unapplied_tags) and not await self._replay():
+            return None
+        return self.redis
+
+    async def _replay(self) -> bool:
+        """Apply the deletes and invalidations that failed earlier."""
+        keys, self._unapplied_keys = self._unapplied_keys, set()
+        tags, self._unapplied_tags = self._unapplied_tags, set()
+        try:
+            if keys:
+                await self.redis.delete(*(self._key(key) for key in keys))
+            if tags:
+                await self._delete_tagged(self.redis, tags)
+        except Exception as e:
+            self._unapplied_keys |= keys
+            self._unapplied_tags |= tags
+            self._redis_failed("replay", sorted(keys | tags), e)
+            return False
+        self.stats["replayed_invalidations"] += len(keys) + len(tags)
+        return True
+
+    def _redis_failed(self, operation: str, key: Any, error: Exception):
+        self.stats["redis_errors"] += 1
+        self._redis_retry_at = time.monotonic() + settings.CACHE_REDIS_RETRY_INTERVAL
+        logger.error(f"Cache {operation} error for key {key}: {error}")
+
+    # --- Local tier ---
+
+    def _local_get(self, key: str) -> Optional[bytes]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry[1]:
+            self._local_drop(key)
+            return None
+        self._local.move_to_end(key)
+        return entry[0]
+
+    def _local_set(self, key: str, data: bytes, ttl: float):
+        ttl = min(ttl, self.local_ttl)
+        if ttl <= 0:
+            self._local_drop(key)
+            return
+        self._local[key] = (data, time.monotonic() + ttl)
+        self._local.move_to_end(key)
+        while len(self._local) > self.local_max_entries:
+            self._local_drop(next(iter(self._local)))
+
+    def _local_tag(self, key: str, tags: Iterable[str]):
+        for tag in tags:
+            self._local_tags.setdefault(tag, set()).add(key)
+            self._local_key_tags.setdefault(key, set()).add(tag)
+
+    def _local_drop(self, key: str):
+        """Remove a key from the local tier and from the tags that track it."""
+        self._local.pop(key, None)
+        for tag in self._local_key_tags.pop(key, ()):
+            keys = self._local_tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._local_tags[tag]
+
+    # --- Basic operations ---
+
     async def get(self, key: str) -> Optional[Any]:
         """
         Get value from cache.
@@ -42,15 +227,37 @@ class CacheService:
         Returns:
             Cached value or None
         """
+        payload = await self._get_payload(key)
+        return None if payload is None else _unwrap(payload)[0]
+
+    async def _get_payload(self, key: str) -> Optional[Any]:
+        data = self._local_get(key)
+        if data is not None:
+            self.stats["local_hits"] += 1
+            return _loads(data)
         try:
-            await self.connect()
-            value = await self.redis.get(f"{self.prefix}{key}")
-            return json.loads(value) if value else None
+            client = await self._client()
+            data = await client.get(self._key(key)) if client else None
         except Exception as e:
-            logger.error(f"Cache get error for key {key}: {e}")
+            self._redis_failed("get", key, e)
+            data = None
+        if data is None:
+            self.stats["misses"] += 1
             return None
+        self.stats["redis_hits"] += 1
+        payload = _loads(data)
+        self._local_set(key, data, self.local_ttl)
+        return payload
 
-    async def set(self, key: str, value: Any, ttl: int = 3600) -> bool:
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: int = 3600,
+        tags: Optional[Iterable[str]] = None,
+        stale_ttl: int = 0,
+        versions: Optional[Dict[str, Tuple[int, Any]]] = None,
+    ) -> bool:
         """
         Set value in cache with TTL.
 
@@ -58,18 +265,15 @@ class CacheService:
             key: Cache key
             value: Value to cache
             ttl: Time to live in seconds
+            tags: Tags the value can be invalidated by
+            stale_ttl: Seconds after the TTL the value may still be served
+                by get_or_set while it is refreshed
+            versions: Tag versions read before computing the value
 
         Returns:
             True if successful
         """
-        try:
-            await self.connect()
-            json_value = json.dumps(value)
-            await self.redis.setex(f"{self.prefix}{key}", ttl, json_value)
-            return True
-        except Exception as e:
-            logger.error(f"Cache set error for key {key}: {e}")
-            return False
+        return await self.set_many({key: value}, ttl, tags, stale_ttl, versions)
 
     async def delete(self, key: str) -> bool:
         """
@@ -79,15 +283,19 @@ class CacheService:
             key: Cache key
 
         Returns:
-            True if successful
+            True if deleted from Redis; otherwise the delete is retried once
+            Redis is reachable again
         """
+        self._local_drop(key)
         try:
-            await self.connect()
-            await self.redis.delete(f"{self.prefix}{key}")
-            return True
+            client = await self._client(backoff=False)
+            if client:
+                await client.delete(self._key(key))
+                return True
         except Exception as e:
-            logger.error(f"Cache delete error for key {key}: {e}")
-            return False
+            self._redis_failed("delete", key, e)
+        self._unapplied_keys.add(key)
+        return False
 
     async def exists(self, key: str) -> bool:
         """
@@ -99,11 +307,13 @@ class CacheService:
         Returns:
             True if key exists
         """
+        if self._local_get(key) is not None:
+            return True
         try:
-            await self.connect()
-            return bool(await self.redis.exists(f"{self.prefix}{key}"))
+            client = await self._client()
+            return bool(client and await client.exists(self._key(key)))
         except Exception as e:
-            logger.error(f"Cache exists error for key {key}: {e}")
+            self._redis_failed("exists", key, e)
             return False
 
     async def increment(self, key: str, amount: int = 1) -> Optional[int]:
@@ -117,11 +327,13 @@ class CacheService:
         Returns:
             New value or None if error
         """
+        # Counters live in Redis only, a local copy would lag behind
+        self._local_drop(key)
         try:
-            await self.connect()
-            return await self.redis.incrby(f"{self.prefix}{key}", amount)
+            client = await self._client()
+            return await client.incrby(self._key(key), amount) if client else None
         except Exception as e:
-            logger.error(f"Cache increment error for key {key}: {e}")
+            self._redis_failed("increment", key, e)
             return None
 
     async def expire(self, key: str, ttl: int) -> bool:
@@ -135,9 +347,349 @@ class CacheService:
         Returns:
             True if successful
         """
+        self._local_drop(key)
+        try:
+            client = await self._client()
+            return bool(client and await client.expire(self._key(key), ttl))
+        except Exception as e:
+            self._redis_failed("expire", key, e)
+            return False
+
+    # --- Bulk operations ---
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Get several values, fetching the local misses in one MGET.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Values of the keys found in the cache
+        """
+        found: Dict[str, Any] = {}
+        missing: List[str] = []
+        for key in keys:
+            data = self._local_get(key)
+            if data is None:
+                missing.append(key)
+            else:
+                self.stats["local_hits"] += 1
+                found[key] = _unwrap(_loads(data))[0]
+        if not missing:
+            return found
+
+        try:
+            client = await self._client()
+            values = (
+                await client.mget([self._key(key) for key in missing])
+                if client
+                else [None] * len(missing)
+            )
+        except Exception as e:
+            self._redis_failed("get_many", missing, e)
+            values = [None] * len(missing)
+        for key, data in zip(missing, values):
+            if data is None:
+                self.stats["misses"] += 1
+                continue
+            self.stats["redis_hits"] += 1
+            found[key] = _unwrap(_loads(data))[0]
+            self._local_set(key, data, self.local_ttl)
+        return found
+
+    async def set_many(
+        self,
+        values: Dict[str, Any],
+        ttl: int = 3600,
+        tags: Optional[Iterable[str]] = None,
+        stale_ttl: int = 0,
+        versions: Optional[Dict[str, Tuple[int, Any]]] = None,
+    ) -> bool:
+        """
+        Set several values with one pipelined round trip to Redis.
+
+        Args:
+            values: Values by cache key
+            ttl: Time to live in seconds
+            tags: Tags every value can be invalidated by
+            stale_ttl: Seconds after the TTL the values may still be served
+                by get_or_set while they are refreshed
+            versions: Tag versions from `tag_versions`, read before computing
+                the values; the values are dropped if a tag was invalidated
+                since. Costs one more round trip.
+
+        Returns:
+            True if successful
+        """
+        if versions and any(
+            self._tag_generations.get(tag, 0) != local
+            for tag, (local, _) in versions.items()
+        ):
+            self.stats["stale_writes"] += 1
+            return False
+        tags = list(tags or [])
+        fresh_until = time.time() + ttl
+        # None is stored in an envelope too, a bare null would read as a miss
+        encoded = {
+            key: _dumps(
+                {"value": value, ENVELOPE_KEY: fresh_until}
+                if stale_ttl or value is None
+                else value
+            )
+            for key, value in values.items()
+        }
+        for key, data in encoded.items():
+            self._local_set(key, data, ttl)
+            if key in self._local:
+                self._local_tag(key, tags)
+
         try:
-            await self.connect()
-            return bool(await self.redis.expire(f"{self.prefix}{key}", ttl))
+            client = await self._client()
+            if client is None:
+                return False
+            async with client.pipeline(transaction=False) as pipe:
+                for key, data in encoded.items():
+                    pipe.setex(self._key(key), ttl + stale_ttl, data)
+                for tag in tags:
+                    pipe.sadd(self._tag_key(tag), *(self._key(key) for key in values))
+                    # Kept at least as long as the values it tracks
+                    pipe.expire(
+                        self._tag_key(tag), max(ttl + stale_ttl, settings.CACHE_TAG_TTL)
+                    )
+                await pipe.execute()
         except Exception as e:
-            logger.error(f"Cache expire error for key {key}: {e}")
+            self._redis_failed("set_many", list(values), e)
             return False
+
+        if versions:
+            # An invalidation either bumped the versions before this check or
+            # reads the tag members after the write above and deletes them
+            shared = await self._shared_tag_versions(list(versions))
+            if any(
+                version != versions[tag][1] for tag, version in zip(versions, shared)
+            ):
+                for key in values:
+                    self._local_drop(key)
+                try:
+                    await client.delete(*(self._key(key) for key in values))
+                except Exception as e:
+                    self._redis_failed("set_many", list(values), e)
+                    self._unapplied_keys.update(values)
+                self.stats["stale_writes"] += 1
+                return False
+        return True
+
+    async def tag_versions(self, tags: Iterable[str]) -> Dict[str, Tuple[int, Any]]:
+        """
+        Versions of tags, read before computing values tagged with them and
+        passed to `set`/`set_many` along with the values.
+        """
+        tags = list(tags)
+        shared = await self._shared_tag_versions(tags)
+        return {
+            tag: (self._tag_generations.get(tag, 0), version)
+            for tag, version in zip(tags, shared)
+        }
+
+    async def _shared_tag_versions(self, tags: List[str]) -> List[Any]:
+        """Versions of tags in Redis; None for all of them without Redis."""
+        if not tags:
+            return []
+        try:
+            client = await self._client()
+            if client is not None:
+                return await client.mget([self._tag_version_key(tag) for tag in tags])
+        except Exception as e:
+            self._redis_failed("tag_versions", tags, e)
+        return [None] * len(tags)
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        """
+        Delete every value tagged with any of the tags, e.g. "bot:42".
+
+        Other processes drop their local copies within CACHE_LOCAL_TTL. If
+        Redis fails, the tags are invalidated there once it is reachable.
+
+        Returns:
+            Number of keys deleted from Redis
+        """
+        for tag in tags:
+            self._tag_generations[tag] = self._tag_generations.get(tag, 0) + 1
+            for key in list(self._local_tags.get(tag, ())):
+                self._local_drop(key)
+        try:
+            client = await self._client(backoff=False)
+            if client:
+                return await self._delete_tagged(client, tags)
+        except Exception as e:
+            self._redis_failed("invalidate_tags", tags, e)
+        self._unapplied_tags.update(tags)
+        return 0
+
+    async def _delete_tagged(self, client: redis.Redis, tags: Iterable[str]) -> int:
+        tags = list(tags)
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        async with client.pipeline(transaction=False) as pipe:
+            for tag, tag_key in zip(tags, tag_keys):
+                # Bumped before the members are read, see set_many
+                pipe.incrby(self._tag_version_key(tag), 1)
+                pipe.expire(self._tag_version_key(tag), settings.CACHE_TAG_TTL)
+                pipe.smembers(tag_key)
+            keys = set().union(*(await pipe.execute())[2::3])
+        async with client.pipeline(transaction=False) as pipe:
+            if keys:
+                pipe.delete(*keys)
+            pipe.delete(*tag_keys)
+            results = await pipe.execute()
+        return results[0] if keys else 0
+
+    # --- Loading ---
+
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int = 3600,
+        tags: Optional[Iterable[str]] = None,
+        stale_ttl: int = 0,
+    ) -> Any:
+        """
+        Get a value, loading and caching it on a miss.
+
+        Concurrent misses of a key share one call of `loader`. With
+        `stale_ttl`, an expired value is returned as is for that long while a
+        single background load refreshes it.
+
+        Args:
+            key: Cache key
+            loader: Coroutine function computing the value
+            ttl: Time to live in seconds
+            tags: Tags the value can be invalidated by
+            stale_ttl: Seconds an expired value may be served while refreshed
+
+        Returns:
+            Cached or loaded value
+        """
+        payload = await self._get_payload(key)
+        if payload is not None:
+            value, fresh_until = _unwrap(payload)
+            if fresh_until is None or time.time() < fresh_until:
+                return value
+            self.stats["stale_served"] += 1
+            if key not in self._refreshing and key not in self._inflight:
+                self._refreshing.add(key)
+                asyncio.create_task(self._refresh(key, loader, ttl, tags, stale_ttl))
+            return value
+        return await self._load(key, loader, ttl, tags, stale_ttl)
+
+    async def _load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        tags: Optional[Iterable[str]],
+        stale_ttl: int,
+    ) -> Any:
+        while key in self._inflight:
+            inflight = self._inflight[key]
+            self.stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The loading caller was cancelled, not this one: a waiter
+                # takes the load over
+
+        self.stats["loads"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            tags = list(tags or ())
+            versions = await self.tag_versions(tags) if tags else None
+            value = await loader()
+            await self.set(key, value, ttl, tags, stale_ttl, versions)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieve the exception so an uncoalesced failure is not logged
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _refresh(self, key, loader, ttl, tags, stale_ttl):
+        try:
+            await self._load(key, loader, ttl, tags, stale_ttl)
+        except Exception as e:
+            logger.warning(f"Background refresh of cache key {key} failed: {e}")
+        finally:
+            self._refreshing.discard(key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = (
+            self.stats["local_hits"] + self.stats["redis_hits"] + self.stats["misses"]
+        )
+        hits = self.stats["local_hits"] + self.stats["redis_hits"]
+        return {
+            **self.stats,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "local_entries": len(self._local),
+            "local_tags": len(self._local_tags),
+            "inflight": len(self._inflight),
+            "serializer": "orjson" if ORJSON_AVAILABLE else "json",
+        }
+
+
+# Global instance
+cache_service = CacheService()
+
+
+def cached(
+    ttl: int = 3600,
+    key: Optional[str] = None,
+    tags: Iterable[str] = (),
+    stale_ttl: int = 0,
+    cache: Optional[CacheService] = None,
+):
+    """
+    Cache the results of an async service method.
+
+    `key` and `tags` are templates formatted with the call's arguments, e.g.
+    ``@cached(ttl=30, key="bot_status:{bot_id}", tags=["bot:{bot_id}"])``.
+    Without `key`, the method's qualified name and arguments make the key.
+    """
+
+    def decorator(func: Callable[..., Awaitable[Any]]):
+        signature = inspect.signature(func)
+        prefix = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = {
+                name: value
+                for name, value in bound.arguments.items()
+                if name not in ("self", "cls")
+            }
+            if key is not None:
+                cache_key = key.format(**arguments)
+            else:
+                cache_key = f"{prefix}:{sorted(arguments.items())!r}"
+            return await (cache or cache_service).get_or_set(
+                cache_key,
+                lambda: func(*args, **kwargs),
+                ttl=ttl,
+                tags=[tag.format(**arguments) for tag in tags],
+                stale_ttl=stale_ttl,
+            )
+
+        return wrapper
+
+    return decorator
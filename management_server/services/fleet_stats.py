@@ -0,0 +1,382 @@
+"""
+Materialized fleet statistics.
+
+Dashboards poll bot counts by status, profit and drawdown, which used to be
+aggregated over `bots` on every request. FleetStats keeps the figures of
+each bot in memory and a precomputed summary per user and for the whole
+fleet, so reads cost a dictionary lookup. Figures are maintained from:
+- bot state changes written by BotEventHandler (running, stopped, error);
+- BOT_STARTING/BOT_STOPPING/BOT_RESTARTING events on `bot_events`;
+- TRADES_INGESTED events on `bot_events`: closed trades add their profit.
+
+Every FLEET_STATS_RECONCILE_INTERVAL seconds the figures are rebuilt from
+the database, which also picks up created and deleted bots, changes made by
+other processes and trades reported twice. Profit is the sum of the closed
+ingested trades of a bot; drawdown is the `max_drawdown` column of `bots`.
+"""
+
+import asyncio
+import logging
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from management_server.core.config import settings
+from management_server.models.models import Bot, BotTrade
+from management_server.tools.redis_streams_event_bus import (
+    RedisStreamsEventBus,
+    mcp_streams_event_bus,
+)
+
+logger = logging.getLogger(__name__)
+
+BOT_EVENTS_STREAM = "bot_events"
+# Per-process consumer groups are named with this prefix
+CONSUMER_GROUP_PREFIX = "fleet_stats_"
+
+# Status a bot has after a BotService action event
+ACTION_STATUSES = {
+    "starting": "starting",
+    "stopping": "stopping",
+    "restarting": "starting",
+}
+
+
+@dataclass
+class BotFigures:
+    """Figures of one bot that the fleet summaries are built from."""
+
+    user_id: Optional[int] = None
+    status: str = "stopped"
+    profit: float = 0.0
+    closed_trades: int = 0
+    profitable_trades: int = 0
+    max_drawdown: float = 0.0
+
+
+@dataclass
+class _Partial:
+    """Mergeable aggregate of a group of bots."""
+
+    bots: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    profit_sum: float = 0.0
+    profit_min: Optional[float] = None
+    profit_max: Optional[float] = None
+    drawdown_sum: float = 0.0
+    drawdown_max: float = 0.0
+    closed_trades: int = 0
+    profitable_trades: int = 0
+
+    def add_bot(self, figures: BotFigures):
+        self.merge(
+            _Partial(
+                bots=1,
+                statuses=Counter({figures.status: 1}),
+                profit_sum=figures.profit,
+                profit_min=figures.profit,
+                profit_max=figures.profit,
+                drawdown_sum=figures.max_drawdown,
+                drawdown_max=figures.max_drawdown,
+                closed_trades=figures.closed_trades,
+                profitable_trades=figures.profitable_trades,
+            )
+        )
+
+    def merge(self, other: "_Partial"):
+        if not other.bots:
+            return
+        self.statuses.update(other.statuses)
+        self.profit_sum += other.profit_sum
+        self.profit_min = (
+            other.profit_min
+            if self.profit_min is None
+            else min(self.profit_min, other.profit_min)
+        )
+        self.profit_max = (
+            other.profit_max
+            if self.profit_max is None
+            else max(self.profit_max, other.profit_max)
+        )
+        self.drawdown_sum += other.drawdown_sum
+        self.drawdown_max = max(self.drawdown_max, other.drawdown_max)
+        self.closed_trades += other.closed_trades
+        self.profitable_trades += other.profitable_trades
+        self.bots += other.bots
+
+    def summary(self) -> Dict[str, Any]:
+        bots = self.bots or 1
+        return {
+            "total_bots": self.bots,
+            "status_distribution": dict(self.statuses),
+            "profit_stats": {
+                "total_profit": round(self.profit_sum, 8),
+                "avg_profit": round(self.profit_sum / bots, 8),
+                "max_profit": self.profit_max or 0.0,
+                "min_profit": self.profit_min or 0.0,
+            },
+            "risk_stats": {
+                "avg_drawdown": round(self.drawdown_sum / bots, 8),
+                "max_drawdown": self.drawdown_max,
+            },
+            "closed_trades": self.closed_trades,
+            "profitable_trades": self.profitable_trades,
+        }
+
+
+class FleetStats:
+    """Per-bot figures with precomputed per-user and fleet-wide summaries."""
+
+    def __init__(
+        self,
+        event_bus: Optional[RedisStreamsEventBus] = None,
+        reconcile_interval: Optional[float] = None,
+    ):
+        self.event_bus = event_bus or mcp_streams_event_bus
+        self.reconcile_interval = (
+            reconcile_interval or settings.FLEET_STATS_RECONCILE_INTERVAL
+        )
+        self._bots: Dict[str, BotFigures] = {}
+        self._user_bots: Dict[Optional[int], Set[str]] = defaultdict(set)
+        self._partials: Dict[Optional[int], _Partial] = {}
+        self._summaries: Dict[Optional[int], Dict[str, Any]] = {}
+        self._fleet_summary: Dict[str, Any] = _Partial().summary()
+        self._dirty_users: Set[Optional[int]] = set()
+        # Bots changed while a reconciliation reads the database
+        self._touched: Optional[Set[str]] = None
+        self._reconcile_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._consumer_group = f"{CONSUMER_GROUP_PREFIX}{uuid.uuid4().hex[:12]}"
+        self.loaded = False
+        self.stats: Dict[str, int] = {
+            "events": 0,
+            "trades": 0,
+            "reconciliations": 0,
+            "drift": 0,
+        }
+
+    # --- Reads ---
+
+    def get_summary(self, user_id: Optional[int] = None) -> Dict[str, Any]:
+        """Summary of a user's bots, or of the whole fleet if user_id is None."""
+        if user_id is None:
+            return self._fleet_summary
+        return self._summaries.get(user_id) or _Partial().summary()
+
+    def get_bot(self, bot_name: str) -> Optional[BotFigures]:
+        return self._bots.get(bot_name)
+
+    async def ensure_loaded(self, db: AsyncSession):
+        """Reconcile once if nothing was loaded yet in this process."""
+        if not self.loaded:
+            await self.reconcile(db)
+
+    # --- Incremental maintenance ---
+
+    def _update(self, bot_name: str, user_id: Optional[int] = None, **changes):
+        figures = self._bots.get(bot_name)
+        if figures is None:
+            figures = self._bots[bot_name] = BotFigures(user_id=user_id)
+            self._user_bots[user_id].add(bot_name)
+        elif user_id is not None and figures.user_id != user_id:
+            self._user_bots[figures.user_id].discard(bot_name)
+            self._dirty_users.add(figures.user_id)
+            figures.user_id = user_id
+            self._user_bots[user_id].add(bot_name)
+        for name, value in changes.items():
+            setattr(figures, name, value)
+        self._dirty_users.add(figures.user_id)
+        if self._touched is not None:
+            self._touched.add(bot_name)
+        return figures
+
+    def apply_states(self, states: Dict[str, Dict[str, Any]]):
+        """Apply bot states written to the database, by bot name."""
+        for bot_name, state in states.items():
+            # Bots not loaded yet are picked up by the next reconciliation
+            if "status" in state and bot_name in self._bots:
+                self._update(bot_name, status=state["status"])
+        self._refresh()
+
+    def apply_trades(self, bot_name: str, trades: Iterable[Dict[str, Any]]):
+        """Add the profit of newly closed trades of a bot."""
+        closed = [trade for trade in trades if not trade.get("is_open")]
+        if not closed:
+            return
+        figures = self._bots.get(bot_name) or self._update(bot_name)
+        profits = [trade.get("profit_abs") or 0.0 for trade in closed]
+        self._update(
+            bot_name,
+            profit=figures.profit + sum(profits),
+            closed_trades=figures.closed_trades + len(closed),
+            profitable_trades=figures.profitable_trades
+            + sum(1 for profit in profits if profit > 0),
+        )
+        self.stats["trades"] += len(closed)
+        self._refresh()
+
+    async def handle_event(self, event_message: Any):
+        """Apply BotService action events and TRADES_INGESTED events."""
+        data = event_message.data
+        bot_name = data.get("bot_name")
+        if not bot_name:
+            return
+        self.stats["events"] += 1
+        if event_message.type == "TRADES_INGESTED":
+            self.apply_trades(bot_name, data.get("trades", []))
+        elif data.get("action") in ACTION_STATUSES:
+            self._update(
+                bot_name, data.get("user_id"), status=ACTION_STATUSES[data["action"]]
+            )
+            self._refresh()
+
+    def _refresh(self):
+        """Recompute the summaries of changed users and of the fleet."""
+        if not self._dirty_users:
+            return
+        for user_id in self._dirty_users:
+            partial = _Partial()
+            for bot_name in self._user_bots.get(user_id, ()):
+                partial.add_bot(self._bots[bot_name])
+            if partial.bots:
+                self._partials[user_id] = partial
+                self._summaries[user_id] = partial.summary()
+            else:
+                self._partials.pop(user_id, None)
+                self._summaries.pop(user_id, None)
+                self._user_bots.pop(user_id, None)
+        self._dirty_users.clear()
+        fleet = _Partial()
+        for partial in self._partials.values():
+            fleet.merge(partial)
+        self._fleet_summary = fleet.summary()
+
+    # --- Reconciliation ---
+
+    async def reconcile(self, db: AsyncSession) -> int:
+        """
+        Rebuild the figures from the database.
+
+        Returns:
+            Number of bots whose figures had drifted
+        """
+        async with self._reconcile_lock:
+            self._touched = set()
+            try:
+                bots = (
+                    await db.execute(
+                        select(Bot.name, Bot.created_by, Bot.status, Bot.max_drawdown)
+                    )
+                ).all()
+                trades = (
+                    await db.execute(
+                        select(
+                            BotTrade.bot_name,
+                            func.count(BotTrade.id),
+                            func.sum(case((BotTrade.profit_abs > 0, 1), else_=0)),
+                            func.coalesce(func.sum(BotTrade.profit_abs), 0.0),
+                        )
+                        .where(BotTrade.is_open.is_(False))
+                        .group_by(BotTrade.bot_name)
+                    )
+                ).all()
+                touched = self._touched
+            finally:
+                self._touched = None
+
+        closed = {name: (count, wins, profit) for name, count, wins, profit in trades}
+        figures: Dict[str, BotFigures] = {}
+        for name, user_id, status, max_drawdown in bots:
+            count, wins, profit = closed.get(name, (0, 0, 0.0))
+            figures[name] = BotFigures(
+                user_id=user_id,
+                status=status,
+                profit=float(profit or 0.0),
+                closed_trades=count,
+                profitable_trades=int(wins or 0),
+                max_drawdown=max_drawdown or 0.0,
+            )
+        # Changes applied while the database was read are newer than it
+        for name in touched:
+            if name in figures and name in self._bots:
+                figures[name] = self._bots[name]
+
+        drift = sum(
+            1
+            for name in figures.keys() | self._bots.keys()
+            if figures.get(name) != self._bots.get(name)
+        )
+        self._bots = figures
+        self._user_bots = defaultdict(set)
+        for name, bot_figures in figures.items():
+            self._user_bots[bot_figures.user_id].add(name)
+        self._partials.clear()
+        self._summaries.clear()
+        self._dirty_users = set(self._user_bots)
+        self._refresh()
+        if not figures:
+            self._fleet_summary = _Partial().summary()
+
+        if self.loaded:
+            self.stats["drift"] += drift
+        self.loaded = True
+        self.stats["reconciliations"] += 1
+        return drift
+
+    async def _run(self, session_factory: Callable[[], AsyncSession]):
+        while True:
+            try:
+                async with session_factory() as db:
+                    drift = await self.reconcile(db)
+                if drift:
+                    logger.info(f"Fleet statistics reconciled, {drift} bots drifted")
+            except Exception as e:
+                logger.error(f"Fleet statistics reconciliation failed: {e}")
+            await asyncio.sleep(self.reconcile_interval)
+
+    def start(self, session_factory: Callable[[], AsyncSession]):
+        """Start periodic reconciliation in the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(session_factory))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def subscribe(self):
+        """Listen for bot events, in a consumer group of this process."""
+        await self.event_bus.prune_idle_consumer_groups(
+            BOT_EVENTS_STREAM,
+            CONSUMER_GROUP_PREFIX,
+            keep=self._consumer_group,
+            ttl=settings.EVENT_CONSUMER_GROUP_TTL,
+        )
+        await self.event_bus.subscribe(
+            stream_name=BOT_EVENTS_STREAM,
+            callback=self.handle_event,
+            consumer_group=self._consumer_group,
+            start_id="$",
+        )
+
+    async def unsubscribe(self):
+        # The listener goes first, or it would recreate the group
+        await self.event_bus.unsubscribe(BOT_EVENTS_STREAM)
+        await self.event_bus.destroy_consumer_group(
+            BOT_EVENTS_STREAM, self._consumer_group
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "bots": len(self._bots), "loaded": self.loaded}
+
+
+# Global instance
+fleet_stats = FleetStats()
@@ -7,50 +7,65 @@ from typing import Any, Dict, Optional
 import aiohttp
 from fastapi import HTTPException
 
+from shared.freqtrade_auth import freqtrade_token_cache
+
 logger = logging.getLogger(__name__)
 
+# One connection pool for all bots. Clients are created per request, so the
+# session (and its keep-alive connections) must outlive them.
+_freqtrade_client_session: Optional[aiohttp.ClientSession] = None
+
+
+def _get_shared_session() -> aiohttp.ClientSession:
+    global _freqtrade_client_session
+    if _freqtrade_client_session is None or _freqtrade_client_session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=100, limit_per_host=4, keepalive_timeout=30, ttl_dns_cache=300
+        )
+        _freqtrade_client_session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=30, connect=10),
+        )
+    return _freqtrade_client_session
+
+
+async def close_freqtrade_client_session():
+    """Function to close the shared session on application shutdown."""
+    global _freqtrade_client_session
+    if _freqtrade_client_session and not _freqtrade_client_session.closed:
+        await _freqtrade_client_session.close()
+        logger.info("Freqtrade client session closed.")
+    _freqtrade_client_session = None
+
+
 class FreqtradeClient:
     def __init__(self, bot_url: str, username: str, password: str):
         # The bot_url should be the base URL, e.g., http://localhost:8081
         self.base_url = bot_url.rstrip('/')
         self.username = username
         self.password = password
-        self._session: Optional[aiohttp.ClientSession] = None
-        self._jwt_token: Optional[str] = None
 
     async def _get_session(self) -> aiohttp.ClientSession:
-        if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
-        return self._session
+        return _get_shared_session()
 
     async def close(self):
-        if self._session and not self._session.closed:
-            await self._session.close()
+        # The session is shared and closed on application shutdown
+        pass
 
-    async def _login(self):
-        """Logs into the Freqtrade API and stores the JWT token."""
+    async def _get_headers(self) -> Dict[str, str]:
         session = await self._get_session()
         try:
-            async with session.post(
-                f"{self.base_url}/api/v1/token/login",
-                auth=aiohttp.BasicAuth(self.username, self.password)
-            ) as response:
-                response.raise_for_status()
-                data = await response.json()
-                self._jwt_token = data.get("access_token")
-                logger.info(f"Successfully logged into Freqtrade API at {self.base_url}")
+            token = await freqtrade_token_cache.get_access_token(
+                session, self.base_url, self.username, self.password
+            )
         except aiohttp.ClientError as e:
             logger.error(f"Failed to log into Freqtrade API at {self.base_url}: {e}")
-            self._jwt_token = None
-
-    async def _get_headers(self) -> Dict[str, str]:
-        if not self._jwt_token:
-            await self._login()
+            token = None
 
-        if not self._jwt_token:
+        if not token:
              raise HTTPException(status_code=503, detail="Could not authenticate with Freqtrade bot API.")
 
-        return {"Authorization": f"Bearer {self._jwt_token}"}
+        return {"Authorization": f"Bearer {token}"}
 
     async def get_pair_history(self, pair: str, timeframe: str, strategy: str) -> Dict[str, Any]:
         """
@@ -71,7 +86,7 @@ class FreqtradeClient:
                 return await response.json()
         except aiohttp.ClientError as e:
             logger.error(f"Error fetching pair history from {self.base_url}: {e}")
-            # If token is expired, it might be a 401, try to login again on next call.
-            if response.status == 401:
-                self._jwt_token = None
+            # If token is expired, it might be a 401, login again on next call.
+            if isinstance(e, aiohttp.ClientResponseError) and e.status == 401:
+                freqtrade_token_cache.invalidate(self.base_url, self.username)
             raise HTTPException(status_code=503, detail=f"Failed to fetch data from Freqtrade bot: {e}")
@@ -4,18 +4,21 @@ Combines system metrics, component health checks, and bot statistics.
 """
 
 import asyncio
-import psutil
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Set
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 import httpx
 from redis.asyncio import Redis
 
 from management_server.core.config import settings
-from management_server.models.models import Bot
+from management_server.services.fleet_stats import fleet_stats
+from management_server.services.system_metrics_sampler import system_metrics_sampler
 from management_server.tools.redis_streams_event_bus import core_streams_event_bus
 
+# Running event publications, referenced until done
+_publish_tasks: Set[asyncio.Task] = set()
+
 
 class MonitoringService:
     """Comprehensive monitoring service combining system metrics and health checks."""
@@ -57,8 +60,10 @@ class MonitoringService:
             "overall_status": self._calculate_overall_status(component_health),
         }
 
-        # Отправка WebSocket событий для real-time обновлений
-        await self._publish_system_status_events(component_health)
+        # Отправка WebSocket событий для real-time обновлений, вне пути запроса
+        task = asyncio.create_task(self._publish_system_status_events(component_health))
+        _publish_tasks.add(task)
+        task.add_done_callback(_publish_tasks.discard)
 
         return result
 
@@ -67,78 +72,40 @@ class MonitoringService:
     ):
         """Publish system status events for WebSocket broadcasting."""
         try:
-            # Отправка общего статуса системы
+            # Общий статус системы и статус каждого компонента - одним батчем
             overall_status = self._calculate_overall_status(component_health)
-            await core_streams_event_bus.publish(
-                stream_name="system_events",
-                event_data={
-                    "overall_status": overall_status,
-                    "component_count": len(component_health),
-                    "timestamp": datetime.utcnow().isoformat(),
-                },
-                event_type="SYSTEM_STATUS_UPDATE",
-            )
-
-            # Отправка статуса каждого компонента
-            for component in component_health:
-                await core_streams_event_bus.publish(
-                    stream_name="system_events",
-                    event_data={
+            timestamp = datetime.utcnow().isoformat()
+            events = [
+                (
+                    {
+                        "overall_status": overall_status,
+                        "component_count": len(component_health),
+                        "timestamp": timestamp,
+                    },
+                    "SYSTEM_STATUS_UPDATE",
+                )
+            ]
+            events.extend(
+                (
+                    {
                         "service_name": component["name"],
                         "status": component["status"],
                         "details": component.get("details", {}),
-                        "timestamp": datetime.utcnow().isoformat(),
+                        "timestamp": timestamp,
                     },
-                    event_type="SERVICE_HEALTH_UPDATE",
+                    "SERVICE_HEALTH_UPDATE",
                 )
+                for component in component_health
+            )
+            await core_streams_event_bus.publish_batch("system_events", events)
         except Exception as e:
             # Не позволяем ошибкам отправки событий ломать мониторинг
             print(f"Failed to publish system status events: {e}")
 
     async def _get_system_metrics(self) -> Dict[str, Any]:
-        """Gather detailed system metrics."""
+        """Latest host metrics from the background sampler."""
         try:
-            # CPU usage (measured over 1 second)
-            cpu_usage = psutil.cpu_percent(interval=1)
-
-            # Memory information
-            memory_info = psutil.virtual_memory()
-
-            # Disk usage for root filesystem
-            disk_info = psutil.disk_usage("/")
-
-            # Network I/O (optional)
-            network_info = psutil.net_io_counters()
-            if network_info:
-                network_stats = {
-                    "bytes_sent": network_info.bytes_sent,
-                    "bytes_recv": network_info.bytes_recv,
-                    "packets_sent": network_info.packets_sent,
-                    "packets_recv": network_info.packets_recv,
-                }
-            else:
-                network_stats = {}
-
-            return {
-                "cpu": {
-                    "usage_percent": round(cpu_usage, 2),
-                    "cores": psutil.cpu_count(),
-                    "cores_logical": psutil.cpu_count(logical=True),
-                },
-                "memory": {
-                    "total_gb": round(memory_info.total / (1024**3), 2),
-                    "used_gb": round(memory_info.used / (1024**3), 2),
-                    "free_gb": round(memory_info.available / (1024**3), 2),
-                    "usage_percent": round(memory_info.percent, 2),
-                },
-                "disk": {
-                    "total_gb": round(disk_info.total / (1024**3), 2),
-                    "used_gb": round(disk_info.used / (1024**3), 2),
-                    "free_gb": round(disk_info.free / (1024**3), 2),
-                    "usage_percent": round(disk_info.percent, 2),
-                },
-                "network": network_stats,
-            }
+            return await system_metrics_sampler.get_metrics()
         except Exception as e:
             return {"error": f"Failed to collect system metrics: {str(e)}"}
 
@@ -299,48 +266,10 @@ class MonitoringService:
             }
 
     async def _get_bot_statistics(self) -> Dict[str, Any]:
-        """Get comprehensive bot statistics."""
+        """Fleet-wide bot statistics, read from the materialized summary."""
         try:
-            # Count bots by status
-            status_query = select(Bot.status, func.count(Bot.id)).group_by(Bot.status)
-            status_result = await self.db.execute(status_query)
-            status_counts = {status: count for status, count in status_result.all()}
-
-            # Get total bot count
-            total_query = select(func.count(Bot.id))
-            total_result = await self.db.execute(total_query)
-            total_bots = total_result.scalar() or 0
-
-            # Get profit statistics
-            profit_query = select(
-                func.sum(Bot.total_profit).label("total_profit"),
-                func.avg(Bot.total_profit).label("avg_profit"),
-                func.max(Bot.total_profit).label("max_profit"),
-                func.min(Bot.total_profit).label("min_profit"),
-            )
-            profit_result = await self.db.execute(profit_query)
-            profit_stats = profit_result.first()
-
-            # Get drawdown statistics
-            drawdown_query = select(
-                func.avg(Bot.max_drawdown).label("avg_drawdown"),
-                func.max(Bot.max_drawdown).label("max_drawdown"),
-            )
-            drawdown_result = await self.db.execute(drawdown_query)
-            drawdown_stats = drawdown_result.first()
-
-            # Safe access to statistics
-            return {
-                "total_bots": total_bots,
-                "status_distribution": status_counts,
-                "profit_stats": {
-                    "total_profit": 0.0,
-                    "avg_profit": 0.0,
-                    "max_profit": 0.0,
-                    "min_profit": 0.0,
-                },
-                "risk_stats": {"avg_drawdown": 0.0, "max_drawdown": 0.0},
-            }
+            await fleet_stats.ensure_loaded(self.db)
+            return fleet_stats.get_summary()
         except Exception as e:
             return {"error": f"Failed to collect bot statistics: {str(e)}"}
 
@@ -0,0 +1,208 @@
+"""
+Background sampler of host metrics.
+
+Monitoring requests used to call `psutil.cpu_percent(interval=1)`, which
+blocked the event loop, and every other request, for a second. One task now
+samples CPU, memory, disk and network every SYSTEM_METRICS_INTERVAL seconds
+in a worker thread and keeps the last SYSTEM_METRICS_BUFFER_SIZE samples in
+a ring buffer. Requests read the latest sample and the min/avg/max of the
+SYSTEM_METRICS_WINDOWS without waiting.
+
+CPU usage is measured between the `psutil.cpu_times()` of two consecutive
+samples, kept on the sampler rather than in psutil's per-thread state of
+`cpu_percent(interval=None)`, so the worker thread a sample runs on does not
+matter. The first sample after start reports the average usage since boot.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Optional, Sequence
+
+import psutil
+
+from management_server.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Sample fields summarized over the windows
+WINDOW_FIELDS = ("cpu_percent", "memory_percent", "disk_percent")
+
+
+def _cpu_busy_and_total(times) -> tuple:
+    """Busy and total CPU seconds of a `psutil.cpu_times()` result."""
+    total = sum(times)
+    # guest time is already counted in user and nice on Linux
+    total -= getattr(times, "guest", 0) + getattr(times, "guest_nice", 0)
+    busy = total - times.idle - getattr(times, "iowait", 0)
+    return busy, total
+
+
+class SystemMetricsSampler:
+    """Ring buffer of host metrics filled by one background task."""
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        buffer_size: Optional[int] = None,
+        windows: Optional[Sequence[int]] = None,
+    ):
+        self.interval = interval or settings.SYSTEM_METRICS_INTERVAL
+        self.buffer_size = buffer_size or settings.SYSTEM_METRICS_BUFFER_SIZE
+        self.windows = tuple(windows or settings.SYSTEM_METRICS_WINDOWS)
+        self._samples: Deque[Dict[str, Any]] = deque(maxlen=self.buffer_size)
+        self._task: Optional[asyncio.Task] = None
+        self._cpu_lock = threading.Lock()
+        self._last_cpu: tuple = (0.0, 0.0)
+        self.stats: Dict[str, Any] = {
+            "samples": 0,
+            "errors": 0,
+            "last_sample_ms": 0.0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the sampling task in the running event loop."""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            await self.sample()
+            await asyncio.sleep(self.interval)
+
+    async def sample(self) -> Optional[Dict[str, Any]]:
+        """Take one sample in a worker thread and append it to the buffer."""
+        started = time.perf_counter()
+        try:
+            sample = await asyncio.to_thread(self._collect)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Failed to collect system metrics: {e}")
+            return None
+        self._samples.append(sample)
+        self.stats["samples"] += 1
+        self.stats["last_sample_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return sample
+
+    def _cpu_percent(self) -> float:
+        """CPU usage since the previous sample, whichever thread takes it."""
+        with self._cpu_lock:
+            busy, total = _cpu_busy_and_total(psutil.cpu_times())
+            last_busy, last_total = self._last_cpu
+            self._last_cpu = (busy, total)
+        elapsed = total - last_total
+        if elapsed <= 0:
+            return 0.0
+        return min(max((busy - last_busy) / elapsed * 100, 0.0), 100.0)
+
+    def _collect(self) -> Dict[str, Any]:
+        cpu_usage = self._cpu_percent()
+        memory_info = psutil.virtual_memory()
+        disk_info = psutil.disk_usage("/")
+        network_info = psutil.net_io_counters()
+        return {
+            "time": time.time(),
+            "cpu_percent": cpu_usage,
+            "memory": memory_info,
+            "memory_percent": memory_info.percent,
+            "disk": disk_info,
+            "disk_percent": disk_info.percent,
+            "network": network_info,
+        }
+
+    def summarize(self, seconds: float) -> Dict[str, Dict[str, float]]:
+        """Min, average and max of the samples of the last `seconds`."""
+        since = time.time() - seconds
+        recent = [sample for sample in self._samples if sample["time"] >= since]
+        if not recent:
+            return {}
+        summary = {}
+        for name in WINDOW_FIELDS:
+            values = [sample[name] for sample in recent]
+            summary[name] = {
+                "min": round(min(values), 2),
+                "avg": round(sum(values) / len(values), 2),
+                "max": round(max(values), 2),
+            }
+        summary["samples"] = len(recent)
+        return summary
+
+    async def get_metrics(self) -> Dict[str, Any]:
+        """
+        Latest host metrics with their window summaries. Samples once if the
+        sampler has not run yet.
+        """
+        if not self._samples and await self.sample() is None:
+            return {"error": "Failed to collect system metrics"}
+        latest = self._samples[-1]
+        memory_info, disk_info, network_info = (
+            latest["memory"],
+            latest["disk"],
+            latest["network"],
+        )
+        if network_info:
+            network_stats = {
+                "bytes_sent": network_info.bytes_sent,
+                "bytes_recv": network_info.bytes_recv,
+                "packets_sent": network_info.packets_sent,
+                "packets_recv": network_info.packets_recv,
+            }
+        else:
+            network_stats = {}
+
+        return {
+            "sampled_at": datetime.fromtimestamp(
+                latest["time"], tz=timezone.utc
+            ).isoformat(),
+            "cpu": {
+                "usage_percent": round(latest["cpu_percent"], 2),
+                "cores": psutil.cpu_count(),
+                "cores_logical": psutil.cpu_count(logical=True),
+            },
+            "memory": {
+                "total_gb": round(memory_info.total / (1024**3), 2),
+                "used_gb": round(memory_info.used / (1024**3), 2),
+                "free_gb": round(memory_info.available / (1024**3), 2),
+                "usage_percent": round(memory_info.percent, 2),
+            },
+            "disk": {
+                "total_gb": round(disk_info.total / (1024**3), 2),
+                "used_gb": round(disk_info.used / (1024**3), 2),
+                "free_gb": round(disk_info.free / (1024**3), 2),
+                "usage_percent": round(disk_info.percent, 2),
+            },
+            "network": network_stats,
+            "windows": {
+                f"{seconds}s": self.summarize(seconds) for seconds in self.windows
+            },
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "running": self.running,
+            "buffered": len(self._samples),
+            "interval": self.interval,
+        }
+
+
+# Global instance
+system_metrics_sampler = SystemMetricsSampler()
@@ -0,0 +1,403 @@
+"""
+Vectorized trade analytics over ingested trades.
+
+Analytics are computed from the closed trades in `bot_trades` for groups of
+bots: a single bot, or all bots of a user as one portfolio. The trades of
+every requested group are loaded with one query into columnar NumPy
+arrays. The metrics of all groups are then computed together for each
+window, with bincounts over a group code and pandas group-wise cumulative
+operations rather than a Python loop per trade or per group.
+
+Metrics of a group over a window:
+- trade count, win rate, total and average profit;
+- equity curve, starting from the group's capital (stake_amount times
+  max_open_trades of its bots);
+- max drawdown of the equity, as a ratio and in stake currency;
+- Sharpe and Sortino ratios of daily returns and the Calmar ratio, all
+  annualized over 365 days.
+
+Results are cached per (group, window) in the CacheService for
+ANALYTICS_CACHE_TTL seconds, tagged with the bots' names. Cache keys hold a
+hash of the group's bots and capital, so adding or resizing a bot is not
+answered from the previous group's results. Trade ingestion
+invalidates the tags of the bots it changed.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from management_server.core.config import settings
+from management_server.models.models import BotTrade
+from management_server.services.cache_service import CacheService, cache_service
+
+logger = logging.getLogger(__name__)
+
+DAY = 86400.0
+
+# Lookback of each window in seconds; None is the whole history
+WINDOWS: Dict[str, Optional[float]] = {
+    "1h": 3600.0,
+    "24h": DAY,
+    "7d": 7 * DAY,
+    "30d": 30 * DAY,
+    "all": None,
+}
+
+# Bucket and lookback of each profit period
+PROFIT_PERIODS: Dict[str, Tuple[str, float]] = {
+    "hourly": ("h", 2 * DAY),
+    "daily": ("D", 30 * DAY),
+    "weekly": ("W", 26 * 7 * DAY),
+    "monthly": ("M", 365 * DAY),
+}
+
+
+class TradeGroup:
+    """Bots analyzed together, and the capital they trade with."""
+
+    def __init__(self, key: str, bot_names: Sequence[str], capital: float):
+        self.key = key
+        self.bot_names = list(bot_names)
+        self.capital = capital if capital > 0 else 1.0
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the bots and capital, so cached results follow their changes."""
+        raw = f"{sorted(self.bot_names)}|{self.capital}"
+        return hashlib.sha1(raw.encode()).hexdigest()[:12]
+
+
+def trades_tag(bot_name: str) -> str:
+    """Cache tag of the analytics computed from a bot's trades."""
+    return f"trades:{bot_name}"
+
+
+class TradeColumns:
+    """Closed trades as arrays sorted by group code, then close time."""
+
+    def __init__(self, codes: np.ndarray, close_ts: np.ndarray, profit: np.ndarray):
+        order = np.lexsort((close_ts, codes))
+        self.codes = codes[order]
+        self.close_ts = close_ts[order]
+        self.profit = profit[order]
+
+    def since(self, cutoff: float) -> "TradeColumns":
+        mask = self.close_ts >= cutoff
+        return TradeColumns(self.codes[mask], self.close_ts[mask], self.profit[mask])
+
+
+def compute_metrics(
+    trades: TradeColumns,
+    capital: np.ndarray,
+    starts: np.ndarray,
+    end: float,
+    curve_points: int,
+) -> List[Dict[str, Any]]:
+    """
+    Metrics of every group at once.
+
+    Args:
+        trades: Closed trades of the groups, codes indexing `capital`
+        capital: Starting capital of each group
+        starts: Start of the analyzed period of each group (epoch seconds)
+        end: End of the analyzed period (epoch seconds)
+        curve_points: Maximum points of each returned equity curve
+
+    Returns:
+        Metrics of each group, in code order
+    """
+    n = len(capital)
+    codes, profit = trades.codes, trades.profit
+    counts = np.bincount(codes, minlength=n)
+    wins = np.bincount(codes, weights=profit > 0, minlength=n)
+    total = np.bincount(codes, weights=profit, minlength=n)
+
+    # Equity curve and drawdown, cumulated within each group
+    cumulative = pd.Series(profit).groupby(codes).cumsum().to_numpy()
+    equity = capital[codes] + cumulative
+    peak = np.maximum(
+        pd.Series(equity).groupby(codes).cummax().to_numpy(), capital[codes]
+    )
+    max_drawdown = np.zeros(n)
+    max_drawdown_abs = np.zeros(n)
+    np.maximum.at(max_drawdown, codes, (peak - equity) / peak)
+    np.maximum.at(max_drawdown_abs, codes, peak - equity)
+
+    # Daily returns on capital, days without closed trades included
+    days = np.maximum(np.ceil((end - starts) / DAY), 1).astype(np.int64)
+    width = int(days.max()) if n else 0
+    day = ((trades.close_ts - starts[codes]) // DAY).astype(np.int64)
+    day = np.clip(day, 0, days[codes] - 1)
+    flat = np.bincount(codes * width + day, weights=profit, minlength=n * width)
+    daily = flat.reshape(n, width) / capital[:, None]
+    valid = np.arange(width) < days[:, None]
+    mean = np.where(valid, daily, 0).sum(axis=1) / days
+    squared = np.where(valid, (daily - mean[:, None]) ** 2, 0)
+    std = np.sqrt(squared.sum(axis=1) / np.maximum(days - 1, 1))
+    downside = np.sqrt(np.where(valid, np.minimum(daily, 0) ** 2, 0).sum(axis=1) / days)
+    annualizer = np.sqrt(365)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 0, mean / std * annualizer, 0.0)
+        sortino = np.where(downside > 0, mean / downside * annualizer, 0.0)
+        annual_return = total / capital * 365 / days
+        calmar = np.where(max_drawdown > 0, annual_return / max_drawdown, 0.0)
+
+    # Equity curves, thinned to at most curve_points per group
+    bounds = np.concatenate(([0], np.cumsum(counts)))
+    results = []
+    for code in range(n):
+        first, last = bounds[code], bounds[code + 1]
+        if last - first > curve_points:
+            picks = np.linspace(first, last - 1, curve_points).astype(np.int64)
+        else:
+            picks = np.arange(first, last)
+        results.append(
+            {
+                "total_trades": int(counts[code]),
+                "profitable_trades": int(wins[code]),
+                "win_rate": (
+                    round(float(wins[code] / counts[code] * 100), 2)
+                    if counts[code]
+                    else 0.0
+                ),
+                "total_profit": round(float(total[code]), 8),
+                "avg_profit": (
+                    round(float(total[code] / counts[code]), 8) if counts[code] else 0.0
+                ),
+                "max_drawdown": round(float(max_drawdown[code]), 6),
+                "max_drawdown_abs": round(float(max_drawdown_abs[code]), 8),
+                "sharpe_ratio": round(float(sharpe[code]), 4),
+                "sortino_ratio": round(float(sortino[code]), 4),
+                "calmar_ratio": round(float(calmar[code]), 4),
+                "equity_curve": [
+                    [float(trades.close_ts[i]), round(float(equity[i]), 8)]
+                    for i in picks
+                ],
+            }
+        )
+    return results
+
+
+def bucket_profit(
+    trades: TradeColumns, n: int, bucket: str
+) -> List[List[Dict[str, Any]]]:
+    """Profit of every group per hour, day, week ("W", from Monday) or month."""
+    seconds = trades.close_ts.astype("datetime64[s]")
+    if bucket == "W":
+        # datetime64 weeks start on Thursday, the weekday of the epoch
+        days = seconds.astype("datetime64[D]")
+        weekday = (days.astype(np.int64) + 3) % 7
+        periods = (days - weekday.astype("timedelta64[D]")).astype(str)
+    else:
+        periods = seconds.astype(f"datetime64[{bucket}]").astype(str)
+    sums = (
+        pd.DataFrame({"code": trades.codes, "period": periods, "profit": trades.profit})
+        .groupby(["code", "period"], sort=True)
+        .profit.sum()
+    )
+    series: List[List[Dict[str, Any]]] = [[] for _ in range(n)]
+    for (code, period), profit in sums.items():
+        series[code].append({"period": period, "profit": round(float(profit), 8)})
+    return series
+
+
+class TradeAnalyticsEngine:
+    """Batched, cached analytics of groups of bots over their closed trades."""
+
+    def __init__(
+        self,
+        cache: Optional[CacheService] = None,
+        cache_ttl: Optional[int] = None,
+        curve_points: Optional[int] = None,
+    ):
+        self.cache = cache or cache_service
+        self.cache_ttl = cache_ttl or settings.ANALYTICS_CACHE_TTL
+        self.curve_points = curve_points or settings.ANALYTICS_EQUITY_CURVE_POINTS
+        self.stats: Dict[str, Any] = {
+            "batches": 0,
+            "trades_loaded": 0,
+            "last_batch_ms": 0.0,
+        }
+
+    async def _load(
+        self, db: AsyncSession, groups: Sequence[TradeGroup], since: Optional[float]
+    ) -> TradeColumns:
+        """Closed trades of all groups with one query; a bot may be in several."""
+        names = {name for group in groups for name in group.bot_names}
+        query = select(
+            BotTrade.bot_name, BotTrade.close_date, BotTrade.profit_abs
+        ).where(
+            BotTrade.bot_name.in_(names),
+            BotTrade.is_open.is_(False),
+            BotTrade.close_date.is_not(None),
+        )
+        if since is not None:
+            query = query.where(
+                BotTrade.close_date >= datetime.fromtimestamp(since, tz=timezone.utc)
+            )
+        rows = (await db.execute(query)).all()
+        self.stats["trades_loaded"] += len(rows)
+
+        frame = pd.DataFrame(rows, columns=["bot_name", "close_date", "profit"])
+        members = pd.DataFrame(
+            [
+                (name, code)
+                for code, group in enumerate(groups)
+                for name in group.bot_names
+            ],
+            columns=["bot_name", "code"],
+        )
+        frame = frame.merge(members, on="bot_name")
+        close_dates = pd.to_datetime(frame["close_date"], utc=True)
+        close_ts = (
+            close_dates.dt.tz_localize(None).to_numpy("datetime64[us]").astype(np.int64)
+            / 1e6
+        )
+        return TradeColumns(
+            frame["code"].to_numpy(np.int64),
+            close_ts,
+            frame["profit"].fillna(0.0).to_numpy(np.float64),
+        )
+
+    async def _cached(
+        self,
+        kind: str,
+        groups: Sequence[TradeGroup],
+        variants: Sequence[str],
+        compute,
+    ) -> Dict[Tuple[str, str], Any]:
+        """
+        Results by (group key, variant), computing the missing ones together.
+        """
+
+        def cache_key(group: TradeGroup, variant: str) -> str:
+            return f"{kind}:{group.key}:{group.fingerprint}:{variant}"
+
+        keys = {
+            cache_key(group, variant): (group.key, variant)
+            for group in groups
+            for variant in variants
+        }
+        found = await self.cache.get_many(keys)
+        results = {keys[key]: value for key, value in found.items()}
+        missing_groups = [
+            group
+            for group in groups
+            if any((group.key, variant) not in results for variant in variants)
+        ]
+        if not missing_groups:
+            return results
+
+        # Read before the trades, so results of trades ingested meanwhile
+        # are not cached over the invalidation
+        versions = await self.cache.tag_versions(
+            {trades_tag(name) for group in missing_groups for name in group.bot_names}
+        )
+        started = time.perf_counter()
+        computed = await compute(missing_groups)
+        self.stats["batches"] += 1
+        self.stats["last_batch_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        results.update(computed)
+        await asyncio.gather(
+            *(
+                self.cache.set_many(
+                    {
+                        cache_key(group, variant): computed[(group.key, variant)]
+                        for variant in variants
+                    },
+                    ttl=self.cache_ttl,
+                    tags=[trades_tag(name) for name in group.bot_names],
+                    versions={
+                        trades_tag(name): versions[trades_tag(name)]
+                        for name in group.bot_names
+                    },
+                )
+                for group in missing_groups
+            )
+        )
+        return results
+
+    async def analyze(
+        self,
+        db: AsyncSession,
+        groups: Sequence[TradeGroup],
+        windows: Sequence[str],
+        now: Optional[float] = None,
+    ) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """
+        Metrics of every group over every window, by (group key, window).
+        """
+        now = now if now is not None else time.time()
+
+        async def compute(missing: Sequence[TradeGroup]):
+            lookbacks = [WINDOWS[window] for window in windows]
+            since = None if None in lookbacks else now - max(lookbacks)
+            trades = await self._load(db, missing, since)
+            capital = np.array([group.capital for group in missing])
+            computed = {}
+            for window, lookback in zip(windows, lookbacks):
+                if lookback is None:
+                    selected = trades
+                    # The whole history starts at each group's first trade
+                    starts = np.full(len(missing), now)
+                    np.minimum.at(starts, trades.codes, trades.close_ts)
+                else:
+                    selected = trades.since(now - lookback)
+                    starts = np.full(len(missing), now - lookback)
+                metrics = await asyncio.to_thread(
+                    compute_metrics, selected, capital, starts, now, self.curve_points
+                )
+                for group, group_metrics in zip(missing, metrics):
+                    computed[(group.key, window)] = group_metrics
+            return computed
+
+        return await self._cached("trade_analytics", groups, windows, compute)
+
+    async def profit_series(
+        self,
+        db: AsyncSession,
+        groups: Sequence[TradeGroup],
+        period: str,
+        now: Optional[float] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Profit per period bucket of every group, by group key."""
+        now = now if now is not None else time.time()
+        bucket, lookback = PROFIT_PERIODS[period]
+
+        async def compute(missing: Sequence[TradeGroup]):
+            trades = await self._load(db, missing, now - lookback)
+            series = await asyncio.to_thread(
+                bucket_profit, trades, len(missing), bucket
+            )
+            return {
+                (group.key, period): {
+                    "period_profit": round(
+                        sum(point["profit"] for point in group_series), 8
+                    ),
+                    "series": group_series,
+                }
+                for group, group_series in zip(missing, series)
+            }
+
+        results = await self._cached("profit_series", groups, [period], compute)
+        return {group_key: value for (group_key, _), value in results.items()}
+
+    async def invalidate(self, *bot_names: str):
+        """Drop cached analytics computed from the trades of these bots."""
+        await self.cache.invalidate_tags(*(trades_tag(name) for name in bot_names))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
+
+
+# Global instance
+trade_analytics = TradeAnalyticsEngine()
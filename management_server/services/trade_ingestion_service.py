@@ -0,0 +1,324 @@
+"""
+Bulk trade ingestion from the bots' freqtrade databases.
+
+Every bot writes its trades to `bots_data/<bot>/tradesv3.sqlite`. Instead of
+asking each bot's REST API, this worker tails those files read-only. The
+checkpoint of a bot is the last trade and order IDs it has seen, plus the
+trades still open at that point. Each pass reads only:
+- new trades;
+- trades with new orders;
+- trades that were open and have closed, as exits fill without new rows.
+Changed trades are upserted into `bot_trades` in one statement per bot and
+announced as batched TRADES_INGESTED events; the bot's cached trade
+analytics are invalidated.
+"""
+
+import asyncio
+import logging
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from management_server.core.config import settings
+from management_server.models.models import BotTrade, TradeIngestionCheckpoint
+from management_server.services.trade_analytics import trade_analytics
+from management_server.tools.redis_streams_event_bus import (
+    RedisStreamsEventBus,
+    mcp_streams_event_bus,
+)
+
+logger = logging.getLogger(__name__)
+
+TRADE_DB_NAME = "tradesv3.sqlite"
+UPSERT_CHUNK_SIZE = 500
+
+
+def _parse_date(value: Any) -> Optional[datetime]:
+    """Freqtrade stores naive UTC datetimes as text in SQLite."""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(str(value))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _parse_timeframe(value: Any) -> Optional[int]:
+    """Freqtrade stores the timeframe as an integer number of minutes."""
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_trade(bot_name: str, row: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a row of freqtrade's `trades` table to a `bot_trades` row."""
+    return {
+        "bot_name": bot_name,
+        "ft_trade_id": row["id"],
+        "exchange": row.get("exchange"),
+        "pair": row["pair"],
+        "is_open": bool(row.get("is_open")),
+        "is_short": bool(row.get("is_short")),
+        "open_date": _parse_date(row.get("open_date")),
+        "close_date": _parse_date(row.get("close_date")),
+        "open_rate": row.get("open_rate"),
+        "close_rate": row.get("close_rate"),
+        "amount": row.get("amount"),
+        "stake_amount": row.get("stake_amount"),
+        "profit_ratio": row.get("close_profit"),
+        "profit_abs": row.get("close_profit_abs"),
+        "exit_reason": row.get("exit_reason"),
+        "enter_tag": row.get("enter_tag"),
+        "strategy": row.get("strategy"),
+        "timeframe": _parse_timeframe(row.get("timeframe")),
+    }
+
+
+def read_changed_trades(
+    db_path: Path, last_trade_id: int, last_order_id: int, open_trade_ids: List[int]
+) -> Dict[str, Any]:
+    """
+    Read the trades changed since a checkpoint from a freqtrade database.
+
+    Opens the file read-only, so the bot is never blocked by the reader when
+    its database runs in WAL mode.
+
+    Returns:
+        Dict with 'trades' (rows as dicts) and the new 'last_trade_id' and
+        'last_order_id'
+    """
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=5)
+    conn.row_factory = sqlite3.Row
+    try:
+        tables = {
+            row["name"]
+            for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        }
+        if "trades" not in tables:
+            return {
+                "trades": [],
+                "last_trade_id": last_trade_id,
+                "last_order_id": last_order_id,
+            }
+
+        order_filter = ""
+        params: List[Any] = [last_trade_id]
+        new_last_order_id = last_order_id
+        if "orders" in tables:
+            order_filter = " OR id IN (SELECT ft_trade_id FROM orders WHERE id > ?)"
+            params.append(last_order_id)
+            new_last_order_id = conn.execute(
+                "SELECT COALESCE(MAX(id), ?) FROM orders", (last_order_id,)
+            ).fetchone()[0]
+
+        open_filter = ""
+        if open_trade_ids:
+            # Exits fill by updating existing rows, so known open trades are
+            # checked for having closed
+            placeholders = ",".join("?" * len(open_trade_ids))
+            open_filter = f" OR (is_open = 0 AND id IN ({placeholders}))"
+            params.extend(open_trade_ids)
+
+        rows = conn.execute(
+            f"SELECT * FROM trades WHERE id > ?{order_filter}{open_filter} ORDER BY id",
+            params,
+        ).fetchall()
+        trades = [dict(row) for row in rows]
+        new_last_trade_id = max([last_trade_id] + [trade["id"] for trade in trades])
+        return {
+            "trades": trades,
+            "last_trade_id": new_last_trade_id,
+            "last_order_id": new_last_order_id,
+        }
+    finally:
+        conn.close()
+
+
+def enable_wal(db_path: Path) -> bool:
+    """
+    Switch a bot database to WAL journaling, so readers and the bot's writer
+    do not block each other. The mode is persistent, this is done once.
+    """
+    try:
+        conn = sqlite3.connect(str(db_path), timeout=1)
+        try:
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+            if mode.lower() != "wal":
+                mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+            return mode.lower() == "wal"
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.debug(f"Could not enable WAL for {db_path}: {e}")
+        return False
+
+
+class TradeIngestionService:
+    """Tails the bots' freqtrade databases into the management database."""
+
+    def __init__(
+        self,
+        db_session_factory: Callable[[], AsyncSession],
+        bots_dir: Optional[str] = None,
+        event_bus: Optional[RedisStreamsEventBus] = None,
+        interval: Optional[float] = None,
+    ):
+        self._get_db = db_session_factory
+        self.bots_dir = Path(bots_dir or settings.TRADE_INGESTION_BOTS_DIR)
+        self.event_bus = event_bus or mcp_streams_event_bus
+        self.interval = interval or settings.TRADE_INGESTION_INTERVAL
+        self._wal_checked: set = set()
+        self._task: Optional[asyncio.Task] = None
+        self.stats: Dict[str, int] = {"passes": 0, "trades": 0, "errors": 0}
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.ingest_all()
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Trade ingestion pass failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def ingest_all(self) -> int:
+        """Ingest every bot database under the bots directory."""
+        if not self.bots_dir.is_dir():
+            return 0
+        total = 0
+        for db_path in sorted(self.bots_dir.glob(f"*/{TRADE_DB_NAME}")):
+            try:
+                total += await self.ingest_bot(db_path.parent.name)
+            except (sqlite3.Error, ValueError) as e:
+                self.stats["errors"] += 1
+                logger.warning(f"Trade ingestion of {db_path} failed: {e}")
+        self.stats["passes"] += 1
+        return total
+
+    async def ingest_bot(self, bot_name: str) -> int:
+        """
+        Ingest the trades a bot changed since its checkpoint.
+
+        Returns:
+            Number of trades inserted or updated
+        """
+        db_path = self.bots_dir / bot_name / TRADE_DB_NAME
+        if not db_path.exists():
+            return 0
+        if bot_name not in self._wal_checked and settings.TRADE_INGESTION_ENABLE_WAL:
+            await asyncio.to_thread(enable_wal, db_path)
+            self._wal_checked.add(bot_name)
+
+        db = self._get_db()
+        try:
+            checkpoint = await db.get(TradeIngestionCheckpoint, bot_name)
+            if checkpoint is None:
+                checkpoint = TradeIngestionCheckpoint(
+                    bot_name=bot_name,
+                    last_trade_id=0,
+                    last_order_id=0,
+                    open_trade_ids=[],
+                )
+                db.add(checkpoint)
+
+            changes = await asyncio.to_thread(
+                read_changed_trades,
+                db_path,
+                checkpoint.last_trade_id,
+                checkpoint.last_order_id,
+                list(checkpoint.open_trade_ids or []),
+            )
+            trades = [normalize_trade(bot_name, row) for row in changes["trades"]]
+
+            if trades:
+                await self._upsert_trades(db, trades)
+            still_open = set(checkpoint.open_trade_ids or [])
+            for trade in trades:
+                if trade["is_open"]:
+                    still_open.add(trade["ft_trade_id"])
+                else:
+                    still_open.discard(trade["ft_trade_id"])
+            checkpoint.last_trade_id = changes["last_trade_id"]
+            checkpoint.last_order_id = changes["last_order_id"]
+            checkpoint.open_trade_ids = sorted(still_open)
+            await db.commit()
+        finally:
+            await db.close()
+
+        if trades:
+            self.stats["trades"] += len(trades)
+            await self._publish(bot_name, trades)
+            await trade_analytics.invalidate(bot_name)
+        return len(trades)
+
+    async def _upsert_trades(self, db: AsyncSession, trades: List[Dict[str, Any]]):
+        """Insert or update trades in bulk statements, keyed by bot and trade ID."""
+        if db.bind.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        # Bounded statements keep the first pass of a large database under
+        # the bind parameter limit
+        for start in range(0, len(trades), UPSERT_CHUNK_SIZE):
+            statement = insert(BotTrade).values(
+                trades[start : start + UPSERT_CHUNK_SIZE]
+            )
+            updated = {
+                column: statement.excluded[column]
+                for column in trades[0]
+                if column not in ("bot_name", "ft_trade_id")
+            }
+            await db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["bot_name", "ft_trade_id"], set_=updated
+                )
+            )
+
+    async def _publish(self, bot_name: str, trades: List[Dict[str, Any]]):
+        """Announce ingested trades as TRADES_INGESTED events of bounded size."""
+        batch_size = settings.TRADE_INGESTION_EVENT_BATCH
+        events = []
+        for start in range(0, len(trades), batch_size):
+            batch = trades[start : start + batch_size]
+            events.append(
+                (
+                    {
+                        "bot_name": bot_name,
+                        "trades": [
+                            {
+                                key: (
+                                    value.isoformat()
+                                    if isinstance(value, datetime)
+                                    else value
+                                )
+                                for key, value in trade.items()
+                            }
+                            for trade in batch
+                        ],
+                    },
+                    "TRADES_INGESTED",
+                )
+            )
+        await self.event_bus.publish_batch("bot_events", events)
@@ -3,8 +3,9 @@ Asynchronous HTTP client for interacting with the Trading Gateway service.
 """
 
 import asyncio
+import hashlib
 import logging
-from typing import Any, AsyncGenerator, Dict, Optional
+from typing import IO, Any, AsyncGenerator, Dict, Optional, Tuple
 
 import aiohttp
 from fastapi import Depends
@@ -14,6 +15,13 @@ from ..core.config import settings
 logger = logging.getLogger(__name__)
 
 
+def _read_chunk(f: IO[bytes], offset: int, size: int) -> Tuple[bytes, str]:
+    """Chunk of an open model file at an offset, and its SHA-256."""
+    f.seek(offset)
+    chunk = f.read(size)
+    return chunk, hashlib.sha256(chunk).hexdigest()
+
+
 class TradingGatewayClient:
     """
     HTTP client for the Trading Gateway API.
@@ -81,6 +89,64 @@ class TradingGatewayClient:
             "GET", f"/api/v1/bots/{bot_name}/pair_history", params=params
         )
 
+    async def upload_freqai_model(
+        self, file_path: str, content_hash: str, size: int
+    ) -> Dict[str, Any]:
+        """
+        Stream a FreqAI model into the gateway model store.
+
+        Skips the transfer when the gateway already has the model, resumes a
+        partial upload from the offset the gateway reports and verifies every
+        chunk and the whole model by SHA-256.
+        """
+        endpoint = f"/api/v1/models/{content_hash}"
+        state = await self._make_request("GET", endpoint)
+        if "error" in state:
+            return state
+        if state.get("present"):
+            logger.info(f"FreqAI model {content_hash} already on the gateway")
+            return state
+
+        url = f"{self.base_url.rstrip('/')}{endpoint}/chunks"
+        offset = state.get("received", 0)
+        retries = settings.FREQAI_MODEL_UPLOAD_RETRIES
+        # Models can be hundreds of MB; file reads and hashing run in a thread
+        f = await asyncio.to_thread(open, file_path, "rb")
+        try:
+            while offset < size:
+                chunk, chunk_hash = await asyncio.to_thread(
+                    _read_chunk, f, offset, settings.FREQAI_MODEL_CHUNK_SIZE
+                )
+                if not chunk:
+                    return {"error": "Model file changed during upload"}
+                try:
+                    async with self._session.put(
+                        url,
+                        params={"offset": offset},
+                        data=chunk,
+                        headers={"X-Chunk-SHA256": chunk_hash},
+                    ) as response:
+                        body = await response.json()
+                        if response.status == 409:
+                            # Gateway has a different amount, continue from there
+                            offset = body["received"]
+                            continue
+                        response.raise_for_status()
+                        offset = body["received"]
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    retries -= 1
+                    logger.warning(f"FreqAI model chunk upload failed: {e}")
+                    if retries < 0:
+                        return {"error": "Model upload failed", "detail": str(e)}
+                    state = await self._make_request("GET", endpoint)
+                    offset = state.get("received", offset)
+        finally:
+            f.close()
+
+        return await self._make_request(
+            "POST", f"{endpoint}/commit", params={"size": size}
+        )
+
 
 # --- FastAPI Dependency ---
 
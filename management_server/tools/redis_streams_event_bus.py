@@ -26,6 +26,8 @@ class EventMessage(BaseModel):
     timestamp: float = Field(default_factory=time.time)
     version: int = 1
     priority: str = "normal"  # critical, high, normal, low
+    # Stream entry ID of a received event; set by the bus, never published
+    message_id: Optional[str] = Field(default=None, exclude=True)
 
     def to_redis_dict(self) -> Dict[str, str]:
         """Serializes the event message for storage in Redis."""
@@ -47,6 +49,8 @@ class RedisStreamsEventBus:
         self.redis: Optional[redis.Redis] = None
         self._handlers: Dict[str, Callable] = {}
         self._listener_tasks: Dict[str, asyncio.Task] = {}
+        # stream name -> start id its consumer group was created with
+        self._group_start_ids: Dict[str, str] = {}
 
     async def connect(self):
         """Connect to Redis and ping the server to ensure connectivity."""
@@ -297,7 +301,7 @@ class RedisStreamsEventBus:
             # Process messages
             for message_id, message_data in messages:
                 try:
-                    event = EventMessage(**message_data)
+                    event = EventMessage(**message_data, message_id=message_id)
 
                     # Call handler
                     if stream_name in self._handlers:
@@ -332,10 +336,14 @@ class RedisStreamsEventBus:
         except Exception as e:
             logger.error(f"❌ Error processing batch for {stream_name}: {e}")
 
-    async def ensure_consumer_group(self, stream_name: str, consumer_group: str):
+    async def ensure_consumer_group(
+        self, stream_name: str, consumer_group: str, start_id: str = "0"
+    ):
         """
         Ensure consumer group exists for the stream.
         Creates it if it doesn't exist, validates if it does.
+        A new group reads from start_id: "0" for the whole stream, "$" for new
+        messages only.
         """
         if not self.redis:
             logger.error("Cannot ensure consumer group, Redis is not connected.")
@@ -344,7 +352,7 @@ class RedisStreamsEventBus:
         try:
             # Try to create the consumer group
             await self.redis.xgroup_create(
-                stream_name, consumer_group, id="0", mkstream=True
+                stream_name, consumer_group, id=start_id, mkstream=True
             )
             logger.info(
                 f"📡 Created consumer group '{consumer_group}' for stream '{stream_name}'"
@@ -399,6 +407,68 @@ class RedisStreamsEventBus:
             )
             return None
 
+    async def destroy_consumer_group(self, stream_name: str, consumer_group: str):
+        """Delete a consumer group together with its pending entries."""
+        if not self.redis:
+            return False
+
+        try:
+            await self.redis.xgroup_destroy(stream_name, consumer_group)
+            logger.info(
+                f"🗑️ Destroyed consumer group '{consumer_group}' for stream '{stream_name}'"
+            )
+            return True
+        except redis.RedisError as e:
+            logger.error(f"❌ Error destroying consumer group '{consumer_group}': {e}")
+            return False
+
+    async def _oldest_unread_age_ms(
+        self, stream_name: str, group: Dict
+    ) -> Optional[float]:
+        """
+        Age of the oldest entry a group has not read, None if it read them all.
+        A group without consumers may belong to a process that has created it
+        and not read yet; it is only stale if it left events unread for long.
+        """
+        entries = await self.redis.xrange(
+            stream_name, min=f"({group['last-delivered-id']}", count=1
+        )
+        if not entries:
+            return None
+        entry_ms = int(entries[0][0].split("-")[0])
+        return time.time() * 1000 - entry_ms
+
+    async def prune_idle_consumer_groups(
+        self, stream_name: str, prefix: str, keep: str, ttl: float
+    ) -> List[str]:
+        """
+        Remove the per-process consumer groups named `prefix*` whose
+        processes stopped reading more than `ttl` seconds ago, e.g. after a
+        crash that skipped their unsubscribe.
+        """
+        if not self.redis:
+            return []
+
+        try:
+            groups = await self.redis.xinfo_groups(stream_name)
+        except Exception:
+            return []  # stream does not exist yet
+
+        ttl_ms = ttl * 1000
+        pruned = []
+        for group in groups:
+            name = group["name"]
+            if not name.startswith(prefix) or name == keep:
+                continue
+            consumers = await self.redis.xinfo_consumers(stream_name, name)
+            idle_ms = min((consumer["idle"] for consumer in consumers), default=None)
+            if idle_ms is None:
+                idle_ms = await self._oldest_unread_age_ms(stream_name, group)
+            if idle_ms is not None and idle_ms > ttl_ms:
+                if await self.destroy_consumer_group(stream_name, name):
+                    pruned.append(name)
+        return pruned
+
     async def get_consumer_lag(
         self, stream_name: str, consumer_group: str
     ) -> Optional[int]:
@@ -411,19 +481,27 @@ class RedisStreamsEventBus:
         return None
 
     async def subscribe(
-        self, stream_name: str, callback: Callable, consumer_group: Optional[str] = None
+        self,
+        stream_name: str,
+        callback: Callable,
+        consumer_group: Optional[str] = None,
+        start_id: str = "0",
     ):
-        """Subscribe to a stream and start a background listener task."""
+        """
+        Subscribe to a stream and start a background listener task.
+        start_id is where a newly created consumer group starts reading.
+        """
         if not self.redis:
             logger.error("Cannot subscribe, Redis is not connected.")
             return
 
         self._handlers[stream_name] = callback
+        self._group_start_ids[stream_name] = start_id
         if consumer_group is None:
             consumer_group = self.service_name
 
         # Ensure consumer group exists
-        if not await self.ensure_consumer_group(stream_name, consumer_group):
+        if not await self.ensure_consumer_group(stream_name, consumer_group, start_id):
             logger.error(
                 f"❌ Failed to ensure consumer group '{consumer_group}' for {stream_name}"
             )
@@ -447,6 +525,21 @@ class RedisStreamsEventBus:
             f"🎧 Listening to stream '{stream_name}' with consumer group '{consumer_group}'"
         )
 
+    async def unsubscribe(self, stream_name: str):
+        """
+        Stop listening to a stream; its consumer group and pending entries
+        are kept for the next subscriber.
+        """
+        tasks = [
+            self._listener_tasks.pop(key)
+            for key in (stream_name, f"{stream_name}:retry_processor")
+            if key in self._listener_tasks
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._handlers.pop(stream_name, None)
+
     async def _process_retry_queue_loop(self, stream_name: str):
         """Background loop to process retry queue."""
         while self.redis:
@@ -490,7 +583,9 @@ class RedisStreamsEventBus:
                             deserialized_data = {
                                 k: json.loads(v) for k, v in data.items()
                             }
-                            event = EventMessage(**deserialized_data)
+                            event = EventMessage(
+                                **deserialized_data, message_id=message_id
+                            )
                             logger.info(f"🔥 Processing pending event: {event.type}")
 
                             await self._handlers[stream_name](event)
@@ -553,6 +648,21 @@ class RedisStreamsEventBus:
                         )
 
             except redis.RedisError as e:
+                if "NOGROUP" in str(e):
+                    if stream_name not in self._listener_tasks:
+                        break  # unsubscribed, the group is being removed
+                    # The group was destroyed under the listener; recreate it
+                    # rather than failing every read until reconnection
+                    logger.warning(
+                        f"Consumer group '{group_name}' of {stream_name} is gone, recreating"
+                    )
+                    if await self.ensure_consumer_group(
+                        stream_name,
+                        group_name,
+                        self._group_start_ids.get(stream_name, "0"),
+                    ):
+                        continue
+
                 consecutive_errors += 1
                 logger.error(
                     f"Redis error while listening to {stream_name} (error {consecutive_errors}/{max_consecutive_errors}): {e}"
@@ -593,7 +703,7 @@ class RedisStreamsEventBus:
         try:
             # Deserialize data from JSON strings
             deserialized_data = {k: json.loads(v) for k, v in data.items()}
-            event = EventMessage(**deserialized_data)
+            event = EventMessage(**deserialized_data, message_id=message_id)
 
             # Pass the event object to the handler
             await self._handlers[stream_name](event)
@@ -0,0 +1,166 @@
+"""
+Cached JWT authentication for the Freqtrade REST API.
+
+Freqtrade issues short-lived access tokens from /api/v1/token/login (HTTP Basic)
+and renews them from /api/v1/token/refresh (Bearer refresh token). Tokens are
+cached per (bot URL, username) and refreshed shortly before they expire, so
+regular requests never pay for a login round trip.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import aiohttp
+import jwt
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FreqtradeToken:
+    """Access/refresh token pair issued by a Freqtrade bot."""
+
+    access_token: str
+    refresh_token: Optional[str]
+    expires_at: float  # epoch seconds
+
+    def expires_within(self, seconds: float) -> bool:
+        return self.expires_at - time.time() <= seconds
+
+
+def _token_expiry(token: str, default_ttl: float) -> float:
+    """Read the `exp` claim without verifying the signature (it is the bot's key)."""
+    try:
+        payload = jwt.decode(token, options={"verify_signature": False})
+        return float(payload["exp"])
+    except (jwt.PyJWTError, KeyError, TypeError, ValueError):
+        return time.time() + default_ttl
+
+
+class FreqtradeTokenCache:
+    """
+    Process-wide cache of Freqtrade access tokens.
+
+    Connection errors while logging in are raised to the caller so that they are
+    handled like any other request failure. Rejected logins are remembered for
+    ``failure_backoff`` seconds, during which callers fall back to HTTP Basic auth.
+    """
+
+    def __init__(
+        self,
+        refresh_margin: float = 60.0,
+        default_ttl: float = 900.0,
+        failure_backoff: float = 30.0,
+    ):
+        self.refresh_margin = refresh_margin
+        self.default_ttl = default_ttl
+        self.failure_backoff = failure_backoff
+        self._tokens: Dict[Tuple[str, str], FreqtradeToken] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self._failed_until: Dict[Tuple[str, str], float] = {}
+
+    async def get_access_token(
+        self,
+        session: aiohttp.ClientSession,
+        base_url: str,
+        username: str,
+        password: str,
+    ) -> Optional[str]:
+        """Return a valid access token, refreshing or logging in when needed."""
+        base_url = base_url.rstrip("/")
+        key = (base_url, username)
+
+        token = self._tokens.get(key)
+        if token and not token.expires_within(self.refresh_margin):
+            return token.access_token
+        if self._failed_until.get(key, 0) > time.time():
+            return None
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another request may have renewed the token while we waited
+            token = self._tokens.get(key)
+            if token and not token.expires_within(self.refresh_margin):
+                return token.access_token
+
+            new_token = None
+            if token and token.refresh_token:
+                new_token = await self._refresh(session, base_url, token)
+            if new_token is None:
+                new_token = await self._login(session, base_url, username, password)
+
+            if new_token is None:
+                self._tokens.pop(key, None)
+                self._failed_until[key] = time.time() + self.failure_backoff
+                return None
+
+            self._tokens[key] = new_token
+            self._failed_until.pop(key, None)
+            return new_token.access_token
+
+    def invalidate(self, base_url: str, username: str):
+        """Drop a cached token, e.g. after the bot answered 401."""
+        self._tokens.pop((base_url.rstrip("/"), username), None)
+
+    def has_token(self, base_url: str, username: str) -> bool:
+        token = self._tokens.get((base_url.rstrip("/"), username))
+        return token is not None and not token.expires_within(0)
+
+    def get_expiry(self, base_url: str, username: str) -> Optional[float]:
+        token = self._tokens.get((base_url.rstrip("/"), username))
+        return token.expires_at if token else None
+
+    async def _login(
+        self,
+        session: aiohttp.ClientSession,
+        base_url: str,
+        username: str,
+        password: str,
+    ) -> Optional[FreqtradeToken]:
+        async with session.post(
+            f"{base_url}/api/v1/token/login",
+            auth=aiohttp.BasicAuth(username, password),
+        ) as response:
+            if response.status >= 400:
+                logger.warning(
+                    f"Freqtrade login rejected at {base_url}: {response.status}"
+                )
+                return None
+            data = await response.json()
+
+        access_token = data.get("access_token")
+        if not access_token:
+            return None
+        logger.info(f"Successfully logged into Freqtrade API at {base_url}")
+        return FreqtradeToken(
+            access_token=access_token,
+            refresh_token=data.get("refresh_token"),
+            expires_at=_token_expiry(access_token, self.default_ttl),
+        )
+
+    async def _refresh(
+        self, session: aiohttp.ClientSession, base_url: str, token: FreqtradeToken
+    ) -> Optional[FreqtradeToken]:
+        async with session.post(
+            f"{base_url}/api/v1/token/refresh",
+            headers={"Authorization": f"Bearer {token.refresh_token}"},
+        ) as response:
+            if response.status >= 400:
+                return None
+            data = await response.json()
+
+        access_token = data.get("access_token")
+        if not access_token:
+            return None
+        return FreqtradeToken(
+            access_token=access_token,
+            refresh_token=token.refresh_token,
+            expires_at=_token_expiry(access_token, self.default_ttl),
+        )
+
+
+# Global instance
+freqtrade_token_cache = FreqtradeTokenCache()
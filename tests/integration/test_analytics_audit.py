@@ -213,6 +213,29 @@ class TestAuditAPI:
         logs2 = response2.json()
         assert len(logs2) == 2
 
+    @pytest.mark.asyncio
+    async def test_get_audit_logs_cursor_pagination(self, authenticated_client):
+        """Test that audit log pages continue from the X-Next-Cursor header."""
+        client = authenticated_client
+
+        for i in range(5):
+            await client.get("/api/v1/bots/")
+
+        response = await client.get("/api/v1/audit/logs?limit=3")
+        assert response.status_code == 200
+        first_page = response.json()
+        cursor = response.headers["X-Next-Cursor"]
+
+        response2 = await client.get(f"/api/v1/audit/logs?limit=3&cursor={cursor}")
+        assert response2.status_code == 200
+        second_page = response2.json()
+
+        assert len(second_page) == 3
+        assert second_page[0]["id"] < first_page[-1]["id"]
+
+        response3 = await client.get(f"/api/v1/audit/logs?skip=3&cursor={cursor}")
+        assert response3.status_code == 400
+
     @pytest.mark.asyncio
     async def test_audit_log_structure(self, authenticated_client):
         """Test that audit logs have correct structure."""
@@ -124,9 +124,11 @@ async def test_start_bot_command_cycle(
                 event_data={"bot_name": test_bot.name, "pid": 1234, "port": 8081},
             )
         )
+        # State updates are coalesced; write them without waiting for the window
+        await bot_event_handler.flush()
 
     # 4. Verify bot status is updated in the database
-    # No need to sleep, the call was synchronous
+    # No need to sleep, the update was flushed above
     final_bot_resp = await app_client.get(
         f"/api/v1/bots/{test_bot.id}", headers=auth_headers
     )
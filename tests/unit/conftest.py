@@ -0,0 +1,88 @@
+"""
+Shared fixtures of the unit tests.
+"""
+
+import pytest
+
+
+class FakePipeline:
+    """Queues commands of FakeRedis and runs them on execute()."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        results = []
+        for name, args, kwargs in self.commands:
+            results.append(await getattr(self.redis, name)(*args, **kwargs))
+        self.redis.round_trips -= len(self.commands)
+        self.commands = []
+        return results
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeRedis:
+    """In-memory subset of the Redis commands used by CacheService."""
+
+    def __init__(self):
+        self.data = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        self.round_trips += 1
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.data.get(key) for key in keys]
+
+    async def setex(self, key, ttl, value):
+        self.round_trips += 1
+        self.data[key] = value
+
+    async def sadd(self, key, *members):
+        self.round_trips += 1
+        self.data.setdefault(key, set()).update(
+            m.encode() if isinstance(m, str) else m for m in members
+        )
+
+    async def smembers(self, key):
+        self.round_trips += 1
+        return set(self.data.get(key, set()))
+
+    async def incrby(self, key, amount):
+        self.round_trips += 1
+        self.data[key] = int(self.data.get(key, 0)) + amount
+        return self.data[key]
+
+    async def expire(self, key, ttl):
+        self.round_trips += 1
+        return key in self.data
+
+    async def delete(self, *keys):
+        self.round_trips += 1
+        keys = [k.decode() if isinstance(k, bytes) else k for k in keys]
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+
+@pytest.fixture
+def fake_redis():
+    """In-memory Redis for a CacheService."""
+    return FakeRedis()
@@ -2,11 +2,19 @@
 Unit tests for Analytics Service.
 """
 
+from datetime import datetime, timedelta, timezone
+
 import pytest
+import pytest_asyncio
 from unittest.mock import AsyncMock, patch
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
+from management_server.models.base import Base
+from management_server.models.models import Bot, BotTrade, User
+from management_server.services import analytics_service as analytics_service_module
 from management_server.services.analytics_service import AnalyticsService
+from management_server.services.cache_service import CacheService
+from management_server.services.trade_analytics import TradeAnalyticsEngine
 
 
 class TestAnalyticsService:
@@ -22,57 +30,99 @@ class TestAnalyticsService:
         """Create AnalyticsService instance with mocked session."""
         return AnalyticsService(db_session=mock_db_session)
 
-    @pytest.mark.asyncio
-    async def test_get_performance_analytics_with_data(
-        self, analytics_service, mock_db_session
-    ):
-        """Test performance analytics calculation with data."""
-        # Mock the database query result
-        mock_result = AsyncMock()
-        mock_stats = AsyncMock()
-        mock_stats.total_trades = 100
-        mock_stats.profitable_trades = 65
-        mock_stats.avg_profit = 150.50
-        mock_result.first.return_value = mock_stats
+    @pytest_asyncio.fixture
+    async def trade_db(self, monkeypatch, fake_redis):
+        """In-memory database with one bot of user 123 and its trades."""
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        cache = CacheService(local_ttl=60)
+        cache.redis = fake_redis
+        monkeypatch.setattr(
+            analytics_service_module, "trade_analytics", TradeAnalyticsEngine(cache)
+        )
+        now = datetime.now(timezone.utc)
+        async with async_sessionmaker(bind=engine, expire_on_commit=False)() as db:
+            db.add(User(id=123, username="u", email="u@x.io", hashed_password="x"))
+            db.add(
+                Bot(
+                    id=1,
+                    name="alpha",
+                    strategy_name="Sample",
+                    exchange="binance",
+                    stake_currency="USDT",
+                    stake_amount=100,
+                    max_open_trades=10,
+                    created_by=123,
+                )
+            )
+            for trade_id, (hours_ago, profit) in enumerate(
+                [(60, 50.0), (30, -20.0), (2, 10.0), (1, -5.0)], start=1
+            ):
+                db.add(
+                    BotTrade(
+                        bot_name="alpha",
+                        ft_trade_id=trade_id,
+                        pair="BTC/USDT",
+                        is_open=False,
+                        close_date=now - timedelta(hours=hours_ago),
+                        profit_abs=profit,
+                    )
+                )
+            await db.commit()
+            yield db
+        await engine.dispose()
 
-        mock_db_session.execute.return_value = mock_result
+    @pytest.mark.asyncio
+    async def test_get_performance_analytics_with_data(self, trade_db):
+        """Test performance analytics computed from the trades of a timeframe."""
+        service = AnalyticsService(db_session=trade_db)
 
-        result = await analytics_service.get_performance_analytics(
+        result = await service.get_performance_analytics(
             bot_id=1, timeframe="24h", user_id=123
         )
 
-        assert result["total_trades"] == 150  # Matches hardcoded value in service
-        assert result["profitable_trades"] == 90  # Matches hardcoded value in service
-        assert result["avg_profit"] == 2.5  # Matches hardcoded value in service
-        assert result["win_rate"] == 60.0  # Matches hardcoded value in service
+        assert result["total_trades"] == 2
+        assert result["profitable_trades"] == 1
+        assert result["avg_profit"] == 2.5
+        assert result["win_rate"] == 50.0
+        assert [point[1] for point in result["equity_curve"]] == [1010.0, 1005.0]
 
     @pytest.mark.asyncio
-    async def test_get_performance_analytics_no_data(
-        self, analytics_service, mock_db_session
-    ):
-        """Test performance analytics with no data."""
-        mock_result = AsyncMock()
-        mock_result.first.return_value = None
-        mock_db_session.execute.return_value = mock_result
-
-        result = await analytics_service.get_performance_analytics(
-            bot_id=None, timeframe="24h", user_id=123
+    async def test_get_performance_analytics_no_data(self, trade_db):
+        """Test performance analytics of a bot the user does not own."""
+        service = AnalyticsService(db_session=trade_db)
+
+        assert (
+            await service.get_performance_analytics(
+                bot_id=1, timeframe="24h", user_id=999
+            )
+            is None
         )
-
-        assert result["total_trades"] == 150  # Service returns hardcoded mock data
-        assert result["profitable_trades"] == 0
-        assert result["avg_profit"] == 0.0
+        result = await service.get_performance_analytics(
+            bot_id=None, timeframe="1h", user_id=999
+        )
+        assert result["total_trades"] == 0
         assert result["win_rate"] == 0.0
 
     @pytest.mark.asyncio
-    async def test_get_risk_analytics(self, analytics_service, mock_db_session):
-        """Test risk analytics calculation."""
-        mock_db_session.scalar.return_value = 0.15
-
-        result = await analytics_service.get_risk_analytics(bot_id=1, user_id=123)
-
-        assert result["max_drawdown"] == 0.15
-        mock_db_session.scalar.assert_called_once()
+    async def test_get_risk_analytics(self, trade_db):
+        """Test risk analytics over the whole trade history."""
+        service = AnalyticsService(db_session=trade_db)
+
+        result = await service.get_risk_analytics(bot_id=1, user_id=123)
+
+        # Equity 1000 -> 1050 -> 1030 -> 1040 -> 1035, peak 1050
+        assert result["max_drawdown_abs"] == 20.0
+        assert result["max_drawdown"] == round(20 / 1050, 6)
+        assert result["sharpe_ratio"] > 0
+        assert set(result) == {
+            "max_drawdown",
+            "max_drawdown_abs",
+            "sharpe_ratio",
+            "sortino_ratio",
+            "calmar_ratio",
+        }
 
     @pytest.mark.asyncio
     async def test_get_portfolio_analytics(self, analytics_service, mock_db_session):
@@ -96,15 +146,17 @@ class TestAnalyticsService:
         assert result["portfolio_value"] == 1250.0  # 1000 + 250
 
     @pytest.mark.asyncio
-    async def test_get_profit_analytics(self, analytics_service, mock_db_session):
-        """Test profit analytics calculation."""
-        mock_db_session.scalar.return_value = 500.0
+    async def test_get_profit_analytics(self, trade_db):
+        """Test lifetime profit and the profit of each period bucket."""
+        service = AnalyticsService(db_session=trade_db)
 
-        result = await analytics_service.get_profit_analytics(
+        result = await service.get_profit_analytics(
             bot_id=1, period="monthly", user_id=123
         )
 
-        assert result["total_profit"] == 500.0
+        assert result["total_profit"] == 35.0
+        assert result["period_profit"] == 35.0
+        assert sum(point["profit"] for point in result["series"]) == 35.0
 
     @pytest.mark.asyncio
     async def test_get_market_analytics_success(self, analytics_service):
@@ -3,6 +3,7 @@ Unit tests for Audit Service.
 """
 
 import pytest
+import pytest_asyncio
 from unittest.mock import AsyncMock, patch
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -165,3 +166,235 @@ class TestAuditService:
         result = await audit_service.get_logs(limit=10)
 
         assert result == []
+
+
+class TestAuditLogWriter:
+    """Test cases for the batched background audit writer."""
+
+    @pytest_asyncio.fixture
+    async def session_factory(self):
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        from sqlalchemy.pool import StaticPool
+        from management_server.models.base import Base
+
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        yield async_sessionmaker(bind=engine, expire_on_commit=False)
+        await engine.dispose()
+
+    @staticmethod
+    def record(path: str):
+        from management_server.services.audit_writer import AuditRecord
+
+        return AuditRecord(
+            action=f"GET {path}",
+            status_code=200,
+            http_method="GET",
+            path=path,
+            ip_address="127.0.0.1",
+        )
+
+    @staticmethod
+    async def count_logs(session_factory) -> int:
+        from sqlalchemy import func, select
+
+        async with session_factory() as db:
+            return (await db.execute(select(func.count(AuditLog.id)))).scalar()
+
+    @pytest.mark.asyncio
+    async def test_records_written_in_batches_and_flushed_on_stop(
+        self, session_factory
+    ):
+        """Test that full batches are written at once and the rest on shutdown."""
+        import asyncio
+        from management_server.services.audit_writer import AuditLogWriter
+
+        writer = AuditLogWriter(session_factory, batch_size=3, flush_interval=60)
+        writer.start()
+        for i in range(5):
+            writer.enqueue(self.record(f"/api/v1/bots/{i}"))
+        await asyncio.sleep(0.05)
+
+        assert await self.count_logs(session_factory) == 3
+        assert writer.get_stats()["batches"] == 1
+
+        await writer.stop()
+        assert await self.count_logs(session_factory) == 5
+        assert writer.get_stats()["written"] == 5
+
+    @pytest.mark.asyncio
+    async def test_rejected_batch_is_retried_in_halves(self, session_factory):
+        """Test that one bad record does not cost the rest of its batch."""
+        from management_server.services.audit_writer import AuditLogWriter
+
+        writer = AuditLogWriter(session_factory)
+        records = [self.record(f"/api/v1/bots/{i}") for i in range(5)]
+        records[3].http_method = None  # NOT NULL column
+
+        await writer._flush(records)
+
+        assert await self.count_logs(session_factory) == 4
+        assert (writer.stats["written"], writer.stats["failed"]) == (4, 1)
+
+    @pytest.mark.asyncio
+    async def test_database_outage_holds_the_batch(self, session_factory, monkeypatch):
+        """Test that a lost connection retries the whole batch, unsplit."""
+        import asyncio
+        from sqlalchemy.exc import OperationalError
+        from management_server.services import audit_writer as audit_writer_module
+        from management_server.services.audit_writer import AuditLogWriter
+
+        monkeypatch.setattr(audit_writer_module.settings, "AUDIT_RETRY_INTERVAL", 0.01)
+        outages = {"left": 2, "attempts": 0}
+
+        def flaky_factory():
+            outages["attempts"] += 1
+            if outages["left"]:
+                outages["left"] -= 1
+                raise OperationalError("INSERT", {}, Exception("database is locked"))
+            return session_factory()
+
+        writer = AuditLogWriter(flaky_factory, batch_size=4, flush_interval=60)
+        writer.start()
+        for i in range(4):
+            writer.enqueue(self.record(f"/api/v1/bots/{i}"))
+        await asyncio.sleep(0.1)
+
+        assert await self.count_logs(session_factory) == 4
+        assert outages["attempts"] == 3
+        assert writer.stats["retries"] == 2
+        assert (writer.stats["written"], writer.stats["failed"]) == (4, 0)
+
+        outages["left"] = 100
+        writer.enqueue(self.record("/api/v1/bots/late"))
+        await writer.stop()
+        assert writer.stats["failed"] == 1
+
+    def test_fields_cut_to_column_lengths(self):
+        """Test that long fields fit their columns."""
+        record = self.record("/" + "p" * 300)
+
+        assert len(record.path) == 255
+        assert len(record.action) == 100
+        assert record.ip_address == "127.0.0.1"
+
+    def test_unauthenticated_requests_attributed_from_token(self):
+        """Test the token fallback of requests not recorded by get_current_user."""
+        import jwt
+        from types import SimpleNamespace
+        from management_server.auth.jwt import ALGORITHM, SECRET_KEY
+        from management_server.middleware.audit_middleware import token_username
+
+        def request(authorization=None):
+            headers = {"Authorization": authorization} if authorization else {}
+            return SimpleNamespace(headers=headers)
+
+        token = jwt.encode({"sub": "alice"}, SECRET_KEY, algorithm=ALGORITHM)
+        assert token_username(request(f"Bearer {token}")) == "alice"
+        assert token_username(request("Bearer garbage")) == "invalid_token"
+        assert token_username(request()) is None
+
+    @pytest.mark.asyncio
+    async def test_overflow_policies(self, session_factory):
+        """Test that a full queue drops the newest or the oldest record."""
+        from management_server.services.audit_writer import AuditLogWriter
+
+        for policy, kept in (("drop_newest", "/a"), ("drop_oldest", "/b")):
+            writer = AuditLogWriter(
+                session_factory, max_queue=1, overflow_policy=policy
+            )
+            writer.start()
+            # Fill the queue before the writer task gets to run
+            writer.enqueue(self.record("/a"))
+            writer.enqueue(self.record("/b"))
+
+            assert writer.get_stats()["dropped"] == 1
+            assert writer._queue.get_nowait().path == kept
+            await writer.stop()
+
+
+class TestAuditLogSearch:
+    """Test cases for keyset-paginated audit search and retention."""
+
+    @pytest_asyncio.fixture
+    async def db_session(self):
+        from datetime import datetime, timedelta, timezone
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        from sqlalchemy.pool import StaticPool
+        from management_server.models.base import Base
+
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session = async_sessionmaker(bind=engine, expire_on_commit=False)()
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        # Pairs of logs share a timestamp, so pages must break ties by id
+        session.add_all(
+            AuditLog(
+                action=f"GET /api/v1/bots/{i}",
+                status_code=404 if i % 3 == 0 else 200,
+                http_method="GET",
+                path=f"/api/v1/bots/{i}" if i % 2 else f"/api/v1/users/{i}",
+                ip_address="127.0.0.1",
+                username="alice" if i < 5 else "bob",
+                created_at=start + timedelta(minutes=i // 2),
+            )
+            for i in range(10)
+        )
+        await session.commit()
+        yield session
+        await session.close()
+        await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_keyset_pages_cover_all_logs_newest_first(self, db_session):
+        """Test that following cursors returns every log once, in order."""
+        service = AuditService(db_session)
+        seen, cursor = [], None
+        while True:
+            logs, cursor = await service.search_logs(cursor=cursor, limit=3)
+            seen.extend(logs)
+            if cursor is None:
+                break
+
+        assert len(seen) == 10
+        assert len({log.id for log in seen}) == 10
+        keys = [(log.created_at, log.id) for log in seen]
+        assert keys == sorted(keys, reverse=True)
+
+    @pytest.mark.asyncio
+    async def test_filters(self, db_session):
+        """Test that filters combine with each other and with pagination."""
+        service = AuditService(db_session)
+
+        logs, cursor = await service.search_logs(
+            username="alice", path_prefix="/api/v1/bots/", limit=10
+        )
+        assert sorted(log.path for log in logs) == ["/api/v1/bots/1", "/api/v1/bots/3"]
+        assert cursor is None
+
+        logs, _ = await service.search_logs(status_code=404, limit=10)
+        assert {log.action for log in logs} == {
+            f"GET /api/v1/bots/{i}" for i in (0, 3, 6, 9)
+        }
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor(self, db_session):
+        """Test that a malformed cursor is rejected."""
+        with pytest.raises(ValueError):
+            await AuditService(db_session).search_logs(cursor="not-a-cursor")
+
+    @pytest.mark.asyncio
+    async def test_purge_older_than_in_batches(self, db_session):
+        """Test that logs before the cutoff are deleted across several batches."""
+        from datetime import datetime, timezone
+
+        service = AuditService(db_session)
+        purged = await service.purge_older_than(
+            datetime(2024, 1, 1, 0, 3, tzinfo=timezone.utc), batch_size=4
+        )
+
+        assert purged == 6
+        logs, _ = await service.search_logs(limit=10)
+        assert len(logs) == 4
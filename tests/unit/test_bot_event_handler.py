@@ -0,0 +1,145 @@
+"""
+Unit tests for coalesced bot state updates.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from management_server.models.base import Base
+from management_server.models.models import Bot, User
+from management_server.services.bot_event_handler import (
+    BotEventHandler,
+    BotStateCoalescer,
+)
+
+
+def bot_event(event_type, bot_name, message_id=None, **data):
+    return SimpleNamespace(
+        type=event_type, data={"bot_name": bot_name, **data}, message_id=message_id
+    )
+
+
+class TestBotEventHandler:
+    """Test cases for BotEventHandler with BotStateCoalescer."""
+
+    @pytest_asyncio.fixture
+    async def session_factory(self):
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        async with factory() as db:
+            db.add(User(id=1, username="owner", email="o@x.io", hashed_password="x"))
+            for i in range(3):
+                db.add(
+                    Bot(
+                        name=f"bot-{i}",
+                        strategy_name="Sample",
+                        exchange="binance",
+                        stake_currency="USDT",
+                        stake_amount=10,
+                        created_by=1,
+                    )
+                )
+            await db.commit()
+
+        factory.updates = []
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def count_updates(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("UPDATE bots"):
+                factory.updates.append(statement)
+
+        yield factory
+        await engine.dispose()
+
+    async def states(self, session_factory):
+        async with session_factory() as db:
+            rows = await db.execute(select(Bot.name, Bot.status, Bot.pid, Bot.port))
+            return {name: (status, pid, port) for name, status, pid, port in rows}
+
+    @pytest.mark.asyncio
+    async def test_events_are_written_in_one_update(self, session_factory):
+        """Test that a window of events costs one UPDATE with the latest states."""
+        handler = BotEventHandler(
+            session_factory, BotStateCoalescer(session_factory, window=60)
+        )
+
+        await handler.handle_event(bot_event("BOT_STARTED", "bot-0", pid=10, port=81))
+        await handler.handle_event(bot_event("BOT_STARTED", "bot-1", pid=11, port=82))
+        await handler.handle_event(bot_event("BOT_START_FAILED", "bot-2"))
+        await handler.handle_event(bot_event("BOT_STOPPED", "bot-0"))
+        assert session_factory.updates == []
+
+        assert await handler.flush() == 3
+
+        assert len(session_factory.updates) == 1
+        assert await self.states(session_factory) == {
+            "bot-0": ("stopped", None, None),
+            "bot-1": ("running", 11, 82),
+            "bot-2": ("error", None, None),
+        }
+        assert handler.state_updates.get_stats()["superseded"] == 1
+
+    @pytest.mark.asyncio
+    async def test_older_stream_entries_are_dropped(self, session_factory):
+        """Test that ordering follows stream IDs, not arrival."""
+        handler = BotEventHandler(
+            session_factory, BotStateCoalescer(session_factory, window=60)
+        )
+
+        await handler.handle_event(bot_event("BOT_STOPPED", "bot-0", "1700-1"))
+        await handler.handle_event(
+            bot_event("BOT_STARTED", "bot-0", "1700-0", pid=10, port=81)
+        )
+        await handler.stop()
+
+        assert (await self.states(session_factory))["bot-0"][0] == "stopped"
+        assert handler.state_updates.get_stats()["out_of_order"] == 1
+
+    @pytest.mark.asyncio
+    async def test_window_elapses_and_batches_are_bounded(self, session_factory):
+        """Test the timed flush and the flush of a full batch."""
+        coalescer = BotStateCoalescer(session_factory, window=0.01, max_batch=2)
+
+        await coalescer.submit("bot-0", {"status": "running"})
+        assert session_factory.updates == []
+        await coalescer.submit("bot-1", {"status": "running"})
+        assert len(session_factory.updates) == 1
+
+        await coalescer.submit("bot-2", {"status": "running"})
+        await coalescer._timer
+        assert len(session_factory.updates) == 2
+        states = await self.states(session_factory)
+        assert {status for status, _, _ in states.values()} == {"running"}
+
+    @pytest.mark.asyncio
+    async def test_failed_write_is_queued_again(self, session_factory):
+        """Test that a rejected batch is retried behind newer pending states."""
+        coalescer = BotStateCoalescer(session_factory, window=60)
+        engine = session_factory.kw["bind"].sync_engine
+        failures = [RuntimeError("database unavailable")]
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def fail_once(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("UPDATE bots") and failures:
+                raise failures.pop()
+
+        await coalescer.submit("bot-0", {"status": "running"})
+        await coalescer.submit("bot-1", {"status": "running"})
+        assert await coalescer.flush() == 0
+        assert coalescer.get_stats()["pending"] == 2
+
+        # A state queued after the failed write wins over the requeued one
+        await coalescer.submit("bot-0", {"status": "stopped"})
+        coalescer._requeue({"bot-0": {"status": "running"}})
+        await coalescer.stop()
+
+        states = await self.states(session_factory)
+        assert (states["bot-0"][0], states["bot-1"][0]) == ("stopped", "running")
+        assert coalescer.get_stats()["requeued"] == 3
+        assert coalescer._timer is None
@@ -268,6 +268,41 @@ class TestBotService:
             mock_event_bus.publish.call_count == 2
         )  # One for mcp_commands, one for bot_events
 
+    @pytest.mark.asyncio
+    async def test_start_command_carries_model_hash(self, bot_service, tmp_path):
+        """Test that an uploaded FreqAI model is referenced by hash, not inlined."""
+        import hashlib
+
+        service, _, mock_model_repo, mock_tg_client, _ = bot_service
+        model_file = tmp_path / "model.joblib"
+        model_file.write_bytes(b"model bytes")
+        content_hash = hashlib.sha256(b"model bytes").hexdigest()
+
+        mock_user = AsyncMock()
+        mock_user.id = 1
+        mock_bot = AsyncMock()
+        mock_bot.name = "test_bot"
+        mock_bot.config = {}
+        mock_bot.freqai_model_id = 7
+        mock_model = AsyncMock()
+        mock_model.file_path = str(model_file)
+        mock_model_repo.get_by_id.return_value = mock_model
+        mock_tg_client.upload_freqai_model.return_value = {
+            "status": "success",
+            "present": True,
+        }
+
+        command_data = await service._prepare_start_command(mock_bot, mock_user)
+
+        mock_tg_client.upload_freqai_model.assert_awaited_once_with(
+            str(model_file), content_hash, len(b"model bytes")
+        )
+        assert command_data["freqai_model"] == {
+            "filename": "model.joblib",
+            "sha256": content_hash,
+            "size": len(b"model bytes"),
+        }
+
     @pytest.mark.asyncio
     async def test_start_bot_not_found(self, bot_service):
         """Test bot start when bot doesn't exist."""
@@ -339,3 +374,124 @@ class TestBotService:
         assert "bot_name" in result
         # Should publish both STOP and START commands
         assert mock_event_bus.publish.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_start_all_bots_is_batched(self, bot_service):
+        """Test that start-all prepares shared models once and batches everything."""
+        from types import SimpleNamespace
+
+        service, mock_repo, mock_model_repo, _, mock_event_bus = bot_service
+
+        mock_user = SimpleNamespace(id=1, username="testuser")
+        bots = [
+            SimpleNamespace(id=i, name=f"bot_{i}", config={}, freqai_model_id=7)
+            for i in range(3)
+        ]
+        mock_repo.get_all.return_value = bots
+        mock_model_repo.get_many.return_value = [
+            SimpleNamespace(id=7, name="model", file_path="/missing.joblib")
+        ]
+        service._prepare_model_payload = AsyncMock(
+            return_value={"filename": "model.joblib", "sha256": "abc", "size": 1}
+        )
+
+        result = await service.start_all_bots(mock_user)
+
+        assert result == {"bots": 3}
+        service._prepare_model_payload.assert_awaited_once()
+        mock_model_repo.get_many.assert_awaited_once_with({7}, 1)
+        mock_model_repo.get_by_id.assert_not_called()
+        mock_event_bus.publish.assert_not_called()
+        commands, events = mock_event_bus.publish_batch.await_args_list
+        assert [event_type for _, event_type in commands.args[1]] == ["START_BOT"] * 3
+        assert all(
+            command["freqai_model"]["sha256"] == "abc"
+            for command, _ in commands.args[1]
+        )
+        assert len(events.args[1]) == 3
+        mock_repo.update_statuses.assert_awaited_once_with(
+            [0, 1, 2], BotStatus.STARTING
+        )
+
+    @pytest.mark.asyncio
+    async def test_stop_all_bots_is_batched(self, bot_service):
+        """Test that stop-all publishes one batch of commands and one UPDATE."""
+        from types import SimpleNamespace
+
+        service, mock_repo, _, _, mock_event_bus = bot_service
+
+        mock_user = SimpleNamespace(id=1, username="testuser")
+        mock_repo.get_all.return_value = [
+            SimpleNamespace(id=i, name=f"bot_{i}") for i in range(2)
+        ]
+
+        await service.stop_all_bots(mock_user)
+
+        mock_event_bus.publish_batch.assert_any_await(
+            "mcp_commands",
+            [({"bot_name": "bot_0"}, "STOP_BOT"), ({"bot_name": "bot_1"}, "STOP_BOT")],
+        )
+        mock_repo.update_statuses.assert_awaited_once_with([0, 1], "stopping")
+        mock_repo.get_by_id.assert_not_called()
+
+
+class TestModelUpload:
+    """Test cases for the chunked FreqAI model upload to the gateway."""
+
+    @pytest.mark.asyncio
+    async def test_model_read_off_the_event_loop(self, tmp_path, monkeypatch):
+        """Test that chunks are read and hashed in a thread, not the event loop."""
+        import hashlib
+        import threading
+
+        import aiohttp
+        from aiohttp import web
+        from aiohttp.test_utils import TestServer
+        from management_server.services import trading_gateway_client as client_module
+
+        content = b"model bytes" * 100
+        content_hash = hashlib.sha256(content).hexdigest()
+        model_file = tmp_path / "model.joblib"
+        model_file.write_bytes(content)
+        received = bytearray()
+
+        async def state(request):
+            return web.json_response({"received": len(received), "present": False})
+
+        async def chunk(request):
+            data = await request.read()
+            assert request.headers["X-Chunk-SHA256"] == hashlib.sha256(data).hexdigest()
+            received.extend(data)
+            return web.json_response({"received": len(received)})
+
+        async def commit(request):
+            return web.json_response({"present": bytes(received) == content})
+
+        app = web.Application()
+        app.router.add_get("/api/v1/models/{sha}", state)
+        app.router.add_put("/api/v1/models/{sha}/chunks", chunk)
+        app.router.add_post("/api/v1/models/{sha}/commit", commit)
+        server = TestServer(app)
+        await server.start_server()
+
+        read_threads = set()
+        read_chunk = client_module._read_chunk
+
+        def tracked_read_chunk(*args):
+            read_threads.add(threading.current_thread())
+            return read_chunk(*args)
+
+        monkeypatch.setattr(client_module, "_read_chunk", tracked_read_chunk)
+        monkeypatch.setattr(client_module.settings, "FREQAI_MODEL_CHUNK_SIZE", 256)
+        try:
+            async with aiohttp.ClientSession() as session:
+                client = client_module.TradingGatewayClient(session)
+                client.base_url = str(server.make_url(""))
+                result = await client.upload_freqai_model(
+                    str(model_file), content_hash, len(content)
+                )
+        finally:
+            await server.close()
+
+        assert result == {"present": True}
+        assert read_threads and threading.main_thread() not in read_threads
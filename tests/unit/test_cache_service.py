@@ -0,0 +1,247 @@
+"""
+Unit tests for the two-tier Cache Service.
+"""
+
+import asyncio
+
+import pytest
+
+from management_server.services.cache_service import CacheService, cached
+
+
+class TestCacheService:
+    """Test cases for CacheService."""
+
+    @pytest.fixture
+    def cache(self, fake_redis):
+        service = CacheService(local_max_entries=100, local_ttl=60)
+        service.redis = fake_redis
+        return service
+
+    @pytest.mark.asyncio
+    async def test_local_tier_serves_repeated_reads(self, cache, fake_redis):
+        """Test that values read from Redis are kept in the local tier."""
+        other = CacheService(local_ttl=60)
+        other.redis = fake_redis
+        await other.set("bot:1", {"name": "alpha"})
+
+        assert await cache.get("bot:1") == {"name": "alpha"}
+        round_trips = fake_redis.round_trips
+        assert await cache.get("bot:1") == {"name": "alpha"}
+
+        assert fake_redis.round_trips == round_trips
+        stats = cache.get_stats()
+        assert (stats["redis_hits"], stats["local_hits"]) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_get_many_and_set_many_use_one_round_trip(self, cache, fake_redis):
+        """Test that bulk operations are pipelined."""
+        await cache.set_many({f"k{i}": i for i in range(5)}, ttl=60)
+        assert fake_redis.round_trips == 1
+
+        fresh = CacheService(local_ttl=60)
+        fresh.redis = fake_redis
+        assert await fresh.get_many(["k0", "k3", "missing"]) == {"k0": 0, "k3": 3}
+        assert fake_redis.round_trips == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_load_once(self, cache):
+        """Test that concurrent misses of a key share one load."""
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"status": "running"}
+
+        results = await asyncio.gather(
+            *(cache.get_or_set("status", loader, ttl=60) for _ in range(10))
+        )
+
+        assert calls == 1
+        assert all(result == {"status": "running"} for result in results)
+        assert cache.get_stats()["coalesced"] == 9
+
+    @pytest.mark.asyncio
+    async def test_waiter_takes_over_a_cancelled_load(self, cache):
+        """Test that cancelling the loading caller does not fail its waiters."""
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        leader = asyncio.create_task(cache.get_or_set("k", loader, ttl=60))
+        await asyncio.sleep(0)
+        waiters = [
+            asyncio.create_task(cache.get_or_set("k", loader, ttl=60))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await asyncio.gather(*waiters) == [2, 2, 2]
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_stale_value_served_while_refreshed(self, cache):
+        """Test stale-while-revalidate: the old value is returned at once."""
+        versions = iter(["v1", "v2"])
+
+        async def loader():
+            return next(versions)
+
+        cache.local_ttl = 0
+        assert await cache.get_or_set("k", loader, ttl=0, stale_ttl=60) == "v1"
+
+        assert await cache.get_or_set("k", loader, ttl=0, stale_ttl=60) == "v1"
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert await cache.get("k") == "v2"
+        assert cache.get_stats()["stale_served"] == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate_tags(self, cache, fake_redis):
+        """Test that invalidating a tag deletes only the values tagged with it."""
+        await cache.set("bot:42:status", "running", tags=["bot:42"])
+        await cache.set("bot:42:profit", 1.5, tags=["bot:42"])
+        await cache.set("bot:7:status", "stopped", tags=["bot:7"])
+
+        assert await cache.invalidate_tags("bot:42") == 2
+
+        assert await cache.get("bot:42:status") is None
+        assert await cache.get("bot:42:profit") is None
+        assert await cache.get("bot:7:status") == "stopped"
+        assert "freqtrade:bot:42:status" not in fake_redis.data
+
+    @pytest.mark.asyncio
+    async def test_load_racing_an_invalidation_is_not_cached(self, cache, fake_redis):
+        """Test that a value loaded across an invalidation of its tag is dropped."""
+        other = CacheService(local_ttl=60)
+        other.redis = fake_redis
+
+        async def loader(invalidator):
+            await invalidator.invalidate_tags("bot:1")
+            return "old"
+
+        # Invalidated by this process, then by another one
+        for invalidator in (cache, other):
+            assert await cache.get_or_set(
+                "bot:1:status", lambda: loader(invalidator), tags=["bot:1"]
+            ) == "old"
+            assert await cache.get("bot:1:status") is None
+            assert "freqtrade:bot:1:status" not in fake_redis.data
+
+        assert cache.get_stats()["stale_writes"] == 2
+
+    @pytest.mark.asyncio
+    async def test_redis_errors_fall_back_to_local_tier(self, cache):
+        """Test that a failing Redis is skipped instead of failing every call."""
+
+        async def broken_get(key):
+            raise ConnectionError("down")
+
+        cache.redis.get = broken_get
+        cache._local.clear()
+
+        assert await cache.get("k") is None
+        assert await cache.get("k") is None
+        assert cache.get_stats()["redis_errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_counters_back_off_after_redis_errors(self, cache, fake_redis):
+        """Test that increment and expire skip Redis while it backs off."""
+
+        async def broken_incrby(key, amount):
+            raise ConnectionError("down")
+
+        fake_redis.incrby = broken_incrby
+
+        assert await cache.increment("hits") is None
+        assert await cache.increment("hits") is None
+        assert await cache.expire("hits", 60) is False
+        assert cache.get_stats()["redis_errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_deletes_are_not_skipped_during_backoff(self, cache, fake_redis):
+        """Test that a delete reaches Redis while reads back off."""
+        await cache.set("k", "old")
+        cache._redis_retry_at = float("inf")
+
+        assert await cache.delete("k") is True
+        assert "freqtrade:k" not in fake_redis.data
+
+    @pytest.mark.asyncio
+    async def test_failed_invalidation_is_replayed(self, cache, fake_redis):
+        """Test that tags Redis could not invalidate are invalidated later."""
+        await cache.set("bot:1:status", "old", tags=["bot:1"])
+        delete = fake_redis.delete
+
+        async def broken_delete(*keys):
+            raise ConnectionError("down")
+
+        fake_redis.delete = broken_delete
+        assert await cache.invalidate_tags("bot:1") == 0
+        fake_redis.delete = delete
+        cache._redis_retry_at = 0.0
+
+        assert await cache.get("bot:1:status") is None
+        assert "freqtrade:bot:1:status" not in fake_redis.data
+        assert cache.get_stats()["replayed_invalidations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_tags_pruned_with_local_entries(self, fake_redis):
+        """Test that evicted and expired keys leave the local tag index."""
+        cache = CacheService(local_max_entries=2, local_ttl=60)
+        cache.redis = fake_redis
+        for bot_id in range(3):
+            await cache.set(f"bot:{bot_id}", bot_id, tags=[f"bot:{bot_id}"])
+        assert set(cache._local_tags) == {"bot:1", "bot:2"}
+
+        cache._local["bot:1"] = (cache._local["bot:1"][0], 0.0)
+        await cache.get("bot:1")
+        await cache.invalidate_tags("bot:2")
+
+        assert cache._local_tags == {}
+        assert cache._local_key_tags == {}
+
+    @pytest.mark.asyncio
+    async def test_loaded_none_is_cached(self, cache):
+        """Test that a loader returning None is not called again."""
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            return None
+
+        assert await cache.get_or_set("missing", loader, ttl=60) is None
+        cache._local.clear()
+        assert await cache.get_or_set("missing", loader, ttl=60) is None
+        assert await cache.get("missing") is None
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_cached_decorator(self, cache):
+        """Test that decorated methods are cached per argument and by tag."""
+
+        class StatusService:
+            calls = 0
+
+            @cached(ttl=60, key="status:{bot_id}", tags=["bot:{bot_id}"], cache=cache)
+            async def get_status(self, bot_id: int):
+                StatusService.calls += 1
+                return {"bot_id": bot_id}
+
+        service = StatusService()
+        assert await service.get_status(1) == {"bot_id": 1}
+        assert await service.get_status(bot_id=1) == {"bot_id": 1}
+        assert await service.get_status(2) == {"bot_id": 2}
+        assert StatusService.calls == 2
+
+        await cache.invalidate_tags("bot:1")
+        await service.get_status(1)
+        assert StatusService.calls == 3
@@ -0,0 +1,131 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from trading_gateway.services import exchange_proxy as exchange_proxy_module
+from trading_gateway.services.exchange_proxy import ExchangeProxy, RateLimitBudget
+
+
+@pytest_asyncio.fixture
+async def mock_exchange(monkeypatch):
+    """Local stand-in exchange counting the requests it serves."""
+    hits = {"ticker": 0, "order": 0}
+
+    async def ticker(request):
+        hits["ticker"] += 1
+        await asyncio.sleep(0.05)
+        return web.json_response({"symbol": request.query["symbol"], "price": "1.0"})
+
+    async def order(request):
+        hits["order"] += 1
+        return web.json_response({"orderId": hits["order"]})
+
+    app = web.Application()
+    app.router.add_get("/api/v3/ticker/price", ticker)
+    app.router.add_post("/api/v3/order", order)
+    server = TestServer(app, host="127.0.0.1")
+    await server.start_server()
+
+    settings = exchange_proxy_module.gateway_settings
+    monkeypatch.setattr(settings, "EXCHANGE_PROXY_ALLOWED_HOSTS", ["127.0.0.1"])
+    monkeypatch.setattr(settings, "EXCHANGE_PROXY_DEFAULT_RATE", 1000.0)
+
+    yield f"http://127.0.0.1:{server.port}", hits
+    await server.close()
+
+
+class TestExchangeProxy:
+    """Test cases for the caching exchange proxy."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_coalesce_and_cache(self, mock_exchange):
+        """Test that identical ticker requests reach the exchange once."""
+        base_url, hits = mock_exchange
+        proxy = ExchangeProxy()
+        url = f"{base_url}/api/v3/ticker/price?symbol=BTCUSDT"
+
+        responses = await asyncio.gather(
+            *(proxy.fetch("binance", "GET", url) for _ in range(10))
+        )
+        cached = await proxy.fetch("binance", "GET", url)
+        await proxy.close()
+
+        assert hits["ticker"] == 1
+        assert all(response.status == 200 for response in responses)
+        assert cached.body == responses[0].body
+        stats = proxy.get_stats()
+        assert stats["misses"] == 1
+        assert stats["coalesced"] == 9
+        assert stats["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_fail_coalesced_requests(
+        self, mock_exchange
+    ):
+        """Test that a disconnecting first caller leaves the shared fetch running."""
+        base_url, hits = mock_exchange
+        proxy = ExchangeProxy()
+        url = f"{base_url}/api/v3/ticker/price?symbol=BTCUSDT"
+
+        first = asyncio.create_task(proxy.fetch("binance", "GET", url))
+        await asyncio.sleep(0.01)
+        others = [
+            asyncio.create_task(proxy.fetch("binance", "GET", url)) for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        first.cancel()
+        responses = await asyncio.gather(*others)
+        await proxy.close()
+
+        assert first.cancelled()
+        assert all(response.status == 200 for response in responses)
+        assert hits["ticker"] == 1
+
+    @pytest.mark.asyncio
+    async def test_signed_requests_are_never_cached(self, mock_exchange):
+        """Test that account requests are forwarded every time."""
+        base_url, hits = mock_exchange
+        proxy = ExchangeProxy()
+        url = f"{base_url}/api/v3/ticker/price?symbol=BTCUSDT"
+
+        await proxy.fetch("binance", "GET", url, headers={"X-MBX-APIKEY": "key"})
+        await proxy.fetch("binance", "GET", url, headers={"X-MBX-APIKEY": "key"})
+        await proxy.fetch("binance", "POST", f"{base_url}/api/v3/order")
+        await proxy.close()
+
+        assert hits == {"ticker": 2, "order": 1}
+        assert proxy.cache == {}
+
+    @pytest.mark.asyncio
+    async def test_bitget_and_mexc_keys_mark_signed_requests(self, mock_exchange):
+        """Test that bitget and MEXC API key headers bypass the cache."""
+        base_url, hits = mock_exchange
+        proxy = ExchangeProxy()
+        url = f"{base_url}/api/v3/ticker/price?symbol=BTCUSDT"
+
+        for header in ("ACCESS-KEY", "X-MEXC-APIKEY"):
+            await proxy.fetch("bitget", "GET", url, headers={header: "key"})
+            await proxy.fetch("bitget", "GET", url, headers={header: "key"})
+        await proxy.close()
+
+        assert hits["ticker"] == 4
+        assert proxy.cache == {}
+
+    @pytest.mark.asyncio
+    async def test_rejects_hosts_outside_allowlist(self, mock_exchange):
+        """Test that the proxy cannot be used for arbitrary hosts."""
+        proxy = ExchangeProxy()
+        with pytest.raises(ValueError):
+            await proxy.fetch("binance", "GET", "http://example.org/ticker")
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_budget_spaces_requests(self):
+        """Test that requests beyond the burst wait for the exchange budget."""
+        budget = RateLimitBudget(rate=20, burst=1)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for _ in range(3):
+            await budget.acquire()
+        assert loop.time() - started >= 0.09
@@ -0,0 +1,142 @@
+"""
+Unit tests for materialized fleet statistics.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from management_server.models.base import Base
+from management_server.models.models import Bot, BotTrade, User
+from management_server.services.fleet_stats import FleetStats
+
+
+def bot(name, user_id, status="stopped", max_drawdown=0.0):
+    return Bot(
+        name=name,
+        strategy_name="Sample",
+        exchange="binance",
+        stake_currency="USDT",
+        stake_amount=10,
+        created_by=user_id,
+        status=status,
+        max_drawdown=max_drawdown,
+    )
+
+
+def trade(bot_name, trade_id, profit, is_open=False):
+    return {
+        "bot_name": bot_name,
+        "ft_trade_id": trade_id,
+        "pair": "BTC/USDT",
+        "is_open": is_open,
+        "profit_abs": profit,
+    }
+
+
+class TestFleetStats:
+    """Test cases for FleetStats."""
+
+    @pytest_asyncio.fixture
+    async def db(self):
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with async_sessionmaker(bind=engine, expire_on_commit=False)() as db:
+            for user_id in (1, 2):
+                db.add(
+                    User(
+                        id=user_id,
+                        username=f"user{user_id}",
+                        email=f"user{user_id}@x.io",
+                        hashed_password="x",
+                    )
+                )
+            db.add_all(
+                [
+                    bot("a", 1, "running", 0.1),
+                    bot("b", 1, "stopped", 0.3),
+                    bot("c", 2, "running"),
+                ]
+            )
+            db.add_all(
+                [
+                    BotTrade(**trade("a", 1, 5.0)),
+                    BotTrade(**trade("a", 2, -1.0)),
+                    BotTrade(**trade("b", 1, 2.0, is_open=True)),
+                ]
+            )
+            await db.commit()
+            yield db
+        await engine.dispose()
+
+    @pytest.fixture
+    def stats(self):
+        return FleetStats(event_bus=SimpleNamespace(), reconcile_interval=60)
+
+    @pytest.mark.asyncio
+    async def test_reconcile_builds_user_and_fleet_summaries(self, db, stats):
+        """Test that summaries are built from bots and closed trades."""
+        await stats.ensure_loaded(db)
+
+        user = stats.get_summary(1)
+        assert user["total_bots"] == 2
+        assert user["status_distribution"] == {"running": 1, "stopped": 1}
+        assert user["profit_stats"] == {
+            "total_profit": 4.0,
+            "avg_profit": 2.0,
+            "max_profit": 4.0,
+            "min_profit": 0.0,
+        }
+        assert user["risk_stats"] == {"avg_drawdown": 0.2, "max_drawdown": 0.3}
+        assert (user["closed_trades"], user["profitable_trades"]) == (2, 1)
+
+        fleet = stats.get_summary()
+        assert fleet["total_bots"] == 3
+        assert fleet["status_distribution"] == {"running": 2, "stopped": 1}
+        assert stats.get_summary(99)["total_bots"] == 0
+
+    @pytest.mark.asyncio
+    async def test_events_update_summaries_incrementally(self, db, stats):
+        """Test that state changes and ingested trades are applied at once."""
+        await stats.reconcile(db)
+
+        stats.apply_states({"a": {"status": "stopped"}, "ghost": {"status": "error"}})
+        await stats.handle_event(
+            SimpleNamespace(
+                type="BOT_STARTING",
+                data={"bot_name": "c", "user_id": 2, "action": "starting"},
+            )
+        )
+        await stats.handle_event(
+            SimpleNamespace(
+                type="TRADES_INGESTED",
+                data={
+                    "bot_name": "c",
+                    "trades": [trade("c", 1, 3.0), trade("c", 2, 0.0, is_open=True)],
+                },
+            )
+        )
+
+        assert stats.get_summary(1)["status_distribution"] == {"stopped": 2}
+        assert stats.get_summary(2)["status_distribution"] == {"starting": 1}
+        assert stats.get_summary(2)["profit_stats"]["total_profit"] == 3.0
+        assert stats.get_summary()["total_bots"] == 3
+
+    @pytest.mark.asyncio
+    async def test_reconcile_corrects_drift(self, db, stats):
+        """Test that changes missed by the events are picked up."""
+        await stats.reconcile(db)
+        stats.apply_trades("a", [trade("a", 2, -1.0)])  # reported twice
+        await db.execute(update(Bot).where(Bot.name == "b").values(status="error"))
+        await db.commit()
+
+        assert await stats.reconcile(db) == 2
+
+        user = stats.get_summary(1)
+        assert user["profit_stats"]["total_profit"] == 4.0
+        assert user["status_distribution"] == {"running": 1, "error": 1}
+        assert stats.get_stats()["drift"] == 2
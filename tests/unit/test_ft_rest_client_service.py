@@ -0,0 +1,476 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock
+
+from trading_gateway.services.ft_rest_client_service import (
+    BotConnection,
+    FtRestClientService,
+)
+
+
+@pytest.fixture
+def ft_service():
+    """FtRestClientService with three configured bots and no real sessions."""
+    service = FtRestClientService(max_concurrency=2, bulk_deadline=0.5)
+    service.event_bus = AsyncMock()
+    for name in ("bot_a", "bot_b", "bot_c"):
+        service.connections[name] = BotConnection(
+            name=name,
+            url=f"http://{name}:8080",
+            ui_url=f"http://{name}:8080/ui",
+            username="freqtrade",
+            password="secret",
+        )
+    return service
+
+
+class TestBulkFanOut:
+    """Test cases for concurrent bulk operations."""
+
+    @pytest.mark.asyncio
+    async def test_get_all_bots_status_runs_concurrently(self, ft_service):
+        """Test that bulk status calls overlap instead of running one by one."""
+        in_flight = 0
+        max_in_flight = 0
+
+        async def fake_status(bot_name):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            return {"state": "running", "bot": bot_name}
+
+        ft_service.get_bot_status = fake_status
+
+        results = await ft_service.get_all_bots_status()
+
+        assert set(results) == {"bot_a", "bot_b", "bot_c"}
+        assert max_in_flight == 2  # bounded by max_concurrency
+        for bot_name, status in results.items():
+            assert status["state"] == "running"
+            assert status["ui_url"] == f"http://{bot_name}:8080/ui"
+            assert status["elapsed_ms"] >= 40
+
+    @pytest.mark.asyncio
+    async def test_bot_removed_during_status_poll(self, ft_service):
+        """Test that a bot removed mid-poll does not fail the bulk status."""
+
+        async def fake_status(bot_name):
+            if bot_name == "bot_b":
+                await ft_service.remove_bot("bot_b")
+            return {"state": "running"}
+
+        ft_service.get_bot_status = fake_status
+
+        results = await ft_service.get_all_bots_status()
+
+        assert set(results) == {"bot_a", "bot_b", "bot_c"}
+        assert "ui_url" not in results["bot_b"]
+        assert results["bot_a"]["ui_url"] == "http://bot_a:8080/ui"
+
+    @pytest.mark.asyncio
+    async def test_dead_bot_returns_partial_results(self, ft_service):
+        """Test that a hanging bot does not stall the whole bulk call."""
+
+        async def fake_stop(bot_name):
+            if bot_name == "bot_b":
+                await asyncio.sleep(30)
+            return {"status": "stopped"}
+
+        ft_service.stop_bot = fake_stop
+
+        started = asyncio.get_running_loop().time()
+        results = await ft_service.stop_all_bots(deadline=0.1)
+        elapsed = asyncio.get_running_loop().time() - started
+
+        assert elapsed < 1
+        assert results["bot_a"]["status"] == "stopped"
+        assert results["bot_c"]["status"] == "stopped"
+        assert results["bot_b"]["timed_out"] is True
+        assert "Deadline" in results["bot_b"]["error"]
+
+    @pytest.mark.asyncio
+    async def test_failing_bot_is_reported_per_bot(self, ft_service):
+        """Test that an exception for one bot is isolated to its entry."""
+
+        async def fake_start(bot_name):
+            if bot_name == "bot_c":
+                raise RuntimeError("boom")
+            return {"status": "started"}
+
+        ft_service.start_bot = fake_start
+
+        results = await ft_service.start_all_bots()
+
+        assert results["bot_a"]["status"] == "started"
+        assert "boom" in results["bot_c"]["error"]
+        assert "elapsed_ms" in results["bot_c"]
+
+
+class TestConnectionPooling:
+    """Test cases for the shared connection pool and token reuse."""
+
+    @pytest_asyncio.fixture
+    async def fake_bot_server(self):
+        """Local freqtrade-like API counting logins."""
+        import jwt
+        import time
+        from aiohttp import web
+        from aiohttp.test_utils import TestServer
+
+        calls = {"login": 0, "status": 0}
+
+        async def login(request):
+            calls["login"] += 1
+            token = jwt.encode({"exp": int(time.time()) + 900}, "k", algorithm="HS256")
+            return web.json_response(
+                {"access_token": token, "refresh_token": "refresh"}
+            )
+
+        async def status(request):
+            if not request.headers.get("Authorization", "").startswith("Bearer "):
+                return web.json_response({"detail": "unauthorized"}, status=401)
+            calls["status"] += 1
+            return web.json_response({"state": "running"})
+
+        app = web.Application()
+        app.router.add_post("/api/v1/token/login", login)
+        app.router.add_get("/api/v1/status", status)
+        server = TestServer(app)
+        await server.start_server()
+        yield server, calls
+        await server.close()
+
+    @pytest.mark.asyncio
+    async def test_token_is_reused_across_requests(self, fake_bot_server):
+        """Test that repeated requests log in only once."""
+        from shared.freqtrade_auth import FreqtradeTokenCache
+
+        server, calls = fake_bot_server
+        service = FtRestClientService()
+        service.token_cache = FreqtradeTokenCache()
+        await service.initialize({"bot_a": {"api_url": str(server.make_url(""))}})
+
+        try:
+            for _ in range(3):
+                result = await service.get_bot_status("bot_a")
+                assert result == {"state": "running"}
+
+            assert calls == {"login": 1, "status": 3}
+            stats = await service.get_connection_stats()
+            assert stats["bot_a"]["token_cached"] is True
+        finally:
+            await service.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_sessions_share_connector_and_recycle_per_bot(self, ft_service):
+        """Test that closing one bot session does not recreate the others."""
+        await ft_service._create_sessions()
+        session_a = ft_service.connections["bot_a"].session
+        session_b = ft_service.connections["bot_b"].session
+
+        try:
+            assert session_a.connector is session_b.connector
+
+            await session_a.close()
+            new_session_a = await ft_service._ensure_session("bot_a")
+
+            assert new_session_a is not session_a
+            assert ft_service.connections["bot_b"].session is session_b
+            assert new_session_a.connector is session_b.connector
+        finally:
+            await ft_service.shutdown()
+
+
+class TestBotStatusSnapshot:
+    """Test cases for the background bot status snapshot."""
+
+    @pytest.fixture
+    def snapshot(self, ft_service):
+        from trading_gateway.services.bot_status_snapshot import BotStatusSnapshot
+
+        return BotStatusSnapshot(
+            ft_service,
+            intervals={"status": 1, "trades": 1, "profit": 1, "balance": 1},
+            jitter=0,
+        )
+
+    @pytest.mark.asyncio
+    async def test_refresh_field_updates_versioned_snapshot(self, ft_service, snapshot):
+        """Test that a refresh stores data and bumps the version only on change."""
+        ft_service.get_bot_profit = AsyncMock(return_value={"profit_all_coin": 1.5})
+
+        await snapshot.refresh_field("profit")
+        first_version = snapshot.version
+        assert first_version == 3  # one change per bot
+
+        await snapshot.refresh_field("profit")
+        assert snapshot.version == first_version  # unchanged data
+
+        profit = snapshot.read("bot_a", "profit")
+        assert profit["profit_all_coin"] == 1.5
+        assert profit["snapshot"]["stale"] is False
+        assert profit["snapshot"]["age_seconds"] < 1
+
+        assert snapshot.read_all(since_version=first_version)["bots"] == {}
+
+    @pytest.mark.asyncio
+    async def test_error_keeps_last_known_value(self, ft_service, snapshot):
+        """Test that a failed refresh keeps data and exposes the error."""
+        ft_service.get_bot_status = AsyncMock(return_value=[{"trade_id": 1}])
+        await snapshot.refresh_field("status")
+
+        ft_service.get_bot_status = AsyncMock(
+            return_value={"error": "Connection failed"}
+        )
+        await snapshot.refresh_field("status")
+
+        status = snapshot.read("bot_b", "status")
+        assert status["data"] == [{"trade_id": 1}]
+        assert status["snapshot"]["error"] == "Connection failed"
+
+    @pytest.mark.asyncio
+    async def test_ai_status_command_served_from_snapshot(self, ft_service, snapshot):
+        """Test that execute_ai_command reads status without a live call."""
+        ft_service.get_bot_status = AsyncMock(return_value={"state": "running"})
+        await snapshot.refresh_field("status")
+        ft_service.get_bot_status.reset_mock()
+
+        snapshot.start()
+        try:
+            result = await ft_service.execute_ai_command("bot_a", "status")
+        finally:
+            await snapshot.stop()
+
+        assert result["state"] == "running"
+        assert result["ai_command"] == "status"
+        assert "snapshot" in result
+        # The poller may have refreshed in the background, the command did not
+        assert ft_service.get_bot_status.await_count <= 3
+
+
+class TestBotPushIngestor:
+    """Test cases for push ingestion of bot messages."""
+
+    @pytest.fixture
+    def ingestor(self, ft_service):
+        from trading_gateway.services.bot_push_ingestor import BotPushIngestor
+        from trading_gateway.services.bot_status_snapshot import BotStatusSnapshot
+
+        snapshot = BotStatusSnapshot(ft_service, jitter=0)
+        ingestor = BotPushIngestor(
+            ft_service, snapshot, event_bus=AsyncMock(), mode="webhook"
+        )
+        ingestor.refresh_delay = 0.01
+        return ingestor
+
+    @pytest.mark.asyncio
+    async def test_trade_messages_publish_events_and_coalesce_refresh(
+        self, ft_service, ingestor
+    ):
+        """Test that a burst of pushed messages results in one refresh per field."""
+        ft_service.get_bot_status = AsyncMock(return_value=[{"trade_id": 7}])
+        ft_service.get_open_trades = AsyncMock(return_value=[{"trade_id": 7}])
+        ft_service.get_bot_balance = AsyncMock(return_value={"total": 100})
+
+        for _ in range(5):
+            await ingestor.handle_message(
+                "bot_a", {"type": "entry_fill", "data": {"trade_id": 7}}
+            )
+        await asyncio.sleep(0.05)
+
+        assert ingestor.event_bus.publish.await_count == 5
+        stream, event, event_type = ingestor.event_bus.publish.await_args.args
+        assert stream == "bot_events"
+        assert event_type == "TRADE_ENTRY_FILL"
+        assert event["data"] == {"trade_id": 7}
+
+        ft_service.get_bot_status.assert_awaited_once_with("bot_a")
+        ft_service.get_bot_balance.assert_awaited_once_with("bot_a")
+        assert ingestor.snapshot.read("bot_a", "trades")["data"] == [{"trade_id": 7}]
+
+    @pytest.mark.asyncio
+    async def test_webhook_bot_is_skipped_by_poller(self, ft_service, ingestor):
+        """Test that push-driven bots are not polled while others still are."""
+        ft_service.connections["bot_a"].webhook_token = "token-a"
+        assert await ingestor.handle_webhook(
+            "bot_a", {"type": "status", "status": "running"}, "token-a"
+        )
+        ft_service.get_bot_profit = AsyncMock(return_value={"profit_all_coin": 0})
+
+        await ingestor.snapshot.refresh_field("profit")
+
+        polled = {call.args[0] for call in ft_service.get_bot_profit.await_args_list}
+        assert polled == {"bot_b", "bot_c"}
+        assert ingestor.get_stats()["push_bots"] == ["bot_a"]
+
+    @pytest.mark.asyncio
+    async def test_webhook_needs_webhook_mode_and_bot_token(self, ft_service, ingestor):
+        """Test that webhook calls without the bot's token are rejected."""
+        ft_service.connections["bot_a"].webhook_token = "token-a"
+        message = {"type": "status", "status": "running"}
+
+        assert not await ingestor.handle_webhook("bot_a", message, None)
+        assert not await ingestor.handle_webhook("bot_a", message, "token-b")
+        assert not await ingestor.handle_webhook("bot_b", message, "token-a")
+        ingestor.mode = "off"
+        assert not await ingestor.handle_webhook("bot_a", message, "token-a")
+
+        ingestor.event_bus.publish.assert_not_awaited()
+        assert ingestor.get_stats()["webhooks_rejected"] == 4
+        assert ingestor.get_stats()["push_bots"] == []
+
+    @pytest.mark.asyncio
+    async def test_quiet_push_bot_is_polled_again(self, ingestor):
+        """Test that the push lease expires unless messages renew it."""
+        ingestor.lease_ttl = 0.05
+        await ingestor.handle_message("bot_a", {"type": "warning"})
+        assert ingestor.snapshot.is_push("bot_a")
+
+        await asyncio.sleep(0.06)
+        assert not ingestor.snapshot.is_push("bot_a")
+
+    def test_build_webhook_config(self):
+        """Test the freqtrade webhook section injected for webhook mode."""
+        from trading_gateway.services.bot_push_ingestor import build_webhook_config
+
+        webhook = build_webhook_config("http://gw/api/v1/bots/b/webhook")
+
+        assert webhook["enabled"] is True
+        assert webhook["format"] == "json"
+        assert webhook["exit_fill"]["type"] == "exit_fill"
+        assert webhook["status"] == {"type": "status", "status": "{status}"}
+
+
+class TestCircuitBreaker:
+    """Test cases for the per-bot circuit breaker."""
+
+    @pytest.fixture
+    def dead_bot(self, ft_service):
+        """bot_a whose requests fail with a connection error."""
+        import aiohttp
+
+        connection = ft_service.connections["bot_a"]
+        connection.breaker.failure_threshold = 2
+        connection.breaker.recovery_timeout = 0.05
+
+        session = AsyncMock()
+        session.closed = False
+        session.request = lambda *args, **kwargs: (_ for _ in ()).throw(
+            aiohttp.ClientConnectionError("refused")
+        )
+        connection.session = session
+        ft_service._get_auth = AsyncMock(return_value=({}, None))
+        return connection
+
+    @pytest.mark.asyncio
+    async def test_breaker_opens_and_fails_fast(self, ft_service, dead_bot):
+        """Test that consecutive failures open the breaker and later calls fail fast."""
+        for _ in range(2):
+            result = await ft_service.get_bot_status("bot_a")
+            assert "Connection failed" in result["error"]
+
+        result = await ft_service.get_bot_status("bot_a")
+        assert result["circuit_open"] is True
+        assert result["retry_after"] > 0
+
+        stats = await ft_service.get_connection_stats()
+        assert stats["bot_a"]["circuit"]["state"] == "open"
+        assert stats["bot_a"]["circuit"]["rejected"] == 1
+        assert stats["bot_b"]["circuit"]["state"] == "closed"
+
+    @pytest.mark.asyncio
+    async def test_half_open_allows_single_probe(self, ft_service, dead_bot):
+        """Test that only one probe goes out after the recovery timeout."""
+        from trading_gateway.services.ft_rest_client_service import CircuitState
+
+        breaker = dead_bot.breaker
+        for _ in range(2):
+            await ft_service.get_bot_status("bot_a")
+        await asyncio.sleep(0.06)
+
+        assert breaker.allow_request() is True
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.allow_request() is False  # probe already in flight
+
+        breaker.record_failure("still down")
+        assert breaker.state == CircuitState.OPEN
+
+        await asyncio.sleep(0.06)
+        assert breaker.allow_request() is True
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.failures == 0
+
+    @pytest.mark.asyncio
+    async def test_only_transport_errors_and_5xx_count_as_failures(self):
+        """Test that non-JSON pages and 4xx answers leave the breaker closed."""
+        from aiohttp import web
+        from aiohttp.test_utils import TestServer
+        from trading_gateway.services.ft_rest_client_service import CircuitState
+
+        async def status(request):
+            return web.Response(text="<html>maintenance</html>")
+
+        async def profit(request):
+            return web.json_response({}, status=404)
+
+        async def balance(request):
+            return web.json_response({}, status=503)
+
+        app = web.Application()
+        app.router.add_get("/api/v1/status", status)
+        app.router.add_get("/api/v1/profit", profit)
+        app.router.add_get("/api/v1/balance", balance)
+        server = TestServer(app)
+        await server.start_server()
+        service = FtRestClientService()
+        await service.initialize({"bot_a": {"api_url": str(server.make_url(""))}})
+        service._get_auth = AsyncMock(return_value=({}, None))
+        breaker = service.connections["bot_a"].breaker
+        breaker.failure_threshold = 2
+
+        try:
+            for _ in range(3):
+                assert (
+                    "Invalid response"
+                    in (await service.get_bot_status("bot_a"))["error"]
+                )
+                assert "404" in (await service.get_bot_profit("bot_a"))["error"]
+            assert breaker.state == CircuitState.CLOSED
+
+            for _ in range(2):
+                await service.get_bot_balance("bot_a")
+            assert breaker.state == CircuitState.OPEN
+        finally:
+            await service.shutdown()
+            await server.close()
+
+    @pytest.mark.asyncio
+    async def test_only_the_probe_request_releases_the_probe(
+        self, ft_service, dead_bot
+    ):
+        """Test that a cancelled earlier request leaves another's probe taken."""
+        from trading_gateway.services.ft_rest_client_service import CircuitState
+
+        class HangingRequest:
+            async def __aenter__(self):
+                await asyncio.Event().wait()
+
+            async def __aexit__(self, *exc):
+                return False
+
+        dead_bot.session.request = lambda *args, **kwargs: HangingRequest()
+        slow = asyncio.create_task(ft_service.get_bot_status("bot_a"))
+        await asyncio.sleep(0)
+
+        breaker = dead_bot.breaker
+        breaker.state = CircuitState.HALF_OPEN
+        assert breaker.allow_request() is True
+        slow.cancel()
+        await asyncio.gather(slow, return_exceptions=True)
+
+        assert breaker.probe_in_flight is True
+        assert breaker.allow_request() is False
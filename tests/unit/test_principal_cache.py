@@ -0,0 +1,176 @@
+"""
+Unit tests for the principal cache used by token authentication.
+"""
+
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from management_server.auth import dependencies
+from management_server.auth.principal_cache import PrincipalCache
+from management_server.models.models import User
+
+
+def make_user(**overrides) -> User:
+    fields = {
+        "id": 7,
+        "username": "alice",
+        "email": "alice@example.com",
+        "is_active": True,
+        "is_superuser": False,
+    }
+    fields.update(overrides)
+    return User(**fields)
+
+
+class TestPrincipalCache:
+    """Test cases for PrincipalCache."""
+
+    @pytest.fixture
+    def cache(self, monkeypatch):
+        event_bus = MagicMock()
+        event_bus.publish = AsyncMock()
+        cache = PrincipalCache(event_bus=event_bus, ttl=30, max_entries=2)
+        monkeypatch.setattr(dependencies, "principal_cache", cache)
+        return cache
+
+    @pytest.fixture
+    def auth_service(self):
+        service = MagicMock()
+        service.verify_token.return_value = {
+            "sub": "alice",
+            "uid": 7,
+            "iat": time.time(),
+        }
+        service.get_user_by_username = AsyncMock(return_value=make_user())
+        return service
+
+    @staticmethod
+    async def authenticate(auth_service, dependency=None):
+        request = SimpleNamespace(state=SimpleNamespace())
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials="t")
+        dependency = dependency or dependencies.get_current_user
+        user = await dependency(request, credentials, auth_service)
+        return user, request
+
+    @pytest.mark.asyncio
+    async def test_repeated_requests_hit_the_database_once(self, cache, auth_service):
+        """Test that the principal is cached after the first lookup."""
+        for _ in range(3):
+            user, request = await self.authenticate(auth_service)
+
+        assert user.id == 7 and user.email == "alice@example.com"
+        assert request.state.audit_username == "alice"
+        assert auth_service.get_user_by_username.await_count == 1
+        assert cache.get_stats()["hits"] == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidation_event_forces_a_reload(self, cache, auth_service):
+        """Test that a PRINCIPAL_INVALIDATED event drops the cached principal."""
+        await self.authenticate(auth_service)
+        await cache.handle_event(
+            SimpleNamespace(type="PRINCIPAL_INVALIDATED", data={"username": "alice"})
+        )
+        auth_service.get_user_by_username.return_value = make_user(is_active=False)
+
+        user, _ = await self.authenticate(auth_service)
+
+        assert user.is_active is False
+        assert auth_service.get_user_by_username.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_publish_invalidation(self, cache):
+        """Test that invalidations are applied locally and published."""
+        cache.put(make_user(), time.time())
+        await cache.publish_invalidation("alice", "password_changed")
+
+        assert cache.get("alice") is None
+        cache.event_bus.publish.assert_awaited_once_with(
+            "user_events",
+            {"username": "alice", "reason": "password_changed"},
+            "PRINCIPAL_INVALIDATED",
+        )
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_stops_the_listener_before_destroying(self, cache):
+        """Test that the listener cannot recreate the group being destroyed."""
+        cache.event_bus.unsubscribe = AsyncMock()
+        cache.event_bus.destroy_consumer_group = AsyncMock()
+
+        await cache.unsubscribe()
+
+        assert [call[0] for call in cache.event_bus.mock_calls] == [
+            "unsubscribe",
+            "destroy_consumer_group",
+        ]
+
+    def test_stale_load_is_not_cached(self, cache):
+        """Test that a user loaded before an invalidation is not cached."""
+        resolved_at = time.time()
+        cache.invalidate("alice")
+        cache.put(make_user(), resolved_at)
+
+        assert cache.get("alice") is None
+
+    def test_entries_bounded(self, cache):
+        """Test that the oldest principals are evicted beyond max_entries."""
+        for i, name in enumerate(("a", "b", "c")):
+            cache.put(make_user(id=i, username=name), time.time())
+
+        assert cache.get("a") is None
+        assert cache.get("c").id == 2
+
+    @pytest.mark.asyncio
+    async def test_claims_authorize_without_lookup(self, cache, auth_service):
+        """Test that read-only endpoints authorize from claims once cached."""
+        for _ in range(3):
+            user, request = await self.authenticate(
+                auth_service, dependencies.get_token_principal
+            )
+
+        assert (user.id, user.username, user.is_superuser) == (7, "alice", False)
+        assert request.state.audit_user_id == 7
+        auth_service.get_user_by_username.assert_awaited_once()
+        assert cache.get_stats()["claims"] == 2
+
+    @pytest.mark.asyncio
+    async def test_claims_need_a_loaded_principal(self, cache, auth_service):
+        """Test that claims alone are not trusted by a fresh cache."""
+        auth_service.verify_token.return_value["su"] = True
+        auth_service.get_user_by_username.return_value = make_user(is_active=False)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await self.authenticate(auth_service, dependencies.get_token_principal)
+
+        assert exc_info.value.status_code == 400
+        auth_service.get_user_by_username.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_claims_use_the_cached_flags(self, cache, auth_service):
+        """Test that a demoted user's superuser claim is not honoured."""
+        auth_service.verify_token.return_value["su"] = True
+        cache.put(make_user(is_superuser=False), time.time())
+
+        user, _ = await self.authenticate(
+            auth_service, dependencies.get_token_principal
+        )
+
+        assert user.is_superuser is False
+        auth_service.get_user_by_username.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_claims_of_older_tokens_are_not_trusted(self, cache, auth_service):
+        """Test that a token predating an invalidation is resolved normally."""
+        auth_service.verify_token.return_value["iat"] = time.time() - 60
+        cache.invalidate("alice")
+        auth_service.get_user_by_username.return_value = make_user(is_active=False)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await self.authenticate(auth_service, dependencies.get_token_principal)
+
+        assert exc_info.value.status_code == 400
+        auth_service.get_user_by_username.assert_awaited_once()
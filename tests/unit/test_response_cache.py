@@ -0,0 +1,159 @@
+"""
+Unit tests for conditional GET response caching.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from typing import List
+from unittest.mock import MagicMock
+
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI, Request
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import update
+
+from management_server.api import response_cache as response_cache_module
+from management_server.api.response_cache import ResponseCache
+from management_server.models.models import Bot
+from management_server.services.cache_service import CacheService
+
+
+def bots_client(cache: ResponseCache) -> AsyncClient:
+    """Client of an app listing bots through the cache; counts its loads."""
+    app = FastAPI()
+    app.state.loads = 0
+
+    @app.get("/bots")
+    async def list_bots(request: Request, user_id: int = 1):
+        async def load():
+            app.state.loads += 1
+            return [f"bot-{user_id}"]
+
+        return await cache.respond(request, "bots", user_id, load, List[str])
+
+    client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+    client.app = app
+    return client
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache."""
+
+    @pytest.fixture
+    def shared(self, fake_redis):
+        """CacheService holding the versions, shared by server processes."""
+        service = CacheService(local_ttl=60)
+        service.redis = fake_redis
+        return service
+
+    @pytest.fixture
+    def cache(self, monkeypatch, shared):
+        cache = ResponseCache(
+            event_bus=MagicMock(), max_entries=10, ttl=3600, cache=shared
+        )
+        monkeypatch.setattr(response_cache_module, "response_cache", cache)
+        return cache
+
+    @pytest_asyncio.fixture
+    async def client(self, cache):
+        async with bots_client(cache) as client:
+            yield client
+
+    @pytest.mark.asyncio
+    async def test_unchanged_poll_returns_304_without_loading(self, cache, client):
+        """Test that a matching If-None-Match is answered before loading."""
+        first = await client.get("/bots")
+        etag = first.headers["etag"]
+
+        second = await client.get("/bots", headers={"If-None-Match": etag})
+
+        assert first.json() == ["bot-1"]
+        assert second.status_code == 304
+        assert second.headers["etag"] == etag
+        assert client.app.state.loads == 1
+        assert cache.get_stats()["not_modified"] == 1
+
+    @pytest.mark.asyncio
+    async def test_body_cached_per_user(self, cache, client):
+        """Test that responses are cached per user and never shared."""
+        await client.get("/bots", params={"user_id": 1})
+        other = await client.get("/bots", params={"user_id": 2})
+        again = await client.get("/bots", params={"user_id": 1})
+
+        assert other.json() == ["bot-2"]
+        assert again.json() == ["bot-1"]
+        assert client.app.state.loads == 2
+        assert cache.get_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidation_changes_the_etag(self, cache, client):
+        """Test that invalidating the resource makes old ETags stale."""
+        etag = (await client.get("/bots")).headers["etag"]
+
+        await cache.invalidate("bots")
+        response = await client.get("/bots", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert await cache.version("bots") == "1"
+
+    @pytest.mark.asyncio
+    async def test_processes_share_etags_and_invalidations(self, cache, shared):
+        """Test that another process answers 304 and sees invalidations."""
+        other = ResponseCache(
+            event_bus=MagicMock(), max_entries=10, ttl=3600, cache=shared
+        )
+        async with bots_client(cache) as first, bots_client(other) as second:
+            etag = (await first.get("/bots")).headers["etag"]
+            polled = await second.get("/bots", headers={"If-None-Match": etag})
+            await cache.invalidate("bots")
+            changed = await second.get("/bots", headers={"If-None-Match": etag})
+
+        assert polled.status_code == 304
+        assert changed.status_code == 200
+        assert second.app.state.loads == 1
+
+    @pytest.mark.asyncio
+    async def test_without_redis_etags_are_per_process(self, cache, shared):
+        """Test that fallback versions never match another process's ETags."""
+        shared.redis = None
+        shared._redis_retry_at = float("inf")
+        other = ResponseCache(event_bus=MagicMock(), cache=shared)
+
+        assert await cache.version("bots") != await other.version("bots")
+
+    @pytest.mark.asyncio
+    async def test_only_bot_status_events_invalidate_bots(self, cache):
+        """Test that status events bump the bots version and trades do not."""
+        await cache.handle_event(SimpleNamespace(type="TRADES_INGESTED", data={}))
+        assert await cache.version("bots") == "0"
+
+        await cache.handle_event(SimpleNamespace(type="BOT_STARTED", data={}))
+        await cache.handle_event(SimpleNamespace(type="bot_started", data={}))
+
+        assert await cache.version("bots") == "2"
+        assert cache.versions == {"bots": 2}
+
+    @pytest.mark.asyncio
+    async def test_database_commits_invalidate_their_resource(self, cache):
+        """Test that committed bulk updates of bots bump the bots version."""
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        from management_server.models.base import Base
+
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with async_sessionmaker(bind=engine)() as db:
+            await db.execute(update(Bot).where(Bot.id == 0).values(status="running"))
+            await db.rollback()
+            assert cache.versions["bots"] == 0
+
+            await db.execute(update(Bot).where(Bot.id == 0).values(status="running"))
+            await db.commit()
+        await engine.dispose()
+        await asyncio.sleep(0)
+
+        assert cache.versions["bots"] == 1
+        assert "freqai_models" not in cache.versions
+        assert await cache.version("bots") == "1"
@@ -0,0 +1,102 @@
+"""
+Unit tests for the background system metrics sampler.
+"""
+
+import asyncio
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from management_server.services import system_metrics_sampler as sampler_module
+from management_server.services.system_metrics_sampler import SystemMetricsSampler
+
+CpuTimes = namedtuple("CpuTimes", ["user", "idle"])
+
+
+def fake_psutil(cpu_values):
+    """psutil whose CPU is `cpu_values[i]` percent busy in the i-th interval."""
+    cpu = iter(cpu_values)
+    times = {"user": 0.0, "idle": 0.0}
+
+    def cpu_times():
+        busy = next(cpu)
+        times["user"] += busy
+        times["idle"] += 100 - busy
+        return CpuTimes(**times)
+
+    return SimpleNamespace(
+        cpu_times=cpu_times,
+        virtual_memory=lambda: SimpleNamespace(
+            total=8 * 1024**3, used=2 * 1024**3, available=6 * 1024**3, percent=25.0
+        ),
+        disk_usage=lambda path: SimpleNamespace(
+            total=100 * 1024**3, used=40 * 1024**3, free=60 * 1024**3, percent=40.0
+        ),
+        net_io_counters=lambda: None,
+        cpu_count=lambda logical=False: 4,
+    )
+
+
+class TestSystemMetricsSampler:
+    """Test cases for SystemMetricsSampler."""
+
+    @pytest.mark.asyncio
+    async def test_metrics_are_read_from_the_buffer(self):
+        """Test that reads return the latest sample and window summaries."""
+        sampler = SystemMetricsSampler(interval=60, buffer_size=3, windows=[60])
+        with patch.object(sampler_module, "psutil", fake_psutil([10, 30, 20, 50])):
+            for _ in range(4):
+                await sampler.sample()
+
+            metrics = await sampler.get_metrics()
+
+        assert sampler.get_stats()["buffered"] == 3
+        assert metrics["cpu"]["usage_percent"] == 50
+        assert metrics["memory"]["used_gb"] == 2
+        assert metrics["windows"]["60s"]["cpu_percent"] == {
+            "min": 20,
+            "avg": 33.33,
+            "max": 50,
+        }
+
+    @pytest.mark.asyncio
+    async def test_old_samples_leave_the_window(self):
+        """Test that windows only summarize samples of their period."""
+        sampler = SystemMetricsSampler(interval=60, windows=[60])
+        with patch.object(sampler_module, "psutil", fake_psutil([90, 10])):
+            await sampler.sample()
+            sampler._samples[-1]["time"] = time.time() - 120
+            await sampler.sample()
+
+        assert sampler.summarize(60)["cpu_percent"]["max"] == 10
+        assert sampler.summarize(300)["cpu_percent"]["max"] == 90
+
+    @pytest.mark.asyncio
+    async def test_background_task_samples_without_blocking(self):
+        """Test that the task samples at its cadence and stops cleanly."""
+        sampler = SystemMetricsSampler(interval=0.01, windows=[60])
+        with patch.object(sampler_module, "psutil", fake_psutil(range(100))):
+            sampler.start()
+            await asyncio.sleep(0.05)
+            await sampler.stop()
+
+        assert not sampler.running
+        assert sampler.get_stats()["samples"] >= 2
+
+    @pytest.mark.asyncio
+    async def test_cpu_usage_does_not_depend_on_the_sampling_thread(self):
+        """Test that each sample measures CPU since the previous one on any thread."""
+        sampler = SystemMetricsSampler(interval=60, windows=[60])
+        with patch.object(sampler_module, "psutil", fake_psutil([5, 100, 40, 70])):
+            readings = []
+            for _ in range(4):
+                # a fresh thread per sample, like a busy default executor
+                with ThreadPoolExecutor(max_workers=1) as pool:
+                    sample = pool.submit(sampler._collect).result()
+                readings.append(sample["cpu_percent"])
+
+        assert readings == pytest.approx([5, 100, 40, 70])
@@ -0,0 +1,207 @@
+"""
+Unit tests for the vectorized trade analytics engine.
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from management_server.models.base import Base
+from management_server.models.models import BotTrade
+from management_server.services.cache_service import CacheService
+from management_server.services.trade_analytics import (
+    DAY,
+    TradeAnalyticsEngine,
+    TradeColumns,
+    TradeGroup,
+    bucket_profit,
+    compute_metrics,
+)
+
+NOW = datetime(2025, 3, 1, tzinfo=timezone.utc).timestamp()
+
+
+def columns(trades):
+    """TradeColumns of (code, days before NOW, profit) tuples."""
+    codes, days_ago, profit = zip(*trades)
+    return TradeColumns(
+        np.array(codes), NOW - np.array(days_ago) * DAY, np.array(profit, dtype=float)
+    )
+
+
+class TestComputeMetrics:
+    """Test cases for the vectorized metrics."""
+
+    def test_groups_are_computed_independently(self):
+        """Test that metrics of interleaved groups match per-group figures."""
+        trades = columns(
+            [(0, 2.5, 10.0), (1, 2.5, -5.0), (0, 1.5, -30.0), (0, 0.5, 5.0)]
+        )
+        capital = np.array([100.0, 50.0])
+
+        first, second = compute_metrics(
+            trades, capital, np.full(2, NOW - 3 * DAY), NOW, curve_points=10
+        )
+
+        assert first["total_trades"] == 3
+        assert first["win_rate"] == 66.67
+        assert [point[1] for point in first["equity_curve"]] == [110.0, 80.0, 85.0]
+        assert first["max_drawdown_abs"] == 30.0
+        assert first["max_drawdown"] == round(30 / 110, 6)
+        daily = np.array([0.10, -0.30, 0.05])
+        expected_sharpe = daily.mean() / daily.std(ddof=1) * np.sqrt(365)
+        assert first["sharpe_ratio"] == round(expected_sharpe, 4)
+        expected_sortino = daily.mean() / np.sqrt((np.minimum(daily, 0) ** 2).mean())
+        assert first["sortino_ratio"] == round(expected_sortino * np.sqrt(365), 4)
+
+        assert second["total_trades"] == 1
+        assert second["max_drawdown"] == 0.1
+        assert second["sortino_ratio"] < 0
+
+    def test_equity_curve_is_thinned(self):
+        """Test that long equity curves keep their first and last points."""
+        trades = columns([(0, 1 - i / 1000, 1.0) for i in range(1000)])
+
+        (metrics,) = compute_metrics(
+            trades, np.array([100.0]), np.array([NOW - DAY]), NOW, curve_points=5
+        )
+
+        curve = metrics["equity_curve"]
+        assert len(curve) == 5
+        assert (curve[0][1], curve[-1][1]) == (101.0, 1100.0)
+
+    def test_weekly_buckets_start_on_monday(self):
+        """Test that weekly profit is bucketed by ISO week."""
+        # NOW is Saturday 2025-03-01
+        trades = columns([(0, 0, 1.0), (0, 5, 2.0), (0, 6, 4.0), (1, 0, 8.0)])
+
+        series = bucket_profit(trades, 2, "W")
+
+        assert series[0] == [
+            {"period": "2025-02-17", "profit": 4.0},
+            {"period": "2025-02-24", "profit": 3.0},
+        ]
+        assert series[1] == [{"period": "2025-02-24", "profit": 8.0}]
+
+
+class TestTradeAnalyticsEngine:
+    """Test cases for batching and caching in TradeAnalyticsEngine."""
+
+    @pytest_asyncio.fixture
+    async def db(self):
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        queries = []
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def count_queries(conn, cursor, statement, parameters, context, executemany):
+            if "FROM bot_trades" in statement:
+                queries.append(parameters)
+
+        async with async_sessionmaker(bind=engine)() as db:
+            for trade_id, (bot_name, days_ago, profit) in enumerate(
+                [("a", 0.5, 10.0), ("a", 10, -4.0), ("b", 3, 6.0), ("c", 1, 1.0)]
+            ):
+                db.add(
+                    BotTrade(
+                        bot_name=bot_name,
+                        ft_trade_id=trade_id,
+                        pair="ETH/USDT",
+                        is_open=False,
+                        close_date=datetime.fromtimestamp(
+                            NOW - days_ago * DAY, tz=timezone.utc
+                        ),
+                        profit_abs=profit,
+                    )
+                )
+            await db.commit()
+            db.info["queries"] = queries
+            yield db
+        await engine.dispose()
+
+    @pytest.fixture
+    def engine(self, fake_redis):
+        cache = CacheService(local_ttl=60)
+        cache.redis = fake_redis
+        return TradeAnalyticsEngine(cache=cache)
+
+    @pytest.mark.asyncio
+    async def test_many_groups_and_windows_use_one_query(self, db, engine):
+        """Test that a batch loads its trades once and is then cached."""
+        groups = [
+            TradeGroup("bot:1", ["a"], 100),
+            TradeGroup("bot:2", ["b"], 100),
+            TradeGroup("user:1", ["a", "b"], 200),
+        ]
+
+        results = await engine.analyze(db, groups, ["24h", "7d", "all"], now=NOW)
+
+        assert len(db.info["queries"]) == 1
+        assert results[("bot:1", "24h")]["total_profit"] == 10.0
+        assert results[("bot:1", "all")]["total_profit"] == 6.0
+        assert results[("bot:2", "24h")]["total_trades"] == 0
+        assert results[("user:1", "7d")]["total_profit"] == 16.0
+
+        again = await engine.analyze(db, groups, ["24h", "7d", "all"], now=NOW)
+        assert again == results
+        assert len(db.info["queries"]) == 1
+        assert engine.get_stats()["batches"] == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidation_recomputes_the_bots_groups(self, db, engine):
+        """Test that invalidating a bot drops the groups that include it."""
+        groups = [TradeGroup("bot:3", ["c"], 100), TradeGroup("bot:1", ["a"], 100)]
+        await engine.analyze(db, groups, ["all"], now=NOW)
+
+        await engine.invalidate("c")
+        await engine.analyze(db, groups, ["all"], now=NOW)
+
+        queries = db.info["queries"]
+        assert len(queries) == 2
+        assert "c" in queries[1] and "a" not in queries[1]
+
+    @pytest.mark.asyncio
+    async def test_results_of_invalidated_trades_are_not_cached(self, db, engine):
+        """Test that trades ingested during a computation are not hidden by it."""
+        groups = [TradeGroup("bot:3", ["c"], 100)]
+        load = engine._load
+
+        async def load_then_ingest(*args):
+            trades = await load(*args)
+            await engine.invalidate("c")
+            return trades
+
+        engine._load = load_then_ingest
+        await engine.analyze(db, groups, ["all"], now=NOW)
+        engine._load = load
+        await engine.analyze(db, groups, ["all"], now=NOW)
+
+        assert len(db.info["queries"]) == 2
+        assert engine.cache.get_stats()["stale_writes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_changed_group_is_not_served_from_cache(self, db, engine):
+        """Test that a portfolio with other bots or capital is recomputed."""
+        first = await engine.analyze(
+            db, [TradeGroup("user:1", ["a"], 100)], ["all"], now=NOW
+        )
+        more_bots = await engine.analyze(
+            db, [TradeGroup("user:1", ["a", "b"], 100)], ["all"], now=NOW
+        )
+        more_capital = await engine.analyze(
+            db, [TradeGroup("user:1", ["a", "b"], 200)], ["all"], now=NOW
+        )
+
+        assert len(db.info["queries"]) == 3
+        assert first[("user:1", "all")]["total_profit"] == 6.0
+        assert more_bots[("user:1", "all")]["total_trades"] > (
+            first[("user:1", "all")]["total_trades"]
+        )
+        assert more_capital[("user:1", "all")]["max_drawdown"] != (
+            more_bots[("user:1", "all")]["max_drawdown"]
+        )
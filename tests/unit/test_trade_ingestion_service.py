@@ -0,0 +1,120 @@
+import sqlite3
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from management_server.models.base import Base
+from management_server.models.models import BotTrade, TradeIngestionCheckpoint
+from management_server.services.trade_ingestion_service import TradeIngestionService
+
+
+def create_bot_db(bots_dir, bot_name):
+    """Minimal freqtrade tradesv3.sqlite with trades and orders tables."""
+    (bots_dir / bot_name).mkdir(parents=True)
+    conn = sqlite3.connect(bots_dir / bot_name / "tradesv3.sqlite")
+    conn.execute(
+        "CREATE TABLE trades (id INTEGER PRIMARY KEY, exchange TEXT, pair TEXT,"
+        " is_open BOOLEAN, is_short BOOLEAN, open_date DATETIME, close_date DATETIME,"
+        " open_rate FLOAT, close_rate FLOAT, amount FLOAT, stake_amount FLOAT,"
+        " close_profit FLOAT, close_profit_abs FLOAT, exit_reason TEXT,"
+        " enter_tag TEXT, strategy TEXT, timeframe INTEGER)"
+    )
+    conn.execute(
+        "CREATE TABLE orders (id INTEGER PRIMARY KEY, ft_trade_id INTEGER, status TEXT)"
+    )
+    conn.commit()
+    return conn
+
+
+def open_trade(conn, trade_id, pair):
+    conn.execute(
+        "INSERT INTO trades (id, exchange, pair, is_open, is_short, open_date,"
+        " open_rate, amount, stake_amount, strategy, timeframe)"
+        " VALUES (?, 'binance', ?, 1, 0, '2025-01-01 10:00:00.000000', 100, 1, 100,"
+        " 'TestStrategy', 5)",
+        (trade_id, pair),
+    )
+    conn.execute(
+        "INSERT INTO orders (ft_trade_id, status) VALUES (?, 'closed')", (trade_id,)
+    )
+    conn.commit()
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(bind=engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+class TestTradeIngestionService:
+    """Test cases for tailing bot trade databases."""
+
+    @pytest.mark.asyncio
+    async def test_incremental_ingestion_updates_closed_trades(
+        self, session_factory, tmp_path
+    ):
+        """Test that only changed trades are read and closed trades are updated."""
+        conn = create_bot_db(tmp_path, "bot_a")
+        open_trade(conn, 1, "BTC/USDT")
+        open_trade(conn, 2, "ETH/USDT")
+
+        event_bus = AsyncMock()
+        service = TradeIngestionService(
+            session_factory, bots_dir=str(tmp_path), event_bus=event_bus
+        )
+        assert await service.ingest_all() == 2
+        assert await service.ingest_all() == 0
+
+        # Trade 1 exits: the order row is updated in place, no new IDs
+        conn.execute(
+            "UPDATE trades SET is_open = 0, close_date = '2025-01-01 12:00:00.000000',"
+            " close_rate = 110, close_profit = 0.1, close_profit_abs = 10,"
+            " exit_reason = 'roi' WHERE id = 1"
+        )
+        conn.commit()
+        open_trade(conn, 3, "SOL/USDT")
+        conn.close()
+
+        assert await service.ingest_all() == 2
+
+        async with session_factory() as db:
+            trades = {
+                trade.ft_trade_id: trade
+                for trade in (await db.execute(select(BotTrade))).scalars()
+            }
+            checkpoint = await db.get(TradeIngestionCheckpoint, "bot_a")
+
+        assert len(trades) == 3
+        assert trades[1].is_open is False
+        assert trades[1].profit_abs == 10
+        assert trades[1].close_date.year == 2025
+        assert trades[1].timeframe == 5
+        assert checkpoint.last_trade_id == 3
+        assert checkpoint.last_order_id == 3
+        assert checkpoint.open_trade_ids == [2, 3]
+
+        published = [call.args for call in event_bus.publish_batch.await_args_list]
+        assert published[0][0] == "bot_events"
+        event_data, event_type = published[0][1][0]
+        assert event_type == "TRADES_INGESTED"
+        assert [trade["ft_trade_id"] for trade in event_data["trades"]] == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_bot_database_is_switched_to_wal(self, session_factory, tmp_path):
+        """Test that bot databases are moved to WAL so reads never block the bot."""
+        create_bot_db(tmp_path, "bot_b").close()
+        service = TradeIngestionService(
+            session_factory, bots_dir=str(tmp_path), event_bus=AsyncMock()
+        )
+
+        await service.ingest_all()
+
+        conn = sqlite3.connect(tmp_path / "bot_b" / "tradesv3.sqlite")
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        conn.close()
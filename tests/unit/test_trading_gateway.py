@@ -20,7 +20,18 @@ def event_bus():
 
 
 @pytest.fixture
-def bot_process_manager(event_bus):
+def rest_client(monkeypatch):
+    """Fresh FtRestClientService the manager registers started bots with."""
+    from trading_gateway.services import bot_process_manager as bpm_module
+    from trading_gateway.services.ft_rest_client_service import FtRestClientService
+
+    client = FtRestClientService()
+    monkeypatch.setattr(bpm_module, "ft_rest_client_service", client)
+    return client
+
+
+@pytest.fixture
+def bot_process_manager(event_bus, rest_client):
     """BotProcessManager instance for testing."""
     manager = BotProcessManager(event_bus)
     return manager
@@ -174,6 +185,196 @@ class TestBotProcessManager:
         # Check the event_type parameter (should be the third positional arg or in kwargs)
         assert "BOT_START_FAILED" in str(publish_call)
 
+    @pytest.mark.asyncio
+    async def test_push_modes_register_the_bot_connection(
+        self, bot_process_manager, monkeypatch
+    ):
+        """Test that push-mode bots get their push settings and a REST connection."""
+        import shutil
+        from trading_gateway.services import bot_process_manager as bpm_module
+
+        rest_client = MagicMock()
+        rest_client.add_bot = AsyncMock()
+        rest_client.remove_bot = AsyncMock()
+        monkeypatch.setattr(bpm_module, "ft_rest_client_service", rest_client)
+
+        try:
+            for mode in ("websocket", "webhook"):
+                monkeypatch.setattr(bpm_module.gateway_settings, "BOT_PUSH_MODE", mode)
+                bot_name = f"push_{mode}"
+                with patch("subprocess.Popen") as mock_popen:
+                    mock_popen.return_value = MagicMock(pid=1)
+                    await bot_process_manager.handle_start_bot_command(
+                        {"bot_name": bot_name, "bot_config": {}}
+                    )
+                config = rest_client.add_bot.await_args.args[1]
+                api_server = bot_process_manager.bot_configs[bot_name]["api_server"]
+                assert config["api_url"].endswith(f":{api_server['listen_port']}")
+
+                if mode == "websocket":
+                    assert api_server["enable_message_ws"] is True
+                    assert config["api_server"]["ws_token"] == api_server["ws_token"]
+                else:
+                    webhook = bot_process_manager.bot_configs[bot_name]["webhook"]
+                    assert webhook["url"].endswith(f"?token={config['webhook_token']}")
+
+                bot_process_manager.running_bots[bot_name] = MagicMock()
+                await bot_process_manager.handle_stop_bot_command(
+                    {"bot_name": bot_name}
+                )
+                rest_client.remove_bot.assert_awaited_with(bot_name)
+        finally:
+            for mode in ("websocket", "webhook"):
+                shutil.rmtree(
+                    bot_process_manager.base_bot_dir / f"push_{mode}",
+                    ignore_errors=True,
+                )
+
+    @pytest.mark.asyncio
+    async def test_default_mode_bot_is_polled_into_the_snapshot(
+        self, bot_process_manager, rest_client, monkeypatch
+    ):
+        """Test that a bot started without push mode reaches the snapshot."""
+        import shutil
+        from trading_gateway.services import bot_process_manager as bpm_module
+        from trading_gateway.services.bot_status_snapshot import BotStatusSnapshot
+
+        monkeypatch.setattr(bpm_module.gateway_settings, "BOT_PUSH_MODE", "off")
+        rest_client.get_bot_status = AsyncMock(return_value=[{"trade_id": 1}])
+        snapshot = BotStatusSnapshot(rest_client)
+
+        try:
+            with patch("subprocess.Popen") as mock_popen:
+                mock_popen.return_value = MagicMock(pid=1)
+                await bot_process_manager.handle_start_bot_command(
+                    {"bot_name": "polled_bot", "bot_config": {}}
+                )
+            port = bot_process_manager.bot_configs["polled_bot"]["api_server"][
+                "listen_port"
+            ]
+            assert rest_client.connections["polled_bot"].url.endswith(f":{port}")
+
+            await snapshot.refresh_field("status")
+            status = snapshot.read("polled_bot", "status")
+            assert status["data"] == [{"trade_id": 1}]
+
+            await bot_process_manager.handle_stop_bot_command(
+                {"bot_name": "polled_bot"}
+            )
+            await snapshot.refresh_field("status")
+            assert "polled_bot" not in rest_client.connections
+            assert "polled_bot" not in snapshot.bots
+        finally:
+            shutil.rmtree(
+                bot_process_manager.base_bot_dir / "polled_bot", ignore_errors=True
+            )
+
+    @pytest.mark.asyncio
+    async def test_emergency_stop_releases_push_connections(
+        self, bot_process_manager, monkeypatch
+    ):
+        """Test that killed push-mode bots lose their connection and token."""
+        import shutil
+        from trading_gateway.services import bot_process_manager as bpm_module
+
+        rest_client = MagicMock()
+        rest_client.add_bot = AsyncMock()
+        rest_client.remove_bot = AsyncMock()
+        monkeypatch.setattr(bpm_module, "ft_rest_client_service", rest_client)
+        monkeypatch.setattr(bpm_module.gateway_settings, "BOT_PUSH_MODE", "webhook")
+
+        try:
+            with patch("subprocess.Popen") as mock_popen:
+                mock_popen.return_value = MagicMock(pid=1)
+                await bot_process_manager.handle_start_bot_command(
+                    {"bot_name": "push_killed", "bot_config": {}}
+                )
+            assert "push_killed" in bot_process_manager.webhook_tokens
+
+            await bot_process_manager.handle_emergency_stop_all_command()
+
+            rest_client.remove_bot.assert_awaited_once_with("push_killed")
+            assert bot_process_manager.webhook_tokens == {}
+        finally:
+            shutil.rmtree(
+                bot_process_manager.base_bot_dir / "push_killed", ignore_errors=True
+            )
+
+    @pytest.mark.asyncio
+    async def test_failed_start_drops_webhook_token(
+        self, bot_process_manager, event_bus, monkeypatch
+    ):
+        """Test that a bot that failed to start has no accepted webhook token."""
+        import shutil
+        from trading_gateway.services import bot_process_manager as bpm_module
+
+        monkeypatch.setattr(bpm_module.gateway_settings, "BOT_PUSH_MODE", "webhook")
+
+        try:
+            with patch("subprocess.Popen", side_effect=OSError("no freqtrade")):
+                await bot_process_manager.handle_start_bot_command(
+                    {"bot_name": "push_failed", "bot_config": {}}
+                )
+
+            assert "BOT_START_FAILED" in str(event_bus.publish.call_args)
+            assert "push_failed" not in bot_process_manager.webhook_tokens
+        finally:
+            shutil.rmtree(
+                bot_process_manager.base_bot_dir / "push_failed", ignore_errors=True
+            )
+
+    @pytest.mark.asyncio
+    async def test_emergency_stop_unpins_models(self, bot_process_manager):
+        """Test that models of killed bots are unpinned and can be evicted."""
+        import shutil
+        from trading_gateway.services.freqai_model_handler import FreqAIModelHandler
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            handler = FreqAIModelHandler(cache_dir=temp_dir)
+            bot_process_manager._freqai_handler = handler
+            try:
+                with patch("subprocess.Popen") as mock_popen:
+                    mock_popen.return_value = MagicMock(pid=1)
+                    await bot_process_manager.handle_start_bot_command(
+                        {
+                            "bot_name": "pinned_killed",
+                            "bot_config": {},
+                            "freqai_model": {
+                                "filename": "model.joblib",
+                                "content_b64": "ZmFrZSBtb2RlbCBkYXRh",
+                            },
+                        }
+                    )
+                assert handler.pinned_bots == {"pinned_killed"}
+
+                await bot_process_manager.handle_emergency_stop_all_command()
+
+                assert handler.pinned_bots == set()
+                assert handler.get_cache_stats()["pinned_models"] == 0
+            finally:
+                shutil.rmtree(
+                    bot_process_manager.base_bot_dir / "pinned_killed",
+                    ignore_errors=True,
+                )
+
+    @pytest.mark.asyncio
+    async def test_start_with_missing_model_publishes_failure(
+        self, bot_process_manager, event_bus
+    ):
+        """Test that a model that cannot be linked fails the start."""
+        command_data = {
+            "bot_name": "test_bot_missing_model",
+            "bot_config": {"exchange": {"name": "binance"}},
+            "freqai_model": {"sha256": "0" * 64, "filename": "model.joblib"},
+        }
+
+        with patch("subprocess.Popen") as mock_popen:
+            await bot_process_manager.handle_start_bot_command(command_data)
+
+        mock_popen.assert_not_called()
+        assert "BOT_START_FAILED" in str(event_bus.publish.call_args)
+        assert "test_bot_missing_model" not in bot_process_manager.bot_configs
+
 
 class TestFreqAIModelHandler:
     """Test cases for FreqAIModelHandler."""
@@ -306,6 +507,448 @@ class TestFreqAIModelHandler:
         assert model_handler.get_model_path("bot1") == path1
         assert model_handler.get_model_path("bot3") == path3
 
+    @pytest.mark.asyncio
+    async def test_shared_model_stored_once(self, model_handler):
+        """Test that bots with the same model share one physical file."""
+        model_data = {
+            "filename": "shared.joblib",
+            "content_b64": base64.b64encode(b"shared model").decode(),
+        }
+
+        path1 = await model_handler.store_model_for_bot("bot1", model_data)
+        path2 = await model_handler.store_model_for_bot("bot2", model_data)
+
+        assert path1 != path2
+        assert os.path.samefile(path1, path2)
+        assert len(model_handler.objects) == 1
+        assert model_handler.total_bytes == len(b"shared model")
+
+        # Stopping one bot keeps the model for the other
+        await model_handler.cleanup_bot_models("bot1")
+        assert not os.path.exists(path1)
+        with open(path2, "rb") as f:
+            assert f.read() == b"shared model"
+
+    @pytest.mark.asyncio
+    async def test_byte_bound_eviction_skips_pinned_models(self):
+        """Test that the store stays within its byte budget without evicting running bots."""
+        from trading_gateway.services.freqai_model_handler import FreqAIModelHandler
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            handler = FreqAIModelHandler(cache_dir=temp_dir, max_store_size_mb=1)
+            megabyte = 1024 * 1024
+
+            def model(byte: bytes) -> dict:
+                return {
+                    "filename": "model.joblib",
+                    "content_b64": base64.b64encode(byte * (megabyte // 2)).decode(),
+                }
+
+            pinned = await handler.store_model_for_bot("running", model(b"a"), pin=True)
+            idle = await handler.store_model_for_bot("idle", model(b"b"))
+            await handler.store_model_for_bot("new", model(b"c"))
+
+            assert handler.total_bytes <= megabyte
+            assert os.path.exists(pinned)
+            assert not os.path.exists(idle)
+            assert handler.get_model_path("idle") is None
+            assert handler.get_cache_stats()["pinned_models"] == 1
+
+    @pytest.mark.asyncio
+    async def test_chunked_upload_resumes_and_verifies(self, model_handler):
+        """Test that a chunked upload resumes at the stored offset and is hash-checked."""
+        import hashlib
+        from trading_gateway.services.freqai_model_handler import (
+            ModelUploadOffsetError,
+        )
+
+        content = b"chunked model data" * 100
+        content_hash = hashlib.sha256(content).hexdigest()
+        first, rest = content[:1000], content[1000:]
+
+        def sha(chunk: bytes) -> str:
+            return hashlib.sha256(chunk).hexdigest()
+
+        received = await model_handler.write_chunk(content_hash, 0, first, sha(first))
+        assert received == 1000
+        with pytest.raises(ValueError):
+            await model_handler.write_chunk(content_hash, 1000, rest, sha(b"corrupt"))
+        with pytest.raises(ModelUploadOffsetError) as exc_info:
+            await model_handler.write_chunk(content_hash, 0, first, sha(first))
+        assert exc_info.value.received == 1000
+
+        # Resume after a dropped connection
+        assert model_handler.get_upload_state(content_hash) == {
+            "present": False,
+            "received": 1000,
+        }
+        await model_handler.write_chunk(content_hash, 1000, rest, sha(rest))
+        await model_handler.commit_upload(content_hash, len(content))
+
+        assert model_handler.get_upload_state(content_hash)["present"] is True
+        model_path = model_handler.link_model_for_bot(
+            "bot1", content_hash, "model.joblib", pin=True
+        )
+        with open(model_path, "rb") as f:
+            assert f.read() == content
+
+    @pytest.mark.asyncio
+    async def test_concurrent_chunks_at_one_offset_append_once(self, model_handler):
+        """Test that racing retries of a chunk do not both pass the offset check."""
+        import hashlib
+        from trading_gateway.services.freqai_model_handler import (
+            ModelUploadOffsetError,
+        )
+
+        chunk = b"racing chunk" * 1000
+        content_hash = hashlib.sha256(chunk).hexdigest()
+        chunk_sha256 = hashlib.sha256(chunk).hexdigest()
+
+        results = await asyncio.gather(
+            *(
+                model_handler.write_chunk(content_hash, 0, chunk, chunk_sha256)
+                for _ in range(3)
+            ),
+            return_exceptions=True,
+        )
+
+        assert results.count(len(chunk)) == 1
+        assert sum(isinstance(r, ModelUploadOffsetError) for r in results) == 2
+        assert model_handler.get_upload_state(content_hash)["received"] == len(chunk)
+
+    @pytest.mark.asyncio
+    async def test_uploaded_model_is_leased_until_linked(self):
+        """Test that a committed model survives eviction until a bot links it."""
+        import hashlib
+        import time
+        from trading_gateway.services.freqai_model_handler import FreqAIModelHandler
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            handler = FreqAIModelHandler(
+                cache_dir=temp_dir, max_cache_size=1, lease_ttl=60
+            )
+            hashes = []
+            for content in (b"first model", b"second model"):
+                content_hash = hashlib.sha256(content).hexdigest()
+                await handler.write_chunk(
+                    content_hash, 0, content, hashlib.sha256(content).hexdigest()
+                )
+                await handler.commit_upload(content_hash, len(content))
+                hashes.append(content_hash)
+
+            # Both uploads wait for their bots, over the count limit
+            assert all(handler.has_model(content_hash) for content_hash in hashes)
+            assert handler.get_cache_stats()["leased_models"] == 2
+
+            handler.link_model_for_bot("bot1", hashes[0], "model.joblib", pin=True)
+            assert handler.get_cache_stats()["leased_models"] == 1
+
+            # An expired lease makes the unlinked model evictable again
+            handler.objects[hashes[1]].leased_until = time.monotonic() - 1
+            handler._evict()
+            assert not handler.has_model(hashes[1])
+            assert handler.has_model(hashes[0])
+
+    @pytest.mark.asyncio
+    async def test_commit_rejects_checksum_mismatch(self, model_handler):
+        """Test that a model not matching its hash is discarded."""
+        import hashlib
+
+        content_hash = hashlib.sha256(b"expected").hexdigest()
+        chunk = b"tampered"
+        await model_handler.write_chunk(
+            content_hash, 0, chunk, hashlib.sha256(chunk).hexdigest()
+        )
+
+        with pytest.raises(ValueError):
+            await model_handler.commit_upload(content_hash, len(chunk))
+        assert model_handler.get_upload_state(content_hash) == {
+            "present": False,
+            "received": 0,
+        }
+
+
+    @pytest.mark.asyncio
+    async def test_oversized_chunk_is_refused_before_buffering(
+        self, model_handler, monkeypatch
+    ):
+        """Test that chunk uploads over the size limit get 413 and write nothing."""
+        import hashlib
+        from fastapi import FastAPI
+        from httpx import ASGITransport, AsyncClient
+        from trading_gateway.api.v1 import models as models_api
+
+        monkeypatch.setattr(models_api, "freqai_model_handler", model_handler)
+        monkeypatch.setattr(
+            models_api.gateway_settings, "FREQAI_MODEL_MAX_CHUNK_MB", 1
+        )
+        app = FastAPI()
+        app.include_router(models_api.router, prefix="/api/v1/models")
+        content_hash = hashlib.sha256(b"model").hexdigest()
+        url = f"/api/v1/models/{content_hash}/chunks?offset=0"
+        oversized = b"x" * (1024 * 1024 + 1)
+        headers = {"X-Chunk-SHA256": hashlib.sha256(oversized).hexdigest()}
+
+        async def without_length():
+            for start in range(0, len(oversized), 64 * 1024):
+                yield oversized[start : start + 64 * 1024]
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            declared = await client.put(url, content=oversized, headers=headers)
+            streamed = await client.put(url, content=without_length(), headers=headers)
+            small = await client.put(
+                url,
+                content=b"model",
+                headers={"X-Chunk-SHA256": content_hash},
+            )
+
+        assert (declared.status_code, streamed.status_code) == (413, 413)
+        assert small.json()["received"] == 5
+
+
+class TestMarketDataProducerRegistry:
+    """Test cases for shared market data between bots."""
+
+    @staticmethod
+    def bot_config(port: int, pairs: list, timeframe: str = "5m") -> dict:
+        return {
+            "exchange": {"name": "Binance", "pair_whitelist": pairs},
+            "timeframe": timeframe,
+            "api_server": {"listen_port": port},
+        }
+
+    @pytest.fixture
+    def registry(self, monkeypatch):
+        from trading_gateway.services import market_data_producer
+
+        monkeypatch.setattr(
+            market_data_producer.gateway_settings, "MARKET_DATA_SHARING", "bots"
+        )
+        return market_data_producer.MarketDataProducerRegistry()
+
+    def test_covered_bots_consume_the_producer_feed(self, registry):
+        """Test that one bot per feed produces and covered bots consume it."""
+        producer_config = self.bot_config(9001, ["BTC/USDT", "ETH/USDT"])
+        consumer_config = self.bot_config(9002, ["ETH/USDT"])
+        uncovered_config = self.bot_config(9003, ["ETH/USDT", "SOL/USDT"])
+        other_timeframe_config = self.bot_config(9004, ["ETH/USDT"], "1h")
+
+        assert registry.assign("producer", producer_config) == "producer"
+        assert registry.assign("consumer", consumer_config) == "consumer"
+        assert registry.assign("uncovered", uncovered_config) == "standalone"
+        assert registry.assign("hourly", other_timeframe_config) == "producer"
+
+        producer = consumer_config["external_message_consumer"]["producers"][0]
+        assert producer_config["api_server"]["enable_message_ws"] is True
+        assert "enable_message_ws" not in consumer_config["api_server"]
+        assert producer["port"] == 9001
+        assert producer["ws_token"] == producer_config["api_server"]["ws_token"]
+        assert "external_message_consumer" not in uncovered_config
+        assert registry.get_stats()["feeds"]["binance:5m"]["consumers"] == ["consumer"]
+
+    def test_stopping_producer_orphans_consumers(self, registry):
+        """Test that consumers of a stopped producer are reported for restart."""
+        registry.assign("producer", self.bot_config(9001, ["BTC/USDT"]))
+        consumer_config = self.bot_config(9002, ["BTC/USDT"])
+        registry.assign("consumer", consumer_config)
+
+        assert registry.release("producer") == ["consumer"]
+        assert registry.producers == {}
+
+        # On restart the orphan becomes the new producer
+        assert registry.assign("consumer", consumer_config) == "producer"
+        assert "external_message_consumer" not in consumer_config
+
+    @pytest.mark.asyncio
+    async def test_bot_process_manager_writes_consumer_config(
+        self, registry, bot_process_manager, monkeypatch
+    ):
+        """Test that a bot started after a covering producer is configured as consumer."""
+        import shutil
+        from trading_gateway.services import bot_process_manager as bpm_module
+
+        monkeypatch.setattr(bpm_module, "market_data_registry", registry)
+        with patch("subprocess.Popen") as mock_popen:
+            mock_popen.return_value = MagicMock(pid=1)
+            for bot_name in ("md_producer", "md_consumer"):
+                config = self.bot_config(0, ["BTC/USDT"])
+                await bot_process_manager.handle_start_bot_command(
+                    {"bot_name": bot_name, "bot_config": config}
+                )
+
+        try:
+            with open(
+                bot_process_manager.base_bot_dir / "md_consumer" / "config.json"
+            ) as f:
+                consumer = json.load(f)["external_message_consumer"]
+            assert consumer["producers"][0]["port"] == (
+                bot_process_manager.bot_configs["md_producer"]["api_server"][
+                    "listen_port"
+                ]
+            )
+            assert registry.get_role("md_consumer") == "consumer"
+        finally:
+            for bot_name in ("md_producer", "md_consumer"):
+                shutil.rmtree(bot_process_manager.base_bot_dir / bot_name)
+
+    @pytest.mark.asyncio
+    async def test_consumers_share_one_exchange_fetch(self, registry):
+        """Test that consumers reach a stand-in producer feed with their config."""
+        import aiohttp
+        from aiohttp import web
+
+        exchange_fetches = []
+        candles = {}
+        feed = {}
+
+        async def message_ws(request):
+            # Stand-in for a producer bot's freqtrade message websocket
+            api_server = feed["api_server"]
+            if not api_server.get("enable_message_ws") or (
+                request.query.get("token") != api_server["ws_token"]
+            ):
+                raise web.HTTPForbidden()
+            websocket = web.WebSocketResponse()
+            await websocket.prepare(request)
+            await websocket.receive_json()  # subscribe
+            for pair in sorted(feed["pairs"]):
+                key = (pair, "5m")
+                if key not in candles:
+                    exchange_fetches.append(key)
+                    candles[key] = [[0, 1.0, 2.0, 0.5, 1.5, 10.0]]
+                await websocket.send_json(
+                    {
+                        "type": "analyzed_df",
+                        "data": {
+                            "key": [pair, "5m", "spot"],
+                            "df": candles[key],
+                        },
+                    }
+                )
+            await websocket.close()
+            return websocket
+
+        app = web.Application()
+        app.router.add_get("/api/v1/message/ws", message_ws)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        try:
+            producer_config = self.bot_config(port, ["BTC/USDT", "ETH/USDT"])
+            assert registry.assign("producer", producer_config) == "producer"
+            feed["api_server"] = producer_config["api_server"]
+            feed["pairs"] = whitelist = producer_config["exchange"]["pair_whitelist"]
+
+            received = {}
+            async with aiohttp.ClientSession() as session:
+                for consumer in ("consumer_1", "consumer_2"):
+                    config = self.bot_config(0, whitelist)
+                    assert registry.assign(consumer, config) == "consumer"
+                    producer = config["external_message_consumer"]["producers"][0]
+                    url = (
+                        f"ws://{producer['host']}:{producer['port']}"
+                        f"/api/v1/message/ws?token={producer['ws_token']}"
+                    )
+                    async with session.ws_connect(url) as websocket:
+                        await websocket.send_json(
+                            {"type": "subscribe", "data": ["analyzed_df"]}
+                        )
+                        received[consumer] = [
+                            message.json()["data"]["key"][0]
+                            async for message in websocket
+                        ]
+        finally:
+            await runner.cleanup()
+
+        assert received == {
+            "consumer_1": ["BTC/USDT", "ETH/USDT"],
+            "consumer_2": ["BTC/USDT", "ETH/USDT"],
+        }
+        assert exchange_fetches == [("BTC/USDT", "5m"), ("ETH/USDT", "5m")]
+
+
+class TestBotResourceSampler:
+    """Test cases for BotResourceSampler."""
+
+    @pytest.fixture
+    def sampler(self):
+        """Sampler watching the current test process as a fake bot."""
+        from trading_gateway.services.bot_resource_sampler import BotResourceSampler
+
+        process_manager = MagicMock()
+        process_manager.running_bots = {"self_bot": MagicMock(pid=os.getpid())}
+        return BotResourceSampler(process_manager, interval=0.01, history_size=3)
+
+    @pytest.mark.asyncio
+    async def test_sample_once_records_series(self, sampler):
+        """Test that a tick samples every running bot into its ring buffer."""
+        samples = await sampler.sample_once()
+
+        assert "self_bot" in samples
+        assert samples["self_bot"].rss_bytes > 0
+        assert samples["self_bot"].num_threads >= 1
+
+        resources = sampler.get_bot_resources("self_bot")
+        assert resources["latest"]["rss_bytes"] == samples["self_bot"].rss_bytes
+        assert len(resources["history"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_ring_buffer_keeps_latest_samples(self, sampler):
+        """Test that the series is bounded by the history size."""
+        for _ in range(5):
+            await sampler.sample_once()
+
+        history = sampler.get_bot_resources("self_bot")["history"]
+        assert len(history) == 3
+        timestamps = [sample["timestamp"] for sample in history]
+        assert timestamps == sorted(timestamps)
+
+    @pytest.mark.asyncio
+    async def test_stopped_bot_is_dropped(self, sampler):
+        """Test that series of bots that stopped running are discarded."""
+        await sampler.sample_once()
+        sampler.process_manager.running_bots = {}
+        await sampler.sample_once()
+
+        assert sampler.get_bot_resources("self_bot") is None
+        assert sampler.get_all_resources() == {}
+
+    def test_flags_detect_leak_and_pegged_cpu(self, sampler):
+        """Test memory leak and CPU saturation detection."""
+        from trading_gateway.services.bot_resource_sampler import (
+            ResourceSample,
+            ResourceSeries,
+        )
+
+        sampler.leak_window = 10
+        sampler.cpu_peg_window = 5
+        series = sampler.series["leaky_bot"] = ResourceSeries(10)
+        for i in range(10):
+            series.append(
+                ResourceSample(
+                    timestamp=1000.0 + i * 60,
+                    cpu_percent=99.0,
+                    rss_bytes=100_000_000 + i * 20_000_000,
+                    open_files=10,
+                    num_threads=4,
+                )
+            )
+
+        flags = sampler.get_flags("leaky_bot")
+        assert flags["memory_leak"] is True
+        assert flags["rss_growth_bytes_per_minute"] == pytest.approx(20_000_000)
+        assert flags["cpu_pegged"] is True
+
+        metrics = sampler.render_prometheus()
+        assert 'trading_gateway_bot_memory_leak{bot="leaky_bot"} 1' in metrics
+        assert 'trading_gateway_bot_rss_bytes{bot="leaky_bot"} 280000000' in metrics
+
 
 # BotService tests removed - they use global services that are hard to unit test
 # These are better tested in integration tests
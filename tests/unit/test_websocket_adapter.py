@@ -0,0 +1,380 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from trading_gateway.adapters.websocket_adapter import (
+    ClientConnection,
+    ConnectionManager,
+)
+
+
+def make_websocket(send_delay: float = 0):
+    """Fake WebSocket recording sent frames."""
+    websocket = MagicMock()
+    websocket.accept = AsyncMock()
+    websocket.sent = []
+
+    async def send_text(frame):
+        if send_delay:
+            await asyncio.sleep(send_delay)
+        websocket.sent.append(frame)
+
+    websocket.send_text = send_text
+    websocket.send_bytes = send_text
+    return websocket
+
+
+def make_event_bus():
+    """Event bus with a mocked Redis client."""
+    from management_server.tools.redis_streams_event_bus import RedisStreamsEventBus
+
+    bus = RedisStreamsEventBus("redis://localhost", "trading_gateway")
+    bus.redis = MagicMock()
+    return bus
+
+
+class TestConnectionManagerFanOut:
+    """Test cases for topic-indexed broadcast with per-client queues."""
+
+    @pytest.mark.asyncio
+    async def test_broadcast_reaches_only_topic_subscribers(self):
+        """Test that events are delivered to subscribers of the topic only."""
+        manager = ConnectionManager()
+        subscribed, other = make_websocket(), make_websocket()
+        await manager.connect(subscribed, "user_1")
+        await manager.connect(other, "user_2")
+        manager.subscribe(subscribed, ["bot_events"])
+        manager.subscribe(other, ["system"])
+
+        await manager.broadcast_event("bot_events", "bot_started", {"bot_name": "a"})
+        await asyncio.sleep(0.01)
+
+        assert len(subscribed.sent) == 1
+        assert json.loads(subscribed.sent[0])["payload"]["event_name"] == "BOT_STARTED"
+        assert other.sent == []
+
+        manager.disconnect(subscribed)
+        manager.disconnect(other)
+        assert manager.topic_subscribers == {}
+
+    @pytest.mark.asyncio
+    async def test_slow_client_does_not_delay_fast_client(self):
+        """Test that each client is written by its own task."""
+        manager = ConnectionManager()
+        slow, fast = make_websocket(send_delay=0.2), make_websocket()
+        for websocket in (slow, fast):
+            await manager.connect(websocket, "user")
+            manager.subscribe(websocket, ["bot_events"])
+
+        await manager.broadcast_event("bot_events", "bot_started", {})
+        await asyncio.sleep(0.01)
+
+        assert len(fast.sent) == 1
+        assert slow.sent == []
+        stats = manager.get_stats()
+        assert stats["topics"] == {"bot_events": 2}
+
+        manager.disconnect(slow)
+        manager.disconnect(fast)
+
+    def test_conflate_and_drop_policies(self):
+        """Test that pending state frames are conflated and full queues drop."""
+        client = ClientConnection(make_websocket(), max_queue=2, policy="conflate")
+
+        client.enqueue("status-1", key="bot_a")
+        client.enqueue("status-2", key="bot_a")
+        client.enqueue("trade-1")
+        client.enqueue("trade-2")
+
+        stats = client.get_stats()
+        assert stats["conflated"] == 1
+        assert stats["dropped"] == 1
+        assert [frame for frame, _ in client._pending.values()] == [
+            "trade-1",
+            "trade-2",
+        ]
+
+        client = ClientConnection(make_websocket(), max_queue=3, policy="conflate")
+        client.enqueue("started-1", key="bot_a")
+        client.enqueue("stopped", key="bot_b")
+        client.enqueue("started-2", key="bot_a")
+        assert [frame for frame, _ in client._pending.values()] == [
+            "stopped",
+            "started-2",
+        ]
+
+        client = ClientConnection(make_websocket(), max_queue=1, policy="drop_newest")
+        assert client.enqueue("first") is True
+        assert client.enqueue("second") is False
+        assert [frame for frame, _ in client._pending.values()] == ["first"]
+
+
+class TestBotStateStream:
+    """Test cases for conflated bot state deltas."""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_then_conflated_delta(self):
+        """Test that a burst of events becomes one patch per bot per flush."""
+        from trading_gateway.adapters.websocket_adapter import BotStateStream
+
+        manager = ConnectionManager()
+        stream = BotStateStream(manager, interval=1)
+        stream.apply_event("bot_a", "BOT_STARTING", {"action": "starting"})
+        stream.flush()
+
+        websocket = make_websocket()
+        await manager.connect(websocket, "user")
+        manager.subscribe(websocket, ["bot_state"])
+        stream.send_snapshot(manager.active_connections[websocket])
+
+        for action in ("stopping", "stopped", "starting", "running"):
+            stream.apply_event("bot_a", f"BOT_{action.upper()}", {"action": action})
+        stream.apply_event("bot_b", "BOT_STARTING", {"action": "starting"})
+        assert stream.flush() == 2
+        await asyncio.sleep(0.01)
+
+        frames = [json.loads(frame) for frame in websocket.sent]
+        assert [frame["type"] for frame in frames] == ["STATE_SNAPSHOT", "STATE_DELTA"]
+        assert frames[0]["bots"]["bot_a"]["action"] == "starting"
+        assert frames[1]["bots"]["bot_a"] == [
+            {"op": "replace", "path": "/action", "value": "running"},
+            {"op": "replace", "path": "/last_event", "value": "BOT_RUNNING"},
+        ]
+        assert {"op": "add", "path": "/action", "value": "starting"} in frames[1][
+            "bots"
+        ]["bot_b"]
+
+        # Nothing changed - nothing is sent
+        assert stream.flush() == 0
+        manager.disconnect(websocket)
+
+
+class TestWireProtocol:
+    """Test cases for negotiated websocket frame encodings."""
+
+    def test_negotiate_defaults_and_fallbacks(self):
+        """Test that JSON text is the default and unknown options fall back."""
+        from trading_gateway.adapters import ws_protocol
+
+        assert ws_protocol.negotiate() == ws_protocol.JSON_TEXT
+        assert ws_protocol.negotiate("xml", "brotli") == ws_protocol.JSON_TEXT
+        wire = ws_protocol.negotiate("msgpack", "deflate")
+        assert wire.compression == "deflate"
+        expected = "msgpack" if ws_protocol.MSGPACK_AVAILABLE else "json"
+        assert wire.encoding == expected
+        assert wire.is_binary
+
+    @pytest.mark.asyncio
+    async def test_frame_encoded_once_per_format(self):
+        """Test that subscribers sharing a format share one encoded payload."""
+        from trading_gateway.adapters.ws_protocol import WireFormat, decode
+
+        deflate = WireFormat("json", "deflate")
+        manager = ConnectionManager()
+        text_ws, deflate_ws_1, deflate_ws_2 = (make_websocket() for _ in range(3))
+        await manager.connect(text_ws, "user")
+        await manager.connect(deflate_ws_1, "user", deflate)
+        await manager.connect(deflate_ws_2, "user", deflate)
+        for websocket in (text_ws, deflate_ws_1, deflate_ws_2):
+            manager.subscribe(websocket, ["bot_events"])
+
+        await manager.broadcast_event("bot_events", "bot_started", {"n": 1})
+        await asyncio.sleep(0.01)
+
+        assert isinstance(text_ws.sent[0], str)
+        assert deflate_ws_1.sent[0] is deflate_ws_2.sent[0]
+        message = decode(deflate_ws_1.sent[0], deflate)
+        assert message == json.loads(text_ws.sent[0])
+
+        for websocket in (text_ws, deflate_ws_1, deflate_ws_2):
+            manager.disconnect(websocket)
+
+
+class TestCrossReplicaFanOut:
+    """Test cases for per-replica delivery of bot events."""
+
+    @pytest.mark.asyncio
+    async def test_state_events_of_a_bot_share_a_conflation_key(self, monkeypatch):
+        """Test that any state event supersedes the pending one of its bot."""
+        from trading_gateway.adapters import websocket_adapter
+
+        broadcast = AsyncMock()
+        monkeypatch.setattr(websocket_adapter.manager, "broadcast_event", broadcast)
+        monkeypatch.setattr(websocket_adapter, "bot_state_stream", MagicMock())
+
+        for event_name in ("BOT_STARTED", "BOT_STOPPED", "TRADE_CLOSED"):
+            await websocket_adapter.handle_redis_event(
+                {"type": event_name, "bot_name": "bot_a"}
+            )
+
+        keys = [call.kwargs["conflate_key"] for call in broadcast.await_args_list]
+        assert keys == ["bot_a", "bot_a", None]
+
+    @pytest.mark.asyncio
+    async def test_listener_uses_own_group_from_new_messages(self, monkeypatch):
+        """Test that each replica subscribes with its own consumer group."""
+        from trading_gateway.adapters import websocket_adapter
+
+        bus = MagicMock()
+        bus.redis = None
+        bus.subscribe = AsyncMock()
+        monkeypatch.setattr(websocket_adapter, "mcp_streams_event_bus", bus)
+        monkeypatch.setattr(
+            websocket_adapter.gateway_settings, "GATEWAY_REPLICA_ID", "replica-1"
+        )
+
+        await websocket_adapter.redis_event_listener()
+
+        bus.subscribe.assert_awaited_once_with(
+            "bot_events",
+            websocket_adapter.handle_redis_event,
+            consumer_group="ws_fanout:replica-1",
+            start_id="$",
+        )
+
+    @pytest.mark.asyncio
+    async def test_prune_stale_groups_keeps_live_ones(self, monkeypatch):
+        """Test that only idle fan-out groups of other replicas are removed."""
+        from trading_gateway.adapters import websocket_adapter
+
+        bus = make_event_bus()
+        bus.redis.xinfo_groups = AsyncMock(
+            return_value=[
+                {"name": "ws_fanout:me"},
+                {"name": "ws_fanout:live"},
+                {"name": "ws_fanout:dead"},
+                {"name": "trading_gateway"},
+            ]
+        )
+        idle = {"ws_fanout:live": 4000, "ws_fanout:dead": 10_000_000}
+        bus.redis.xinfo_consumers = AsyncMock(
+            side_effect=lambda stream, group: [{"idle": idle[group]}]
+        )
+        bus.destroy_consumer_group = AsyncMock(return_value=True)
+        monkeypatch.setattr(websocket_adapter, "mcp_streams_event_bus", bus)
+
+        pruned = await websocket_adapter.prune_stale_fanout_groups(
+            "bot_events", keep="ws_fanout:me"
+        )
+
+        assert pruned == ["ws_fanout:dead"]
+        bus.destroy_consumer_group.assert_awaited_once_with(
+            "bot_events", "ws_fanout:dead"
+        )
+
+    @pytest.mark.asyncio
+    async def test_prune_keeps_new_groups_without_consumers(self, monkeypatch):
+        """Test that a consumer-less group is only pruned once it left events unread."""
+        import time
+        from trading_gateway.adapters import websocket_adapter
+
+        now_ms = int(time.time() * 1000)
+        bus = make_event_bus()
+        bus.redis.xinfo_groups = AsyncMock(
+            return_value=[
+                {"name": "ws_fanout:starting", "last-delivered-id": "100-0"},
+                {"name": "ws_fanout:quiet", "last-delivered-id": "100-0"},
+                {"name": "ws_fanout:dead", "last-delivered-id": "100-0"},
+            ]
+        )
+        bus.redis.xinfo_consumers = AsyncMock(return_value=[])
+        # First entry after each group's last-delivered-id
+        unread = {
+            "ws_fanout:starting": [(f"{now_ms - 1000}-0", {})],
+            "ws_fanout:quiet": [],
+            "ws_fanout:dead": [(f"{now_ms - 10_000_000}-0", {})],
+        }
+        groups = iter(unread)
+        bus.redis.xrange = AsyncMock(
+            side_effect=lambda stream, min, count: unread[next(groups)]
+        )
+        bus.destroy_consumer_group = AsyncMock(return_value=True)
+        monkeypatch.setattr(websocket_adapter, "mcp_streams_event_bus", bus)
+
+        pruned = await websocket_adapter.prune_stale_fanout_groups(
+            "bot_events", keep="ws_fanout:me"
+        )
+
+        assert pruned == ["ws_fanout:dead"]
+        bus.redis.xrange.assert_any_await("bot_events", min="(100-0", count=1)
+
+    @pytest.mark.asyncio
+    async def test_listener_recreates_a_destroyed_group(self):
+        """Test that a listener whose group was removed recreates it and goes on."""
+        import redis.asyncio as redis
+
+        bus = make_event_bus()
+        bus.redis.xreadgroup = AsyncMock(
+            side_effect=[
+                redis.ResponseError("NOGROUP No such key or consumer group"),
+                asyncio.CancelledError(),
+            ]
+        )
+        bus._check_redis_connection = AsyncMock(return_value=True)
+        bus.ensure_consumer_group = AsyncMock(return_value=True)
+        bus._group_start_ids["bot_events"] = "$"
+        bus._listener_tasks["bot_events"] = MagicMock()
+
+        await bus._listen("bot_events", "ws_fanout:me")
+
+        bus.ensure_consumer_group.assert_awaited_once_with(
+            "bot_events", "ws_fanout:me", "$"
+        )
+        assert bus.redis.xreadgroup.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_unsubscribed_listener_does_not_recreate_its_group(self):
+        """Test that a group destroyed on shutdown is not brought back."""
+        import redis.asyncio as redis
+
+        bus = make_event_bus()
+        bus.redis.xreadgroup = AsyncMock(
+            side_effect=redis.ResponseError("NOGROUP No such key or consumer group")
+        )
+        bus._check_redis_connection = AsyncMock(return_value=True)
+        bus.ensure_consumer_group = AsyncMock(return_value=True)
+
+        await bus._listen("bot_events", "ws_fanout:me")
+
+        bus.ensure_consumer_group.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_release_stops_the_listener_before_destroying(self, monkeypatch):
+        """Test that the fan-out group is destroyed only after its listener stops."""
+        from trading_gateway.adapters import websocket_adapter
+
+        bus = MagicMock()
+        bus.unsubscribe = AsyncMock()
+        bus.destroy_consumer_group = AsyncMock(return_value=True)
+        monkeypatch.setattr(websocket_adapter, "mcp_streams_event_bus", bus)
+        monkeypatch.setattr(websocket_adapter, "fanout_group", "ws_fanout:me")
+        monkeypatch.setattr(
+            websocket_adapter.gateway_settings, "GATEWAY_REPLICA_ID", ""
+        )
+
+        await websocket_adapter.release_fanout_group()
+
+        assert [call[0] for call in bus.mock_calls] == [
+            "unsubscribe",
+            "destroy_consumer_group",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_per_bot_topic_filters_events(self):
+        """Test that "bot_events:<bot>" subscribers only get that bot's events."""
+        manager = ConnectionManager()
+        websocket = make_websocket()
+        await manager.connect(websocket, "user")
+        manager.subscribe(websocket, ["bot_events:bot_a"])
+
+        for bot_name in ("bot_a", "bot_b"):
+            await manager.broadcast_event(
+                "bot_events", "bot_started", {"bot_name": bot_name}, bot_name=bot_name
+            )
+        await asyncio.sleep(0.01)
+
+        assert [json.loads(frame)["payload"]["data"] for frame in websocket.sent] == [
+            {"bot_name": "bot_a"}
+        ]
+        manager.disconnect(websocket)
@@ -1,8 +1,21 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import Dict, Set, List, Optional
+from typing import Dict, Set, List, Optional, Any, Tuple, Union
+from collections import OrderedDict
+import copy
+import itertools
 import logging
+import os
+import socket
 import json
 import asyncio
+import time
+from trading_gateway.core.config import gateway_settings
+from trading_gateway.adapters.ws_protocol import (
+    Frame,
+    JSON_TEXT,
+    WireFormat,
+    send_payload,
+)
 from trading_gateway.services.ft_rest_client_service import ft_rest_client_service
 
 # We need the event bus to listen to our own events
@@ -16,31 +29,206 @@ router = APIRouter()
 
 # --- Connection Management ---
 class ClientConnection:
-    def __init__(self, websocket: WebSocket, user_id: Optional[str] = None):
+    """
+    A connected WebSocket client with its own bounded outbound queue.
+
+    Frames are queued by the broadcaster and sent by a per-client writer task,
+    so a slow client only delays itself. Frames carrying a conflation key
+    replace a still-pending frame with the same key instead of queueing up;
+    the replacement moves to the tail, after frames queued in between.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        user_id: Optional[str] = None,
+        max_queue: Optional[int] = None,
+        policy: Optional[str] = None,
+        wire: WireFormat = JSON_TEXT,
+    ):
         self.websocket = websocket
         self.user_id = user_id
+        self.wire = wire
         self.is_authenticated = False
         self.subscriptions: Set[str] = set()
 
+        self.max_queue = max_queue or gateway_settings.WS_SEND_QUEUE_SIZE
+        self.policy = policy or gateway_settings.WS_SLOW_CLIENT_POLICY
+        # queue key -> (frame, enqueued_at); unkeyed frames get a unique key
+        self._pending: "OrderedDict[Any, Tuple[Union[Frame, str], float]]" = (
+            OrderedDict()
+        )
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self.closed = False
+
+        self.sent = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.last_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+
+    def enqueue(self, frame: Union[Frame, str], key: Optional[Any] = None) -> bool:
+        """
+        Queue a frame for sending. Returns False if the frame was dropped.
+        Plain strings are sent as pre-encoded JSON text frames.
+        """
+        if self.closed:
+            return False
+
+        if key is not None and self.policy == "conflate" and key in self._pending:
+            # Deliver only the latest state, after everything queued before it
+            _, enqueued_at = self._pending.pop(key)
+            self._pending[key] = (frame, enqueued_at)
+            self.conflated += 1
+            return True
+
+        if len(self._pending) >= self.max_queue:
+            if self.policy == "drop_newest":
+                self.dropped += 1
+                return False
+            self._pending.popitem(last=False)
+            self.dropped += 1
+
+        if key is None or self.policy != "conflate":
+            key = next(self._seq)
+        self._pending[key] = (frame, time.monotonic())
+        self._wakeup.set()
+        return True
+
+    async def _write_loop(self):
+        try:
+            while True:
+                if not self._pending:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                _, (frame, enqueued_at) = self._pending.popitem(last=False)
+                if isinstance(frame, Frame):
+                    # Encoded on first use and shared with same-format clients
+                    await send_payload(self.websocket, frame.encode(self.wire))
+                else:
+                    await self.websocket.send_text(frame)
+                self.sent += 1
+                self.last_lag_ms = (time.monotonic() - enqueued_at) * 1000
+                self.max_lag_ms = max(self.max_lag_ms, self.last_lag_ms)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Stopped sending to client {self.websocket.client}: {e}")
+        finally:
+            self.closed = True
+            self._pending.clear()
+
+    def start_writer(self):
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_loop())
+
+    def close(self):
+        self.closed = True
+        self._pending.clear()
+        if self._writer is not None:
+            self._writer.cancel()
+            self._writer = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        oldest = next(iter(self._pending.values()), None)
+        return {
+            "user_id": self.user_id,
+            "subscriptions": sorted(self.subscriptions),
+            **self.wire.to_dict(),
+            "queue_depth": len(self._pending),
+            "queue_age_ms": (
+                round((time.monotonic() - oldest[1]) * 1000, 1) if oldest else 0.0
+            ),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "conflated": self.conflated,
+            "last_lag_ms": round(self.last_lag_ms, 1),
+            "max_lag_ms": round(self.max_lag_ms, 1),
+        }
+
 
 class ConnectionManager:
     def __init__(self):
         self.active_connections: Dict[WebSocket, ClientConnection] = {}
+        # topic -> subscribed clients, so a broadcast only visits its subscribers
+        self.topic_subscribers: Dict[str, Set[ClientConnection]] = {}
+        self.events_broadcast = 0
 
-    async def connect(self, websocket: WebSocket, user_id: Optional[str] = None):
+    async def connect(
+        self,
+        websocket: WebSocket,
+        user_id: Optional[str] = None,
+        wire: WireFormat = JSON_TEXT,
+    ):
         await websocket.accept()
-        self.active_connections[websocket] = ClientConnection(websocket, user_id)
+        client = ClientConnection(websocket, user_id, wire=wire)
+        self.active_connections[websocket] = client
         if user_id:
-            self.active_connections[websocket].is_authenticated = True
+            client.is_authenticated = True
+        client.start_writer()
         logger.info(f"New client connected: {websocket.client}, user_id: {user_id}")
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            del self.active_connections[websocket]
+        client = self.active_connections.pop(websocket, None)
+        if client is not None:
+            self._remove_subscriptions(client, list(client.subscriptions))
+            client.close()
         logger.info(f"Client disconnected: {websocket.client}")
 
-    async def broadcast_event(self, topic: str, event_name: str, data: dict):
-        event_message = json.dumps(
+    def subscribe(self, websocket: WebSocket, topics: List[str]) -> Set[str]:
+        client = self.active_connections.get(websocket)
+        if client is None:
+            return set()
+        client.subscriptions.update(topics)
+        for topic in topics:
+            self.topic_subscribers.setdefault(topic, set()).add(client)
+        return client.subscriptions
+
+    def unsubscribe(self, websocket: WebSocket, topics: List[str]) -> Set[str]:
+        client = self.active_connections.get(websocket)
+        if client is None:
+            return set()
+        self._remove_subscriptions(client, topics)
+        return client.subscriptions
+
+    def _remove_subscriptions(self, client: ClientConnection, topics: List[str]):
+        client.subscriptions.difference_update(topics)
+        for topic in topics:
+            subscribers = self.topic_subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(client)
+                if not subscribers:
+                    del self.topic_subscribers[topic]
+
+    def _subscribers(
+        self, topic: str, bot_name: Optional[str] = None
+    ) -> Set[ClientConnection]:
+        """Clients of a topic, plus those following only this bot ("topic:bot")."""
+        subscribers = self.topic_subscribers.get(topic, set())
+        if bot_name:
+            bot_subscribers = self.topic_subscribers.get(f"{topic}:{bot_name}")
+            if bot_subscribers:
+                return subscribers | bot_subscribers
+        return subscribers
+
+    async def broadcast_event(
+        self,
+        topic: str,
+        event_name: str,
+        data: dict,
+        conflate_key: Optional[Any] = None,
+        bot_name: Optional[str] = None,
+    ):
+        # Filter before encoding: events nobody here follows cost nothing
+        subscribers = self._subscribers(topic, bot_name)
+        if not subscribers:
+            return
+
+        # Encoded once per wire format, shared by all subscribers
+        event_message = Frame(
             {
                 "type": "EVENT",
                 "payload": {
@@ -50,21 +238,167 @@ class ConnectionManager:
                 },
             }
         )
-        # Create a list of tasks to send the message to all subscribed clients
-        tasks = []
-        for client in self.active_connections.values():
-            if client.is_authenticated and topic in client.subscriptions:
-                tasks.append(client.websocket.send_text(event_message))
+        key = (topic, conflate_key) if conflate_key is not None else None
+        queued = 0
+        for client in subscribers:
+            if client.is_authenticated and client.enqueue(event_message, key):
+                queued += 1
+
+        self.events_broadcast += 1
+        logger.debug(
+            f"Queued event '{event_name}' on topic '{topic}' for {queued} clients."
+        )
 
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
-            logger.info(
-                f"Broadcasted event '{event_name}' on topic '{topic}' to {len(tasks)} clients."
-            )
+    def get_stats(self) -> Dict[str, Any]:
+        clients = [client.get_stats() for client in self.active_connections.values()]
+        return {
+            "connections": len(clients),
+            "topics": {
+                topic: len(subscribers)
+                for topic, subscribers in self.topic_subscribers.items()
+            },
+            "events_broadcast": self.events_broadcast,
+            "queued_frames": sum(client["queue_depth"] for client in clients),
+            "dropped_frames": sum(client["dropped"] for client in clients),
+            "conflated_frames": sum(client["conflated"] for client in clients),
+            "max_lag_ms": max((client["max_lag_ms"] for client in clients), default=0),
+            "clients": clients,
+        }
 
 
 manager = ConnectionManager()
 
+
+# --- Bot State Deltas ---
+
+
+def diff_state(old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """JSON-patch style operations turning one flat bot state into another."""
+    ops = []
+    for key, value in new.items():
+        if key not in old:
+            ops.append({"op": "add", "path": f"/{key}", "value": value})
+        elif old[key] != value:
+            ops.append({"op": "replace", "path": f"/{key}", "value": value})
+    for key in old:
+        if key not in new:
+            ops.append({"op": "remove", "path": f"/{key}"})
+    return ops
+
+
+class BotStateStream:
+    """
+    Per-bot state for the "bot_state" topic, sent as a snapshot plus deltas.
+
+    Bot events update an in-memory state per bot; once per conflation interval
+    the bots that changed are diffed against what was last sent and a single
+    STATE_DELTA frame carrying patches for all of them is broadcast. A burst of
+    events for one bot within an interval therefore costs one patch. Clients
+    get a STATE_SNAPSHOT on subscribe, and again if frames were dropped for them.
+    """
+
+    topic = "bot_state"
+
+    def __init__(
+        self, connections: ConnectionManager, interval: Optional[float] = None
+    ):
+        self.connections = connections
+        self.interval = interval or gateway_settings.WS_STATE_CONFLATION_INTERVAL
+        self.states: Dict[str, Dict[str, Any]] = {}
+        self._sent: Dict[str, Dict[str, Any]] = {}
+        self._dirty: Set[str] = set()
+        # dropped frame count of each client when it was last in sync
+        self._client_drops: Dict[ClientConnection, int] = {}
+        self.version = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def apply_event(self, bot_name: str, event_name: str, data: Dict[str, Any]):
+        """Merge a bot event into the state of the bot."""
+        state = self.states.setdefault(bot_name, {})
+        for key, value in data.items():
+            if key != "bot_name":
+                state[key] = value
+        state["last_event"] = event_name
+        self._dirty.add(bot_name)
+
+    def remove_bot(self, bot_name: str):
+        if self.states.pop(bot_name, None) is not None:
+            self._dirty.add(bot_name)
+
+    def _snapshot_frame(self) -> Frame:
+        return Frame(
+            {
+                "type": "STATE_SNAPSHOT",
+                "version": self.version,
+                "bots": copy.deepcopy(self._sent),
+            }
+        )
+
+    def send_snapshot(self, client: ClientConnection):
+        """Send the last flushed state of all bots to one client."""
+        client.enqueue(self._snapshot_frame())
+        self._client_drops[client] = client.dropped
+
+    def flush(self) -> int:
+        """Broadcast patches for bots changed since the last flush."""
+        patches: Dict[str, Optional[List[Dict[str, Any]]]] = {}
+        for bot_name in self._dirty:
+            new = self.states.get(bot_name)
+            if new is None:
+                if self._sent.pop(bot_name, None) is not None:
+                    patches[bot_name] = None  # bot removed
+                continue
+            ops = diff_state(self._sent.get(bot_name, {}), new)
+            if ops:
+                patches[bot_name] = ops
+                self._sent[bot_name] = dict(new)
+        self._dirty.clear()
+        if not patches:
+            return 0
+
+        self.version += 1
+        subscribers = self.connections.topic_subscribers.get(self.topic, ())
+        delta = None
+        for client in list(subscribers):
+            if not client.is_authenticated:
+                continue
+            if self._client_drops.get(client) != client.dropped:
+                # Client missed frames, deltas would not apply - resync it
+                self.send_snapshot(client)
+                continue
+            if delta is None:
+                delta = Frame(
+                    {"type": "STATE_DELTA", "version": self.version, "bots": patches}
+                )
+            client.enqueue(delta)
+            self._client_drops[client] = client.dropped
+
+        for client in list(self._client_drops):
+            if client not in subscribers:
+                del self._client_drops[client]
+        return len(patches)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing bot state deltas: {e}")
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+bot_state_stream = BotStateStream(manager)
+
 # --- Redis Event Listener ---
 
 
@@ -99,10 +433,22 @@ async def handle_redis_event(event):
             logger.warning("Received Redis event without event_name")
             return
 
+        # State events of a bot supersede each other for slow clients,
+        # whatever their name; trade events are all delivered
+        conflate_key = None
+        if bot_name and not str(event_name).upper().startswith("TRADE_"):
+            conflate_key = bot_name
+
         # We assume all bot events belong to the 'bot_events' topic
         await manager.broadcast_event(
-            "bot_events", event_name, {"bot_name": bot_name, "details": data}
+            "bot_events",
+            event_name,
+            {"bot_name": bot_name, "details": data},
+            conflate_key=conflate_key,
+            bot_name=bot_name,
         )
+        if bot_name:
+            bot_state_stream.apply_event(bot_name, event_name, data)
 
     except json.JSONDecodeError as e:
         logger.error(f"Failed to parse JSON event data: {e}")
@@ -110,11 +456,56 @@ async def handle_redis_event(event):
         logger.error(f"Error processing Redis event: {e}")
 
 
+# --- Cross-Replica Fan-Out ---
+# Each gateway replica reads bot_events through a consumer group of its own,
+# so every replica receives every event once and delivers it to its clients.
+# A shared group would split the events between replicas.
+
+FANOUT_GROUP_PREFIX = "ws_fanout:"
+fanout_group: Optional[str] = None
+
+
+def fanout_consumer_group() -> str:
+    replica_id = (
+        gateway_settings.GATEWAY_REPLICA_ID or f"{socket.gethostname()}-{os.getpid()}"
+    )
+    return f"{FANOUT_GROUP_PREFIX}{replica_id}"
+
+
+async def prune_stale_fanout_groups(stream_name: str, keep: str) -> List[str]:
+    """Remove fan-out groups of replicas that stopped reading long ago."""
+    return await mcp_streams_event_bus.prune_idle_consumer_groups(
+        stream_name,
+        FANOUT_GROUP_PREFIX,
+        keep=keep,
+        ttl=gateway_settings.WS_FANOUT_GROUP_TTL,
+    )
+
+
 async def redis_event_listener():
     """Long-running task to listen for events on Redis and broadcast them."""
+    global fanout_group
     logger.info("Starting Redis event listener for WebSocket broadcasting...")
-    # We need to connect the bus first, which happens at app startup
-    await mcp_streams_event_bus.subscribe("bot_events", handle_redis_event)
+    fanout_group = fanout_consumer_group()
+    pruned = await prune_stale_fanout_groups("bot_events", keep=fanout_group)
+    if pruned:
+        logger.info(f"Pruned stale websocket fan-out groups: {pruned}")
+
+    # We need to connect the bus first, which happens at app startup.
+    # A new replica only needs events from now on, not the stream history.
+    await mcp_streams_event_bus.subscribe(
+        "bot_events", handle_redis_event, consumer_group=fanout_group, start_id="$"
+    )
+
+
+async def release_fanout_group():
+    """
+    Stop reading bot_events and drop this replica's consumer group unless its
+    id is stable. The listener goes first, or it would recreate the group.
+    """
+    await mcp_streams_event_bus.unsubscribe("bot_events")
+    if fanout_group and not gateway_settings.GATEWAY_REPLICA_ID:
+        await mcp_streams_event_bus.destroy_consumer_group("bot_events", fanout_group)
 
 
 # ... (WebSocket Endpoint is the same, just need to add the listener to app startup) ...
@@ -0,0 +1,148 @@
+"""
+Wire formats of the gateway WebSocket endpoints.
+
+Clients pick an encoding and compression at handshake through query
+parameters (`?encoding=msgpack&compression=deflate`). JSON text frames stay
+the default. Any other combination is sent as binary frames: the message
+is encoded with msgpack (or JSON) and optionally deflated with zlib.
+Broadcast messages are wrapped in a Frame, which encodes each wire format
+at most once no matter how many subscribers use it.
+"""
+
+import json
+import logging
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Union
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from trading_gateway.core.config import gateway_settings
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+ENCODINGS = ("json", "msgpack")
+COMPRESSIONS = ("none", "deflate")
+
+
+@dataclass(frozen=True)
+class WireFormat:
+    """Encoding and compression negotiated by one client."""
+
+    encoding: str = "json"
+    compression: str = "none"
+
+    @property
+    def is_binary(self) -> bool:
+        return self.encoding != "json" or self.compression != "none"
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"encoding": self.encoding, "compression": self.compression}
+
+
+JSON_TEXT = WireFormat()
+
+
+def negotiate(
+    encoding: Optional[str] = None, compression: Optional[str] = None
+) -> WireFormat:
+    """Wire format for the requested options, falling back to what is supported."""
+    encoding = (encoding or "json").lower()
+    compression = (compression or "none").lower()
+
+    if encoding not in ENCODINGS:
+        logger.warning(f"Unknown websocket encoding '{encoding}', using json")
+        encoding = "json"
+    elif encoding == "msgpack" and not MSGPACK_AVAILABLE:
+        logger.warning("msgpack is not installed, using json websocket frames")
+        encoding = "json"
+
+    if compression not in COMPRESSIONS:
+        logger.warning(f"Unknown websocket compression '{compression}', using none")
+        compression = "none"
+
+    return WireFormat(encoding, compression)
+
+
+def encode(message: Dict[str, Any], wire: WireFormat) -> Union[str, bytes]:
+    """Encode a message for a wire format: str for text frames, bytes for binary."""
+    if wire.encoding == "msgpack":
+        payload = msgpack.packb(message, default=str, use_bin_type=True)
+    else:
+        text = json.dumps(message, default=str)
+        if wire.compression == "none":
+            return text
+        payload = text.encode()
+
+    if wire.compression == "deflate":
+        payload = zlib.compress(payload, gateway_settings.WS_COMPRESSION_LEVEL)
+    return payload
+
+
+def decode(data: Union[str, bytes], wire: WireFormat) -> Dict[str, Any]:
+    """Decode a client message; text frames are always JSON. Raises ValueError."""
+    if isinstance(data, str):
+        return json.loads(data)
+    try:
+        if wire.compression == "deflate":
+            data = zlib.decompress(data)
+        if wire.encoding == "msgpack":
+            return msgpack.unpackb(data, raw=False)
+        return json.loads(data)
+    except zlib.error as e:
+        raise ValueError(f"Invalid compressed frame: {e}")
+    except ValueError:
+        raise
+    except Exception as e:
+        # msgpack reports malformed data with its own exception types
+        raise ValueError(f"Invalid binary frame: {e}")
+
+
+class Frame:
+    """A message shared by many clients, encoded once per wire format."""
+
+    __slots__ = ("message", "_encoded")
+
+    def __init__(self, message: Dict[str, Any]):
+        self.message = message
+        self._encoded: Dict[WireFormat, Union[str, bytes]] = {}
+
+    def encode(self, wire: WireFormat) -> Union[str, bytes]:
+        encoded = self._encoded.get(wire)
+        if encoded is None:
+            encoded = self._encoded[wire] = encode(self.message, wire)
+        return encoded
+
+
+async def send_payload(websocket: WebSocket, payload: Union[str, bytes]):
+    if isinstance(payload, str):
+        await websocket.send_text(payload)
+    else:
+        await websocket.send_bytes(payload)
+
+
+async def send_message(
+    websocket: WebSocket, message: Dict[str, Any], wire: WireFormat = JSON_TEXT
+):
+    """Send one message to one client in its wire format."""
+    await send_payload(websocket, encode(message, wire))
+
+
+async def receive_message(
+    websocket: WebSocket, wire: WireFormat = JSON_TEXT
+) -> Dict[str, Any]:
+    """Receive one client message. Raises ValueError on undecodable frames."""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+    if message.get("text") is not None:
+        return decode(message["text"], wire)
+    return decode(message.get("bytes") or b"", wire)
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from trading_gateway.services.ft_rest_client_service import ft_rest_client_service
+from trading_gateway.services.bot_status_snapshot import bot_status_snapshot
 
 router = APIRouter()
 
@@ -21,13 +22,24 @@ async def stop_bot(bot_name: str):
 @router.get("/{bot_name}/status", response_model=Dict[str, Any])
 async def get_bot_status(bot_name: str):
     try:
-        return await ft_rest_client_service.get_bot_status(bot_name)
+        return await ft_rest_client_service.get_cached(
+            bot_name, "status", ft_rest_client_service.get_bot_status
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/status/all", response_model=Dict[str, Dict[str, Any]])
-async def get_all_bots_status():
+async def get_all_bots_status(deadline: Optional[float] = None):
     try:
-        return await ft_rest_client_service.get_all_bots_status()
+        if bot_status_snapshot.is_running:
+            results = {}
+            for bot_name, connection in ft_rest_client_service.connections.items():
+                status = bot_status_snapshot.read(bot_name, "status") or {
+                    "error": "No status in snapshot yet"
+                }
+                status["ui_url"] = connection.ui_url
+                results[bot_name] = status
+            return results
+        return await ft_rest_client_service.get_all_bots_status(deadline=deadline)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
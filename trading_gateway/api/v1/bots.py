@@ -2,7 +2,9 @@
 API endpoints for bot management in the Trading Gateway.
 """
 
-from fastapi import APIRouter
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Body, HTTPException
 from ...services.bot_service import bot_service
 
 router = APIRouter()
@@ -33,6 +35,86 @@ async def get_all_bots_status():
     return await bot_service.get_all_bots_status()
 
 
+@router.get("/snapshot")
+async def get_bots_snapshot(since_version: int = 0):
+    """
+    Get the background snapshot of all bots (status, trades, profit, balance).
+    Only bots changed after `since_version` are returned.
+    """
+    from ...services.bot_status_snapshot import bot_status_snapshot
+
+    return {"status": "success", **bot_status_snapshot.read_all(since_version)}
+
+
+@router.get("/{bot_name}/snapshot")
+async def get_bot_snapshot(bot_name: str):
+    """Get the background snapshot of a bot with per-field staleness."""
+    from ...services.bot_status_snapshot import bot_status_snapshot
+
+    snapshot = bot_status_snapshot.read_bot(bot_name)
+    if snapshot is None:
+        return {
+            "status": "error",
+            "bot_name": bot_name,
+            "error": "No snapshot for this bot",
+        }
+    return {"status": "success", "bot_name": bot_name, **snapshot}
+
+
+@router.post("/{bot_name}/webhook")
+async def receive_bot_webhook(
+    bot_name: str, payload: Dict[str, Any] = Body(...), token: Optional[str] = None
+):
+    """
+    Receive a freqtrade webhook message pushed by a bot. Only accepted in
+    webhook push mode, with the token the gateway put in the bot's webhook URL.
+    """
+    from ...services.bot_push_ingestor import bot_push_ingestor
+
+    if not await bot_push_ingestor.handle_webhook(bot_name, payload, token):
+        raise HTTPException(status_code=403, detail="Webhook not accepted")
+    return {"status": "success"}
+
+
+@router.get("/push/stats")
+async def get_push_stats():
+    """Get push ingestion mode and the bots currently delivering by push."""
+    from ...services.bot_push_ingestor import bot_push_ingestor
+
+    return {"status": "success", **bot_push_ingestor.get_stats()}
+
+
+@router.get("/market_data/producers")
+async def get_market_data_producers():
+    """Get the market data producer of each feed and the bots consuming it."""
+    from ...services.market_data_producer import market_data_registry
+
+    return {"status": "success", **market_data_registry.get_stats()}
+
+
+@router.get("/resources")
+async def get_all_bots_resources():
+    """Get the latest resource sample and leak/CPU flags of all running bots."""
+    from ...core.app import bot_resource_sampler
+
+    return {"status": "success", "bots": bot_resource_sampler.get_all_resources()}
+
+
+@router.get("/{bot_name}/resources")
+async def get_bot_resources(bot_name: str, limit: Optional[int] = None):
+    """Get the resource time series of a running bot."""
+    from ...core.app import bot_resource_sampler
+
+    resources = bot_resource_sampler.get_bot_resources(bot_name, limit=limit)
+    if resources is None:
+        return {
+            "status": "error",
+            "bot_name": bot_name,
+            "error": "No resource samples for this bot",
+        }
+    return {"status": "success", **resources}
+
+
 @router.get("/{bot_name}/predictions")
 async def get_bot_predictions(
     bot_name: str,
@@ -0,0 +1,51 @@
+"""
+Caching exchange proxy endpoints of the Trading Gateway.
+
+Used as ccxt `proxyUrl`: the upstream exchange URL is appended to
+`/api/v1/exchange_proxy/{exchange_id}/`.
+"""
+
+import asyncio
+
+import aiohttp
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from ...services.exchange_proxy import exchange_proxy
+
+router = APIRouter()
+
+
+@router.get("/stats")
+async def get_exchange_proxy_stats():
+    """Cache hits, coalesced requests and rate-limit budgets per exchange."""
+    return {"status": "success", **exchange_proxy.get_stats()}
+
+
+@router.api_route(
+    "/{exchange_id}/{target:path}", methods=["GET", "POST", "PUT", "DELETE"]
+)
+async def proxy_exchange_request(exchange_id: str, target: str, request: Request):
+    """Forward an exchange REST request, serving public reads from cache."""
+    # Some HTTP stacks merge the double slash of the embedded scheme
+    if target.startswith(("http:/", "https:/")) and "://" not in target:
+        target = target.replace(":/", "://", 1)
+    url = f"{target}?{request.url.query}" if request.url.query else target
+
+    try:
+        response = await exchange_proxy.fetch(
+            exchange_id.lower(),
+            request.method,
+            url,
+            headers=request.headers,
+            body=await request.body() or None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        raise HTTPException(status_code=502, detail=f"Exchange unreachable: {e}")
+
+    return Response(
+        content=response.body,
+        status_code=response.status,
+        media_type=response.content_type,
+    )
@@ -0,0 +1,82 @@
+"""
+API endpoints for chunked FreqAI model uploads to the Trading Gateway.
+
+The management server streams a model into the gateway's content-addressed
+store before sending START_BOT, so the command only carries the model hash.
+"""
+
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+from ...core.config import gateway_settings
+from ...services.freqai_model_handler import (
+    ModelUploadOffsetError,
+    freqai_model_handler,
+)
+
+router = APIRouter()
+
+
+async def read_chunk(request: Request) -> bytes:
+    """
+    Body of a chunk upload, refused with 413 as soon as it is known to exceed
+    FREQAI_MODEL_MAX_CHUNK_MB instead of after buffering it whole.
+    """
+    max_bytes = gateway_settings.FREQAI_MODEL_MAX_CHUNK_MB * 1024 * 1024
+    too_large = HTTPException(
+        status_code=413, detail=f"Chunk too large: more than {max_bytes} bytes"
+    )
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise too_large
+
+    # The declared length may be missing or wrong, the read is capped anyway
+    body = bytearray()
+    async for part in request.stream():
+        body.extend(part)
+        if len(body) > max_bytes:
+            raise too_large
+    return bytes(body)
+
+
+@router.get("/{content_hash}")
+async def get_model_upload_state(content_hash: str):
+    """Whether the model is stored, or how much of it was received so far."""
+    try:
+        state = freqai_model_handler.get_upload_state(content_hash)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "success", "content_hash": content_hash, **state}
+
+
+@router.put("/{content_hash}/chunks")
+async def upload_model_chunk(
+    content_hash: str,
+    request: Request,
+    offset: int,
+    chunk_sha256: str = Header(..., alias="X-Chunk-SHA256"),
+):
+    """Append a chunk at `offset`; 409 tells the client where to resume."""
+    chunk = await read_chunk(request)
+    try:
+        received = await freqai_model_handler.write_chunk(
+            content_hash, offset, chunk, chunk_sha256
+        )
+    except ModelUploadOffsetError as e:
+        return JSONResponse(
+            status_code=409,
+            content={"status": "error", "error": str(e), "received": e.received},
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "success", "content_hash": content_hash, "received": received}
+
+
+@router.post("/{content_hash}/commit")
+async def commit_model_upload(content_hash: str, size: int):
+    """Verify the uploaded model against its hash and add it to the store."""
+    try:
+        state = await freqai_model_handler.commit_upload(content_hash, size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "success", "content_hash": content_hash, **state}
@@ -1,6 +1,10 @@
 from fastapi import APIRouter
-from . import bots
+from . import bots, exchange_proxy, models
 
 api_router = APIRouter()
 api_router.include_router(bots.router, prefix="/bots", tags=["bots"])
+api_router.include_router(models.router, prefix="/models", tags=["models"])
+api_router.include_router(
+    exchange_proxy.router, prefix="/exchange_proxy", tags=["exchange_proxy"]
+)
 # WebSocket routes are added directly to the app in core/app.py
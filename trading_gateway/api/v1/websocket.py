@@ -16,7 +16,17 @@ from datetime import datetime
 
 from management_server.core.config import settings
 from management_server.auth.jwt import ALGORITHM, SECRET_KEY
-from trading_gateway.adapters.websocket_adapter import manager, ClientConnection
+from trading_gateway.adapters.websocket_adapter import (
+    manager,
+    ClientConnection,
+    bot_state_stream,
+)
+from trading_gateway.adapters.ws_protocol import (
+    JSON_TEXT,
+    negotiate,
+    receive_message,
+    send_message,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -44,45 +54,55 @@ async def handle_client_message(
 ):
     """Handle incoming messages from WebSocket clients."""
     message_type = message.get("type")
+    connection = manager.active_connections.get(websocket)
+    wire = connection.wire if connection else JSON_TEXT
 
     if message_type == "SUBSCRIBE":
         # Handle topic subscriptions
         topics = message.get("topics", [])
-        connection = manager.active_connections.get(websocket)
-        if connection:
-            connection.subscriptions.update(topics)
+        if websocket in manager.active_connections:
+            subscriptions = manager.subscribe(websocket, topics)
             logger.info(f"User {user_id} subscribed to topics: {topics}")
 
             # Send confirmation
-            await websocket.send_json(
+            await send_message(
+                websocket,
                 {
                     "type": "SUBSCRIBED",
-                    "topics": list(connection.subscriptions),
+                    "topics": list(subscriptions),
                     "timestamp": datetime.utcnow().isoformat(),
-                }
+                },
+                wire,
             )
 
+            # Dashboards following bot state start from a full snapshot
+            if bot_state_stream.topic in topics:
+                bot_state_stream.send_snapshot(manager.active_connections[websocket])
+
     elif message_type == "UNSUBSCRIBE":
         # Handle topic unsubscriptions
         topics = message.get("topics", [])
-        connection = manager.active_connections.get(websocket)
-        if connection:
-            connection.subscriptions.difference_update(topics)
+        if websocket in manager.active_connections:
+            subscriptions = manager.unsubscribe(websocket, topics)
             logger.info(f"User {user_id} unsubscribed from topics: {topics}")
 
             # Send confirmation
-            await websocket.send_json(
+            await send_message(
+                websocket,
                 {
                     "type": "UNSUBSCRIBED",
-                    "topics": list(connection.subscriptions),
+                    "topics": list(subscriptions),
                     "timestamp": datetime.utcnow().isoformat(),
-                }
+                },
+                wire,
             )
 
     elif message_type == "PING":
         # Handle ping/pong for connection health
-        await websocket.send_json(
-            {"type": "PONG", "timestamp": datetime.utcnow().isoformat()}
+        await send_message(
+            websocket,
+            {"type": "PONG", "timestamp": datetime.utcnow().isoformat()},
+            wire,
         )
 
     else:
@@ -92,10 +112,21 @@ async def handle_client_message(
 def add_websocket_routes(app):
     """Add WebSocket routes to the FastAPI app."""
 
+    @app.get("/ws/stats")
+    async def websocket_stats():
+        """Fan-out statistics: subscribers per topic, per-client queues and lag."""
+        return manager.get_stats()
+
     @app.websocket("/ws")
     async def websocket_endpoint(
         websocket: WebSocket,
         token: str | None = Query(None, description="JWT authentication token"),
+        encoding: str | None = Query(
+            None, description="Frame encoding: json or msgpack"
+        ),
+        compression: str | None = Query(
+            None, description="Frame compression: none or deflate"
+        ),
     ):
         """
         Main WebSocket endpoint for real-time communication.
@@ -106,41 +137,48 @@ def add_websocket_routes(app):
         - Live trading events
 
         Authentication: JWT token required via query parameter
-        Protocol: JSON messages with type/payload structure
+        Protocol: JSON messages with type/payload structure; binary msgpack
+        and/or deflate-compressed frames can be negotiated via query parameters
         """
         user_id = await authenticate_websocket(websocket, token)
+        wire = negotiate(encoding, compression)
 
         # Connect to WebSocket manager
-        await manager.connect(websocket, user_id)
+        await manager.connect(websocket, user_id, wire)
 
         logger.info(f"WebSocket connection established for user {user_id}")
 
         try:
             # Send welcome message
-            await websocket.send_json(
+            await send_message(
+                websocket,
                 {
                     "type": "WELCOME",
                     "user_id": user_id,
+                    "protocol": wire.to_dict(),
                     "timestamp": datetime.utcnow().isoformat(),
                     "message": "Connected to Freqtrade Multi-Bot System",
-                }
+                },
+                wire,
             )
 
             # Main message handling loop
             while True:
                 try:
                     # Receive message from client
-                    data = await websocket.receive_json()
+                    data = await receive_message(websocket, wire)
                     await handle_client_message(websocket, data, user_id)
 
                 except ValueError:
-                    # Invalid JSON
-                    await websocket.send_json(
+                    # Invalid JSON or undecodable binary frame
+                    await send_message(
+                        websocket,
                         {
                             "type": "ERROR",
                             "error": "Invalid JSON format",
                             "timestamp": datetime.utcnow().isoformat(),
-                        }
+                        },
+                        wire,
                     )
 
         except WebSocketDisconnect:
@@ -150,19 +188,29 @@ def add_websocket_routes(app):
         except Exception as e:
             logger.error(f"WebSocket error for user {user_id}: {e}")
             try:
-                await websocket.send_json(
+                await send_message(
+                    websocket,
                     {
                         "type": "ERROR",
                         "error": "Internal server error",
                         "timestamp": datetime.utcnow().isoformat(),
-                    }
+                    },
+                    wire,
                 )
             except:
                 pass  # Connection might be closed
             manager.disconnect(websocket)
 
     @app.websocket("/ws/mcp")
-    async def mcp_websocket_endpoint(websocket: WebSocket):
+    async def mcp_websocket_endpoint(
+        websocket: WebSocket,
+        encoding: str | None = Query(
+            None, description="Frame encoding: json or msgpack"
+        ),
+        compression: str | None = Query(
+            None, description="Frame compression: none or deflate"
+        ),
+    ):
         """
         WebSocket endpoint for MCP (Model Context Protocol) agents.
 
@@ -170,37 +218,43 @@ def add_websocket_routes(app):
         using the MCP protocol for enhanced communication.
         """
         # MCP handshake
+        wire = negotiate(encoding, compression)
         await websocket.accept()
 
-        await websocket.send_json(
+        await send_message(
+            websocket,
             {
                 "type": "HANDSHAKE",
                 "protocol": "mcp",
                 "version": "1.0",
+                **wire.to_dict(),
                 "capabilities": [
                     "real_time_events",
                     "command_execution",
                     "data_streaming",
                 ],
                 "timestamp": datetime.utcnow().isoformat(),
-            }
+            },
+            wire,
         )
 
         logger.info("MCP WebSocket connection established")
 
         try:
             while True:
-                data = await websocket.receive_json()
+                data = await receive_message(websocket, wire)
 
                 # Handle MCP protocol messages
                 if data.get("type") == "SUBSCRIBE":
                     # MCP subscription handling
-                    await websocket.send_json(
+                    await send_message(
+                        websocket,
                         {
                             "type": "SUBSCRIBED",
                             "topics": data.get("topics", []),
                             "timestamp": datetime.utcnow().isoformat(),
-                        }
+                        },
+                        wire,
                     )
 
                 elif data.get("type") == "COMMAND":
@@ -208,21 +262,25 @@ def add_websocket_routes(app):
                     command = data.get("command")
                     # Process MCP command
                     result = {"status": "executed", "command": command}
-                    await websocket.send_json(
+                    await send_message(
+                        websocket,
                         {
                             "type": "COMMAND_RESULT",
                             "result": result,
                             "timestamp": datetime.utcnow().isoformat(),
-                        }
+                        },
+                        wire,
                     )
 
                 else:
-                    await websocket.send_json(
+                    await send_message(
+                        websocket,
                         {
                             "type": "ERROR",
                             "error": f"Unknown MCP message type: {data.get('type')}",
                             "timestamp": datetime.utcnow().isoformat(),
-                        }
+                        },
+                        wire,
                     )
 
         except WebSocketDisconnect:
@@ -230,12 +288,14 @@ def add_websocket_routes(app):
         except Exception as e:
             logger.error(f"MCP WebSocket error: {e}")
             try:
-                await websocket.send_json(
+                await send_message(
+                    websocket,
                     {
                         "type": "ERROR",
                         "error": "MCP protocol error",
                         "timestamp": datetime.utcnow().isoformat(),
-                    }
+                    },
+                    wire,
                 )
             except:
                 pass
@@ -7,20 +7,30 @@ import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+
 # from prometheus_fastapi_instrumentator import Instrumentator
 
 from ..api.v1.router import api_router
 from ..api.v1 import websocket
-from ..adapters.websocket_adapter import redis_event_listener
+from ..adapters.websocket_adapter import (
+    redis_event_listener,
+    release_fanout_group,
+    bot_state_stream,
+)
 from management_server.tools.redis_streams_event_bus import mcp_streams_event_bus
 from shared.config.redis_streams import redis_streams_config
 from ..services.bot_process_manager import BotProcessManager
+from ..services.bot_resource_sampler import BotResourceSampler
+from ..services.bot_status_snapshot import bot_status_snapshot
+from ..services.bot_push_ingestor import bot_push_ingestor
+from ..services.exchange_proxy import exchange_proxy
 
 logger = logging.getLogger(__name__)
 
 
 # --- Global Instances ---
 bot_process_manager = BotProcessManager(event_bus=mcp_streams_event_bus)
+bot_resource_sampler = BotResourceSampler(bot_process_manager)
 
 
 async def command_handler(event_message):
@@ -69,6 +79,12 @@ async def lifespan(app: FastAPI):
     print("🚀 Starting Trading Gateway lifespan")
     logger.info("🚀 Starting Trading Gateway")
 
+    # Per-bot resource sampling and status polling do not depend on Redis
+    bot_resource_sampler.start()
+    bot_status_snapshot.start()
+    bot_push_ingestor.start()
+    bot_state_stream.start()
+
     try:
         print("🔌 Connecting to Redis...")
         # Connect to Redis
@@ -105,6 +121,12 @@ async def lifespan(app: FastAPI):
 
     print("🛑 Shutting down Trading Gateway")
     try:
+        await bot_resource_sampler.stop()
+        await bot_push_ingestor.stop()
+        await bot_state_stream.stop()
+        await bot_status_snapshot.stop()
+        await release_fanout_group()
+        await exchange_proxy.close()
         await mcp_streams_event_bus.disconnect()
     except Exception as e:
         logger.error(f"Error during shutdown: {e}")
@@ -150,6 +172,7 @@ trading_gateway_uptime_seconds {time.time()}
 # TYPE trading_gateway_active_bots gauge
 trading_gateway_active_bots {len(bot_process_manager.running_bots)}
 """
+        metrics_text += bot_resource_sampler.render_prometheus()
         return Response(
             metrics_text, media_type="text/plain; version=0.0.4; charset=utf-8"
         )
@@ -0,0 +1,120 @@
+"""
+Trading Gateway configuration with Pydantic settings.
+"""
+
+from typing import Dict, List
+
+from pydantic_settings import BaseSettings
+
+
+class GatewaySettings(BaseSettings):
+    """Trading Gateway settings."""
+
+    # Per-bot resource sampling
+    BOT_RESOURCE_SAMPLE_INTERVAL: float = 5.0  # seconds between sampler ticks
+    BOT_RESOURCE_HISTORY_SIZE: int = 720  # samples kept per bot (1h at 5s)
+    BOT_MEMORY_LEAK_WINDOW: int = 60  # samples used for RSS trend detection
+    BOT_MEMORY_LEAK_BYTES_PER_MINUTE: int = 5 * 1024 * 1024
+    BOT_CPU_PEG_WINDOW: int = 12  # samples used for CPU saturation detection
+    BOT_CPU_PEG_PERCENT: float = 90.0  # percent of a single core
+
+    # Freqtrade REST bulk operations
+    FT_BULK_MAX_CONCURRENCY: int = 20  # bots queried in parallel
+    FT_BULK_DEADLINE: float = 10.0  # seconds for the whole bulk call
+
+    # Freqtrade REST connection pool (shared by all bots)
+    FT_POOL_LIMIT: int = 100  # total open connections
+    FT_POOL_LIMIT_PER_HOST: int = 4  # open connections per bot
+    FT_KEEPALIVE_TIMEOUT: float = 30.0  # seconds an idle connection is kept
+
+    # Per-bot circuit breaker for freqtrade REST calls
+    FT_BREAKER_FAILURE_THRESHOLD: int = 3  # consecutive failures that open it
+    FT_BREAKER_RECOVERY_TIMEOUT: float = 30.0  # seconds open before a probe
+
+    # Background bot status snapshot (seconds between refreshes per field)
+    SNAPSHOT_STATUS_INTERVAL: float = 5.0
+    SNAPSHOT_TRADES_INTERVAL: float = 10.0
+    SNAPSHOT_PROFIT_INTERVAL: float = 30.0
+    SNAPSHOT_BALANCE_INTERVAL: float = 60.0
+    SNAPSHOT_JITTER: float = 0.1  # +/- fraction of the interval
+    SNAPSHOT_STALE_FACTOR: float = 3.0  # stale after this many missed intervals
+
+    # Push ingestion from bots: "off", "websocket" (freqtrade message
+    # websocket) or "webhook" (freqtrade webhook posting to the gateway)
+    BOT_PUSH_MODE: str = "off"
+    BOT_PUSH_REFRESH_DELAY: float = 0.5  # coalesce bursts of pushed events
+    BOT_PUSH_RECONNECT_DELAY: float = 5.0
+    BOT_PUSH_LEASE_TTL: float = 300.0  # poll again after this long without pushes
+    GATEWAY_PUBLIC_URL: str = "http://localhost:8001"  # webhook target for bots
+
+    # WebSocket fan-out: outbound frames queued per client, and what to do
+    # when a slow client's queue is full: "conflate" (replace pending state
+    # events of the same bot, else drop oldest), "drop_oldest", "drop_newest"
+    WS_SEND_QUEUE_SIZE: int = 256
+    WS_SLOW_CLIENT_POLICY: str = "conflate"
+    # Bot state deltas on the "bot_state" topic are flushed once per interval
+    WS_STATE_CONFLATION_INTERVAL: float = 0.25
+    WS_COMPRESSION_LEVEL: int = 6  # zlib level for clients negotiating deflate
+
+    # Cross-replica websocket fan-out: every replica reads bot_events through
+    # its own consumer group. Without a stable replica id the group is
+    # per-process and removed on shutdown; groups of replicas idle for longer
+    # than WS_FANOUT_GROUP_TTL seconds, or that have not read yet and left
+    # events unread for as long, are pruned at startup.
+    GATEWAY_REPLICA_ID: str = ""
+    WS_FANOUT_GROUP_TTL: float = 3600.0
+
+    # Content-addressed FreqAI model store: one file per unique model, shared
+    # by bots via hard links; unused models are evicted LRU beyond this size
+    FREQAI_MODEL_STORE_MAX_MB: int = 1024
+    # Uploaded models are kept from eviction until a bot links them, or for
+    # at most this many seconds
+    FREQAI_MODEL_LEASE_TTL: float = 600.0
+    # Largest chunk of a model upload; bigger requests are refused with 413
+    # before their body is read
+    FREQAI_MODEL_MAX_CHUNK_MB: int = 8
+
+    # Shared market data: "off", or "bots" to make the first bot of each
+    # exchange/timeframe the producer of analyzed candles for later bots it
+    # covers (freqtrade external message consumer mode)
+    MARKET_DATA_SHARING: str = "off"
+    MARKET_DATA_PRODUCER_HOST: str = "127.0.0.1"  # where consumers reach producers
+    MARKET_DATA_WAIT_TIMEOUT: int = 300  # seconds a consumer waits for a message
+
+    # Caching exchange proxy (/api/v1/exchange_proxy/{exchange}/<url>) used
+    # as ccxt proxyUrl by bots and the management API. Public GETs are cached
+    # for the TTL of the first keyword found in the URL path (0 = never).
+    EXCHANGE_PROXY_ENABLED: bool = False  # route started bots through the proxy
+    EXCHANGE_PROXY_ALLOWED_HOSTS: List[str] = [
+        "binance.com",
+        "bybit.com",
+        "kucoin.com",
+        "okx.com",
+        "kraken.com",
+        "gateio.ws",
+        "bitget.com",
+        "mexc.com",
+        "htx.com",
+    ]
+    EXCHANGE_PROXY_CACHE_TTLS: Dict[str, float] = {
+        "exchangeinfo": 300.0,
+        "instruments": 300.0,
+        "symbols": 300.0,
+        "markets": 300.0,
+        "currencies": 300.0,
+        "ticker": 2.0,
+        "depth": 1.0,
+        "orderbook": 1.0,
+        "klines": 5.0,
+        "candles": 5.0,
+    }
+    EXCHANGE_PROXY_RATE_LIMITS: Dict[str, float] = {}  # requests/s per exchange
+    EXCHANGE_PROXY_DEFAULT_RATE: float = 10.0
+    EXCHANGE_PROXY_MAX_ENTRIES: int = 10000
+    EXCHANGE_PROXY_TIMEOUT: float = 30.0
+
+    model_config = {"env_file": ".env", "case_sensitive": True, "extra": "ignore"}
+
+
+# Global settings instance
+gateway_settings = GatewaySettings()
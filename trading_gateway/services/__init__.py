@@ -4,12 +4,14 @@ Trading Gateway Services
 
 from .bot_service import bot_service
 from .bot_process_manager import BotProcessManager
+from .bot_resource_sampler import BotResourceSampler
 from .freqai_integration_service import FreqAIIntegrationService
 from .ft_rest_client_service import FtRestClientService
 
 __all__ = [
     "bot_service",
     "BotProcessManager",
+    "BotResourceSampler",
     "FreqAIIntegrationService",
     "FtRestClientService",
 ]
@@ -7,12 +7,18 @@ import base64
 import json
 import logging
 import os
+import secrets
 import socket
 import subprocess
 from pathlib import Path
 from typing import Dict, Any
 
 from management_server.tools.redis_streams_event_bus import RedisStreamsEventBus
+from ..core.config import gateway_settings
+from .bot_push_ingestor import build_webhook_config
+from .exchange_proxy import proxy_url
+from .ft_rest_client_service import ft_rest_client_service
+from .market_data_producer import market_data_registry
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +32,10 @@ class BotProcessManager:
         self.event_bus = event_bus
         self.running_bots: Dict[str, subprocess.Popen] = {}
         self.bot_configs: Dict[str, Dict[str, Any]] = {}
+        # FreqAI model of each bot, kept to restart consumers of a stopped producer
+        self.bot_models: Dict[str, Dict[str, Any]] = {}
+        # Token each bot sends with its webhook calls in webhook push mode
+        self.webhook_tokens: Dict[str, str] = {}
         self.base_bot_dir = Path("bots_data")
         self.base_bot_dir.mkdir(exist_ok=True)
 
@@ -55,10 +65,19 @@ class BotProcessManager:
     ):
         """Handle FreqAI model using the FreqAIModelHandler."""
         try:
-            # Store model using FreqAIModelHandler
-            model_path = await self.freqai_handler.store_model_for_bot(
-                bot_name, freqai_model_data
-            )
+            if freqai_model_data.get("sha256"):
+                # Model was uploaded in chunks beforehand, only link it
+                model_path = self.freqai_handler.link_model_for_bot(
+                    bot_name,
+                    freqai_model_data["sha256"],
+                    freqai_model_data.get("filename", "model.joblib"),
+                    pin=True,
+                )
+            else:
+                # Store model using FreqAIModelHandler, pinned while the bot runs
+                model_path = await self.freqai_handler.store_model_for_bot(
+                    bot_name, freqai_model_data, pin=True
+                )
 
             logger.info(f"FreqAI model stored for bot {bot_name}: {model_path}")
 
@@ -73,6 +92,68 @@ class BotProcessManager:
             logger.error(f"Failed to handle FreqAI model for bot {bot_name}: {e}")
             raise
 
+    def _configure_push(self, bot_name: str, bot_config: Dict[str, Any]):
+        """Enable the push transport selected by BOT_PUSH_MODE in the bot config."""
+        if gateway_settings.BOT_PUSH_MODE == "websocket":
+            api_server = bot_config["api_server"]
+            # freqtrade serves /api/v1/message/ws only with enable_message_ws
+            api_server["enable_message_ws"] = True
+            api_server.setdefault("ws_token", secrets.token_urlsafe(32))
+        elif gateway_settings.BOT_PUSH_MODE == "webhook":
+            base_url = gateway_settings.GATEWAY_PUBLIC_URL.rstrip("/")
+            url = f"{base_url}/api/v1/bots/{bot_name}/webhook"
+            webhook = bot_config.get("webhook") or {}
+            # A webhook of the user's own is kept; the gateway's gets a new token
+            if not webhook or webhook.get("url", "").startswith(url):
+                token = secrets.token_urlsafe(32)
+                self.webhook_tokens[bot_name] = token
+                bot_config["webhook"] = build_webhook_config(f"{url}?token={token}")
+
+    async def _register_connection(self, bot_name: str, bot_config: Dict[str, Any]):
+        """
+        Let the REST client, and so the snapshot poller, reach a started bot;
+        the push ingestor uses its tokens only in push modes.
+        """
+        api_server = bot_config["api_server"]
+        await ft_rest_client_service.add_bot(
+            bot_name,
+            {
+                "api_url": f"http://127.0.0.1:{api_server['listen_port']}",
+                "api_username": api_server["username"],
+                "api_password": api_server["password"],
+                "api_server": api_server,
+                "webhook_token": self.webhook_tokens.get(bot_name),
+            },
+        )
+
+    def _configure_exchange_proxy(self, bot_config: Dict[str, Any]):
+        """Route the bot's exchange requests through the gateway caching proxy."""
+        exchange = bot_config.get("exchange") or {}
+        if not gateway_settings.EXCHANGE_PROXY_ENABLED or not exchange.get("name"):
+            return
+        url = proxy_url(exchange["name"].lower())
+        # freqtrade uses the sync ccxt client for orders and the async one for candles
+        for section in ("ccxt_config", "ccxt_async_config"):
+            exchange.setdefault(section, {}).setdefault("proxyUrl", url)
+
+    def _release_market_data(self, bot_name: str):
+        """Drop the market data role of a bot, restarting consumers it fed."""
+        for consumer in market_data_registry.release(bot_name):
+            if consumer not in self.running_bots:
+                continue
+            logger.info(
+                f"Market data producer '{bot_name}' stopped, restarting consumer '{consumer}'."
+            )
+            asyncio.create_task(
+                self.handle_restart_bot_command(
+                    {
+                        "bot_name": consumer,
+                        "bot_config": self.bot_configs[consumer],
+                        "freqai_model": self.bot_models.get(consumer),
+                    }
+                )
+            )
+
     async def handle_start_bot_command(self, command_data: Dict[str, Any]):
         """Receives a START_BOT command and initiates the bot process."""
         bot_name = command_data.get("bot_name")
@@ -100,31 +181,37 @@ class BotProcessManager:
         bot_dir = self.base_bot_dir / bot_name
         bot_dir.mkdir(exist_ok=True)
 
-        if freqai_model_data:
-            await self._handle_freqai_model(bot_name, bot_config, freqai_model_data)
+        try:
+            # A model that cannot be linked fails the start like any other error
+            if freqai_model_data:
+                await self._handle_freqai_model(bot_name, bot_config, freqai_model_data)
 
-        port = self._find_free_port()
+            port = self._find_free_port()
 
-        # Use user-defined API settings or set defaults
-        api_server_config = bot_config.get("api_server", {})
-        api_server_config.update(
-            {
-                "enabled": True,
-                "listen_ip_address": "0.0.0.0",
-                "listen_port": port,
-                "username": api_server_config.get("username", "user"),
-                "password": api_server_config.get("password", "password"),
-            }
-        )
-        bot_config["api_server"] = api_server_config
+            # Use user-defined API settings or set defaults
+            api_server_config = bot_config.get("api_server", {})
+            api_server_config.update(
+                {
+                    "enabled": True,
+                    "listen_ip_address": "0.0.0.0",
+                    "listen_port": port,
+                    "username": api_server_config.get("username", "user"),
+                    "password": api_server_config.get("password", "password"),
+                }
+            )
+            bot_config["api_server"] = api_server_config
+            self._configure_push(bot_name, bot_config)
+            market_data_role = market_data_registry.assign(bot_name, bot_config)
+            self._configure_exchange_proxy(bot_config)
 
-        config_path = bot_dir / "config.json"
-        with open(config_path, "w") as f:
-            json.dump(bot_config, f, indent=4)
+            config_path = bot_dir / "config.json"
+            with open(config_path, "w") as f:
+                json.dump(bot_config, f, indent=4)
 
-        self.bot_configs[bot_name] = bot_config
+            self.bot_configs[bot_name] = bot_config
+            if freqai_model_data:
+                self.bot_models[bot_name] = freqai_model_data
 
-        try:
             command = [
                 "freqtrade",
                 "trade",
@@ -142,6 +229,7 @@ class BotProcessManager:
             logger.info(
                 f"Bot '{bot_name}' started with PID {process.pid} on port {port}."
             )
+            await self._register_connection(bot_name, bot_config)
 
             await self.event_bus.publish(
                 "mcp_events",
@@ -150,12 +238,18 @@ class BotProcessManager:
                     "status": "running",
                     "pid": process.pid,
                     "port": port,
+                    "market_data_role": market_data_role,
                 },
                 event_type="BOT_STARTED",
             )
 
         except Exception as e:
             logger.error(f"Failed to start bot '{bot_name}': {e}")
+            self._release_market_data(bot_name)
+            self.bot_configs.pop(bot_name, None)
+            self.bot_models.pop(bot_name, None)
+            self.webhook_tokens.pop(bot_name, None)
+            await self.freqai_handler.cleanup_bot_models(bot_name)
             await self.event_bus.publish(
                 "mcp_events",
                 {"bot_name": bot_name, "status": "error", "error_message": str(e)},
@@ -179,6 +273,10 @@ class BotProcessManager:
 
         del self.running_bots[bot_name]
         del self.bot_configs[bot_name]
+        self.bot_models.pop(bot_name, None)
+        self._release_market_data(bot_name)
+        self.webhook_tokens.pop(bot_name, None)
+        await ft_rest_client_service.remove_bot(bot_name)
 
         # Cleanup FreqAI models for this bot
         await self.freqai_handler.cleanup_bot_models(bot_name)
@@ -209,6 +307,12 @@ class BotProcessManager:
             process.kill()
             del self.running_bots[bot_name]
             del self.bot_configs[bot_name]
+            self.bot_models.pop(bot_name, None)
+            market_data_registry.release(bot_name)
+            self.webhook_tokens.pop(bot_name, None)
+            await ft_rest_client_service.remove_bot(bot_name)
+            # Unpin the bot's models so the store can evict them again
+            await self.freqai_handler.cleanup_bot_models(bot_name)
             logger.info(f"Process for bot '{bot_name}' (PID: {process.pid}) killed.")
 
             await self.event_bus.publish(
@@ -0,0 +1,295 @@
+"""
+Push ingestion of bot updates.
+
+Instead of polling the REST API, bots can push their updates to the gateway,
+either over freqtrade's message websocket (/api/v1/message/ws) or through the
+freqtrade webhook posting to the gateway. Pushed messages are published as
+`bot_events` and trigger targeted snapshot refreshes of the affected bot.
+Bots without push support keep being polled by the BotStatusSnapshot, and so
+are push bots that sent nothing for BOT_PUSH_LEASE_TTL seconds. Webhook calls
+are only accepted in webhook mode, with the token the gateway gave the bot.
+"""
+
+import asyncio
+import json
+import logging
+import secrets
+import time
+from typing import Dict, Any, Optional, Set
+
+import aiohttp
+
+from management_server.tools.redis_streams_event_bus import mcp_streams_event_bus
+from ..core.config import gateway_settings
+from .bot_status_snapshot import BotStatusSnapshot, bot_status_snapshot
+from .ft_rest_client_service import FtRestClientService, ft_rest_client_service
+
+logger = logging.getLogger(__name__)
+
+# Freqtrade RPC message types worth forwarding; candle/dataframe payloads are
+# left out on purpose as they are large and not needed for bot state.
+PUSH_MESSAGE_TYPES = [
+    "status",
+    "warning",
+    "exception",
+    "startup",
+    "entry",
+    "entry_fill",
+    "entry_cancel",
+    "exit",
+    "exit_fill",
+    "exit_cancel",
+    "protection_trigger",
+    "protection_trigger_global",
+    "strategy_msg",
+]
+
+# Snapshot fields to refresh when a message of a type arrives
+REFRESH_ON_MESSAGE = {
+    "status": {"status"},
+    "startup": {"status", "trades", "profit", "balance"},
+    "entry": {"status", "trades"},
+    "exit": {"status", "trades"},
+    "entry_fill": {"status", "trades", "balance"},
+    "entry_cancel": {"status", "trades", "balance"},
+    "exit_fill": {"status", "trades", "profit", "balance"},
+    "exit_cancel": {"status", "trades"},
+}
+
+
+def build_webhook_config(url: str) -> Dict[str, Any]:
+    """Freqtrade `webhook` config section posting trade and status messages to `url`."""
+    webhook: Dict[str, Any] = {
+        "enabled": True,
+        "url": url,
+        "format": "json",
+        "retries": 2,
+        "retry_delay": 0.5,
+        "status": {"type": "status", "status": "{status}"},
+    }
+    for message_type in REFRESH_ON_MESSAGE:
+        if message_type.startswith(("entry", "exit")):
+            webhook[message_type] = {
+                "type": message_type,
+                "trade_id": "{trade_id}",
+                "pair": "{pair}",
+            }
+    return webhook
+
+
+def message_event_name(message_type: str) -> str:
+    """Map a freqtrade message type to a bot_events event name."""
+    if message_type.startswith(("entry", "exit")):
+        return f"TRADE_{message_type.upper()}"
+    return f"BOT_{message_type.upper()}"
+
+
+class BotPushIngestor:
+    """
+    Consumes pushed bot messages and turns them into events and snapshot updates.
+    """
+
+    def __init__(
+        self,
+        client: FtRestClientService,
+        snapshot: BotStatusSnapshot,
+        event_bus=mcp_streams_event_bus,
+        mode: Optional[str] = None,
+    ):
+        self.client = client
+        self.snapshot = snapshot
+        self.event_bus = event_bus
+        self.mode = mode or gateway_settings.BOT_PUSH_MODE
+        self.refresh_delay = gateway_settings.BOT_PUSH_REFRESH_DELAY
+        self.reconnect_delay = gateway_settings.BOT_PUSH_RECONNECT_DELAY
+        self.lease_ttl = gateway_settings.BOT_PUSH_LEASE_TTL
+
+        self._ws_tasks: Dict[str, asyncio.Task] = {}
+        self._pending_refresh: Dict[str, Set[str]] = {}
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+        self._supervisor: Optional[asyncio.Task] = None
+        self.messages_received = 0
+        self.webhooks_rejected = 0
+
+    # === MESSAGE HANDLING ===
+
+    async def handle_message(self, bot_name: str, message: Dict[str, Any]):
+        """Handle one pushed message, whichever transport delivered it."""
+        message_type = message.get("type")
+        if not message_type:
+            logger.warning(f"Pushed message without type from bot {bot_name}")
+            return
+        self.messages_received += 1
+        self._renew_push(bot_name)
+
+        data = message.get("data", message)
+        if isinstance(data, dict):
+            data = {k: v for k, v in data.items() if k != "type"}
+        event_name = message_event_name(message_type)
+        await self.event_bus.publish(
+            "bot_events",
+            {
+                "bot_name": bot_name,
+                "event_name": event_name,
+                "message_type": message_type,
+                "data": data,
+                "received_at": time.time(),
+            },
+            event_name,
+        )
+
+        fields = REFRESH_ON_MESSAGE.get(message_type)
+        if fields:
+            self._schedule_refresh(bot_name, fields)
+
+    async def handle_webhook(
+        self, bot_name: str, payload: Dict[str, Any], token: Optional[str]
+    ) -> bool:
+        """
+        Handle a freqtrade webhook call. Returns False, ignoring the call, if
+        webhook mode is off or the token is not the one of the bot.
+        """
+        connection = self.client.connections.get(bot_name)
+        expected = connection.webhook_token if connection else None
+        if (
+            self.mode != "webhook"
+            or not expected
+            or not token
+            or not secrets.compare_digest(token, expected)
+        ):
+            self.webhooks_rejected += 1
+            return False
+        await self.handle_message(bot_name, payload)
+        return True
+
+    def _renew_push(self, bot_name: str):
+        """The bot counts as push-driven until BOT_PUSH_LEASE_TTL without messages."""
+        self.snapshot.set_push(bot_name, until=time.time() + self.lease_ttl)
+
+    def _schedule_refresh(self, bot_name: str, fields: Set[str]):
+        """Coalesce refreshes so a burst of messages costs one refresh per field."""
+        self._pending_refresh.setdefault(bot_name, set()).update(fields)
+        task = self._refresh_tasks.get(bot_name)
+        if task is None or task.done():
+            self._refresh_tasks[bot_name] = asyncio.create_task(
+                self._refresh_later(bot_name)
+            )
+
+    async def _refresh_later(self, bot_name: str):
+        await asyncio.sleep(self.refresh_delay)
+        fields = self._pending_refresh.pop(bot_name, set())
+        if fields and bot_name in self.client.connections:
+            try:
+                await self.snapshot.refresh_bot(bot_name, fields)
+            except Exception as e:
+                logger.error(f"Failed to refresh snapshot of bot {bot_name}: {e}")
+
+    # === WEBSOCKET TRANSPORT ===
+
+    async def _consume_websocket(self, bot_name: str):
+        """Keep a message websocket to one bot open, falling back to polling when down."""
+        while bot_name in self.client.connections:
+            connection = self.client.connections[bot_name]
+            session = await self.client._ensure_session(bot_name)
+            url = f"{connection.url.rstrip('/')}/api/v1/message/ws"
+            try:
+                async with session.ws_connect(
+                    url, params={"token": connection.ws_token}, heartbeat=30
+                ) as ws:
+                    await ws.send_json(
+                        {"type": "subscribe", "data": PUSH_MESSAGE_TYPES}
+                    )
+                    logger.info(f"Push websocket connected for bot {bot_name}")
+                    self._renew_push(bot_name)
+                    # Catch up on anything missed while disconnected
+                    self._schedule_refresh(
+                        bot_name, {"status", "trades", "profit", "balance"}
+                    )
+
+                    async for msg in ws:
+                        if msg.type == aiohttp.WSMsgType.TEXT:
+                            try:
+                                await self.handle_message(
+                                    bot_name, json.loads(msg.data)
+                                )
+                            except json.JSONDecodeError:
+                                logger.warning(
+                                    f"Invalid push message from bot {bot_name}"
+                                )
+                        elif msg.type in (
+                            aiohttp.WSMsgType.CLOSED,
+                            aiohttp.WSMsgType.ERROR,
+                        ):
+                            break
+            except asyncio.CancelledError:
+                raise
+            except aiohttp.WSServerHandshakeError as e:
+                logger.warning(
+                    f"Bot {bot_name} does not accept push websocket ({e.status}), polling instead"
+                )
+                self.snapshot.clear_push(bot_name)
+                return
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Push websocket for bot {bot_name} failed: {e}")
+            except Exception as e:
+                logger.error(f"Unexpected push websocket error for bot {bot_name}: {e}")
+
+            self.snapshot.clear_push(bot_name)
+            await asyncio.sleep(self.reconnect_delay)
+
+    def _sync_websockets(self):
+        """Start consumers for new push-capable bots and stop removed ones."""
+        for bot_name, connection in self.client.connections.items():
+            if connection.ws_token and bot_name not in self._ws_tasks:
+                self._ws_tasks[bot_name] = asyncio.create_task(
+                    self._consume_websocket(bot_name)
+                )
+        for bot_name in list(self._ws_tasks):
+            if bot_name not in self.client.connections:
+                self._ws_tasks.pop(bot_name).cancel()
+                self.snapshot.clear_push(bot_name)
+
+    async def _supervise(self):
+        while True:
+            self._sync_websockets()
+            await asyncio.sleep(self.reconnect_delay)
+
+    # === LIFECYCLE ===
+
+    def start(self):
+        """Start push ingestion for the configured mode."""
+        if self.mode == "websocket" and (
+            self._supervisor is None or self._supervisor.done()
+        ):
+            self._supervisor = asyncio.create_task(self._supervise())
+        logger.info(f"Bot push ingestion mode: {self.mode}")
+
+    async def stop(self):
+        tasks = list(self._ws_tasks.values()) + list(self._refresh_tasks.values())
+        if self._supervisor is not None:
+            tasks.append(self._supervisor)
+            self._supervisor = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for bot_name in self._ws_tasks:
+            self.snapshot.clear_push(bot_name)
+        self._ws_tasks.clear()
+        self._refresh_tasks.clear()
+        self._pending_refresh.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "messages_received": self.messages_received,
+            "webhooks_rejected": self.webhooks_rejected,
+            "push_bots": sorted(
+                bot_name
+                for bot_name in list(self.snapshot.push_bots)
+                if self.snapshot.is_push(bot_name)
+            ),
+        }
+
+
+# Global push ingestor feeding the global snapshot
+bot_push_ingestor = BotPushIngestor(ft_rest_client_service, bot_status_snapshot)
@@ -0,0 +1,311 @@
+"""
+Per-bot resource sampling for Freqtrade bot processes.
+
+Collects CPU, RSS, open file descriptor and thread counts for every running bot
+in a single batched pass per tick and keeps a fixed-size time series per bot.
+"""
+
+import asyncio
+import logging
+import time
+from array import array
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional
+
+import psutil
+
+from ..core.config import gateway_settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ResourceSample:
+    """A single resource measurement of a bot process."""
+
+    timestamp: float
+    cpu_percent: float
+    rss_bytes: int
+    open_files: int
+    num_threads: int
+
+
+class ResourceSeries:
+    """
+    Fixed-capacity ring buffer of resource samples.
+
+    Samples are stored column-wise in typed arrays so that a long history for
+    hundreds of bots stays compact and trend detection can slice a single column.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._timestamps = array("d", [0.0]) * capacity
+        self._cpu = array("d", [0.0]) * capacity
+        self._rss = array("q", [0]) * capacity
+        self._open_files = array("l", [0]) * capacity
+        self._threads = array("l", [0]) * capacity
+        self._head = 0  # index of the next write
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, sample: ResourceSample):
+        i = self._head
+        self._timestamps[i] = sample.timestamp
+        self._cpu[i] = sample.cpu_percent
+        self._rss[i] = sample.rss_bytes
+        self._open_files[i] = sample.open_files
+        self._threads[i] = sample.num_threads
+        self._head = (i + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def _indices(self, limit: Optional[int] = None) -> List[int]:
+        """Buffer indices of the last `limit` samples, oldest first."""
+        count = self._size if limit is None else max(0, min(limit, self._size))
+        start = (self._head - count) % self.capacity
+        return [(start + offset) % self.capacity for offset in range(count)]
+
+    def latest(self) -> Optional[ResourceSample]:
+        if not self._size:
+            return None
+        return self._sample_at((self._head - 1) % self.capacity)
+
+    def samples(self, limit: Optional[int] = None) -> List[ResourceSample]:
+        return [self._sample_at(i) for i in self._indices(limit)]
+
+    def timestamps(self, limit: Optional[int] = None) -> List[float]:
+        return [self._timestamps[i] for i in self._indices(limit)]
+
+    def cpu(self, limit: Optional[int] = None) -> List[float]:
+        return [self._cpu[i] for i in self._indices(limit)]
+
+    def rss(self, limit: Optional[int] = None) -> List[int]:
+        return [self._rss[i] for i in self._indices(limit)]
+
+    def _sample_at(self, i: int) -> ResourceSample:
+        return ResourceSample(
+            timestamp=self._timestamps[i],
+            cpu_percent=self._cpu[i],
+            rss_bytes=self._rss[i],
+            open_files=self._open_files[i],
+            num_threads=self._threads[i],
+        )
+
+
+class BotResourceSampler:
+    """
+    Periodically samples resource usage of all bot processes.
+
+    The bot processes are read from ``process_manager.running_bots``. All PIDs
+    are sampled in one worker-thread pass per tick so the event loop is never
+    blocked by procfs reads.
+    """
+
+    def __init__(
+        self,
+        process_manager,
+        interval: Optional[float] = None,
+        history_size: Optional[int] = None,
+    ):
+        self.process_manager = process_manager
+        self.interval = interval or gateway_settings.BOT_RESOURCE_SAMPLE_INTERVAL
+        self.history_size = history_size or gateway_settings.BOT_RESOURCE_HISTORY_SIZE
+        self.leak_window = gateway_settings.BOT_MEMORY_LEAK_WINDOW
+        self.leak_bytes_per_minute = gateway_settings.BOT_MEMORY_LEAK_BYTES_PER_MINUTE
+        self.cpu_peg_window = gateway_settings.BOT_CPU_PEG_WINDOW
+        self.cpu_peg_percent = gateway_settings.BOT_CPU_PEG_PERCENT
+
+        self.series: Dict[str, ResourceSeries] = {}
+        self._processes: Dict[str, psutil.Process] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    # === SAMPLING ===
+
+    def _collect(self, pids: Dict[str, int]) -> Dict[str, ResourceSample]:
+        """Sample every PID in one pass. Runs in a worker thread."""
+        samples = {}
+        now = time.time()
+
+        for bot_name, pid in pids.items():
+            process = self._processes.get(bot_name)
+            try:
+                if process is None or process.pid != pid:
+                    process = psutil.Process(pid)
+                    self._processes[bot_name] = process
+
+                with process.oneshot():
+                    cpu_percent = process.cpu_percent(interval=None)
+                    rss_bytes = process.memory_info().rss
+                    num_threads = process.num_threads()
+                    if hasattr(process, "num_fds"):
+                        open_files = process.num_fds()
+                    else:
+                        open_files = process.num_handles()
+
+                samples[bot_name] = ResourceSample(
+                    timestamp=now,
+                    cpu_percent=cpu_percent,
+                    rss_bytes=rss_bytes,
+                    open_files=open_files,
+                    num_threads=num_threads,
+                )
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                self._processes.pop(bot_name, None)
+            except psutil.AccessDenied:
+                logger.warning(f"Access denied sampling bot {bot_name} (PID {pid})")
+
+        # Forget processes of bots that are no longer running
+        for bot_name in list(self._processes):
+            if bot_name not in pids:
+                del self._processes[bot_name]
+
+        return samples
+
+    async def sample_once(self) -> Dict[str, ResourceSample]:
+        """Take one sample of all running bots and append it to their series."""
+        pids = {
+            bot_name: process.pid
+            for bot_name, process in list(self.process_manager.running_bots.items())
+        }
+        samples = await asyncio.to_thread(self._collect, pids)
+
+        for bot_name, sample in samples.items():
+            series = self.series.get(bot_name)
+            if series is None:
+                series = self.series[bot_name] = ResourceSeries(self.history_size)
+            series.append(sample)
+
+        for bot_name in list(self.series):
+            if bot_name not in pids:
+                del self.series[bot_name]
+
+        return samples
+
+    async def _run(self):
+        logger.info(f"Bot resource sampler started (interval: {self.interval}s)")
+        while True:
+            try:
+                await self.sample_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error sampling bot resources: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start the background sampling task."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background sampling task."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        logger.info("Bot resource sampler stopped")
+
+    # === ANALYSIS ===
+
+    def get_flags(self, bot_name: str) -> Dict[str, Any]:
+        """Detect memory leaks (sustained RSS growth) and pegged CPU for a bot."""
+        flags = {
+            "memory_leak": False,
+            "rss_growth_bytes_per_minute": 0.0,
+            "cpu_pegged": False,
+            "avg_cpu_percent": 0.0,
+        }
+        series = self.series.get(bot_name)
+        if not series:
+            return flags
+
+        timestamps = series.timestamps(self.leak_window)
+        rss = series.rss(self.leak_window)
+        if len(rss) >= max(3, self.leak_window // 2):
+            # Least-squares slope of RSS over time
+            n = len(rss)
+            mean_t = sum(timestamps) / n
+            mean_rss = sum(rss) / n
+            variance = sum((t - mean_t) ** 2 for t in timestamps)
+            if variance > 0:
+                covariance = sum(
+                    (t - mean_t) * (r - mean_rss) for t, r in zip(timestamps, rss)
+                )
+                slope = covariance / variance * 60
+                flags["rss_growth_bytes_per_minute"] = slope
+                flags["memory_leak"] = slope >= self.leak_bytes_per_minute
+
+        cpu = series.cpu(self.cpu_peg_window)
+        if cpu:
+            avg_cpu = sum(cpu) / len(cpu)
+            flags["avg_cpu_percent"] = avg_cpu
+            flags["cpu_pegged"] = (
+                len(cpu) >= self.cpu_peg_window and avg_cpu >= self.cpu_peg_percent
+            )
+
+        return flags
+
+    def get_bot_resources(
+        self, bot_name: str, limit: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Get the latest sample, flags and history of a bot."""
+        series = self.series.get(bot_name)
+        if series is None:
+            return None
+
+        latest = series.latest()
+        return {
+            "bot_name": bot_name,
+            "latest": asdict(latest) if latest else None,
+            "flags": self.get_flags(bot_name),
+            "history": [asdict(sample) for sample in series.samples(limit)],
+        }
+
+    def get_all_resources(self) -> Dict[str, Dict[str, Any]]:
+        """Get the latest sample and flags of all sampled bots."""
+        results = {}
+        for bot_name, series in self.series.items():
+            latest = series.latest()
+            results[bot_name] = {
+                "latest": asdict(latest) if latest else None,
+                "flags": self.get_flags(bot_name),
+            }
+        return results
+
+    def render_prometheus(self) -> str:
+        """Render per-bot gauges in the Prometheus text exposition format."""
+        gauges = [
+            ("cpu_percent", "CPU usage of the bot process in percent of one core"),
+            ("rss_bytes", "Resident set size of the bot process"),
+            ("open_files", "Open file descriptors of the bot process"),
+            ("num_threads", "Threads of the bot process"),
+            ("memory_leak", "1 if sustained RSS growth was detected"),
+            ("cpu_pegged", "1 if the bot process saturates a CPU core"),
+        ]
+        values: Dict[str, List[str]] = {name: [] for name, _ in gauges}
+
+        for bot_name, series in self.series.items():
+            latest = series.latest()
+            if latest is None:
+                continue
+            flags = self.get_flags(bot_name)
+            label = '{bot="%s"}' % bot_name.replace("\\", "\\\\").replace('"', '\\"')
+            values["cpu_percent"].append(f"{label} {latest.cpu_percent}")
+            values["rss_bytes"].append(f"{label} {latest.rss_bytes}")
+            values["open_files"].append(f"{label} {latest.open_files}")
+            values["num_threads"].append(f"{label} {latest.num_threads}")
+            values["memory_leak"].append(f"{label} {int(flags['memory_leak'])}")
+            values["cpu_pegged"].append(f"{label} {int(flags['cpu_pegged'])}")
+
+        lines = []
+        for name, help_text in gauges:
+            metric = f"trading_gateway_bot_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            lines.extend(f"{metric}{value}" for value in values[name])
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,302 @@
+"""
+Background snapshot of the state of all bots.
+
+A poller refreshes status, open trades, profit and balance of every bot known
+to the FtRestClientService at per-field intervals. API reads are served from
+the in-memory snapshot together with staleness metadata, so read latency does
+not depend on how responsive the bots are. Bots that push their updates (see
+BotPushIngestor) are skipped by the poller and refreshed on demand instead.
+"""
+
+import asyncio
+import copy
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterable, Optional
+
+from ..core.config import gateway_settings
+from .ft_rest_client_service import FtRestClientService, ft_rest_client_service
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FIELDS = ("status", "trades", "profit", "balance")
+
+
+@dataclass
+class FieldSnapshot:
+    """Last known value of one field of a bot."""
+
+    data: Any = None
+    updated_at: Optional[float] = None  # last successful refresh
+    checked_at: Optional[float] = None  # last refresh attempt
+    version: int = 0  # snapshot version of the last change
+    error: Optional[str] = None
+    latency_ms: Optional[float] = None
+
+
+@dataclass
+class BotSnapshot:
+    """Snapshot of all fields of a bot."""
+
+    fields: Dict[str, FieldSnapshot] = field(
+        default_factory=lambda: {name: FieldSnapshot() for name in SNAPSHOT_FIELDS}
+    )
+    version: int = 0
+
+
+class BotStatusSnapshot:
+    """
+    Versioned in-memory snapshot of all bots, refreshed in the background.
+
+    The snapshot version increases every time a field of any bot changes, so
+    clients can ask only for bots changed since the version they already have.
+    """
+
+    def __init__(
+        self,
+        client: FtRestClientService,
+        intervals: Optional[Dict[str, float]] = None,
+        jitter: Optional[float] = None,
+    ):
+        self.client = client
+        self.intervals = intervals or {
+            "status": gateway_settings.SNAPSHOT_STATUS_INTERVAL,
+            "trades": gateway_settings.SNAPSHOT_TRADES_INTERVAL,
+            "profit": gateway_settings.SNAPSHOT_PROFIT_INTERVAL,
+            "balance": gateway_settings.SNAPSHOT_BALANCE_INTERVAL,
+        }
+        self.jitter = gateway_settings.SNAPSHOT_JITTER if jitter is None else jitter
+        self.stale_factor = gateway_settings.SNAPSHOT_STALE_FACTOR
+
+        self.bots: Dict[str, BotSnapshot] = {}
+        self.version = 0
+        # Bots delivering updates by push, mapped to when that stops being trusted
+        self.push_bots: Dict[str, float] = {}
+        self._getters = {
+            "status": "get_bot_status",
+            "trades": "get_open_trades",
+            "profit": "get_bot_profit",
+            "balance": "get_bot_balance",
+        }
+        self._task: Optional[asyncio.Task] = None
+
+    # === WRITES ===
+
+    def update_field(
+        self,
+        bot_name: str,
+        field_name: str,
+        data: Any = None,
+        error: Optional[str] = None,
+        latency_ms: Optional[float] = None,
+    ) -> bool:
+        """
+        Store a fresh value (or a refresh error) for a bot field.
+
+        On error the previous value is kept so readers still get the last
+        known state, marked with the error. Returns True if the data changed.
+        """
+        bot = self.bots.get(bot_name)
+        if bot is None:
+            bot = self.bots[bot_name] = BotSnapshot()
+        snapshot = bot.fields[field_name]
+
+        now = time.time()
+        snapshot.checked_at = now
+        snapshot.latency_ms = latency_ms
+        snapshot.error = error
+        if error is not None:
+            return False
+
+        snapshot.updated_at = now
+        if snapshot.version and snapshot.data == data:
+            return False
+
+        self.version += 1
+        snapshot.data = data
+        snapshot.version = self.version
+        bot.version = self.version
+        return True
+
+    def set_push(self, bot_name: str, until: float):
+        """
+        Mark a bot as push-driven so the poller skips it until `until`.
+        Every pushed message renews the lease; a bot gone quiet is polled again.
+        """
+        self.push_bots[bot_name] = until
+
+    def clear_push(self, bot_name: str):
+        """Fall back to polling for a bot."""
+        self.push_bots.pop(bot_name, None)
+
+    def is_push(self, bot_name: str) -> bool:
+        until = self.push_bots.get(bot_name)
+        if until is None:
+            return False
+        if until < time.time():
+            del self.push_bots[bot_name]
+            return False
+        return True
+
+    async def refresh_field(
+        self, field_name: str, bot_names: Optional[Iterable[str]] = None
+    ):
+        """
+        Refresh one field with a single bounded fan-out.
+        By default all polled (non push-driven) bots are refreshed.
+        """
+        getter = getattr(self.client, self._getters[field_name])
+
+        async def fetch(bot_name: str) -> Dict[str, Any]:
+            return {"value": await getter(bot_name)}
+
+        if bot_names is None:
+            bot_names = [
+                bot_name
+                for bot_name in self.client.connections
+                if not self.is_push(bot_name)
+            ]
+        results = await self.client._fan_out(fetch, bot_names=bot_names)
+        for bot_name, result in results.items():
+            latency_ms = result.get("elapsed_ms")
+            value = result.get("value")
+            if "value" not in result:
+                error = result.get("error", "Unknown error")
+            elif isinstance(value, dict) and "error" in value:
+                error = value["error"]
+            else:
+                error = None
+            self.update_field(
+                bot_name, field_name, value, error=error, latency_ms=latency_ms
+            )
+
+        # Forget bots that were removed from the client
+        for bot_name in list(self.bots):
+            if bot_name not in self.client.connections:
+                del self.bots[bot_name]
+
+    async def refresh_bot(self, bot_name: str, field_names: Iterable[str]):
+        """Refresh selected fields of one bot, e.g. after a pushed trade event."""
+        await asyncio.gather(
+            *(self.refresh_field(name, bot_names=[bot_name]) for name in field_names)
+        )
+
+    def _next_delay(self, field_name: str) -> float:
+        interval = self.intervals[field_name]
+        return interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    async def _run(self):
+        logger.info(f"Bot status snapshot poller started (intervals: {self.intervals})")
+        loop = asyncio.get_running_loop()
+        next_due = {name: loop.time() for name in SNAPSHOT_FIELDS}
+
+        while True:
+            field_name = min(next_due, key=next_due.get)
+            delay = next_due[field_name] - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            try:
+                await self.refresh_field(field_name)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error refreshing bot snapshot field {field_name}: {e}")
+            next_due[field_name] = loop.time() + self._next_delay(field_name)
+
+    def start(self):
+        """Start the background poller and serve client reads from the snapshot."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self.client.snapshot = self
+
+    async def stop(self):
+        """Stop the background poller."""
+        if self.client.snapshot is self:
+            self.client.snapshot = None
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        logger.info("Bot status snapshot poller stopped")
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    # === READS ===
+
+    def _field_metadata(
+        self, bot_name: str, field_name: str, snapshot: FieldSnapshot
+    ) -> Dict:
+        now = time.time()
+        age = now - snapshot.updated_at if snapshot.updated_at else None
+        push = self.is_push(bot_name)
+        if age is None:
+            stale = True
+        elif push:
+            # Push-driven bots are refreshed on events, quiet is not stale
+            stale = False
+        else:
+            stale = age > self.intervals[field_name] * self.stale_factor
+        return {
+            "version": snapshot.version,
+            "updated_at": snapshot.updated_at,
+            "age_seconds": round(age, 3) if age is not None else None,
+            "stale": stale,
+            "source": "push" if push else "poll",
+            "error": snapshot.error,
+            "latency_ms": snapshot.latency_ms,
+        }
+
+    def read(self, bot_name: str, field_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Read one field of a bot from the snapshot.
+
+        Returns None if the field has never been refreshed successfully.
+        Non-dict payloads (e.g. the open trades list) are returned under "data".
+        """
+        bot = self.bots.get(bot_name)
+        if bot is None:
+            return None
+        snapshot = bot.fields[field_name]
+        if snapshot.updated_at is None:
+            return None
+
+        data = copy.deepcopy(snapshot.data)
+        result = data if isinstance(data, dict) else {"data": data}
+        result["snapshot"] = self._field_metadata(bot_name, field_name, snapshot)
+        return result
+
+    def read_bot(self, bot_name: str) -> Optional[Dict[str, Any]]:
+        """Read all fields of a bot with per-field metadata."""
+        bot = self.bots.get(bot_name)
+        if bot is None:
+            return None
+        return {
+            "version": bot.version,
+            "fields": {
+                name: {
+                    "data": copy.deepcopy(snapshot.data),
+                    **self._field_metadata(bot_name, name, snapshot),
+                }
+                for name, snapshot in bot.fields.items()
+            },
+        }
+
+    def read_all(self, since_version: int = 0) -> Dict[str, Any]:
+        """Read all bots changed after `since_version`."""
+        return {
+            "version": self.version,
+            "bots": {
+                bot_name: self.read_bot(bot_name)
+                for bot_name, bot in self.bots.items()
+                if bot.version > since_version
+            },
+        }
+
+
+# Global snapshot of the bots served by the global FtRestClientService
+bot_status_snapshot = BotStatusSnapshot(ft_rest_client_service)
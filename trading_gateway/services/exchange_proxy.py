@@ -0,0 +1,284 @@
+"""
+Caching proxy in front of exchange REST APIs for the bot fleet.
+
+Bots and the management API point ccxt's `proxyUrl` at
+`/api/v1/exchange_proxy/{exchange_id}/`, so every exchange request arrives
+here with the full upstream URL appended. Public GET requests (markets,
+tickers, order books, candles) are cached for a short TTL and identical
+requests in flight are coalesced into one upstream call. All upstream calls
+of one exchange share a single rate-limit budget, whatever bot they come
+from. Signed requests are forwarded as they are and never cached.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from ..core.config import gateway_settings
+
+logger = logging.getLogger(__name__)
+
+# Request headers that mark a signed (account) request
+AUTH_HEADERS = {
+    "authorization",
+    "x-mbx-apikey",
+    "x-bapi-api-key",
+    "kc-api-key",
+    "ok-access-key",
+    "access-key",  # bitget
+    "x-mexc-apikey",
+    "api-key",
+    "apikey",
+    "key",
+}
+
+# Hop-by-hop headers that must not be forwarded
+HOP_HEADERS = {
+    "host",
+    "connection",
+    "keep-alive",
+    "content-length",
+    "transfer-encoding",
+    "accept-encoding",
+    "content-encoding",
+}
+
+
+@dataclass
+class ProxiedResponse:
+    """An upstream response, as cached and returned to callers."""
+
+    status: int
+    body: bytes
+    content_type: str
+    fetched_at: float = field(default_factory=time.monotonic)
+
+
+class RateLimitBudget:
+    """Token bucket shared by every upstream call to one exchange."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst or max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.waited = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a request may be sent to the exchange."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated_at) * self.rate
+                )
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+                self.waited += delay
+                await asyncio.sleep(delay)
+
+
+class ExchangeProxy:
+    """Coalescing, caching and rate-limited forwarding of exchange requests."""
+
+    def __init__(self):
+        self.cache: Dict[Tuple[str, str], ProxiedResponse] = {}
+        self.budgets: Dict[str, RateLimitBudget] = {}
+        # Upstream fetches run detached, so a cancelled caller never cancels
+        # the fetch the other callers of the same URL are waiting for
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "passthrough": 0,
+            "upstream_errors": 0,
+        }
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(
+                    total=gateway_settings.EXCHANGE_PROXY_TIMEOUT
+                ),
+                auto_decompress=True,
+            )
+        return self._session
+
+    async def close(self):
+        for task in list(self._inflight.values()):
+            task.cancel()
+        await asyncio.gather(*self._inflight.values(), return_exceptions=True)
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _budget(self, exchange_id: str) -> RateLimitBudget:
+        if exchange_id not in self.budgets:
+            rate = gateway_settings.EXCHANGE_PROXY_RATE_LIMITS.get(
+                exchange_id, gateway_settings.EXCHANGE_PROXY_DEFAULT_RATE
+            )
+            self.budgets[exchange_id] = RateLimitBudget(rate)
+        return self.budgets[exchange_id]
+
+    @staticmethod
+    def validate_url(url: str) -> str:
+        """Reject URLs that are not exchange APIs, so this is no open proxy."""
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+        allowed = gateway_settings.EXCHANGE_PROXY_ALLOWED_HOSTS
+        if parts.scheme not in ("http", "https") or not any(
+            host == domain or host.endswith(f".{domain}") for domain in allowed
+        ):
+            raise ValueError(f"Upstream host not allowed: {host or url}")
+        return url
+
+    @staticmethod
+    def cache_ttl(url: str) -> float:
+        """Seconds a public GET response of this URL may be served from cache."""
+        path = urlsplit(url).path.lower()
+        for keyword, ttl in gateway_settings.EXCHANGE_PROXY_CACHE_TTLS.items():
+            if keyword.lower() in path:
+                return ttl
+        return 0.0
+
+    async def fetch(
+        self,
+        exchange_id: str,
+        method: str,
+        url: str,
+        headers: Optional[Mapping[str, str]] = None,
+        body: Optional[bytes] = None,
+    ) -> ProxiedResponse:
+        """
+        Forward one exchange request, serving public reads from cache.
+
+        Raises:
+            ValueError: If the upstream host is not an allowed exchange host
+        """
+        self.validate_url(url)
+        headers = {
+            name: value
+            for name, value in (headers or {}).items()
+            if name.lower() not in HOP_HEADERS
+        }
+        signed = any(name.lower() in AUTH_HEADERS for name in headers)
+        ttl = self.cache_ttl(url)
+
+        if method.upper() != "GET" or signed or ttl <= 0:
+            self.stats["passthrough"] += 1
+            return await self._forward(exchange_id, method, url, headers, body)
+
+        key = (exchange_id, url)
+        cached = self.cache.get(key)
+        if cached and time.monotonic() - cached.fetched_at < ttl:
+            self.stats["hits"] += 1
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["misses"] += 1
+            inflight = asyncio.create_task(self._fetch_shared(key, headers))
+            # Retrieve the exception so a failure nobody waits for is not logged
+            inflight.add_done_callback(
+                lambda task: task.cancelled() or task.exception()
+            )
+            self._inflight[key] = inflight
+        return await asyncio.shield(inflight)
+
+    async def _fetch_shared(
+        self, key: Tuple[str, str], headers: Dict[str, str]
+    ) -> ProxiedResponse:
+        exchange_id, url = key
+        try:
+            response = await self._forward(exchange_id, "GET", url, headers, None)
+            if response.status == 200:
+                self._store(key, response)
+            return response
+        finally:
+            del self._inflight[key]
+
+    async def _forward(
+        self,
+        exchange_id: str,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        body: Optional[bytes],
+    ) -> ProxiedResponse:
+        await self._budget(exchange_id).acquire()
+        session = await self._get_session()
+        try:
+            async with session.request(
+                method, url, headers=headers, data=body
+            ) as response:
+                return ProxiedResponse(
+                    status=response.status,
+                    body=await response.read(),
+                    content_type=response.headers.get(
+                        "Content-Type", "application/json"
+                    ),
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.stats["upstream_errors"] += 1
+            logger.warning(f"Exchange proxy request to {url} failed: {e}")
+            raise
+
+    def _store(self, key: Tuple[str, str], response: ProxiedResponse):
+        # Re-insert so the cache stays ordered by fetch time
+        self.cache.pop(key, None)
+        self.cache[key] = response
+        if len(self.cache) > gateway_settings.EXCHANGE_PROXY_MAX_ENTRIES:
+            self.purge_expired()
+        while len(self.cache) > gateway_settings.EXCHANGE_PROXY_MAX_ENTRIES:
+            del self.cache[next(iter(self.cache))]
+
+    def purge_expired(self) -> int:
+        """Drop cache entries older than the longest TTL."""
+        max_ttl = max(gateway_settings.EXCHANGE_PROXY_CACHE_TTLS.values(), default=0)
+        now = time.monotonic()
+        expired = [
+            key
+            for key, response in self.cache.items()
+            if now - response.fetched_at >= max_ttl
+        ]
+        for key in expired:
+            del self.cache[key]
+        return len(expired)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "cached_responses": len(self.cache),
+            "inflight": len(self._inflight),
+            "budgets": {
+                exchange_id: {
+                    "rate": budget.rate,
+                    "tokens": round(budget.tokens, 2),
+                    "waited_seconds": round(budget.waited, 3),
+                }
+                for exchange_id, budget in self.budgets.items()
+            },
+        }
+
+
+def proxy_url(exchange_id: str) -> str:
+    """ccxt `proxyUrl` routing an exchange's requests through the gateway proxy."""
+    base_url = gateway_settings.GATEWAY_PUBLIC_URL.rstrip("/")
+    return f"{base_url}/api/v1/exchange_proxy/{exchange_id}/"
+
+
+# Global instance
+exchange_proxy = ExchangeProxy()
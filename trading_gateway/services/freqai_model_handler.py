@@ -1,65 +1,162 @@
 """
 FreqAI Model Handler for Trading Gateway
-Provides LRU caching and lifecycle management for FreqAI models
+Provides a content-addressed model store with LRU eviction and lifecycle
+management for FreqAI models
 """
 
 import os
+import re
 import time
+import asyncio
+import hashlib
 import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Set
 import base64
 
+from trading_gateway.core.config import gateway_settings
+
 logger = logging.getLogger(__name__)
 
+CONTENT_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class ModelUploadOffsetError(ValueError):
+    """A chunk did not continue the upload where the store left off."""
+
+    def __init__(self, received: int):
+        super().__init__(f"Upload continues at offset {received}")
+        self.received = received
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file, read in blocks so large models are not loaded at once."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class StoredModel:
+    """One physical model file in the store, identified by its SHA-256."""
+
+    content_hash: str
+    path: Path
+    size: int
+    bots: Set[str] = field(default_factory=set)  # bots linked to this model
+    pins: int = 0  # running bots using this model
+    leased_until: float = 0.0  # uploaded for a bot start, not linked yet
+
 
 class FreqAIModelHandler:
     """
     Handles FreqAI model storage, caching, and lifecycle management.
-    Uses LRU (Least Recently Used) cache to manage memory efficiently.
+
+    Models are stored once per unique content under objects/<sha256>.joblib
+    and each bot gets a hard link to it, so bots sharing a model share one
+    file. Models not pinned by a running bot are kept in an LRU bounded by
+    total bytes (and optionally by count) and evicted in O(1). A model just
+    uploaded, or reported present to an uploader, is leased: it stays out of
+    the LRU until a bot links it or FREQAI_MODEL_LEASE_TTL expires.
     """
 
     def __init__(
         self,
         cache_dir: str = "/tmp/freqai_cache",
-        max_cache_size: int = 5,
+        max_cache_size: Optional[int] = None,
         max_model_size_mb: int = 50,
+        max_store_size_mb: Optional[int] = None,
+        lease_ttl: Optional[float] = None,
     ):
         """
         Initialize the model handler.
 
         Args:
-            cache_dir: Directory for temporary model storage
-            max_cache_size: Maximum number of models to cache
+            cache_dir: Directory for model storage
+            max_cache_size: Maximum number of unique models to keep (None = no limit)
             max_model_size_mb: Maximum model file size in MB
+            max_store_size_mb: Maximum total size of stored models in MB
+            lease_ttl: Seconds an uploaded model is kept for the bot it is for
         """
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
+        self.objects_dir = self.cache_dir / "objects"
+        self.bots_dir = self.cache_dir / "bots"
 
         self.max_cache_size = max_cache_size
         self.max_model_size_bytes = max_model_size_mb * 1024 * 1024
-
-        # LRU cache: bot_name -> model_path
+        if max_store_size_mb is None:
+            max_store_size_mb = gateway_settings.FREQAI_MODEL_STORE_MAX_MB
+        self.max_store_bytes = max_store_size_mb * 1024 * 1024
+        if lease_ttl is None:
+            lease_ttl = gateway_settings.FREQAI_MODEL_LEASE_TTL
+        self.lease_ttl = lease_ttl
+
+        # bot_name -> path of the bot's link to its model
         self.cache: Dict[str, str] = {}
         self.access_times: Dict[str, float] = {}
+        # bot_name -> content hash of its model
+        self.bot_models: Dict[str, str] = {}
+        self.pinned_bots: Set[str] = set()
+
+        # content hash -> stored model; unpinned models in LRU order (oldest first)
+        self.objects: Dict[str, StoredModel] = {}
+        self._lru: "OrderedDict[str, None]" = OrderedDict()
+        # content hashes of leased models
+        self._leases: Set[str] = set()
+        self.total_bytes = 0
+        # content hash -> lock serializing the appends and commit of an upload
+        self._upload_locks: Dict[str, asyncio.Lock] = {}
+
+        self.hits = 0  # stores that reused an existing model file
+        self.misses = 0
+        self.evictions = 0
+
+        self._load_existing_objects()
 
         logger.info(
-            f"FreqAIModelHandler initialized: cache_dir={cache_dir}, max_size={max_cache_size}"
+            f"FreqAIModelHandler initialized: cache_dir={cache_dir}, "
+            f"max_size={max_cache_size}, max_bytes={self.max_store_bytes}"
         )
 
+    def _load_existing_objects(self):
+        """Index models left from a previous run; stale bot links are dropped."""
+        self.objects_dir.mkdir(exist_ok=True)
+        self.bots_dir.mkdir(exist_ok=True)
+
+        for link in self.bots_dir.glob("*/*"):
+            try:
+                link.unlink()
+            except OSError:
+                pass
+
+        for path in sorted(self.objects_dir.glob("*.joblib"), key=os.path.getmtime):
+            content_hash = path.stem
+            size = path.stat().st_size
+            self.objects[content_hash] = StoredModel(content_hash, path, size)
+            self._lru[content_hash] = None
+            self.total_bytes += size
+        self._evict()
+
     async def store_model_for_bot(
-        self, bot_name: str, model_data: Dict[str, str]
+        self, bot_name: str, model_data: Dict[str, str], pin: bool = False
     ) -> str:
         """
         Decode base64 model data and store it for a specific bot.
-        Uses LRU cache management.
+        Identical models are stored once and linked to every bot using them.
 
         Args:
             bot_name: Name of the bot
             model_data: Dict with 'filename' and 'content_b64' keys
+            pin: Keep the model from eviction while the bot is running
 
         Returns:
-            Path to the stored model file
+            Path to the bot's model file
 
         Raises:
             ValueError: If model data is invalid or too large
@@ -78,13 +175,7 @@ class FreqAIModelHandler:
             if not filename or not content_b64:
                 raise ValueError("Missing filename or content_b64 in model data")
 
-            # Validate filename (basic security)
-            if not filename.endswith(".joblib"):
-                raise ValueError("Only .joblib files are supported")
-
-            # Validate filename doesn't contain path traversal
-            if ".." in filename or "/" in filename or "\\" in filename:
-                raise ValueError("Invalid filename: path traversal not allowed")
+            self._validate_filename(filename)
 
             # Decode base64
             try:
@@ -98,29 +189,13 @@ class FreqAIModelHandler:
                     f"Model too large: {len(model_content)} bytes (max: {self.max_model_size_bytes})"
                 )
 
-            # Generate unique filename to avoid conflicts
-            unique_filename = f"{bot_name}_{int(time.time())}_{filename}"
-            model_path = self.cache_dir / unique_filename
-
-            # Ensure cache directory exists
-            self.cache_dir.mkdir(exist_ok=True)
-
-            # Write model file atomically
-            temp_path = model_path.with_suffix(".tmp")
-            try:
-                with open(temp_path, "wb") as f:
-                    f.write(model_content)
-                temp_path.rename(model_path)  # Atomic move
-            except OSError as e:
-                if temp_path.exists():
-                    temp_path.unlink()  # Cleanup temp file
-                raise OSError(f"Failed to write model file: {e}")
+            content_hash = hashlib.sha256(model_content).hexdigest()
+            if content_hash in self.objects:
+                self.hits += 1  # same model already on disk, no write
+            else:
+                self._write_object(content_hash, model_content)
 
-            # Update LRU cache
-            self._update_cache(bot_name, str(model_path))
-
-            logger.info(f"FreqAI model stored for bot {bot_name}: {model_path}")
-            return str(model_path)
+            return self.link_model_for_bot(bot_name, content_hash, filename, pin=pin)
 
         except (ValueError, OSError):
             # Re-raise known exceptions
@@ -131,6 +206,262 @@ class FreqAIModelHandler:
             )
             raise RuntimeError(f"Failed to store FreqAI model: {e}")
 
+    def _validate_filename(self, filename: str):
+        # Validate filename (basic security)
+        if not filename.endswith(".joblib"):
+            raise ValueError("Only .joblib files are supported")
+
+        # Validate filename doesn't contain path traversal
+        if ".." in filename or "/" in filename or "\\" in filename:
+            raise ValueError("Invalid filename: path traversal not allowed")
+
+    def has_model(self, content_hash: str) -> bool:
+        """Whether a model with this SHA-256 is already in the store."""
+        return content_hash in self.objects
+
+    # === CHUNKED UPLOADS ===
+
+    def _part_path(self, content_hash: str) -> Path:
+        if not CONTENT_HASH_RE.match(content_hash):
+            raise ValueError("Invalid content hash: expected hex SHA-256")
+        return self.objects_dir / f"{content_hash}.part"
+
+    def get_upload_state(self, content_hash: str) -> Dict[str, Any]:
+        """
+        Where an upload of a model stands.
+
+        Returns:
+            Dict with 'present' (model already stored) and 'received' (bytes
+            of a partial upload to resume from)
+        """
+        part_path = self._part_path(content_hash)
+        if content_hash in self.objects:
+            # The uploader skips the transfer and starts a bot with it next
+            self.lease_model(content_hash)
+            return {"present": True, "received": self.objects[content_hash].size}
+        received = part_path.stat().st_size if part_path.exists() else 0
+        return {"present": False, "received": received}
+
+    def _upload_lock(self, content_hash: str) -> asyncio.Lock:
+        lock = self._upload_locks.get(content_hash)
+        if lock is None:
+            lock = self._upload_locks[content_hash] = asyncio.Lock()
+        return lock
+
+    def _append_chunk(self, part_path: Path, offset: int, chunk: bytes) -> int:
+        """Append a chunk at `offset` of a partial upload; blocking file I/O."""
+        received = part_path.stat().st_size if part_path.exists() else 0
+        if offset != received:
+            raise ModelUploadOffsetError(received)
+        if received + len(chunk) > self.max_model_size_bytes:
+            raise ValueError(
+                f"Model too large: more than {self.max_model_size_bytes} bytes"
+            )
+
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        with open(part_path, "ab") as f:
+            f.write(chunk)
+        return received + len(chunk)
+
+    async def write_chunk(
+        self, content_hash: str, offset: int, chunk: bytes, chunk_sha256: str
+    ) -> int:
+        """
+        Append one verified chunk to a partial upload.
+
+        Hashing and writing run in a thread, chunks are a megabyte each. The
+        upload's lock keeps the offset check and the append atomic.
+
+        Args:
+            content_hash: SHA-256 of the whole model
+            offset: Position of the chunk in the model
+            chunk: Chunk bytes
+            chunk_sha256: SHA-256 of the chunk
+
+        Returns:
+            Number of bytes received so far
+
+        Raises:
+            ModelUploadOffsetError: If offset is not where the upload left off
+            ValueError: If the chunk is corrupt or the model too large
+        """
+        part_path = self._part_path(content_hash)
+        if content_hash in self.objects:
+            return self.objects[content_hash].size
+
+        actual_sha256 = await asyncio.to_thread(
+            lambda: hashlib.sha256(chunk).hexdigest()
+        )
+        if actual_sha256 != chunk_sha256:
+            raise ValueError("Chunk checksum mismatch")
+
+        async with self._upload_lock(content_hash):
+            if content_hash in self.objects:
+                return self.objects[content_hash].size
+            return await asyncio.to_thread(
+                self._append_chunk, part_path, offset, chunk
+            )
+
+    async def commit_upload(self, content_hash: str, size: int) -> Dict[str, Any]:
+        """
+        Verify a completed upload against its SHA-256 and add it to the store.
+
+        Raises:
+            ValueError: If the size or checksum does not match; the partial
+                upload is discarded on checksum mismatch
+        """
+        part_path = self._part_path(content_hash)
+        async with self._upload_lock(content_hash):
+            if content_hash not in self.objects:
+                await self._commit_part(content_hash, part_path, size)
+            else:
+                self.lease_model(content_hash)
+            self._upload_locks.pop(content_hash, None)
+
+        return {"present": True, "received": self.objects[content_hash].size}
+
+    async def _commit_part(self, content_hash: str, part_path: Path, size: int):
+        received = part_path.stat().st_size if part_path.exists() else 0
+        if received != size:
+            raise ValueError(f"Upload incomplete: {received} of {size} bytes")
+
+        # Hash in a thread, models can be tens of megabytes
+        actual_hash = await asyncio.to_thread(file_sha256, part_path)
+        if actual_hash != content_hash:
+            part_path.unlink()
+            raise ValueError("Model checksum mismatch, upload discarded")
+
+        object_path = self.objects_dir / f"{content_hash}.joblib"
+        part_path.rename(object_path)
+        self.add_object(content_hash, object_path)
+        self.lease_model(content_hash)
+        self._evict(keep=content_hash)
+        logger.info(f"FreqAI model {content_hash} uploaded ({size} bytes)")
+
+    def _write_object(self, content_hash: str, model_content: bytes):
+        """Write a new model file atomically and add it to the store."""
+        object_path = self.objects_dir / f"{content_hash}.joblib"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+
+        temp_path = object_path.with_suffix(".tmp")
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(model_content)
+            temp_path.rename(object_path)  # Atomic move
+        except OSError as e:
+            if temp_path.exists():
+                temp_path.unlink()  # Cleanup temp file
+            raise OSError(f"Failed to write model file: {e}")
+
+        self.add_object(content_hash, object_path)
+
+    def add_object(self, content_hash: str, object_path: Path):
+        """Register a model file already written to its place in the store."""
+        size = object_path.stat().st_size
+        self.objects[content_hash] = StoredModel(content_hash, object_path, size)
+        self._lru[content_hash] = None
+        self.total_bytes += size
+        self.misses += 1
+
+    def link_model_for_bot(
+        self, bot_name: str, content_hash: str, filename: str, pin: bool = False
+    ) -> str:
+        """
+        Give a bot its own path to a model already in the store.
+
+        Args:
+            bot_name: Name of the bot
+            content_hash: SHA-256 of the model
+            filename: File name the bot sees
+            pin: Keep the model from eviction while the bot is running
+
+        Returns:
+            Path to the bot's model file
+        """
+        self._validate_filename(filename)
+        stored = self.objects.get(content_hash)
+        if stored is None:
+            raise ValueError(f"Unknown model {content_hash}")
+        # A bot has one model at a time
+        self._unlink_bot(bot_name)
+
+        bot_dir = self.bots_dir / bot_name
+        bot_dir.mkdir(parents=True, exist_ok=True)
+        model_path = bot_dir / filename
+        try:
+            os.link(stored.path, model_path)
+        except OSError as e:
+            # No hard links on this filesystem - the bot uses the shared file
+            logger.debug(f"Hard link failed for {model_path}, sharing file: {e}")
+            model_path = stored.path
+
+        stored.bots.add(bot_name)
+        self.bot_models[bot_name] = content_hash
+        self.cache[bot_name] = str(model_path)
+        self.access_times[bot_name] = time.time()
+        self._touch(content_hash)
+        if pin:
+            self.pin_model(bot_name)
+        self.release_lease(content_hash)
+
+        self._evict(keep=content_hash)
+        logger.info(f"FreqAI model stored for bot {bot_name}: {model_path}")
+        return str(model_path)
+
+    def pin_model(self, bot_name: str):
+        """Protect the model of a running bot from eviction."""
+        content_hash = self.bot_models.get(bot_name)
+        if content_hash is None or bot_name in self.pinned_bots:
+            return
+        self.pinned_bots.add(bot_name)
+        stored = self.objects[content_hash]
+        stored.pins += 1
+        self._lru.pop(content_hash, None)
+
+    def unpin_model(self, bot_name: str):
+        """Make the model of a stopped bot evictable again."""
+        if bot_name not in self.pinned_bots:
+            return
+        self.pinned_bots.discard(bot_name)
+        stored = self.objects.get(self.bot_models.get(bot_name))
+        if stored is None:
+            return
+        stored.pins -= 1
+        if stored.pins == 0 and stored.content_hash not in self._leases:
+            self._lru[stored.content_hash] = None  # most recently used
+
+    def lease_model(self, content_hash: str):
+        """Keep a model from eviction until a bot links it or the lease expires."""
+        stored = self.objects.get(content_hash)
+        if stored is None:
+            return
+        stored.leased_until = time.monotonic() + self.lease_ttl
+        self._leases.add(content_hash)
+        self._lru.pop(content_hash, None)
+
+    def release_lease(self, content_hash: str):
+        """End the lease of a model; unpinned models become evictable again."""
+        if content_hash not in self._leases:
+            return
+        self._leases.discard(content_hash)
+        stored = self.objects.get(content_hash)
+        if stored is not None and stored.pins == 0:
+            self._lru[content_hash] = None  # most recently used
+
+    def _expire_leases(self):
+        now = time.monotonic()
+        for content_hash in [
+            content_hash
+            for content_hash in self._leases
+            if self.objects[content_hash].leased_until <= now
+        ]:
+            logger.info(f"Lease of unused FreqAI model {content_hash} expired")
+            self.release_lease(content_hash)
+
+    def _touch(self, content_hash: str):
+        if content_hash in self._lru:
+            self._lru.move_to_end(content_hash)
+
     def get_model_path(self, bot_name: str) -> Optional[str]:
         """
         Get the cached model path for a bot.
@@ -144,13 +475,35 @@ class FreqAIModelHandler:
         """
         if bot_name in self.cache:
             self.access_times[bot_name] = time.time()
+            self._touch(self.bot_models[bot_name])
             return self.cache[bot_name]
         return None
 
+    def _unlink_bot(self, bot_name: str):
+        """Remove a bot's link to its model; the model itself stays in the store."""
+        self.unpin_model(bot_name)
+        content_hash = self.bot_models.pop(bot_name, None)
+        model_path = self.cache.pop(bot_name, None)
+        self.access_times.pop(bot_name, None)
+        if content_hash is None:
+            return
+
+        stored = self.objects.get(content_hash)
+        if stored is not None:
+            stored.bots.discard(bot_name)
+        if model_path and (stored is None or Path(model_path) != stored.path):
+            try:
+                os.remove(model_path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Failed to remove model file {model_path}: {e}")
+
     async def cleanup_bot_models(self, bot_name: str):
         """
-        Remove all cached models for a specific bot.
-        Called when bot is stopped.
+        Remove the model link of a specific bot and unpin its model.
+        Called when bot is stopped. The model stays in the store for reuse
+        until it is evicted.
 
         Args:
             bot_name: Name of the bot
@@ -162,67 +515,56 @@ class FreqAIModelHandler:
             raise ValueError("Invalid bot_name provided")
 
         if bot_name in self.cache:
-            model_path = self.cache[bot_name]
-
-            # Remove file if it exists
-            if os.path.exists(model_path):
-                try:
-                    os.remove(model_path)
-                    logger.info(
-                        f"Removed FreqAI model file for bot {bot_name}: {model_path}"
-                    )
-                except OSError as e:
-                    logger.warning(f"Failed to remove model file {model_path}: {e}")
-                    # Continue cleanup even if file removal fails
-                except Exception as e:
-                    logger.error(
-                        f"Unexpected error removing model file {model_path}: {e}"
-                    )
-
-            # Remove from cache
-            del self.cache[bot_name]
-            del self.access_times[bot_name]
-
+            self._unlink_bot(bot_name)
+            self._evict()
             logger.debug(f"Cleaned up FreqAI cache for bot {bot_name}")
         else:
             logger.debug(f"No cached models found for bot {bot_name}")
 
-    def _update_cache(self, bot_name: str, model_path: str):
-        """
-        Update LRU cache with new model.
-        Evicts least recently used items if cache is full.
+    def _over_limit(self) -> bool:
+        if self.total_bytes > self.max_store_bytes:
+            return True
+        return self.max_cache_size is not None and len(self.objects) > (
+            self.max_cache_size
+        )
 
-        Args:
-            bot_name: Name of the bot
-            model_path: Path to the model file
+    def _evict(self, keep: Optional[str] = None):
         """
-        # If bot already in cache, just update access time
-        if bot_name in self.cache:
-            self.access_times[bot_name] = time.time()
-            return
+        Evict least recently used unpinned models until within limits.
+        The model given as `keep` (just handed out to a bot) is never evicted.
+        """
+        self._expire_leases()
+        kept = keep is not None and self._lru.pop(keep, False) is None
+        while self._over_limit() and self._lru:
+            content_hash, _ = self._lru.popitem(last=False)
+            self._remove_object(content_hash)
+            self.evictions += 1
+        if kept:
+            self._lru[keep] = None
+
+        if self._over_limit():
+            logger.warning(
+                f"FreqAI model store over limit with only pinned models: "
+                f"{len(self.objects)} models, {self.total_bytes} bytes"
+            )
 
-        # Check if cache is full
-        if len(self.cache) >= self.max_cache_size:
-            # Find least recently used
-            lru_bot = min(self.access_times.keys(), key=lambda k: self.access_times[k])
-
-            # Remove LRU item
-            lru_path = self.cache[lru_bot]
-            if os.path.exists(lru_path):
-                try:
-                    os.remove(lru_path)
-                    logger.info(f"Evicted LRU model for bot {lru_bot}: {lru_path}")
-                except Exception as e:
-                    logger.warning(f"Failed to remove evicted model {lru_path}: {e}")
-
-            del self.cache[lru_bot]
-            del self.access_times[lru_bot]
-
-        # Add new item
-        self.cache[bot_name] = model_path
-        self.access_times[bot_name] = time.time()
+    def _remove_object(self, content_hash: str):
+        stored = self.objects.pop(content_hash)
+        self._lru.pop(content_hash, None)
+        self._leases.discard(content_hash)
+        self.total_bytes -= stored.size
+
+        # Bots still linked to an evicted model lose their cache entry
+        for bot_name in list(stored.bots):
+            self._unlink_bot(bot_name)
 
-        logger.debug(f"Cache updated: {len(self.cache)}/{self.max_cache_size} models")
+        try:
+            os.remove(stored.path)
+            logger.info(f"Evicted LRU FreqAI model {content_hash}: {stored.path}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to remove evicted model {stored.path}: {e}")
 
     def get_cache_stats(self) -> Dict[str, Any]:
         """
@@ -234,26 +576,31 @@ class FreqAIModelHandler:
         return {
             "cached_models": len(self.cache),
             "max_cache_size": self.max_cache_size,
+            "stored_models": len(self.objects),
+            "stored_bytes": self.total_bytes,
+            "max_store_bytes": self.max_store_bytes,
+            "pinned_models": sum(1 for s in self.objects.values() if s.pins),
+            "leased_models": len(self._leases),
+            "evictable_models": len(self._lru),
+            "evictions": self.evictions,
             "cache_hit_rate": self._calculate_hit_rate(),
-            "oldest_access": min(self.access_times.values())
-            if self.access_times
-            else None,
-            "newest_access": max(self.access_times.values())
-            if self.access_times
-            else None,
+            "oldest_access": (
+                min(self.access_times.values()) if self.access_times else None
+            ),
+            "newest_access": (
+                max(self.access_times.values()) if self.access_times else None
+            ),
         }
 
     def _calculate_hit_rate(self) -> float:
         """
-        Calculate cache hit rate (simplified version).
-        In production, you'd track hits/misses over time.
+        Calculate the share of stores that reused a model already on disk.
 
         Returns:
             Hit rate as percentage
         """
-        # Simplified: assume all current cache entries are hits
-        total_entries = len(self.cache)
-        return 100.0 if total_entries > 0 else 0.0
+        total = self.hits + self.misses
+        return round(100.0 * self.hits / total, 2) if total else 0.0
 
     async def cleanup_all(self):
         """
@@ -262,12 +609,10 @@ class FreqAIModelHandler:
         """
         logger.info("Cleaning up all FreqAI model cache")
 
-        for bot_name, model_path in self.cache.items():
-            if os.path.exists(model_path):
-                try:
-                    os.remove(model_path)
-                except Exception as e:
-                    logger.warning(f"Failed to cleanup {model_path}: {e}")
+        for bot_name in list(self.cache):
+            self._unlink_bot(bot_name)
+        for content_hash in list(self.objects):
+            self._remove_object(content_hash)
 
         self.cache.clear()
         self.access_times.clear()
@@ -5,8 +5,10 @@
 
 import asyncio
 import logging
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass
+import time
+from typing import Dict, Any, Optional, List, Callable, Awaitable, Iterable, Tuple
+from dataclasses import dataclass, field
+from enum import Enum
 from contextlib import asynccontextmanager
 import aiohttp
 import json
@@ -14,10 +16,103 @@ from datetime import datetime, timedelta
 from management_server.tools.redis_streams_event_bus import (
     mcp_streams_event_bus as event_bus,
 )
+from shared.freqtrade_auth import freqtrade_token_cache
+from ..core.config import gateway_settings
 
 logger = logging.getLogger(__name__)
 
 
+class CircuitState(str, Enum):
+    """Состояния circuit breaker бота"""
+
+    CLOSED = "closed"  # запросы проходят
+    OPEN = "open"  # запросы отклоняются без обращения к боту
+    HALF_OPEN = "half_open"  # один пробный запрос проверяет восстановление
+
+
+@dataclass
+class CircuitBreaker:
+    """
+    Circuit breaker подключения к боту.
+    После failure_threshold ошибок подряд запросы к боту отклоняются сразу,
+    а через recovery_timeout пропускается один пробный запрос.
+    """
+
+    failure_threshold: int = field(
+        default_factory=lambda: gateway_settings.FT_BREAKER_FAILURE_THRESHOLD
+    )
+    recovery_timeout: float = field(
+        default_factory=lambda: gateway_settings.FT_BREAKER_RECOVERY_TIMEOUT
+    )
+    state: CircuitState = CircuitState.CLOSED
+    failures: int = 0  # ошибок подряд
+    opened_at: Optional[float] = None
+    probe_in_flight: bool = False
+    times_opened: int = 0
+    rejected: int = 0
+    last_error: Optional[str] = None
+
+    def allow_request(self) -> bool:
+        """Можно ли отправить запрос боту; в half-open - только один пробный"""
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() - self.opened_at < self.recovery_timeout:
+                self.rejected += 1
+                return False
+            self.state = CircuitState.HALF_OPEN
+
+        if self.state == CircuitState.HALF_OPEN:
+            if self.probe_in_flight:
+                self.rejected += 1
+                return False
+            self.probe_in_flight = True
+
+        return True
+
+    def record_success(self):
+        """Бот ответил - breaker закрывается"""
+        if self.state != CircuitState.CLOSED:
+            logger.info("Circuit breaker closed after successful probe")
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+
+    def record_failure(self, error: str):
+        """Ошибка подключения; неудачная проба сразу открывает breaker снова"""
+        self.failures += 1
+        self.last_error = error
+        self.probe_in_flight = False
+        if (
+            self.state == CircuitState.HALF_OPEN
+            or self.failures >= self.failure_threshold
+        ):
+            if self.state != CircuitState.OPEN:
+                self.times_opened += 1
+            self.state = CircuitState.OPEN
+            self.opened_at = time.monotonic()
+
+    def release_probe(self):
+        """Пробный запрос отменён без результата - разрешить следующий"""
+        self.probe_in_flight = False
+
+    def retry_after(self) -> float:
+        """Секунд до следующей пробы"""
+        if self.state != CircuitState.OPEN:
+            return 0.0
+        return max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state.value,
+            "failures": self.failures,
+            "failure_threshold": self.failure_threshold,
+            "retry_after": round(self.retry_after(), 3),
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "last_error": self.last_error,
+        }
+
+
 @dataclass
 class BotConnection:
     """Конфигурация подключения к боту"""
@@ -27,11 +122,14 @@ class BotConnection:
     ui_url: str
     username: str
     password: str
+    ws_token: Optional[str] = None  # api_server.ws_token для push сообщений
+    webhook_token: Optional[str] = None  # токен webhook вызовов бота
     session: Optional[aiohttp.ClientSession] = None
     last_health_check: Optional[datetime] = None
     is_healthy: bool = False
     retry_count: int = 0
     max_retries: int = 3
+    breaker: CircuitBreaker = field(default_factory=CircuitBreaker)
 
 
 class FtRestClientService:
@@ -40,11 +138,23 @@ class FtRestClientService:
     Используется Core Server и MCP Bridge для всех операций с ботами.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        bulk_deadline: Optional[float] = None,
+    ):
         self.connections: Dict[str, BotConnection] = {}
         self._lock = asyncio.Lock()
         self._initialized = False
         self.event_bus = event_bus
+        self.max_concurrency = (
+            max_concurrency or gateway_settings.FT_BULK_MAX_CONCURRENCY
+        )
+        self.bulk_deadline = bulk_deadline or gateway_settings.FT_BULK_DEADLINE
+        self.token_cache = freqtrade_token_cache
+        self._connector: Optional[aiohttp.TCPConnector] = None
+        # Фоновый снимок состояния ботов (BotStatusSnapshot), если запущен
+        self.snapshot = None
 
     async def initialize(self, bot_configs: Dict[str, Dict[str, Any]]) -> bool:
         """Инициализация сервиса с конфигурациями ботов"""
@@ -55,16 +165,9 @@ class FtRestClientService:
                 )
 
                 for bot_name, config in bot_configs.items():
-                    connection = BotConnection(
-                        name=bot_name,
-                        url=config["api_url"],
-                        ui_url=config.get(
-                            "ui_url", f"http://localhost:{8080 + len(self.connections)}"
-                        ),  # Default ui_url
-                        username=config.get("api_username", "freqtrade"),
-                        password=config.get("api_password", "supersecurepassword"),
+                    self.connections[bot_name] = self._build_connection(
+                        bot_name, config
                     )
-                    self.connections[bot_name] = connection
 
                 # Создание сессий для всех ботов
                 await self._create_sessions()
@@ -77,18 +180,59 @@ class FtRestClientService:
                 logger.error(f"Failed to initialize FtRestClient Service: {e}")
                 return False
 
+    def _build_connection(self, bot_name: str, config: Dict[str, Any]) -> BotConnection:
+        """Подключение к боту по его конфигурации"""
+        # Токен push сообщений задаётся на верхнем уровне или, как в конфиге
+        # freqtrade, в секции api_server
+        api_server = config.get("api_server") or {}
+        return BotConnection(
+            name=bot_name,
+            url=config["api_url"],
+            ui_url=config.get(
+                "ui_url", f"http://localhost:{8080 + len(self.connections)}"
+            ),  # Default ui_url
+            username=config.get("api_username", "freqtrade"),
+            password=config.get("api_password", "supersecurepassword"),
+            ws_token=config.get("ws_token") or api_server.get("ws_token"),
+            webhook_token=config.get("webhook_token"),
+        )
+
+    async def add_bot(self, bot_name: str, config: Dict[str, Any]):
+        """Добавление (или замена) подключения к запущенному боту"""
+        await self.remove_bot(bot_name)
+        self.connections[bot_name] = self._build_connection(bot_name, config)
+
+    async def remove_bot(self, bot_name: str):
+        """Удаление подключения к остановленному боту"""
+        connection = self.connections.pop(bot_name, None)
+        if connection and connection.session and not connection.session.closed:
+            await connection.session.close()
+
+    def _get_connector(self) -> aiohttp.TCPConnector:
+        """Общий пул соединений для всех ботов"""
+        if self._connector is None or self._connector.closed:
+            self._connector = aiohttp.TCPConnector(
+                limit=gateway_settings.FT_POOL_LIMIT,
+                limit_per_host=gateway_settings.FT_POOL_LIMIT_PER_HOST,
+                keepalive_timeout=gateway_settings.FT_KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=300,
+            )
+        return self._connector
+
+    def _create_session(self, connection: BotConnection):
+        """Создание HTTP сессии бота поверх общего пула соединений"""
+        timeout = aiohttp.ClientTimeout(total=30, connect=10)
+        connection.session = aiohttp.ClientSession(
+            connector=self._get_connector(),
+            connector_owner=False,
+            timeout=timeout,
+        )
+
     async def _create_sessions(self):
         """Создание HTTP сессий для всех ботов"""
         for connection in self.connections.values():
             if connection.session is None or connection.session.closed:
-                connector = aiohttp.TCPConnector(limit=10, ttl_dns_cache=300)
-                timeout = aiohttp.ClientTimeout(total=30, connect=10)
-
-                connection.session = aiohttp.ClientSession(
-                    connector=connector,
-                    timeout=timeout,
-                    auth=aiohttp.BasicAuth(connection.username, connection.password),
-                )
+                self._create_session(connection)
 
     async def _ensure_session(self, bot_name: str) -> Optional[aiohttp.ClientSession]:
         """Обеспечение активной сессии для бота"""
@@ -98,12 +242,27 @@ class FtRestClientService:
 
         connection = self.connections[bot_name]
 
-        # Проверка здоровья сессии
+        # Пересоздаётся только сессия этого бота
         if connection.session is None or connection.session.closed:
-            await self._create_sessions()
+            self._create_session(connection)
 
         return connection.session
 
+    async def _get_auth(
+        self, connection: BotConnection
+    ) -> Tuple[Dict[str, str], Optional[aiohttp.BasicAuth]]:
+        """
+        Заголовки авторизации для запроса.
+        Используется кэшированный JWT токен; если бот не выдал токен -
+        HTTP Basic авторизация.
+        """
+        token = await self.token_cache.get_access_token(
+            connection.session, connection.url, connection.username, connection.password
+        )
+        if token:
+            return {"Authorization": f"Bearer {token}"}, None
+        return {}, aiohttp.BasicAuth(connection.username, connection.password)
+
     async def _make_request(
         self,
         bot_name: str,
@@ -117,47 +276,98 @@ class FtRestClientService:
         if not session:
             return {"error": f"No session available for bot {bot_name}"}
 
-        url = f"{self.connections[bot_name].url.rstrip('/')}/{endpoint.lstrip('/')}"
+        connection = self.connections[bot_name]
+        url = f"{connection.url.rstrip('/')}/{endpoint.lstrip('/')}"
+
+        breaker = connection.breaker
+        if not breaker.allow_request():
+            # Бот недоступен - быстрый отказ вместо ожидания таймаута
+            return {
+                "error": f"Circuit breaker open for bot {bot_name}",
+                "circuit_open": True,
+                "retry_after": round(breaker.retry_after(), 3),
+            }
+        # Пробу освобождает только запрос, который её занял
+        is_probe = breaker.state == CircuitState.HALF_OPEN
 
         try:
-            async with session.request(
-                method, url, json=data if data else None
-            ) as response:
-                if response.status >= 400:
-                    error_text = await response.text()
-                    logger.error(
-                        f"API error for bot {bot_name}: {response.status} {error_text}"
-                    )
-                    return {
-                        "error": f"API request failed with status {response.status}",
-                        "details": error_text,
-                    }
-                result = await response.json()
+            for attempt in range(2):
+                headers, auth = await self._get_auth(connection)
+                async with session.request(
+                    method, url, json=data if data else None, headers=headers, auth=auth
+                ) as response:
+                    if response.status == 401 and headers and attempt == 0:
+                        # Токен отозван или истёк раньше срока - повторный вход
+                        self.token_cache.invalidate(connection.url, connection.username)
+                        continue
+                    if response.status >= 400:
+                        error_text = await response.text()
+                        if response.status >= 500:
+                            # Сбой сервера бота считается отказом для breaker
+                            await self._handle_connection_error(
+                                bot_name, f"HTTP {response.status}"
+                            )
+                        else:
+                            # Бот отвечает, ошибка прикладная - breaker не открывается
+                            breaker.record_success()
+                        logger.error(
+                            f"API error for bot {bot_name}: {response.status} {error_text}"
+                        )
+                        return {
+                            "error": f"API request failed with status {response.status}",
+                            "details": error_text,
+                        }
+                    result = await response.json()
+                    break
 
             # Обновление статуса здоровья
-            self.connections[bot_name].last_health_check = datetime.now()
-            self.connections[bot_name].is_healthy = True
-            self.connections[bot_name].retry_count = 0
+            breaker.record_success()
+            connection.last_health_check = datetime.now()
+            connection.is_healthy = True
+            connection.retry_count = 0
 
             return result
 
-        except aiohttp.ClientError as e:
-            logger.error(f"HTTP error for bot {bot_name}, endpoint {endpoint}: {e}")
-            await self._handle_connection_error(bot_name)
-            return {"error": f"Connection failed: {str(e)}"}
+        except aiohttp.ClientResponseError as e:
+            # Ответ пришёл, но не разобран (например, HTML вместо JSON) -
+            # бот доступен, breaker не открывается
+            breaker.record_success()
+            logger.error(
+                f"Invalid response from bot {bot_name}, endpoint {endpoint}: {e}"
+            )
+            return {"error": f"Invalid response: {e.message}"}
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error = str(e) or type(e).__name__
+            logger.error(f"HTTP error for bot {bot_name}, endpoint {endpoint}: {error}")
+            await self._handle_connection_error(bot_name, error)
+            return {"error": f"Connection failed: {error}"}
 
         except Exception as e:
             logger.error(f"Unexpected error for bot {bot_name}: {e}")
             return {"error": f"Unexpected error: {str(e)}"}
 
-    async def _handle_connection_error(self, bot_name: str):
+        finally:
+            # Отмена пробного запроса (например, по дедлайну bulk операции)
+            if is_probe:
+                breaker.release_probe()
+
+    async def _handle_connection_error(self, bot_name: str, error: str = ""):
         """Обработка ошибок подключения"""
-        connection = self.connections[bot_name]
+        connection = self.connections.get(bot_name)
+        if connection is None:
+            return  # бот удалён во время запроса
         connection.retry_count += 1
         connection.is_healthy = False
 
-        if connection.retry_count >= connection.max_retries:
-            logger.warning(f"Bot {bot_name} reached max retries, marking as unhealthy")
+        was_open = connection.breaker.state == CircuitState.OPEN
+        connection.breaker.record_failure(error)
+        if connection.breaker.state == CircuitState.OPEN and not was_open:
+            logger.warning(
+                f"Circuit breaker opened for bot {bot_name} after "
+                f"{connection.breaker.failures} failures, next probe in "
+                f"{connection.breaker.recovery_timeout}s"
+            )
 
     # === ОСНОВНЫЕ МЕТОДЫ УПРАВЛЕНИЯ БОТАМИ ===
 
@@ -229,28 +439,89 @@ class FtRestClientService:
 
     # === ДОПОЛНИТЕЛЬНЫЕ МЕТОДЫ ===
 
-    async def get_all_bots_status(self) -> Dict[str, Dict[str, Any]]:
-        """Получение статуса всех ботов"""
+    async def _fan_out(
+        self,
+        operation: Callable[[str], Awaitable[Any]],
+        bot_names: Optional[Iterable[str]] = None,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Выполнение операции для нескольких ботов параллельно.
+
+        Одновременно выполняется не более ``max_concurrency`` запросов. Вся
+        операция ограничена ``deadline`` секундами: боты, не ответившие вовремя,
+        получают ошибку, остальные результаты возвращаются как есть.
+        К каждому результату добавляется ``elapsed_ms``.
+        """
+        if bot_names is None:
+            bot_names = list(self.connections.keys())
+        deadline = deadline or self.bulk_deadline
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        started_at = time.monotonic()
+        timings: Dict[str, float] = {}
+
+        async def run(bot_name: str) -> Any:
+            async with semaphore:
+                call_started = time.monotonic()
+                try:
+                    return await operation(bot_name)
+                finally:
+                    timings[bot_name] = (time.monotonic() - call_started) * 1000
+
+        tasks = {bot_name: asyncio.create_task(run(bot_name)) for bot_name in bot_names}
+        if not tasks:
+            return {}
+
+        await asyncio.wait(tasks.values(), timeout=deadline)
+
         results = {}
-        for bot_name, connection in self.connections.items():
-            status = await self.get_bot_status(bot_name)
-            status["ui_url"] = connection.ui_url
-            results[bot_name] = status
+        for bot_name, task in tasks.items():
+            if not task.done():
+                task.cancel()
+                result = {
+                    "error": f"Deadline of {deadline}s exceeded",
+                    "timed_out": True,
+                }
+                elapsed_ms = (time.monotonic() - started_at) * 1000
+            else:
+                try:
+                    result = task.result()
+                    if not isinstance(result, dict):
+                        result = {"data": result}
+                except Exception as e:
+                    logger.error(f"Bulk operation failed for bot {bot_name}: {e}")
+                    result = {"error": f"Unexpected error: {str(e)}"}
+                elapsed_ms = timings.get(bot_name, 0.0)
+            result["elapsed_ms"] = round(elapsed_ms, 2)
+            results[bot_name] = result
+
+        # Let cancelled requests release their connections
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
         return results
 
-    async def start_all_bots(self) -> Dict[str, Dict[str, Any]]:
-        """Запуск всех ботов"""
-        results = {}
-        for bot_name in self.connections.keys():
-            results[bot_name] = await self.start_bot(bot_name)
+    async def get_all_bots_status(
+        self, deadline: Optional[float] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Получение статуса всех ботов"""
+        results = await self._fan_out(self.get_bot_status, deadline=deadline)
+        for bot_name, status in results.items():
+            # Бот мог быть удалён, пока шёл опрос
+            connection = self.connections.get(bot_name)
+            if connection is not None:
+                status["ui_url"] = connection.ui_url
         return results
 
-    async def stop_all_bots(self) -> Dict[str, Dict[str, Any]]:
+    async def start_all_bots(
+        self, deadline: Optional[float] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Запуск всех ботов"""
+        return await self._fan_out(self.start_bot, deadline=deadline)
+
+    async def stop_all_bots(
+        self, deadline: Optional[float] = None
+    ) -> Dict[str, Dict[str, Any]]:
         """Остановка всех ботов"""
-        results = {}
-        for bot_name in self.connections.keys():
-            results[bot_name] = await self.stop_bot(bot_name)
-        return results
+        return await self._fan_out(self.stop_bot, deadline=deadline)
 
     async def health_check_all(self) -> Dict[str, bool]:
         """Проверка здоровья всех подключений"""
@@ -270,15 +541,34 @@ class FtRestClientService:
             stats[bot_name] = {
                 "url": connection.url,
                 "healthy": connection.is_healthy,
-                "last_check": connection.last_health_check.isoformat()
-                if connection.last_health_check
-                else None,
+                "last_check": (
+                    connection.last_health_check.isoformat()
+                    if connection.last_health_check
+                    else None
+                ),
                 "retry_count": connection.retry_count,
+                "circuit": connection.breaker.to_dict(),
                 "session_active": connection.session is not None
                 and not connection.session.closed,
+                "token_cached": self.token_cache.has_token(
+                    connection.url, connection.username
+                ),
             }
         return stats
 
+    async def get_cached(
+        self, bot_name: str, field: str, getter: Callable[[str], Awaitable[Any]]
+    ) -> Dict[str, Any]:
+        """
+        Чтение данных бота из фонового снимка.
+        Если снимок не запущен или ещё не содержит данных - живой запрос.
+        """
+        if self.snapshot is not None:
+            cached = self.snapshot.read(bot_name, field)
+            if cached is not None:
+                return cached
+        return await getter(bot_name)
+
     # === МЕТОДЫ ДЛЯ MCP BRIDGE ===
 
     async def execute_ai_command(
@@ -298,12 +588,17 @@ class FtRestClientService:
             "trades": self.get_open_trades,
             "config": self.get_bot_config,
         }
+        # Команды чтения обслуживаются из фонового снимка
+        cached_commands = {"status", "profit", "balance", "trades"}
 
         if command not in command_map:
             return {"error": f"Unknown command: {command}"}
 
         try:
-            result = await command_map[command](bot_name)
+            if command in cached_commands:
+                result = await self.get_cached(bot_name, command, command_map[command])
+            else:
+                result = await command_map[command](bot_name)
 
             # Добавление AI контекста
             result.update(
@@ -330,8 +625,8 @@ class FtRestClientService:
         Получение AI рекомендаций для бота.
         Анализирует статус и предлагает действия.
         """
-        status = await self.get_bot_status(bot_name)
-        profit = await self.get_bot_profit(bot_name)
+        status = await self.get_cached(bot_name, "status", self.get_bot_status)
+        profit = await self.get_cached(bot_name, "profit", self.get_bot_profit)
 
         recommendations = []
 
@@ -381,6 +676,10 @@ class FtRestClientService:
             if connection.session and not connection.session.closed:
                 await connection.session.close()
 
+        if self._connector and not self._connector.closed:
+            await self._connector.close()
+        self._connector = None
+
         self.connections.clear()
         self._initialized = False
         logger.info("FtRestClient Service shutdown complete")
@@ -0,0 +1,168 @@
+"""
+Shared market data for bots trading the same pairs.
+
+Bots on the same exchange and timeframe would each download the same OHLCV
+candles and compute the same indicators. With MARKET_DATA_SHARING="bots" the
+first such bot is designated the producer of that feed, and later bots whose
+whitelist it covers are started as consumers using freqtrade's external
+message consumer: they receive the producer's analyzed dataframes over its
+message websocket (`dp.get_producer_df()` in the strategy) instead of pulling
+the exchange themselves. Bots with pairs outside the producer's whitelist
+keep fetching their own data.
+"""
+
+import logging
+import secrets
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from ..core.config import gateway_settings
+
+logger = logging.getLogger(__name__)
+
+# Name of the producer entry the gateway writes into consumer configs
+PRODUCER_NAME = "gateway_market_data"
+
+FeedKey = Tuple[str, str]
+
+
+def feed_key(bot_config: Dict[str, Any]) -> Optional[FeedKey]:
+    """(exchange, timeframe) of the candles a bot trades on, if configured."""
+    exchange = bot_config.get("exchange") or {}
+    name = exchange.get("name")
+    timeframe = bot_config.get("timeframe")
+    if not name or not timeframe:
+        return None
+    return name.lower(), timeframe
+
+
+def whitelist(bot_config: Dict[str, Any]) -> FrozenSet[str]:
+    """Static pair whitelist of a bot."""
+    exchange = bot_config.get("exchange") or {}
+    return frozenset(exchange.get("pair_whitelist") or [])
+
+
+@dataclass
+class MarketDataProducer:
+    """A bot publishing analyzed candles of one feed to consumer bots."""
+
+    bot_name: str
+    port: int
+    ws_token: str
+    pairs: FrozenSet[str]
+    consumers: Set[str] = field(default_factory=set)
+
+    def consumer_config(self) -> Dict[str, Any]:
+        """Freqtrade `external_message_consumer` section pointing at this producer."""
+        return {
+            "enabled": True,
+            "producers": [
+                {
+                    "name": PRODUCER_NAME,
+                    "host": gateway_settings.MARKET_DATA_PRODUCER_HOST,
+                    "port": self.port,
+                    "secure": False,
+                    "ws_token": self.ws_token,
+                }
+            ],
+            "wait_timeout": gateway_settings.MARKET_DATA_WAIT_TIMEOUT,
+            "remove_entry_exit_signals": True,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "bot_name": self.bot_name,
+            "port": self.port,
+            "pairs": sorted(self.pairs),
+            "consumers": sorted(self.consumers),
+        }
+
+
+class MarketDataProducerRegistry:
+    """
+    Assigns each starting bot a market data role: producer, consumer or
+    standalone. One producer per (exchange, timeframe) feed.
+    """
+
+    def __init__(self):
+        self.producers: Dict[FeedKey, MarketDataProducer] = {}
+        self.roles: Dict[str, Tuple[str, Optional[FeedKey]]] = {}
+
+    def assign(self, bot_name: str, bot_config: Dict[str, Any]) -> str:
+        """
+        Pick the market data role of a bot and configure it accordingly.
+
+        `bot_config` must already contain the bot's `api_server` section.
+
+        Returns:
+            "producer", "consumer" or "standalone"
+        """
+        self.release(bot_name)
+
+        # A restarted bot may still carry the consumer section of an old producer
+        consumer_section = bot_config.get("external_message_consumer") or {}
+        producer_names = [p.get("name") for p in consumer_section.get("producers", [])]
+        if producer_names == [PRODUCER_NAME]:
+            del bot_config["external_message_consumer"]
+
+        key = feed_key(bot_config)
+        pairs = whitelist(bot_config)
+        role = "standalone"
+
+        if gateway_settings.MARKET_DATA_SHARING == "bots" and key and pairs:
+            producer = self.producers.get(key)
+            if producer is None:
+                api_server = bot_config["api_server"]
+                # freqtrade serves /api/v1/message/ws only with enable_message_ws
+                api_server["enable_message_ws"] = True
+                ws_token = api_server.setdefault("ws_token", secrets.token_urlsafe(32))
+                self.producers[key] = MarketDataProducer(
+                    bot_name, api_server["listen_port"], ws_token, pairs
+                )
+                role = "producer"
+            elif pairs <= producer.pairs:
+                bot_config["external_message_consumer"] = producer.consumer_config()
+                producer.consumers.add(bot_name)
+                role = "consumer"
+
+        self.roles[bot_name] = (role, key)
+        if role != "standalone":
+            logger.info(f"Bot '{bot_name}' is market data {role} for {key}")
+        return role
+
+    def release(self, bot_name: str) -> List[str]:
+        """
+        Forget the role of a stopped bot.
+
+        Returns:
+            Consumers left without data when a producer stops; they must be
+            restarted to get a new producer
+        """
+        role, key = self.roles.pop(bot_name, (None, None))
+        if role == "consumer" and key in self.producers:
+            self.producers[key].consumers.discard(bot_name)
+        elif role == "producer" and key in self.producers:
+            orphans = sorted(self.producers.pop(key).consumers)
+            for consumer in orphans:
+                self.roles.pop(consumer, None)
+            return orphans
+        return []
+
+    def get_role(self, bot_name: str) -> str:
+        return self.roles.get(bot_name, ("standalone", None))[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "mode": gateway_settings.MARKET_DATA_SHARING,
+            "feeds": {
+                f"{exchange}:{timeframe}": producer.to_dict()
+                for (exchange, timeframe), producer in self.producers.items()
+            },
+            "standalone_bots": sorted(
+                bot for bot, (role, _) in self.roles.items() if role == "standalone"
+            ),
+        }
+
+
+# Global instance shared by all bot process managers
+market_data_registry = MarketDataProducerRegistry()